@@ -0,0 +1,63 @@
+"""
+Batch inference benchmark for IntraMind.
+
+Measures per-message NLP cost of NLPEngine.process_batch at increasing
+batch sizes against the single-message NLPEngine.process path.
+
+Usage:
+    python benchmarks/bench_batch_inference.py [--messages 20000]
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from intramind.core.config import Config  # noqa: E402
+from intramind.core.nlp_engine import NLPEngine  # noqa: E402
+
+WORDS = [
+    "hello", "my", "invoice", "is", "wrong", "please", "help", "the", "vpn",
+    "keeps", "dropping", "great", "support", "thanks", "bad", "printer",
+    "password", "reset", "bye", "how", "do", "i", "access", "payroll?",
+]
+
+
+def make_corpus(count: int, seed: int = 42) -> list:
+    """Build a synthetic ticket corpus."""
+    rng = random.Random(seed)
+    return [" ".join(rng.choice(WORDS) for _ in range(rng.randint(4, 30)))
+            for _ in range(count)]
+
+
+def per_message_us(fn, corpus: list, batch_size: int) -> float:
+    """Run fn over the corpus in batches and return microseconds per message."""
+    start = time.perf_counter()
+    for offset in range(0, len(corpus), batch_size):
+        fn(corpus[offset:offset + batch_size])
+    return (time.perf_counter() - start) / len(corpus) * 1e6
+
+
+def main() -> None:
+    """Run the benchmark and print a table."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--messages", type=int, default=20000)
+    args = parser.parse_args()
+
+    engine = NLPEngine(Config())
+    corpus = make_corpus(args.messages)
+
+    single = per_message_us(lambda batch: [engine.process(t) for t in batch], corpus, 1)
+    print(f"{'mode':<12}{'batch':>8}{'us/msg':>12}{'speedup':>10}")
+    print(f"{'process':<12}{1:>8}{single:>12.2f}{1.0:>10.2f}")
+
+    for batch_size in (1, 8, 32, 128, 512, 2048):
+        cost = per_message_us(engine.process_batch, corpus, batch_size)
+        print(f"{'batch':<12}{batch_size:>8}{cost:>12.2f}{single / cost:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+BM25 keyword index benchmark for IntraMind.
+
+Builds an index over a synthetic corpus with a Zipf-distributed
+vocabulary and sprinkled product codes, then reports build time, index
+size and query latency for code lookups and multi-word queries.
+
+Usage:
+    python benchmarks/bench_bm25.py [--chunks 1000000] [--words 60] [--queries 200]
+"""
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from intramind.knowledge.bm25 import BM25Index  # noqa: E402
+
+VOCABULARY = [f"term{i}" for i in range(50000)]
+CODES = [f"ERR-{i:05d}" for i in range(20000)]
+
+
+def corpus(chunks: int, words: int, seed: int = 7):
+    """Yield synthetic chunk texts."""
+    rng = np.random.default_rng(seed)
+    for _ in range(chunks):
+        ranks = np.minimum(rng.zipf(1.2, words), len(VOCABULARY)) - 1
+        text = " ".join(VOCABULARY[r] for r in ranks)
+        if rng.random() < 0.2:
+            text += f" failed with {CODES[rng.integers(len(CODES))]}"
+        yield text
+
+
+def main() -> None:
+    """Run the benchmark and print a table."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--chunks", type=int, default=1000000)
+    parser.add_argument("--words", type=int, default=60)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--batch", type=int, default=20000, help="chunks per segment flush")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        index = BM25Index(Path(tmp) / "bm25")
+        start = time.perf_counter()
+        rows, texts = [], []
+        for row, text in enumerate(corpus(args.chunks, args.words)):
+            rows.append(row)
+            texts.append(text)
+            if len(rows) == args.batch:
+                index.add(rows, texts)
+                index.flush()
+                rows, texts = [], []
+        index.add(rows, texts)
+        index.flush()
+        build = time.perf_counter() - start
+        size = sum(f.stat().st_size for f in (Path(tmp) / "bm25").rglob("*") if f.is_file())
+        print(f"{args.chunks} chunks indexed in {build:.1f}s, {len(index.segments)} segments, "
+              f"{size / 1e6:.1f} MB")
+
+        rng = random.Random(11)
+        workloads = {
+            "code": [rng.choice(CODES) for _ in range(args.queries)],
+            "2 words": [" ".join(rng.choices(VOCABULARY[:2000], k=2))
+                        for _ in range(args.queries)],
+            "4 words + code": [" ".join(rng.choices(VOCABULARY[:500], k=4) + [rng.choice(CODES)])
+                               for _ in range(args.queries)],
+        }
+        print(f"{'query':>16}{'p50 ms':>10}{'p95 ms':>10}")
+        for name, queries in workloads.items():
+            index.search(queries[0], args.k)
+            latencies = []
+            for query in queries:
+                start = time.perf_counter()
+                index.search(query, args.k)
+                latencies.append((time.perf_counter() - start) * 1000)
+            print(f"{name:>16}{np.percentile(latencies, 50):>10.2f}"
+                  f"{np.percentile(latencies, 95):>10.2f}")
+        index.close()
+
+
+if __name__ == "__main__":
+    main()
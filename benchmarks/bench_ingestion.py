@@ -0,0 +1,70 @@
+"""
+Knowledge base ingestion benchmark for IntraMind.
+
+Generates a synthetic text corpus and ingests it with the hashing
+embedder, reporting throughput and peak memory for several corpus sizes.
+Peak memory should stay flat as the corpus grows. A second, from-scratch
+rebuild of the same corpus shows the effect of the embedding cache.
+
+Usage:
+    python benchmarks/bench_ingestion.py [--documents 2000 8000] [--words 600]
+"""
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from intramind.knowledge.ingestion import IngestionPipeline  # noqa: E402
+from intramind.services.embeddings import HashingEmbedder  # noqa: E402
+
+VOCABULARY = [f"term{i}" for i in range(5000)]
+
+
+def write_corpus(root: Path, documents: int, words: int) -> None:
+    """Write `documents` text files of `words` random words each."""
+    rng = random.Random(7)
+    for i in range(documents):
+        directory = root / f"part{i // 1000:03d}"
+        directory.mkdir(parents=True, exist_ok=True)
+        text = " ".join(rng.choices(VOCABULARY, k=words))
+        (directory / f"doc{i:06d}.txt").write_text(text)
+
+
+def main() -> None:
+    """Run the benchmark and print a table."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--documents", type=int, nargs="+", default=[2000, 8000])
+    parser.add_argument("--words", type=int, default=600)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    print(f"{'documents':>10}{'chunks':>10}{'seconds':>10}{'docs/s':>10}{'peak MB':>10}"
+          f"{'rebuild s':>11}{'embedded':>10}")
+    for documents in args.documents:
+        with tempfile.TemporaryDirectory() as tmp:
+            corpus = Path(tmp) / "corpus"
+            write_corpus(corpus, documents, args.words)
+            pipeline = IngestionPipeline(Path(tmp) / "kb", HashingEmbedder(),
+                                         workers=args.workers)
+            tracemalloc.start()
+            start = time.perf_counter()
+            stats = pipeline.run([corpus])
+            elapsed = time.perf_counter() - start
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            start = time.perf_counter()
+            rebuild = pipeline.run([corpus], resume=False)
+            rebuild_elapsed = time.perf_counter() - start
+        print(f"{documents:>10}{stats.chunks:>10}{elapsed:>10.1f}"
+              f"{documents / elapsed:>10.0f}{peak / 1e6:>10.1f}"
+              f"{rebuild_elapsed:>11.1f}{rebuild.embedded:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Session message memory benchmark for IntraMind.
+
+Measures the bytes held per stored message for the previous dataclass
+layout (datetime timestamp, per-instance __dict__), the slotted Message
+and ColumnarMessages. Every message shares one content string so only
+per-message overhead is counted.
+
+Usage:
+    python benchmarks/bench_message_memory.py [--messages 1000000]
+"""
+
+import argparse
+import sys
+import time
+import tracemalloc
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from intramind.core.conversation import ColumnarMessages, Message  # noqa: E402
+
+CONTENT = "How do I reset my VPN password?"
+
+
+@dataclass
+class LegacyMessage:
+    """The message layout used before slotted messages."""
+    role: str
+    content: str
+    timestamp: datetime = field(default_factory=datetime.now)
+    metadata: Optional[Dict[str, Any]] = None
+    tokens: int = -1
+
+
+def measure(build) -> tuple:
+    """Return (bytes per message, seconds) for building a message store."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    store = build()
+    elapsed = time.perf_counter() - start
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return current / len(store), elapsed
+
+
+def main() -> None:
+    """Run the benchmark and print a table."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--messages", type=int, default=1_000_000)
+    args = parser.parse_args()
+    count = args.messages
+    roles = ("user", "assistant")
+
+    def legacy() -> deque:
+        return deque(LegacyMessage(roles[i & 1], CONTENT, tokens=8) for i in range(count))
+
+    def slotted() -> deque:
+        return deque(Message(roles[i & 1], CONTENT, tokens=8) for i in range(count))
+
+    def columnar() -> ColumnarMessages:
+        store = ColumnarMessages()
+        for i in range(count):
+            store.append(Message(roles[i & 1], CONTENT, tokens=8))
+        return store
+
+    print(f"{'layout':<12}{'messages':>10}{'bytes/msg':>12}{'build s':>10}{'shrink':>9}")
+    baseline = None
+    for name, build in (("dataclass", legacy), ("slotted", slotted), ("columnar", columnar)):
+        per_message, elapsed = measure(build)
+        baseline = baseline or per_message
+        print(f"{name:<12}{count:>10}{per_message:>12.1f}{elapsed:>10.2f}"
+              f"{baseline / per_message:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
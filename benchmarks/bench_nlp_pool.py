@@ -0,0 +1,69 @@
+"""
+NLP process-pool benchmark for IntraMind.
+
+Simulates a CPU-heavy model stage (pure-Python work that holds the GIL)
+and measures process_async throughput with the stage running in the
+default thread executor versus the NLP process pool at several sizes.
+
+Usage:
+    python benchmarks/bench_nlp_pool.py [--requests 400] [--work 20000]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from functools import partial
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from intramind.core.config import Config  # noqa: E402
+from intramind.core.nlp_engine import NLPEngine  # noqa: E402
+
+
+def model_stage(work: int, text: str, result: dict) -> int:
+    """Stand-in for Python-level model inference."""
+    total = 0
+    for i in range(work):
+        total = (total * 31 + i + len(text)) % 1000003
+    return total
+
+
+async def throughput(engine: NLPEngine, requests: int) -> float:
+    """Run concurrent process_async calls and return requests per second."""
+    start = time.perf_counter()
+    await asyncio.gather(*(engine.process_async(f"request {i}: I need help")
+                           for i in range(requests)))
+    return requests / (time.perf_counter() - start)
+
+
+def main() -> None:
+    """Run the benchmark and print a table."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--work", type=int, default=20000)
+    args = parser.parse_args()
+    stage = partial(model_stage, args.work)
+
+    cores = os.cpu_count() or 1
+    print(f"{cores} cores")
+    print(f"{'mode':<10}{'workers':>8}{'req/s':>10}{'speedup':>10}")
+
+    engine = NLPEngine(Config())
+    engine.add_stage("model", stage, cpu_bound=True)
+    baseline = asyncio.run(throughput(engine, args.requests))
+    print(f"{'threads':<10}{'-':>8}{baseline:>10.1f}{1.0:>10.2f}")
+
+    for workers in sorted({1, 2, 4, cores}):
+        engine = NLPEngine(Config(nlp_execution="process", workers=workers))
+        engine.add_stage("model", stage, cpu_bound=True)
+        engine.pool.start()
+        rate = asyncio.run(throughput(engine, args.requests))
+        engine.close()
+        print(f"{'process':<10}{workers:>8}{rate:>10.1f}{rate / baseline:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Rate limiter benchmark for IntraMind.
+
+Measures the cost of a TokenBucketLimiter check as the number of tracked
+keys grows (it should stay flat), and compares the latency of a turn
+rejected by the limiter with a full ChatBot.chat turn.
+
+Usage:
+    python benchmarks/bench_rate_limiter.py [--checks 200000]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from intramind.core.chatbot import ChatBot  # noqa: E402
+from intramind.core.config import Config  # noqa: E402
+from intramind.services.rate_limiter import TokenBucketLimiter  # noqa: E402
+
+
+def time_checks(keys: int, checks: int) -> float:
+    """Return microseconds per check spread over `keys` distinct keys."""
+    limiter = TokenBucketLimiter([(60, 60.0), (1000, 3600.0)], max_keys=keys)
+    names = [f"key-{i}" for i in range(keys)]
+    for name in names:
+        limiter.check(name)
+    start = time.perf_counter()
+    for i in range(checks):
+        limiter.check(names[i % keys])
+    return (time.perf_counter() - start) / checks * 1e6
+
+
+def time_turns(bot: ChatBot, turns: int, key: str) -> float:
+    """Return microseconds per chat() turn under one rate limit key."""
+    start = time.perf_counter()
+    for i in range(turns):
+        bot.chat("My printer is broken, can you help me?", session_id=f"bench-{i % 100}",
+                 rate_limit_key=key)
+    return (time.perf_counter() - start) / turns * 1e6
+
+
+def main() -> None:
+    """Run the benchmark and print a table."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--checks", type=int, default=200000)
+    parser.add_argument("--turns", type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"{'keys':>10}{'us/check':>10}")
+    for keys in (1, 1000, 100000, 1000000):
+        print(f"{keys:>10}{time_checks(keys, args.checks):>10.2f}")
+
+    config = Config(cache_enabled=False)
+    bot = ChatBot(config, rate_limiter=TokenBucketLimiter([(1, 3600.0)]))
+    bot.chat("warm up", rate_limit_key="warmup")
+    rejected = time_turns(bot, args.turns, "abusive")
+    allowed = time_turns(ChatBot(config), args.turns, "normal")
+    print()
+    print(f"{'turn':>10}{'us/turn':>10}")
+    print(f"{'rejected':>10}{rejected:>10.1f}")
+    print(f"{'full':>10}{allowed:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Incremental reindex benchmark for IntraMind.
+
+Builds a knowledge base from a synthetic corpus, edits a fraction of the
+documents (1% by default: mostly rewrites, plus a few removed and added
+files) and compares a sync against full rebuilds with and without the
+embedding cache.
+
+Usage:
+    python benchmarks/bench_reindex.py [--documents 20000] [--words 600] [--change 0.01]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from intramind.knowledge.ingestion import IngestionPipeline  # noqa: E402
+from intramind.services.embeddings import HashingEmbedder  # noqa: E402
+
+VOCABULARY = [f"term{i}" for i in range(5000)]
+
+
+def document_path(root: Path, i: int) -> Path:
+    """Path of the i-th synthetic document."""
+    return root / f"part{i // 1000:03d}" / f"doc{i:06d}.txt"
+
+
+def write_document(root: Path, i: int, words: int, rng: random.Random) -> None:
+    """Write one document of `words` random words."""
+    path = document_path(root, i)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(" ".join(rng.choices(VOCABULARY, k=words)))
+
+
+def main() -> None:
+    """Run the benchmark and print a table."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--documents", type=int, default=20000)
+    parser.add_argument("--words", type=int, default=600)
+    parser.add_argument("--change", type=float, default=0.01, help="fraction of documents edited")
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    with tempfile.TemporaryDirectory() as tmp:
+        corpus = Path(tmp) / "corpus"
+        for i in range(args.documents):
+            write_document(corpus, i, args.words, rng)
+        pipeline = IngestionPipeline(Path(tmp) / "kb", HashingEmbedder(), workers=args.workers)
+        start = time.perf_counter()
+        built = pipeline.run([corpus])
+        build_elapsed = time.perf_counter() - start
+
+        changed = rng.sample(range(args.documents), max(1, int(args.documents * args.change)))
+        removed = changed[:max(1, len(changed) // 10)]
+        for i in changed[len(removed):]:
+            write_document(corpus, i, args.words, rng)
+        for i in removed:
+            os.remove(document_path(corpus, i))
+        for i in range(args.documents, args.documents + len(removed)):
+            write_document(corpus, i, args.words, rng)
+
+        start = time.perf_counter()
+        synced = pipeline.sync([corpus])
+        sync_elapsed = time.perf_counter() - start
+
+        rows = [("initial build", build_elapsed, built.documents, built.chunks, built.embedded),
+                ("sync", sync_elapsed, synced.added + synced.changed + synced.deleted,
+                 synced.chunks, synced.embedded)]
+        for name, cached in (("rebuild, cache", True), ("rebuild, no cache", False)):
+            rebuild = IngestionPipeline(Path(tmp) / "kb", HashingEmbedder(), workers=args.workers,
+                                        cache_embeddings=cached)
+            start = time.perf_counter()
+            stats = rebuild.run([corpus], resume=False)
+            rows.append((name, time.perf_counter() - start, stats.documents, stats.chunks,
+                         stats.embedded))
+
+    print(f"{args.documents} documents, {len(changed)} changed "
+          f"({len(removed)} removed, {len(removed)} added)")
+    print(f"{'':>18}{'seconds':>10}{'documents':>11}{'chunks':>10}{'embedded':>10}{'speedup':>9}")
+    for name, elapsed, documents, chunks, embedded in rows:
+        print(f"{name:>18}{elapsed:>10.2f}{documents:>11}{chunks:>10}{embedded:>10}"
+              f"{rows[-1][1] / elapsed:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
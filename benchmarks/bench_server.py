@@ -0,0 +1,123 @@
+"""
+HTTP server benchmark for IntraMind.
+
+Starts the pre-fork server (src/main.py) with different worker counts,
+drives /api/v1/chat with keep-alive connections and reports throughput
+per worker plus resident (RSS) and proportional (PSS) memory per worker.
+PSS counts pages shared with the parent and the other workers
+fractionally, so the gap between RSS and PSS is what preloading before
+fork saves.
+
+Usage:
+    python benchmarks/bench_server.py [--workers 1 2 4] [--seconds 10] [--concurrency 64]
+"""
+
+import argparse
+import asyncio
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import httpx
+
+ROOT = Path(__file__).resolve().parent.parent
+MESSAGES = ["Hello!", "I need help with my account", "What is the VPN address?",
+            "My printer is broken and I am frustrated", "Thanks, that was great"]
+
+
+def free_port() -> int:
+    """Return a TCP port that is currently free."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def worker_memory(parent: int) -> List[Dict[str, float]]:
+    """
+    RSS and PSS in MB of each worker process (Linux only).
+
+    A single worker runs inside the server process itself, so `parent` is
+    measured when it has no children.
+    """
+    with open(f"/proc/{parent}/task/{parent}/children") as f:
+        pids = [int(pid) for pid in f.read().split()] or [parent]
+    usage = []
+    for pid in pids:
+        fields = {}
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                parts = line.split()
+                if parts[0] in ("Rss:", "Pss:"):
+                    fields[parts[0][:-1].lower()] = int(parts[1]) / 1024
+        usage.append(fields)
+    return usage
+
+
+async def load(url: str, seconds: float, concurrency: int) -> int:
+    """Send chat requests from `concurrency` connections; return the number completed."""
+    completed = 0
+    deadline = time.perf_counter() + seconds
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=30) as client:
+
+        async def user(index: int) -> None:
+            nonlocal completed
+            turn = 0
+            while time.perf_counter() < deadline:
+                message = MESSAGES[(index + turn) % len(MESSAGES)]
+                response = await client.post("/api/v1/chat", json={
+                    "message": message, "session_id": f"bench-{index}"})
+                response.raise_for_status()
+                completed += 1
+                turn += 1
+
+        await asyncio.gather(*(user(i) for i in range(concurrency)))
+    return completed
+
+
+def main() -> None:
+    """Run the benchmark and print a table."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--concurrency", type=int, default=64)
+    args = parser.parse_args()
+
+    cores = len(os.sched_getaffinity(0))
+    print(f"{cores} core(s) available")
+    print(f"{'workers':>8}{'req/s':>10}{'req/s/core':>12}{'RSS MB/worker':>15}"
+          f"{'PSS MB/worker':>15}")
+    for workers in args.workers:
+        port = free_port()
+        env = dict(os.environ, PORT=str(port), HOST="127.0.0.1", WORKERS=str(workers),
+                   CACHE_ENABLED="false", LOG_LEVEL="WARNING")
+        server = subprocess.Popen([sys.executable, str(ROOT / "src" / "main.py")], env=env)
+        url = f"http://127.0.0.1:{port}"
+        try:
+            for _ in range(200):
+                try:
+                    httpx.get(f"{url}/ready", timeout=1).raise_for_status()
+                    break
+                except httpx.HTTPError:
+                    time.sleep(0.1)
+            time.sleep(0.5)
+            asyncio.run(load(url, 1.0, args.concurrency))
+            completed = asyncio.run(load(url, args.seconds, args.concurrency))
+            memory = worker_memory(server.pid)
+        finally:
+            server.send_signal(signal.SIGTERM)
+            server.wait(timeout=60)
+        rate = completed / args.seconds
+        rss = sum(m["rss"] for m in memory) / len(memory)
+        pss = sum(m["pss"] for m in memory) / len(memory)
+        print(f"{workers:>8}{rate:>10.0f}{rate / min(workers, cores):>12.0f}"
+              f"{rss:>15.1f}{pss:>15.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Single-flight coalescing benchmark for IntraMind.
+
+Simulates an incident spike: many users ask a few identical questions at
+once against a provider with fixed latency. Reports provider requests and
+wall time with coalescing on and off.
+
+Usage:
+    python benchmarks/bench_singleflight.py [--users 500] [--questions 5]
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from intramind.core.chatbot import ChatBot  # noqa: E402
+from intramind.core.config import Config  # noqa: E402
+from intramind.services.ai_service import AIProvider  # noqa: E402
+
+
+class SlowProvider(AIProvider):
+    """Provider that answers after a fixed latency and counts requests."""
+
+    name = "slow"
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.requests = 0
+
+    async def stream(self, messages: List[Dict[str, str]], **kwargs: Any) -> AsyncIterator[str]:
+        self.requests += 1
+        await asyncio.sleep(self.latency)
+        yield "Known incident; the VPN gateway is being restarted."
+
+
+async def spike(enabled: bool, users: int, questions: int, latency: float) -> Dict[str, float]:
+    """Send one burst of turns and return provider requests and wall time."""
+    provider = SlowProvider(latency)
+    bot = ChatBot(Config(cache_enabled=False, singleflight_enabled=enabled), provider=provider)
+    start = time.perf_counter()
+    await asyncio.gather(*(bot.chat_async(f"Is service {i % questions} down?",
+                                          session_id=f"user-{i}")
+                           for i in range(users)))
+    return {"requests": provider.requests, "seconds": time.perf_counter() - start}
+
+
+def main() -> None:
+    """Run the benchmark and print a table."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--questions", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.5)
+    args = parser.parse_args()
+
+    print(f"{'singleflight':>14}{'requests':>10}{'seconds':>10}")
+    for enabled in (False, True):
+        result = asyncio.run(spike(enabled, args.users, args.questions, args.latency))
+        print(f"{'on' if enabled else 'off':>14}{result['requests']:>10}"
+              f"{result['seconds']:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
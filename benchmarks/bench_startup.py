@@ -0,0 +1,87 @@
+"""
+Startup benchmark for IntraMind.
+
+Each measurement runs in a fresh interpreter, so imports and model loads
+are cold. Reports the time to ``import intramind``, to import ChatBot,
+to construct a ChatBot, and to the first response, with and without
+ChatBot.warmup() before the first request.
+
+Usage:
+    python benchmarks/bench_startup.py [--runs 5] [--semantic-cache] [--process-pool]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+
+# Executed in a child interpreter; prints one JSON object of timings in ms
+CHILD = """
+import json, sys, time
+t0 = time.perf_counter()
+import intramind
+t1 = time.perf_counter()
+from intramind import ChatBot, Config
+t2 = time.perf_counter()
+bot = ChatBot(Config(**json.loads(sys.argv[1])))
+t3 = time.perf_counter()
+if sys.argv[2] == "warm":
+    bot.warmup()
+t4 = time.perf_counter()
+bot.chat("Hello, I need help with my account?")
+t5 = time.perf_counter()
+bot.close()
+ms = lambda a, b: (b - a) * 1000
+print(json.dumps({
+    "import intramind": ms(t0, t1),
+    "import ChatBot": ms(t1, t2),
+    "construct": ms(t2, t3),
+    "warmup": ms(t3, t4),
+    "first response": ms(t4, t5),
+    "ready to first response": ms(t2, t5),
+}))
+"""
+
+
+def run_child(settings: dict, mode: str) -> dict:
+    """Run one cold start in a new interpreter and return its timings."""
+    env = {**os.environ, "PYTHONPATH": str(SRC)}
+    output = subprocess.run(
+        [sys.executable, "-c", CHILD, json.dumps(settings), mode],
+        env=env, check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main() -> None:
+    """Run the benchmark and print a table."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--semantic-cache", action="store_true")
+    parser.add_argument("--process-pool", action="store_true")
+    args = parser.parse_args()
+
+    settings = {"cache_enabled": False}
+    if args.semantic_cache:
+        settings["semantic_cache_enabled"] = True
+    if args.process_pool:
+        settings["nlp_execution"] = "process"
+
+    results = {mode: [run_child(settings, mode) for _ in range(args.runs)]
+               for mode in ("cold", "warm")}
+
+    print(f"median of {args.runs} runs, ms")
+    print(f"{'phase':<26}{'cold':>10}{'warm':>10}")
+    for phase in results["cold"][0]:
+        cold = statistics.median(run[phase] for run in results["cold"])
+        warm = statistics.median(run[phase] for run in results["warm"])
+        print(f"{phase:<26}{cold:>10.1f}{warm:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
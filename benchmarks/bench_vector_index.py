@@ -0,0 +1,81 @@
+"""
+Vector index benchmark for IntraMind.
+
+Builds a FlatIndex and an IVFIndex over synthetic clustered unit vectors
+and reports recall@k and per-query latency for several nprobe settings,
+for single queries and for batched queries.
+
+Usage:
+    python benchmarks/bench_vector_index.py [--rows 200000] [--dimension 128] [--queries 200]
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from intramind.knowledge.vector_index import FlatIndex, IVFIndex, recall_at_k  # noqa: E402
+
+
+def clustered_vectors(rows: int, dimension: int, clusters: int, seed: int) -> np.ndarray:
+    """Unit vectors scattered around random cluster centers."""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dimension)).astype(np.float32)
+    vectors = centers[rng.integers(clusters, size=rows)]
+    vectors += 0.5 * rng.normal(size=(rows, dimension)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def latency_ms(index, queries: np.ndarray, k: int, batch: bool, **kwargs) -> float:
+    """Mean milliseconds per query."""
+    start = time.perf_counter()
+    if batch:
+        index.search(queries, k, **kwargs)
+    else:
+        for query in queries:
+            index.search(query, k, **kwargs)
+    return (time.perf_counter() - start) / len(queries) * 1000
+
+
+def main() -> None:
+    """Run the benchmark and print a table."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--dimension", type=int, default=128)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--nlist", type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        flat = FlatIndex(Path(tmp) / "vectors.f32", args.dimension)
+        for start in range(0, args.rows, 50000):
+            flat.append(clustered_vectors(min(50000, args.rows - start), args.dimension,
+                                          1000, seed=start))
+        queries = clustered_vectors(args.queries, args.dimension, 1000, seed=args.rows)
+        exact, _ = flat.search(queries, args.k)
+
+        start = time.perf_counter()
+        ivf = IVFIndex.build(flat, tmp, nlist=args.nlist or None)
+        build = time.perf_counter() - start
+        print(f"{args.rows} x {args.dimension} vectors, IVF build {build:.1f}s, "
+              f"{ivf.nlist} lists")
+        print(f"{'index':<14}{'recall@' + str(args.k):>10}{'ms/query':>10}{'ms/q batch':>12}")
+        print(f"{'flat':<14}{1.0:>10.3f}{latency_ms(flat, queries, args.k, False):>10.2f}"
+              f"{latency_ms(flat, queries, args.k, True):>12.2f}")
+        for nprobe in (1, 4, 16, 64):
+            ids, _ = ivf.search(queries, args.k, nprobe=nprobe)
+            single = latency_ms(ivf, queries, args.k, False, nprobe=nprobe)
+            batched = latency_ms(ivf, queries, args.k, True, nprobe=nprobe)
+            print(f"{'ivf nprobe=' + str(nprobe):<14}{recall_at_k(ids, exact):>10.3f}"
+                  f"{single:>10.2f}{batched:>12.2f}")
+        ivf.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -9,7 +9,29 @@ __version__ = "1.0.0"
 __author__ = "IntraMind Team"
 __license__ = "MIT"
 
-from intramind.core.chatbot import ChatBot
-from intramind.core.config import Config
+from importlib import import_module
+from typing import Any
 
-__all__ = ["ChatBot", "Config"]
+# Public names and the modules that define them. They are imported on first
+# access, so ``import intramind`` does not pull in the NLP stack or models.
+_EXPORTS = {
+    "ChatBot": "intramind.core.chatbot",
+    "Config": "intramind.core.config",
+    "get_config": "intramind.core.config",
+}
+
+__all__ = ["ChatBot", "Config", "get_config"]
+
+
+def __getattr__(name: str) -> Any:
+    """Import public names on first access."""
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list:
+    return sorted(list(globals()) + __all__)
@@ -4,4 +4,4 @@ API modules for IntraMind.
 Provides REST API and WebSocket endpoints for the chatbot.
 """
 
-__all__ = ["router", "websocket"]
+__all__ = ["app", "responses", "router", "server", "websocket"]
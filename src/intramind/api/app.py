@@ -0,0 +1,88 @@
+"""
+ASGI application for IntraMind.
+
+create_app() wraps a ChatBot in a FastAPI application serving the REST
+endpoints and the ``/ws/chat`` WebSocket. Responses are serialized with
+orjson (see ORJSONResponse).
+
+The ChatBot is normally created per worker process by a factory that
+runs at startup (see intramind.api.server), after the worker was forked,
+so per-process resources such as session store threads and connections
+are never shared. Shutdown marks the app as draining (readiness checks
+fail), lets in-flight requests finish, then closes the ChatBot so queued
+session writes are flushed.
+"""
+
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Optional
+import logging
+
+from fastapi import FastAPI
+
+from intramind.api.responses import ORJSONResponse
+from intramind.api.router import router
+from intramind.api.websocket import router as websocket_router
+from intramind.core.chatbot import ChatBot
+from intramind.core.config import Config, get_config
+
+logger = logging.getLogger(__name__)
+
+
+def create_app(chatbot: Optional[ChatBot] = None,
+               chatbot_factory: Optional[Callable[[], ChatBot]] = None,
+               config: Optional[Config] = None) -> FastAPI:
+    """
+    Create the IntraMind ASGI application.
+
+    Args:
+        chatbot: ChatBot to serve. The caller keeps ownership and closes it.
+        chatbot_factory: Called at startup to create the ChatBot when none
+            is given; the app closes it on shutdown. Defaults to
+            ``ChatBot(config)``.
+        config: Configuration object. Defaults to the shared config.
+
+    Returns:
+        FastAPI application
+
+    Example:
+        >>> app = create_app(ChatBot(config))
+        >>> uvicorn.run(app, host="0.0.0.0", port=8000)
+    """
+    config = config or (chatbot.config if chatbot is not None else get_config())
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+        owned = chatbot is None
+        bot = chatbot if chatbot is not None else (chatbot_factory or (lambda: ChatBot(config)))()
+        if owned:
+            bot.warmup()
+        if config.session_reaper_interval > 0:
+            bot.conversation_manager.start_reaper()
+        app.state.chatbot = bot
+        app.state.draining = False
+        try:
+            yield
+        finally:
+            app.state.draining = True
+            await bot.conversation_manager.stop_reaper()
+            if owned:
+                await bot.aclose()
+            elif bot.nlp_batcher is not None:
+                # The batcher's worker runs on this app's loop
+                await bot.nlp_batcher.close()
+            if bot.provider is not None:
+                from intramind.services.provider_client import close_shared_client
+
+                await close_shared_client()
+            logger.info("IntraMind application stopped")
+
+    app = FastAPI(
+        title=config.app_name,
+        debug=config.debug,
+        default_response_class=ORJSONResponse,
+        lifespan=lifespan,
+    )
+    app.state.draining = False
+    app.include_router(router)
+    app.include_router(websocket_router)
+    return app
@@ -0,0 +1,40 @@
+"""
+Response classes for the IntraMind API.
+"""
+
+import json
+from typing import Any
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is listed in requirements.txt
+    orjson = None
+
+
+def dumps(content: Any) -> bytes:
+    """
+    Serialize content to JSON bytes.
+
+    Dataclasses (ChatResponse), NumPy scalars and arrays serialize
+    natively with orjson, without a jsonable_encoder pass. Falls back to
+    the standard JSON encoder when orjson is not installed.
+
+    Args:
+        content: Value to serialize
+
+    Returns:
+        UTF-8 encoded JSON
+    """
+    if orjson is None:
+        return json.dumps(jsonable_encoder(content), separators=(",", ":")).encode("utf-8")
+    return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+
+
+class ORJSONResponse(JSONResponse):
+    """JSON response rendered with orjson (see dumps)."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
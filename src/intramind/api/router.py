@@ -0,0 +1,97 @@
+"""
+REST endpoints for IntraMind.
+
+Chat turns run through ChatBot.chat_async on the worker's event loop and
+are rate-limited per caller (see client_key); rejected turns get HTTP 429
+with a Retry-After header. Health and readiness probes are served without
+touching the ChatBot, so they stay fast under load.
+"""
+
+import hashlib
+import math
+import os
+from typing import Any, Dict, Optional
+import logging
+
+from fastapi import APIRouter, Request
+from starlette.requests import HTTPConnection
+from pydantic import BaseModel, Field
+
+from intramind.api.responses import ORJSONResponse
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+
+def client_key(connection: HTTPConnection) -> str:
+    """
+    Identify the caller of a request or WebSocket for rate limiting.
+
+    The API key (``X-API-Key`` or a bearer token) is used when present,
+    hashed so raw keys never reach the limiter's storage; otherwise the
+    client address.
+
+    Args:
+        connection: Incoming request or WebSocket
+
+    Returns:
+        Rate limit key
+    """
+    api_key = connection.headers.get("x-api-key")
+    if api_key is None:
+        scheme, _, token = connection.headers.get("authorization", "").partition(" ")
+        api_key = token if scheme.lower() == "bearer" and token else None
+    if api_key:
+        return "key:" + hashlib.blake2b(api_key.encode("utf-8"), digest_size=12).hexdigest()
+    host = connection.client.host if connection.client else "unknown"
+    return f"ip:{host}"
+
+
+class ChatRequest(BaseModel):
+    """Body of a chat request."""
+
+    message: str = Field(..., min_length=1)
+    session_id: Optional[str] = None
+    context: Optional[Dict[str, Any]] = None
+
+
+@router.post("/api/v1/chat")
+async def chat(body: ChatRequest, request: Request) -> Any:
+    """Process one chat turn and return the ChatResponse."""
+    bot = request.app.state.chatbot
+    response = await bot.chat_async(body.message, session_id=body.session_id,
+                                    context=body.context, rate_limit_key=client_key(request))
+    metadata = response.metadata or {}
+    if metadata.get("error") == "rate_limited":
+        retry_after = str(max(1, math.ceil(metadata["retry_after"])))
+        return ORJSONResponse(response, status_code=429, headers={"Retry-After": retry_after})
+    return ORJSONResponse(response)
+
+
+@router.get("/api/v1/sessions/{session_id}/history")
+async def session_history(session_id: str, request: Request) -> Dict[str, Any]:
+    """Return the messages of a session."""
+    bot = request.app.state.chatbot
+    return {"session_id": session_id, "messages": bot.get_session_history(session_id)}
+
+
+@router.delete("/api/v1/sessions/{session_id}")
+async def clear_session(session_id: str, request: Request) -> Dict[str, Any]:
+    """Delete a session."""
+    bot = request.app.state.chatbot
+    return {"session_id": session_id, "deleted": bot.clear_session(session_id)}
+
+
+@router.get("/health")
+async def health() -> Dict[str, Any]:
+    """Liveness probe."""
+    return {"status": "ok", "pid": os.getpid()}
+
+
+@router.get("/ready")
+async def ready(request: Request) -> Any:
+    """Readiness probe; fails while the worker drains before shutdown."""
+    if request.app.state.draining:
+        return ORJSONResponse({"status": "draining"}, status_code=503)
+    return {"status": "ready"}
@@ -0,0 +1,257 @@
+"""
+Pre-fork ASGI server for IntraMind.
+
+serve() loads the read-only, memory-heavy parts of the ChatBot in the
+parent process: NLP rule tables, embedding models and the memory-mapped
+knowledge base. It then moves the loaded objects out of the garbage
+collector's reach (gc.freeze), binds the listening socket and forks
+``workers`` processes. Each worker runs uvicorn on the inherited socket
+and builds its own ChatBot around the preloaded parts, so model pages are
+shared copy-on-write instead of being loaded once per worker. Anything
+that owns threads, connections or an event loop (session stores, the NLP
+process pool, caches) is created inside the worker.
+
+SIGTERM or SIGINT to the parent drains the workers: each stops
+accepting connections, fails its readiness probe, finishes in-flight
+requests within ``shutdown_timeout`` seconds and flushes session writes.
+Workers that exit unexpectedly are replaced.
+"""
+
+import gc
+import os
+import signal
+import socket
+import time
+from typing import Any, Dict, NamedTuple, Optional
+import logging
+
+from intramind.core.config import Config, get_config
+from intramind.core.nlp_engine import NLPEngine
+
+logger = logging.getLogger(__name__)
+
+# Seconds a worker must stay up before a crash is restarted without delay
+RESTART_BACKOFF = 1.0
+
+
+class Preloaded(NamedTuple):
+    """
+    ChatBot parts loaded once in the parent and shared by forked workers.
+
+    Attributes:
+        nlp_engine: NLP engine with its rule tables compiled
+        knowledge_base: Opened knowledge base, if one is configured
+    """
+    nlp_engine: NLPEngine
+    knowledge_base: Optional[Any]
+
+
+def worker_config(config: Config) -> Config:
+    """
+    Return the configuration forked workers run with.
+
+    Each worker starts its own NLP process pool, so unless ``nlp_workers``
+    is set the pool gets one process per worker rather than ``workers``
+    (which would start workers squared processes).
+
+    Args:
+        config: Server configuration
+
+    Returns:
+        Configuration for the workers
+    """
+    if config.workers > 1 and not config.nlp_workers:
+        return config.model_copy(update={"nlp_workers": 1})
+    return config
+
+
+def preload(config: Config) -> Preloaded:
+    """
+    Load the shared ChatBot parts and freeze them for copy-on-write sharing.
+
+    Args:
+        config: Configuration object
+
+    Returns:
+        Preloaded parts to build each worker's ChatBot from
+    """
+    start = time.perf_counter()
+    nlp_engine = NLPEngine(config)
+    if nlp_engine.pool is None:
+        # A process pool must be started by each worker, never before fork
+        nlp_engine.warmup()
+    if config.semantic_cache_enabled:
+        from intramind.services.embeddings import create_embedder
+
+        create_embedder(config.embedding_model).embed_one("warmup")
+    knowledge_base = None
+    if config.knowledge_base_path:
+        from intramind.knowledge.knowledge_base import KnowledgeBase
+
+        knowledge_base = KnowledgeBase.from_config(config)
+        knowledge_base.embedder.embed_one("warmup")
+    # Objects surviving to here live as long as the process; keeping the
+    # collector off them stops it from dirtying (and so copying) their pages
+    gc.collect()
+    gc.freeze()
+    logger.info(f"Preloaded shared components in {time.perf_counter() - start:.2f}s")
+    return Preloaded(nlp_engine, knowledge_base)
+
+
+def bind_socket(host: str, port: int, backlog: int = 2048) -> socket.socket:
+    """
+    Create the listening socket shared by all workers.
+
+    Args:
+        host: Interface to bind
+        port: TCP port (0 picks a free one)
+        backlog: Pending connection queue length
+
+    Returns:
+        Bound, listening socket
+    """
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def run_worker(config: Config, preloaded: Preloaded, sock: socket.socket) -> None:
+    """
+    Serve the application on an already bound socket until told to stop.
+
+    Args:
+        config: Configuration object
+        preloaded: Shared ChatBot parts
+        sock: Listening socket
+    """
+    import uvicorn
+
+    from intramind.api.app import create_app
+    from intramind.core.chatbot import ChatBot
+
+    def chatbot_factory() -> ChatBot:
+        return ChatBot(config, nlp_engine=preloaded.nlp_engine,
+                       knowledge_base=preloaded.knowledge_base)
+
+    app = create_app(chatbot_factory=chatbot_factory, config=config)
+
+    class DrainingServer(uvicorn.Server):
+        """uvicorn server that fails readiness checks as soon as shutdown starts."""
+
+        def handle_exit(self, sig: int, frame: Any) -> None:
+            app.state.draining = True
+            super().handle_exit(sig, frame)
+
+    server = DrainingServer(uvicorn.Config(
+        app,
+        log_config=None,
+        access_log=config.debug,
+        timeout_graceful_shutdown=int(config.shutdown_timeout),
+        ws_max_size=config.ws_max_message_bytes,
+    ))
+    server.run(sockets=[sock])
+
+
+def serve(config: Optional[Config] = None, sock: Optional[socket.socket] = None) -> int:
+    """
+    Run the server with ``config.workers`` forked worker processes.
+
+    Args:
+        config: Configuration object. Defaults to the shared config.
+        sock: Listening socket. Defaults to one bound to ``host``:``port``.
+
+    Returns:
+        Process exit status
+    """
+    config = worker_config(config or get_config())
+    preloaded = preload(config)
+    try:
+        sock = sock or bind_socket(config.host, config.port)
+        logger.info(f"Listening on {config.host}:{sock.getsockname()[1]} "
+                    f"with {config.workers} worker(s)")
+        if config.workers <= 1:
+            run_worker(config, preloaded, sock)
+        else:
+            supervise(config, preloaded, sock)
+    finally:
+        if sock is not None:
+            sock.close()
+        if preloaded.knowledge_base is not None:
+            preloaded.knowledge_base.close()
+        logger.info("IntraMind server stopped")
+    return 0
+
+
+def supervise(config: Config, preloaded: Preloaded, sock: socket.socket) -> None:
+    """
+    Fork ``config.workers`` workers and restart them until told to stop.
+
+    SIGTERM or SIGINT drains the workers; those still running
+    ``shutdown_timeout`` + 5 seconds later are killed.
+
+    Args:
+        config: Server configuration
+        preloaded: Models and knowledge base shared with the workers
+        sock: Listening socket the workers accept on
+    """
+    children: Dict[int, float] = {}
+    stopping = False
+
+    def spawn() -> None:
+        pid = os.fork()
+        if pid == 0:
+            status = 0
+            try:
+                signal.signal(signal.SIGTERM, signal.SIG_DFL)
+                signal.signal(signal.SIGINT, signal.SIG_DFL)
+                run_worker(config, preloaded, sock)
+            except BaseException as e:
+                logger.error(f"Worker {os.getpid()} failed: {str(e)}")
+                status = 1
+            finally:
+                os._exit(status)
+        children[pid] = time.monotonic()
+        logger.info(f"Started worker {pid}")
+
+    def stop(signum: int, frame: Any) -> None:
+        nonlocal stopping
+        if not stopping:
+            logger.info(f"Received signal {signum}; draining {len(children)} worker(s)")
+        stopping = True
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    for _ in range(config.workers):
+        spawn()
+
+    kill_at: Optional[float] = None
+    while children:
+        pid, status = os.waitpid(-1, os.WNOHANG)
+        if pid == 0:
+            if stopping:
+                kill_at = kill_at or time.monotonic() + config.shutdown_timeout + 5
+                if time.monotonic() > kill_at:
+                    logger.warning(f"Killing {len(children)} worker(s) that did not drain")
+                    for child in children:
+                        try:
+                            os.kill(child, signal.SIGKILL)
+                        except ProcessLookupError:
+                            pass  # exited since the last waitpid
+            time.sleep(0.05)
+            continue
+        started = children.pop(pid, None)
+        if started is None or stopping:
+            continue
+        logger.warning(f"Worker {pid} exited with status {status}; starting a replacement")
+        if time.monotonic() - started < RESTART_BACKOFF:
+            time.sleep(RESTART_BACKOFF)
+        spawn()
@@ -0,0 +1,257 @@
+"""
+WebSocket chat endpoint for IntraMind.
+
+A connection to ``/ws/chat`` is bound to one conversation session: the
+``session_id`` query parameter, the ``session_id`` of its first message,
+or a new session whose id the connection picks before the first reply,
+so it stays bound even if that reply fails. Replies stream token by token
+from ChatBot.chat_stream.
+
+Client frames (JSON text):
+    {"type": "message", "content": "...", "id": "...", "context": {...}}
+    {"type": "ping"} / {"type": "pong"}
+
+Server frames:
+    {"type": "chunk", "id": ..., "delta": "...", "session_id": "..."}
+    {"type": "response", "id": ..., "message": "...", ...ChatResponse fields}
+    {"type": "error", "id": ..., "error": "..."}
+    {"type": "ping"} / {"type": "pong"}
+
+Each connection runs a receiver that reads frames, a generator that
+answers one message at a time, a sender that writes frames to the socket
+and a heartbeat. Generated frames go through a bounded queue
+(``ws_send_queue_size``), so when a client reads slowly the sender blocks
+on the socket, the queue fills and the generator stops pulling tokens
+from the provider until the client catches up. Server memory per
+connection stays bounded by the queue, not by the length of the reply.
+At most ``ws_max_inflight`` messages may be queued or running per
+connection; further messages are answered with an error frame. The
+receiver never waits on the queue: pongs and error replies are dropped
+when it is full, so a client that stops reading is still timed out.
+
+The server sends a ping every ``ws_heartbeat_interval`` seconds, and a
+connection from which nothing (pongs included) has been received for
+``ws_idle_timeout`` seconds is closed with code 1001.
+"""
+
+import asyncio
+import json
+import time
+import uuid
+from typing import Any, Dict, Optional
+import logging
+
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+
+from intramind.api.responses import dumps
+from intramind.api.router import client_key
+from intramind.core.chatbot import ChatBot
+from intramind.core.config import Config
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is listed in requirements.txt
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+# Close codes (RFC 6455)
+CLOSE_GOING_AWAY = 1001
+CLOSE_MESSAGE_TOO_BIG = 1009
+CLOSE_TRY_AGAIN_LATER = 1013
+
+
+class ChatConnection:
+    """
+    One WebSocket chat connection and its conversation session.
+
+    Attributes:
+        session_id: Session the connection is bound to, once known
+        rate_limit_key: Caller key every message is rate-limited under
+        inflight: Messages accepted and not yet answered
+    """
+
+    def __init__(self, websocket: WebSocket, chatbot: ChatBot, config: Config):
+        """
+        Initialize the connection.
+
+        Args:
+            websocket: Accepted or pending WebSocket
+            chatbot: ChatBot that answers messages
+            config: Configuration object
+        """
+        self.websocket = websocket
+        self.chatbot = chatbot
+        self.config = config
+        self.session_id: Optional[str] = websocket.query_params.get("session_id")
+        self.rate_limit_key = client_key(websocket)
+        self.inflight = 0
+        self._inbox: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue()
+        self._outbox: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue(
+            maxsize=max(1, config.ws_send_queue_size))
+        self._last_received = time.monotonic()
+        self._close_code: Optional[int] = None
+
+    async def run(self) -> None:
+        """Serve the connection until the client leaves or it is closed."""
+        await self.websocket.accept()
+        tasks = [
+            asyncio.create_task(self._receive()),
+            asyncio.create_task(self._generate()),
+            asyncio.create_task(self._send()),
+            asyncio.create_task(self._heartbeat()),
+        ]
+        try:
+            await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.wait(tasks)
+        for task in tasks:
+            error = None if task.cancelled() else task.exception()
+            if error is not None and not isinstance(error, WebSocketDisconnect):
+                logger.warning(f"WebSocket connection failed: {str(error)}")
+        if self._close_code is not None:
+            try:
+                await self.websocket.close(code=self._close_code)
+            except RuntimeError:
+                pass  # already closed by the client
+
+    async def _receive(self) -> None:
+        """Read client frames and queue chat messages."""
+        while True:
+            message = await self.websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(message.get("code", 1000), message.get("reason"))
+            self._last_received = time.monotonic()
+            text = message.get("text")
+            data = text.encode("utf-8") if text is not None else message.get("bytes") or b""
+            if len(data) > self.config.ws_max_message_bytes:
+                self._close_code = CLOSE_MESSAGE_TOO_BIG
+                return
+            if text is None:
+                self._reply({"type": "error", "id": None, "error": "Frames must be JSON text"})
+                continue
+            try:
+                frame = _parse(text)
+            except ValueError as e:
+                self._reply({"type": "error", "id": None, "error": str(e)})
+                continue
+
+            kind = frame.get("type", "message")
+            if kind == "ping":
+                self._reply({"type": "pong"})
+            elif kind == "pong":
+                continue
+            elif kind == "message":
+                self._accept_message(frame)
+            else:
+                self._reply({"type": "error", "id": frame.get("id"),
+                             "error": f"Unknown frame type: {kind}"})
+
+    def _reply(self, frame: Dict[str, Any]) -> None:
+        """Queue a reply frame without waiting; drop it if the client is behind."""
+        try:
+            self._outbox.put_nowait(frame)
+        except asyncio.QueueFull:
+            logger.debug(f"Dropped {frame['type']} frame for a client that is not reading")
+
+    def _accept_message(self, frame: Dict[str, Any]) -> None:
+        """Queue a chat message, or reject it with an error frame."""
+        message_id = frame.get("id")
+        content = frame.get("content")
+        session_id = frame.get("session_id")
+        error = None
+        if not isinstance(content, str) or not content:
+            error = "content must be a non-empty string"
+        elif frame.get("context") is not None and not isinstance(frame["context"], dict):
+            error = "context must be a JSON object"
+        elif session_id is not None and self.session_id is not None \
+                and session_id != self.session_id:
+            error = f"Connection is bound to session {self.session_id}"
+        elif self.inflight >= self.config.ws_max_inflight:
+            error = f"Too many messages in flight (limit {self.config.ws_max_inflight})"
+        if error is not None:
+            self._reply({"type": "error", "id": message_id, "error": error})
+            return
+        if self.session_id is None:
+            self.session_id = session_id
+        self.inflight += 1
+        self._inbox.put_nowait(frame)
+
+    async def _generate(self) -> None:
+        """Answer queued messages one at a time, streaming each reply."""
+        while True:
+            frame = await self._inbox.get()
+            message_id = frame.get("id")
+            if self.session_id is None:
+                self.session_id = str(uuid.uuid4())
+            stream = None
+            try:
+                stream = self.chatbot.chat_stream(frame["content"], session_id=self.session_id,
+                                                  context=frame.get("context"),
+                                                  rate_limit_key=self.rate_limit_key)
+                async for chunk in stream:
+                    if chunk.done:
+                        await self._outbox.put({"type": "response", "id": message_id,
+                                                **vars(chunk.response),
+                                                "session_id": self.session_id})
+                    else:
+                        # Blocks while the client is behind, which pauses the
+                        # provider stream too
+                        await self._outbox.put({"type": "chunk", "id": message_id,
+                                                "delta": chunk.delta,
+                                                "session_id": chunk.session_id})
+            except Exception as e:
+                logger.error(f"WebSocket reply to message {message_id} failed: {str(e)}")
+                await self._outbox.put({"type": "error", "id": message_id,
+                                        "error": "Failed to generate a reply"})
+            finally:
+                self.inflight -= 1
+                if stream is not None:
+                    # Release the provider stream and the session's turn lock
+                    # now, not when the generator is garbage collected
+                    await stream.aclose()
+
+    async def _send(self) -> None:
+        """Write queued frames to the socket."""
+        while True:
+            frame = await self._outbox.get()
+            await self.websocket.send_text(dumps(frame).decode("utf-8"))
+
+    async def _heartbeat(self) -> None:
+        """Ping the client and return once the connection has been idle too long."""
+        interval = self.config.ws_heartbeat_interval
+        timeout = self.config.ws_idle_timeout
+        while True:
+            await asyncio.sleep(min(interval, timeout))
+            idle = time.monotonic() - self._last_received
+            if idle >= timeout:
+                logger.info(f"Closing WebSocket idle for {idle:.0f}s")
+                self._close_code = CLOSE_GOING_AWAY
+                return
+            try:
+                self._outbox.put_nowait({"type": "ping"})
+            except asyncio.QueueFull:
+                pass  # frames are already waiting for this client
+
+
+def _parse(text: str) -> Dict[str, Any]:
+    """Decode a client frame, raising ValueError for anything but a JSON object."""
+    frame = orjson.loads(text) if orjson is not None else json.loads(text)
+    if not isinstance(frame, dict):
+        raise ValueError("Frames must be JSON objects")
+    return frame
+
+
+@router.websocket("/ws/chat")
+async def chat_socket(websocket: WebSocket) -> None:
+    """Stream chat replies over a WebSocket bound to one session."""
+    app = websocket.app
+    if app.state.draining:
+        await websocket.close(code=CLOSE_TRY_AGAIN_LATER)
+        return
+    bot = app.state.chatbot
+    await ChatConnection(websocket, bot, bot.config).run()
@@ -4,9 +4,32 @@ Core modules for IntraMind.
 Contains the primary business logic and core functionality.
 """
 
-from intramind.core.chatbot import ChatBot
-from intramind.core.config import Config
-from intramind.core.conversation import ConversationManager
-from intramind.core.nlp_engine import NLPEngine
+from importlib import import_module
+from typing import Any
 
-__all__ = ["ChatBot", "Config", "ConversationManager", "NLPEngine"]
+# Imported on first access; see intramind.__getattr__
+_EXPORTS = {
+    "ChatBot": "intramind.core.chatbot",
+    "Config": "intramind.core.config",
+    "ConversationManager": "intramind.core.conversation",
+    "KeywordMatcher": "intramind.core.keyword_matcher",
+    "NLPEngine": "intramind.core.nlp_engine",
+    "get_config": "intramind.core.config",
+}
+
+__all__ = ["ChatBot", "Config", "ConversationManager", "KeywordMatcher", "NLPEngine",
+           "get_config"]
+
+
+def __getattr__(name: str) -> Any:
+    """Import public names on first access."""
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list:
+    return sorted(list(globals()) + __all__)
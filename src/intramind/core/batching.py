@@ -0,0 +1,279 @@
+"""
+Dynamic micro-batching for IntraMind.
+
+Gathers concurrent requests into batches so batch-friendly work (such as
+NLP model inference) runs once per batch instead of once per request.
+"""
+
+import asyncio
+import inspect
+from collections import Counter, deque
+from typing import (
+    Any, Awaitable, Callable, Deque, Dict, Generic, List, Optional, Sequence, Tuple, TypeVar,
+    Union
+)
+import logging
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+BatchFunc = Callable[[List[T]], Union[Sequence[R], Awaitable[Sequence[R]]]]
+
+
+class BatchMetrics:
+    """
+    Per-batch counters for a MicroBatcher.
+
+    Attributes:
+        batches: Number of batches dispatched
+        items: Number of items dispatched
+        timeouts: Requests that hit the latency ceiling
+        size_histogram: Number of batches of each size
+        total_wait: Seconds the oldest item of each batch waited, summed
+        max_wait: Longest wait of any batch's oldest item, in seconds
+        total_service: Seconds spent running batches, summed
+    """
+
+    def __init__(self) -> None:
+        self.batches = 0
+        self.items = 0
+        self.timeouts = 0
+        self.size_histogram: "Counter[int]" = Counter()
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.total_service = 0.0
+
+    def record(self, size: int, wait: float, service: float) -> None:
+        """Record one dispatched batch."""
+        self.batches += 1
+        self.items += size
+        self.size_histogram[size] += 1
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+        self.total_service += service
+
+    def as_dict(self) -> Dict[str, Any]:
+        """
+        Summarize the counters.
+
+        Returns:
+            Dictionary of batch counts, mean batch size, and mean/max wait
+            and mean service time in milliseconds
+        """
+        batches = self.batches or 1
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "timeouts": self.timeouts,
+            "mean_batch_size": self.items / batches,
+            "mean_wait_ms": self.total_wait / batches * 1000,
+            "max_wait_ms": self.max_wait * 1000,
+            "mean_service_ms": self.total_service / batches * 1000,
+            "size_histogram": dict(sorted(self.size_histogram.items())),
+        }
+
+
+class MicroBatcher(Generic[T, R]):
+    """
+    Collects concurrent requests into batches for a batch function.
+
+    A batch is dispatched as soon as it holds ``max_batch_size`` items or
+    its oldest item has waited ``max_wait`` seconds, whichever comes first.
+    While a batch runs, new requests keep queueing, so batches grow with
+    load and shrink to single items when traffic is light. Each caller
+    gets the result at its own position in the batch output.
+
+    Example:
+        >>> batcher = MicroBatcher(engine.process_batch_async, max_batch_size=32)
+        >>> result = await batcher.submit("Hello!")
+    """
+
+    def __init__(self, func: BatchFunc, max_batch_size: int = 32,
+                 max_wait: float = 0.005, timeout: Optional[float] = None,
+                 max_concurrency: int = 1, name: str = "batcher"):
+        """
+        Initialize the batcher.
+
+        Args:
+            func: Function mapping a list of items to a same-length sequence
+                of results; may be a coroutine function
+            max_batch_size: Largest batch dispatched at once
+            max_wait: Seconds the oldest queued item may wait for the batch
+                to fill
+            timeout: Optional hard ceiling, in seconds, on a request's total
+                latency; requests exceeding it raise asyncio.TimeoutError
+            max_concurrency: Number of batches allowed to run at once
+            name: Name used in log messages
+        """
+        self.func = func
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait
+        self.timeout = timeout
+        self.max_concurrency = max(1, max_concurrency)
+        self.name = name
+        self.metrics = BatchMetrics()
+        self._is_async = inspect.iscoroutinefunction(func)
+        self._queue: Deque[Tuple[T, "asyncio.Future[R]", float]] = deque()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._worker: Optional["asyncio.Task[None]"] = None
+        self._dispatches: Dict[
+            "asyncio.Task[None]", List[Tuple[T, "asyncio.Future[R]", float]]
+        ] = {}
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+    def _ensure_worker(self, loop: asyncio.AbstractEventLoop) -> None:
+        """
+        Start the dispatch task on the running loop if it is not running.
+
+        A batcher moves to a new loop only once its previous loop is
+        closed; requests still queued from the closed loop are dropped,
+        since their callers are gone.
+
+        Raises:
+            RuntimeError: If requests are still queued on another open loop
+        """
+        if self._loop is not loop:
+            if self._loop is not None and not self._loop.is_closed() and any(
+                not future.done() for _, future, _ in self._queue
+            ):
+                raise RuntimeError(f"{self.name}: batcher is in use on another event loop")
+            self._queue.clear()
+            self._dispatches.clear()
+            self._loop = loop
+            self._wakeup = asyncio.Event()
+            self._slots = asyncio.Semaphore(self.max_concurrency)
+            self._worker = None
+        if self._worker is None or self._worker.done():
+            self._worker = loop.create_task(self._run())
+
+    async def submit(self, item: T) -> R:
+        """
+        Queue an item and wait for its result.
+
+        Args:
+            item: Input for the batch function
+
+        Returns:
+            The batch function's result for this item
+
+        Raises:
+            asyncio.TimeoutError: If the latency ceiling is exceeded
+        """
+        loop = asyncio.get_running_loop()
+        self._ensure_worker(loop)
+        future: "asyncio.Future[R]" = loop.create_future()
+        self._queue.append((item, future, loop.time()))
+        if len(self._queue) >= self.max_batch_size:
+            self._wakeup.set()
+
+        if self.timeout is None:
+            return await future
+        try:
+            return await asyncio.wait_for(future, self.timeout)
+        except asyncio.TimeoutError:
+            self.metrics.timeouts += 1
+            raise
+
+    async def _run(self) -> None:
+        """Form batches from the queue and dispatch them until it is empty."""
+        loop = asyncio.get_running_loop()
+        while self._queue:
+            # Let the batch fill until it is full or its oldest item is due
+            deadline = self._queue[0][2] + self.max_wait
+            while len(self._queue) < self.max_batch_size:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), remaining)
+                except asyncio.TimeoutError:
+                    break
+
+            batch = []
+            while self._queue and len(batch) < self.max_batch_size:
+                entry = self._queue.popleft()
+                if not entry[1].done():
+                    batch.append(entry)
+            if not batch:
+                continue
+
+            # Dispatches run as tracked tasks so close() can cancel them; the
+            # semaphore keeps at most max_concurrency of them running
+            await self._slots.acquire()
+            task = loop.create_task(self._dispatch(batch))
+            self._dispatches[task] = batch
+            task.add_done_callback(lambda done: self._dispatches.pop(done, None))
+
+    async def _dispatch(self, batch: List[Tuple[T, "asyncio.Future[R]", float]]) -> None:
+        """Run one batch and deliver each result to its caller."""
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        try:
+            items = [item for item, _, _ in batch]
+            results = self.func(items)
+            if self._is_async or inspect.isawaitable(results):
+                results = await results
+            results = list(results)
+            if len(results) != len(batch):
+                raise ValueError(
+                    f"{self.name}: batch function returned {len(results)} results "
+                    f"for {len(batch)} items"
+                )
+            for (_, future, _), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+        except Exception as e:
+            logger.error(f"{self.name}: batch of {len(batch)} failed: {str(e)}")
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+        except BaseException:
+            # Cancelled (e.g. by close()): release the callers before unwinding
+            for _, future, _ in batch:
+                future.cancel()
+            raise
+        finally:
+            self._slots.release()
+            finished = loop.time()
+            self.metrics.record(len(batch), started - batch[0][2], finished - started)
+            logger.debug(
+                f"{self.name}: dispatched batch of {len(batch)} "
+                f"(waited {(started - batch[0][2]) * 1000:.1f} ms)"
+            )
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return batching metrics.
+
+        Returns:
+            Dictionary from BatchMetrics.as_dict plus the current queue depth
+        """
+        return {**self.metrics.as_dict(), "queued": len(self._queue)}
+
+    async def close(self) -> None:
+        """Stop the dispatch task and cancel running and queued requests."""
+        batches = list(self._dispatches.values())
+        tasks = list(self._dispatches)
+        if self._worker is not None:
+            tasks.append(self._worker)
+            self._worker = None
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        # A dispatch cancelled before it started never ran its own cleanup
+        for batch in batches:
+            for _, future, _ in batch:
+                future.cancel()
+        if self._slots is not None:
+            self._slots = asyncio.Semaphore(self.max_concurrency)
+        while self._queue:
+            _, future, _ = self._queue.popleft()
+            future.cancel()
@@ -6,13 +6,31 @@ with AI models.
 """
 
 import asyncio
-from typing import Any, Dict, Optional, List
+import hashlib
+import json
+import time
+from typing import (
+    TYPE_CHECKING, Any, AsyncIterator, Dict, NamedTuple, Optional, List, Sequence, Union
+)
 from dataclasses import dataclass
 import logging
 
-from intramind.core.config import Config
+import numpy as np
+
+from intramind.core.config import Config, get_config
 from intramind.core.nlp_engine import NLPEngine
 from intramind.core.conversation import ConversationManager
+from intramind.core.singleflight import SingleFlight
+from intramind.services.ai_service import AIProvider, create_provider, run_sync
+from intramind.services.cache_service import ResponseCache, context_digest, normalize_message
+from intramind.services.rate_limiter import RateLimitDecision, RateLimiter, create_rate_limiter
+
+if TYPE_CHECKING:
+    # Optional features; imported on demand in ChatBot.__init__
+    from intramind.core.batching import MicroBatcher
+    from intramind.knowledge.knowledge_base import KnowledgeBase, SearchHit
+    from intramind.services.database_service import SessionStore
+    from intramind.services.semantic_cache import SemanticCache
 
 logger = logging.getLogger(__name__)
 
@@ -38,6 +56,33 @@ class ChatResponse:
     metadata: Optional[Dict[str, Any]] = None
 
 
+@dataclass
+class StreamChunk:
+    """
+    A partial response yielded by ChatBot.chat_stream.
+
+    Attributes:
+        delta: Newly generated text since the previous chunk
+        session_id: Session identifier
+        done: True for the final chunk of the stream
+        response: The assembled ChatResponse, set on the final chunk only
+    """
+    delta: str
+    session_id: Optional[str] = None
+    done: bool = False
+    response: Optional[ChatResponse] = None
+
+
+class _CacheLookup(NamedTuple):
+    """Cache state carried through a turn."""
+    key: Optional[str] = None
+    scope: Optional[str] = None
+    vector: Optional[np.ndarray] = None
+    text: Optional[str] = None
+    tier: Optional[str] = None
+    sources: Sequence[str] = ()
+
+
 class ChatBot:
     """
     Main ChatBot class for conversational AI.
@@ -53,27 +98,100 @@ class ChatBot:
         >>> print(response.message)
     """
 
-    def __init__(self, config: Optional[Config] = None):
+    def __init__(self, config: Optional[Config] = None,
+                 provider: Optional[AIProvider] = None,
+                 response_cache: Optional[ResponseCache] = None,
+                 semantic_cache: Optional["SemanticCache"] = None,
+                 session_store: Optional["SessionStore"] = None,
+                 knowledge_base: Optional["KnowledgeBase"] = None,
+                 nlp_engine: Optional[NLPEngine] = None,
+                 rate_limiter: Optional[RateLimiter] = None):
         """
         Initialize the ChatBot.
 
         Args:
-            config: Configuration object. If None, uses default config.
+            config: Configuration object. If None, uses the shared config
+                from get_config().
+            provider: AI provider used to generate responses. If None,
+                the one selected by ``ai_provider`` is created; with
+                ``none``, the built-in placeholder responses are used.
+            response_cache: Response cache to use. If None, one is created
+                from the config when ``cache_enabled`` is set.
+            semantic_cache: Semantic answer cache to use. If None, one is
+                created from the config when ``semantic_cache_enabled`` is set.
+            session_store: Session store for persistent conversations. If
+                None, one is created from ``session_store`` in the config.
+            knowledge_base: Knowledge base searched for passages that
+                ground each answer. If None, the one at
+                ``knowledge_base_path`` is opened when that is set.
+            nlp_engine: NLP engine to use, e.g. one loaded before a
+                server forks its workers. If None, one is created from
+                the config.
+            rate_limiter: Rate limiter checked before each turn. If None,
+                one is created from the config when ``rate_limit_enabled``
+                is set.
         """
-        self.config = config or Config()
-        self.nlp_engine = NLPEngine(self.config)
-        self.conversation_manager = ConversationManager(self.config)
-        logger.info(f"ChatBot initialized with provider: {self.config.ai_provider}")
+        self.config = config or get_config()
+        self.provider = provider if provider is not None else create_provider(self.config)
+        if response_cache is None and self.config.cache_enabled:
+            response_cache = ResponseCache(self.config)
+        self.response_cache = response_cache
+        if semantic_cache is None and self.config.semantic_cache_enabled:
+            from intramind.services.embeddings import create_embedder
+            from intramind.services.semantic_cache import SemanticCache
+
+            semantic_cache = SemanticCache(
+                create_embedder(self.config.embedding_model),
+                capacity=self.config.semantic_cache_size,
+                threshold=self.config.semantic_cache_threshold,
+                intent_thresholds=self.config.semantic_cache_intent_thresholds,
+                ttl=self.config.cache_ttl,
+            )
+        self.semantic_cache = semantic_cache
+        self.singleflight = SingleFlight() if self.config.singleflight_enabled else None
+        self.nlp_engine = nlp_engine or NLPEngine(self.config)
+        self.nlp_batcher: Optional["MicroBatcher"] = None
+        if self.config.nlp_batching_enabled:
+            from intramind.core.batching import MicroBatcher
+
+            timeout_ms = self.config.nlp_batch_timeout_ms
+            self.nlp_batcher = MicroBatcher(
+                self.nlp_engine.process_batch_async,
+                max_batch_size=self.config.nlp_batch_max_size,
+                max_wait=self.config.nlp_batch_max_wait_ms / 1000,
+                timeout=timeout_ms / 1000 if timeout_ms else None,
+                name="nlp",
+            )
+        self.conversation_manager = ConversationManager(self.config, store=session_store)
+        if knowledge_base is None and self.config.knowledge_base_path:
+            from intramind.knowledge.knowledge_base import KnowledgeBase
+
+            knowledge_base = KnowledgeBase.from_config(self.config)
+        self.knowledge_base = knowledge_base
+        if rate_limiter is None:
+            rate_limiter = create_rate_limiter(self.config)
+        self.rate_limiter = rate_limiter
+        provider_name = getattr(self.provider, "name", type(self.provider).__name__) \
+            if self.provider is not None else "none"
+        logger.info(f"ChatBot initialized with provider: {provider_name}")
 
     def chat(self, message: str, session_id: Optional[str] = None,
-             context: Optional[Dict[str, Any]] = None) -> ChatResponse:
+             context: Optional[Dict[str, Any]] = None,
+             rate_limit_key: Optional[str] = None) -> ChatResponse:
         """
         Process a user message and return a response.
 
+        With a rate limiter, the turn is checked first under
+        ``rate_limit_key`` (or ``session_id``), and a rejected turn returns
+        before any NLP or generation runs. Turns with neither key are not
+        limited.
+
         Args:
             message: User's input message
             session_id: Optional session identifier for conversation continuity
             context: Optional context dictionary for the conversation
+            rate_limit_key: Optional caller key to rate-limit under, such as
+                an API key
 
         Returns:
             ChatResponse object containing the bot's response and metadata
@@ -82,78 +200,694 @@ class ChatBot:
             >>> response = bot.chat("What can you do?")
             >>> print(response.message)
         """
+        limited = self._check_rate_limit(rate_limit_key or session_id, session_id)
+        if limited is not None:
+            return limited
         try:
             # Process the message through NLP engine
             nlp_result = self.nlp_engine.process(message)
+            return self._complete_turn(message, nlp_result, session_id, context)
 
-            # Get or create conversation session
-            session = self.conversation_manager.get_or_create_session(
-                session_id=session_id,
-                context=context
-            )
+        except Exception as e:
+            return self._error_response(e)
+
+    def chat_batch(self, messages: Sequence[str],
+                   session_ids: Optional[Sequence[Optional[str]]] = None,
+                   context: Optional[Dict[str, Any]] = None,
+                   rate_limit_key: Union[None, str, Sequence[Optional[str]]] = None
+                   ) -> List[ChatResponse]:
+        """
+        Process a batch of user messages.
+
+        NLP runs once over the whole batch; each message then follows the
+        same session and response path as chat(). Results are returned in
+        input order and match what chat() would return for each message.
+        Each message is checked against the rate limiter as in chat(), one
+        token per message; rejected messages are left out of NLP.
+
+        Args:
+            messages: User input messages
+            session_ids: Optional session identifier per message
+            context: Optional context for sessions created by this batch
+            rate_limit_key: Optional caller key to rate-limit under, for the
+                whole batch or one per message; falls back to the session
+
+        Returns:
+            List of ChatResponse objects, one per message
+
+        Example:
+            >>> responses = bot.chat_batch(["Hi", "Help me"], ["s1", "s2"])
+        """
+        messages = list(messages)
+        if session_ids is None:
+            session_ids = [None] * len(messages)
+        elif len(session_ids) != len(messages):
+            raise ValueError("session_ids must have the same length as messages")
+        if rate_limit_key is None or isinstance(rate_limit_key, str):
+            rate_limit_keys = [rate_limit_key] * len(messages)
+        elif len(rate_limit_key) != len(messages):
+            raise ValueError("rate_limit_key must be one key or one per message")
+        else:
+            rate_limit_keys = list(rate_limit_key)
+
+        responses: List[Optional[ChatResponse]] = [
+            self._check_rate_limit(key or session_id, session_id)
+            for key, session_id in zip(rate_limit_keys, session_ids)
+        ]
+        admitted = [i for i, response in enumerate(responses) if response is None]
+        try:
+            nlp_results = self.nlp_engine.process_batch([messages[i] for i in admitted])
+        except Exception as e:
+            for i in admitted:
+                responses[i] = self._error_response(e)
+            return responses
+
+        for i, nlp_result in zip(admitted, nlp_results):
+            try:
+                responses[i] = self._complete_turn(messages[i], nlp_result, session_ids[i], context)
+            except Exception as e:
+                responses[i] = self._error_response(e)
+        return responses
+
+    def _complete_turn(self, message: str, nlp_result: Dict[str, Any],
+                       session_id: Optional[str],
+                       context: Optional[Dict[str, Any]]) -> ChatResponse:
+        """
+        Record a turn and generate its response from an NLP result.
+
+        Args:
+            message: User's input message
+            nlp_result: Results from NLP processing
+            session_id: Optional session identifier
+            context: Optional context dictionary for new sessions
+
+        Returns:
+            ChatResponse for the turn
+        """
+        # Get or create conversation session
+        session = self.conversation_manager.get_or_create_session(
+            session_id=session_id,
+            context=context
+        )
+        # Turns in one session run one at a time, so each reply sees the
+        # history it was generated from
+        with session.turn():
+            lookup = self._cache_lookup(message, nlp_result, session)
 
             # Add message to conversation history
             session.add_message("user", message)
 
-            # Generate response (placeholder - integrate with actual AI model)
-            response_text = self._generate_response(
-                message=message,
-                nlp_result=nlp_result,
-                session=session
-            )
+            # Serve repeats from the cache, otherwise generate a response
+            response_text = lookup.text
+            passages: List["SearchHit"] = []
+            if response_text is None:
+                passages = self._retrieve(message)
+                response_text = self._generate_response(
+                    message=message,
+                    nlp_result=nlp_result,
+                    session=session,
+                    passages=passages
+                )
+                self._cache_store(lookup, message, nlp_result, response_text, passages)
 
             # Add bot response to history
             session.add_message("assistant", response_text)
 
-            return ChatResponse(
-                message=response_text,
-                confidence=nlp_result.get("confidence", 0.9),
-                intent=nlp_result.get("intent"),
-                entities=nlp_result.get("entities"),
-                session_id=session.session_id,
-                metadata={"model": self.config.model_name}
-            )
+        return self._build_response(response_text, nlp_result, session,
+                                    **self._cache_metadata(lookup),
+                                    **self._sources_metadata(lookup, passages))
 
-        except Exception as e:
-            logger.error(f"Error processing message: {str(e)}")
-            return ChatResponse(
-                message="I apologize, but I encountered an error processing your message.",
-                confidence=0.0,
-                metadata={"error": str(e)}
-            )
+    def _build_response(self, response_text: str, nlp_result: Dict[str, Any],
+                        session: Any, **metadata: Any) -> ChatResponse:
+        """
+        Assemble the ChatResponse for a completed turn.
+
+        Args:
+            response_text: Generated response text
+            nlp_result: Results from NLP processing
+            session: Current conversation session
+            **metadata: Extra metadata entries
+
+        Returns:
+            ChatResponse for the turn
+        """
+        return ChatResponse(
+            message=response_text,
+            confidence=nlp_result.get("confidence", 0.9),
+            intent=nlp_result.get("intent"),
+            entities=nlp_result.get("entities"),
+            session_id=session.session_id,
+            metadata={"model": self.config.model_name, **metadata}
+        )
+
+    def _cache_lookup(self, message: str, nlp_result: Dict[str, Any],
+                      session: Any) -> _CacheLookup:
+        """
+        Look up a cached answer for a turn, exact match first.
+
+        Must be called before the user message is added to the session,
+        so the context digest covers only prior turns.
+
+        Args:
+            message: User's input message
+            nlp_result: Results from NLP processing
+            session: Current conversation session
+
+        Returns:
+            _CacheLookup with the cached text set on a hit
+        """
+        intent = nlp_result.get("intent")
+        namespace = self._cache_namespace()
+        key = None
+        if self.response_cache is not None:
+            key = self.response_cache.make_key(message, intent, session, namespace)
+            value = self.response_cache.get(key)
+            if value is not None:
+                return _CacheLookup(key=key, tier="exact", **self._decode_cached(value))
+        if self.semantic_cache is None:
+            return _CacheLookup(key=key)
+
+        scope = f"{namespace}:{context_digest(session, self.config.cache_context_messages)}"
+        vector = self.semantic_cache.embed(message)
+        hit = self.semantic_cache.lookup(message, intent, scope, vector=vector)
+        if hit is None:
+            return _CacheLookup(key=key, scope=scope, vector=vector)
+        return _CacheLookup(key=key, scope=scope, vector=vector, tier="semantic",
+                            **self._decode_cached(hit.answer))
+
+    async def _cache_lookup_async(self, message: str, nlp_result: Dict[str, Any],
+                                  session: Any) -> _CacheLookup:
+        """
+        Async version of _cache_lookup.
+
+        Embedding runs in the executor only when the embedder declares
+        itself CPU-bound.
+        """
+        intent = nlp_result.get("intent")
+        namespace = self._cache_namespace()
+        key = None
+        if self.response_cache is not None:
+            key = self.response_cache.make_key(message, intent, session, namespace)
+            value = await self.response_cache.get_async(key)
+            if value is not None:
+                return _CacheLookup(key=key, tier="exact", **self._decode_cached(value))
+        if self.semantic_cache is None:
+            return _CacheLookup(key=key)
+
+        scope = f"{namespace}:{context_digest(session, self.config.cache_context_messages)}"
+        if self.semantic_cache.embedder.cpu_bound:
+            loop = asyncio.get_running_loop()
+            vector = await loop.run_in_executor(None, self.semantic_cache.embed, message)
+        else:
+            vector = self.semantic_cache.embed(message)
+        hit = self.semantic_cache.lookup(message, intent, scope, vector=vector)
+        if hit is None:
+            return _CacheLookup(key=key, scope=scope, vector=vector)
+        return _CacheLookup(key=key, scope=scope, vector=vector, tier="semantic",
+                            **self._decode_cached(hit.answer))
+
+    def _cache_namespace(self) -> str:
+        """
+        Identify what answers are currently generated with.
+
+        Part of every cache key, so answers from another provider or model,
+        or from an older knowledge base state, are not served.
+        """
+        provider = self.provider.name if self.provider is not None else "none"
+        model = getattr(self.provider, "model", self.config.model_name)
+        generation = self.knowledge_base.generation if self.knowledge_base is not None else ""
+        return f"{provider}:{model}:{generation}"
+
+    @staticmethod
+    def _encode_cached(response_text: str, passages: Sequence["SearchHit"]) -> str:
+        """Serialize an answer and the knowledge base chunks it used."""
+        return json.dumps({"text": response_text,
+                           "sources": [hit.chunk_id for hit in passages]})
+
+    @staticmethod
+    def _decode_cached(value: str) -> Dict[str, Any]:
+        """
+        Inverse of _encode_cached, as _CacheLookup fields.
+
+        Plain answer text, as cached by earlier versions, is returned
+        without sources.
+        """
+        try:
+            entry = json.loads(value)
+            return {"text": entry["text"], "sources": tuple(entry.get("sources", ()))}
+        except (ValueError, TypeError, KeyError, AttributeError):
+            return {"text": value, "sources": ()}
+
+    def _cache_store(self, lookup: _CacheLookup, message: str, nlp_result: Dict[str, Any],
+                     response_text: str, passages: Sequence["SearchHit"] = ()) -> None:
+        """
+        Store a freshly generated answer in the caches that missed.
+
+        Args:
+            lookup: Result of the lookup for this turn
+            message: User's input message
+            nlp_result: Results from NLP processing
+            response_text: Generated response text
+            passages: Knowledge base passages the answer was grounded in
+        """
+        value = self._encode_cached(response_text, passages)
+        if lookup.key is not None:
+            self.response_cache.set(lookup.key, value)
+        if lookup.vector is not None:
+            self.semantic_cache.add(message, nlp_result.get("intent"), value,
+                                    scope=lookup.scope, vector=lookup.vector)
+
+    async def _cache_store_async(self, lookup: _CacheLookup, message: str,
+                                 nlp_result: Dict[str, Any], response_text: str,
+                                 passages: Sequence["SearchHit"] = ()) -> None:
+        """Async version of _cache_store."""
+        value = self._encode_cached(response_text, passages)
+        if lookup.key is not None:
+            await self.response_cache.set_async(lookup.key, value)
+        if lookup.vector is not None:
+            self.semantic_cache.add(message, nlp_result.get("intent"), value,
+                                    scope=lookup.scope, vector=lookup.vector)
+
+    @staticmethod
+    def _cache_metadata(lookup: _CacheLookup) -> Dict[str, Any]:
+        """Response metadata describing how the cache served a turn."""
+        if lookup.text is None:
+            return {"cached": False}
+        return {"cached": True, "cache_tier": lookup.tier}
+
+    def _check_rate_limit(self, key: Optional[str],
+                          session_id: Optional[str]) -> Optional[ChatResponse]:
+        """
+        Check a turn against the rate limiter.
+
+        Args:
+            key: Caller key; turns without one are not limited
+            session_id: Session the turn belongs to
+
+        Returns:
+            The rejection response, or None if the turn may proceed
+        """
+        if self.rate_limiter is None or key is None:
+            return None
+        return self._rate_limited_response(self.rate_limiter.check(key), session_id)
+
+    async def _check_rate_limit_async(self, key: Optional[str],
+                                      session_id: Optional[str]) -> Optional[ChatResponse]:
+        """Async version of _check_rate_limit."""
+        if self.rate_limiter is None or key is None:
+            return None
+        return self._rate_limited_response(await self.rate_limiter.check_async(key), session_id)
+
+    @staticmethod
+    def _rate_limited_response(decision: RateLimitDecision,
+                               session_id: Optional[str]) -> Optional[ChatResponse]:
+        """Build the response for a rejected turn, or None if it was allowed."""
+        if decision.allowed:
+            return None
+        return ChatResponse(
+            message="Too many requests. Please wait a moment and try again.",
+            confidence=0.0,
+            session_id=session_id,
+            metadata={"error": "rate_limited", "retry_after": decision.retry_after},
+        )
+
+    def _error_response(self, error: Exception) -> ChatResponse:
+        """
+        Build the response returned when a turn fails.
+
+        Args:
+            error: The exception raised while processing
+
+        Returns:
+            ChatResponse describing the error
+        """
+        logger.error(f"Error processing message: {str(error)}")
+        return ChatResponse(
+            message="I apologize, but I encountered an error processing your message.",
+            confidence=0.0,
+            metadata={"error": str(error)}
+        )
 
     async def chat_async(self, message: str, session_id: Optional[str] = None,
-                        context: Optional[Dict[str, Any]] = None) -> ChatResponse:
+                        context: Optional[Dict[str, Any]] = None,
+                        rate_limit_key: Optional[str] = None) -> ChatResponse:
         """
         Async version of chat method for high-performance applications.
 
+        Runs natively on the event loop: NLP, session access and response
+        generation are awaited, and only NLP stages declared CPU-bound are
+        sent to an executor. With ``nlp_batching_enabled``, NLP for
+        concurrent calls is micro-batched.
+
         Args:
             message: User's input message
             session_id: Optional session identifier
             context: Optional context dictionary
+            rate_limit_key: Optional caller key to rate-limit under (see chat)
 
         Returns:
             ChatResponse object
         """
-        # Run the synchronous chat method in a thread pool
-        return await asyncio.to_thread(self.chat, message, session_id, context)
+        limited = await self._check_rate_limit_async(rate_limit_key or session_id, session_id)
+        if limited is not None:
+            return limited
+        try:
+            nlp_result = await self._analyze_async(message)
+            return await self._complete_turn_async(message, nlp_result, session_id, context)
+
+        except Exception as e:
+            return self._error_response(e)
+
+    async def _analyze_async(self, message: str) -> Dict[str, Any]:
+        """
+        Run NLP for one async turn.
+
+        With ``nlp_batching_enabled``, concurrent turns share one
+        process_batch_async call through the micro-batcher.
+
+        Args:
+            message: User's input message
+
+        Returns:
+            NLP analysis results
+        """
+        if self.nlp_batcher is not None:
+            return await self.nlp_batcher.submit(message)
+        return await self.nlp_engine.process_async(message)
+
+    async def _complete_turn_async(self, message: str, nlp_result: Dict[str, Any],
+                                   session_id: Optional[str],
+                                   context: Optional[Dict[str, Any]]) -> ChatResponse:
+        """
+        Async version of _complete_turn.
+
+        Args:
+            message: User's input message
+            nlp_result: Results from NLP processing
+            session_id: Optional session identifier
+            context: Optional context dictionary for new sessions
+
+        Returns:
+            ChatResponse for the turn
+        """
+        session = await self.conversation_manager.get_or_create_session_async(
+            session_id=session_id,
+            context=context
+        )
+        async with session.turn_async():
+            lookup = await self._cache_lookup_async(message, nlp_result, session)
+            session.add_message("user", message)
+
+            response_text = lookup.text
+            passages: List["SearchHit"] = []
+            if response_text is None:
+                passages = await self._retrieve_async(message)
+                response_text = await self._generate_response_async(
+                    message=message,
+                    nlp_result=nlp_result,
+                    session=session,
+                    passages=passages
+                )
+                await self._cache_store_async(lookup, message, nlp_result, response_text,
+                                              passages)
+            session.add_message("assistant", response_text)
+
+        return self._build_response(response_text, nlp_result, session,
+                                    **self._cache_metadata(lookup),
+                                    **self._sources_metadata(lookup, passages))
+
+    async def _generate_response_async(self, message: str, nlp_result: Dict[str, Any],
+                                       session: Any,
+                                       passages: Sequence["SearchHit"] = ()) -> str:
+        """
+        Async version of _generate_response.
+
+        The placeholder generator does no I/O, so it is called inline.
+        Replace with an awaited AI model call when one is integrated.
+
+        Args:
+            message: The user's message
+            nlp_result: Results from NLP processing
+            session: Current conversation session
+            passages: Knowledge base passages to ground the answer in
+
+        Returns:
+            Generated response text
+        """
+        if self.provider is not None:
+            return await self._provider_generate(self._provider_messages(session, passages))
+        return self._generate_response(message=message, nlp_result=nlp_result, session=session,
+                                       passages=passages)
+
+    async def chat_stream(self, message: str, session_id: Optional[str] = None,
+                          context: Optional[Dict[str, Any]] = None,
+                          rate_limit_key: Optional[str] = None
+                          ) -> AsyncIterator[StreamChunk]:
+        """
+        Process a user message and stream the response as it is generated.
+
+        Chunks are yielded as soon as the provider produces them. The
+        assembled reply is added to the session only once the stream
+        completes; the final chunk carries the full ChatResponse with
+        time-to-first-token in its metadata.
+
+        Args:
+            message: User's input message
+            session_id: Optional session identifier
+            context: Optional context dictionary
+            rate_limit_key: Optional caller key to rate-limit under (see chat)
+
+        Yields:
+            StreamChunk objects; the last one has done=True
+
+        Example:
+            >>> async for chunk in bot.chat_stream("Hello!"):
+            ...     print(chunk.delta, end="")
+        """
+        limited = await self._check_rate_limit_async(rate_limit_key or session_id, session_id)
+        if limited is not None:
+            yield StreamChunk(delta="", session_id=session_id, done=True, response=limited)
+            return
+        start = time.perf_counter()
+        try:
+            nlp_result = await self._analyze_async(message)
+            session = await self.conversation_manager.get_or_create_session_async(
+                session_id=session_id,
+                context=context
+            )
+            async with session.turn_async():
+                lookup = await self._cache_lookup_async(message, nlp_result, session)
+                session.add_message("user", message)
+
+                passages: List["SearchHit"] = []
+                if lookup.text is not None:
+                    deltas = self._single_chunk(lookup.text)
+                else:
+                    passages = await self._retrieve_async(message)
+                    deltas = self._stream_response(message, nlp_result, session, passages)
+
+                parts: List[str] = []
+                first_token_at: Optional[float] = None
+                async for delta in deltas:
+                    if not delta:
+                        continue
+                    if first_token_at is None:
+                        first_token_at = time.perf_counter()
+                    parts.append(delta)
+                    yield StreamChunk(delta=delta, session_id=session.session_id)
+
+                response_text = "".join(parts)
+                if lookup.text is None:
+                    await self._cache_store_async(lookup, message, nlp_result, response_text,
+                                                  passages)
+                session.add_message("assistant", response_text)
+                finished_at = time.perf_counter()
+
+            yield StreamChunk(
+                delta="",
+                session_id=session.session_id,
+                done=True,
+                response=self._build_response(
+                    response_text, nlp_result, session,
+                    **self._cache_metadata(lookup),
+                    **self._sources_metadata(lookup, passages),
+                    time_to_first_token=(first_token_at or finished_at) - start,
+                    total_time=finished_at - start,
+                )
+            )
+
+        except Exception as e:
+            error_response = self._error_response(e)
+            yield StreamChunk(delta="", done=True, response=error_response)
+
+    async def _stream_response(self, message: str, nlp_result: Dict[str, Any],
+                               session: Any,
+                               passages: Sequence["SearchHit"] = ()) -> AsyncIterator[str]:
+        """
+        Stream response text chunks from the provider.
+
+        Without a provider, the placeholder response is yielded as a
+        single chunk.
+
+        Args:
+            message: The user's message
+            nlp_result: Results from NLP processing
+            session: Current conversation session
+            passages: Knowledge base passages to ground the answer in
+
+        Yields:
+            Response text chunks
+        """
+        if self.provider is None:
+            yield self._generate_response(message=message, nlp_result=nlp_result, session=session,
+                                          passages=passages)
+            return
+
+        messages = self._provider_messages(session, passages)
+        if self.singleflight is None:
+            chunks = self.provider.stream(messages)
+        else:
+            chunks = self.singleflight.stream(self._flight_key(messages),
+                                              lambda: self.provider.stream(messages))
+        async for chunk in chunks:
+            yield chunk
+
+    async def _provider_generate(self, messages: List[Dict[str, str]]) -> str:
+        """
+        Generate a reply with the provider.
+
+        With ``singleflight_enabled``, a turn whose provider messages match
+        a generation already in flight waits for that generation and
+        shares its reply instead of sending its own request.
+
+        Args:
+            messages: Provider messages for the turn
+
+        Returns:
+            Generated response text
+        """
+        if self.singleflight is None:
+            return await self.provider.generate(messages)
+        return await self.singleflight.do(self._flight_key(messages),
+                                          lambda: self.provider.generate(messages))
+
+    def _flight_key(self, messages: List[Dict[str, str]]) -> str:
+        """
+        Build the single-flight key for a provider request.
+
+        Namespaced like the response cache, with the latest user message
+        normalized the same way; everything before it (history window and
+        knowledge base passages) must match exactly.
+
+        Args:
+            messages: Provider messages for the turn
+
+        Returns:
+            Hex digest key
+        """
+        *earlier, latest = messages
+        digest = hashlib.sha256()
+        for part in (self._cache_namespace(), normalize_message(latest["content"]),
+                     json.dumps(earlier)):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\x00")
+        return digest.hexdigest()
+
+    @staticmethod
+    async def _single_chunk(text: str) -> AsyncIterator[str]:
+        """Yield a complete text as one stream chunk."""
+        yield text
+
+    def _provider_messages(self, session: Any,
+                           passages: Sequence["SearchHit"] = ()) -> List[Dict[str, str]]:
+        """
+        Build the provider message list from the session history.
+
+        Only the newest messages that fit ``history_window_tokens`` are
+        sent, so the prompt size stays fixed as conversations grow. The
+        latest message is always included, even if it alone exceeds the
+        budget. Knowledge base passages, if any, lead the list as a
+        system message.
+
+        Args:
+            session: Current conversation session
+            passages: Knowledge base passages to ground the answer in
+
+        Returns:
+            List of {"role", "content"} messages, oldest first
+        """
+        window = session.get_window(self.config.history_window_tokens) or session.get_history(1)
+        messages = [{"role": msg["role"], "content": msg["content"]} for msg in window]
+        if passages:
+            context = "\n\n".join(f"[{hit.chunk_id}]\n{hit.text}" for hit in passages)
+            messages.insert(0, {
+                "role": "system",
+                "content": "Answer using the following knowledge base passages when they "
+                           "are relevant, and cite their ids.\n\n" + context,
+            })
+        return messages
+
+    def _retrieve(self, message: str) -> List["SearchHit"]:
+        """
+        Search the knowledge base for passages relevant to a message.
+
+        Args:
+            message: User's input message
+
+        Returns:
+            Up to ``knowledge_top_k`` hits scoring at least
+            ``knowledge_min_score``; empty without a knowledge base
+        """
+        if self.knowledge_base is None:
+            return []
+        return self.knowledge_base.search(message, k=self.config.knowledge_top_k,
+                                          min_score=self.config.knowledge_min_score)
+
+    async def _retrieve_async(self, message: str) -> List["SearchHit"]:
+        """
+        Async version of _retrieve.
+
+        The search always runs in a worker thread: besides embedding the
+        query, it scans the vector index and decodes BM25 postings, which
+        grows with the knowledge base.
+        """
+        if self.knowledge_base is None:
+            return []
+        return await asyncio.to_thread(self._retrieve, message)
+
+    @staticmethod
+    def _sources_metadata(lookup: _CacheLookup,
+                          passages: Sequence["SearchHit"]) -> Dict[str, Any]:
+        """Response metadata listing the knowledge base chunks used."""
+        if lookup.text is not None:
+            sources = list(lookup.sources)
+        else:
+            sources = [hit.chunk_id for hit in passages]
+        if not sources:
+            return {}
+        return {"sources": sources}
 
     def _generate_response(self, message: str, nlp_result: Dict[str, Any],
-                          session: Any) -> str:
+                          session: Any, passages: Sequence["SearchHit"] = ()) -> str:
         """
         Generate a response based on the message and NLP analysis.
 
-        This is a placeholder that should be replaced with actual
-        AI model integration (OpenAI GPT-4, Azure OpenAI, etc.)
+        Uses the configured provider when one is set. Otherwise this is a
+        placeholder that should be replaced with actual AI model
+        integration (OpenAI GPT-4, Azure OpenAI, etc.)
 
         Args:
             message: The user's message
             nlp_result: Results from NLP processing
             session: Current conversation session
+            passages: Knowledge base passages to ground the answer in
 
         Returns:
             Generated response text
         """
+        if self.provider is not None:
+            return run_sync(self._provider_generate(self._provider_messages(session, passages)))
+
         # TODO: Integrate with actual AI model
         # For now, return a placeholder response
 
@@ -163,6 +897,9 @@ class ChatBot:
             return "Hello! How can I assist you today?"
         elif intent == "farewell":
             return "Goodbye! Have a great day!"
+        elif passages:
+            # Without a model, answer with the best matching passage
+            return f"Here is what I found in {passages[0].doc_id}:\n\n{passages[0].text}"
         else:
             return (
                 "I'm IntraMind, an enterprise-grade AI assistant. "
@@ -195,3 +932,63 @@ class ChatBot:
         """
         session = self.conversation_manager.get_session(session_id)
         return session.get_history() if session else []
+
+    def warmup(self) -> Dict[str, float]:
+        """
+        Load models and start workers before the first request.
+
+        Without a warm-up, the first chat() pays for model loads, worker
+        process start-up and first-call setup. Call this once after
+        construction (for example before a server starts accepting
+        traffic) to move that cost out of the request path. Components
+        that are not configured are skipped; a provider is warmed when it
+        defines a ``warmup()`` method.
+
+        Returns:
+            Seconds spent warming each component, keyed by name
+
+        Example:
+            >>> bot = ChatBot(config)
+            >>> bot.warmup()
+            {'nlp': 0.012, 'embedder': 0.4}
+        """
+        timings: Dict[str, float] = {}
+
+        start = time.perf_counter()
+        self.nlp_engine.warmup()
+        timings["nlp"] = time.perf_counter() - start
+
+        if self.semantic_cache is not None:
+            start = time.perf_counter()
+            self.semantic_cache.embedder.embed_one("warmup")
+            timings["embedder"] = time.perf_counter() - start
+
+        provider_warmup = getattr(self.provider, "warmup", None)
+        if callable(provider_warmup):
+            start = time.perf_counter()
+            provider_warmup()
+            timings["provider"] = time.perf_counter() - start
+
+        logger.info(
+            "ChatBot warm-up complete: "
+            + ", ".join(f"{name} {seconds * 1000:.1f} ms" for name, seconds in timings.items())
+        )
+        return timings
+
+    def close(self) -> None:
+        """Flush pending session writes and stop background workers."""
+        self.conversation_manager.close()
+        self.nlp_engine.close()
+        if self.knowledge_base is not None:
+            self.knowledge_base.close()
+
+    async def aclose(self) -> None:
+        """
+        Async version of close.
+
+        Also stops the NLP micro-batcher, which runs on the event loop,
+        cancelling requests still queued in it.
+        """
+        if self.nlp_batcher is not None:
+            await self.nlp_batcher.close()
+        self.close()
@@ -4,30 +4,203 @@ Conversation management for IntraMind.
 Handles session management, conversation history, and context preservation.
 """
 
+import asyncio
+import sys
+import threading
+import time
 import uuid
-from typing import Any, Dict, List, Optional
+from array import array
+from collections import OrderedDict, deque
+from collections.abc import Mapping
+from contextlib import asynccontextmanager, contextmanager
+from itertools import chain, islice
+from typing import Any, AsyncIterator, Callable, Deque, Dict, Iterator, List, Optional, Tuple, Union
 from dataclasses import dataclass, field
-from datetime import datetime
+from datetime import datetime, timedelta
 import logging
 
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the number of model tokens in a text.
+
+    Uses the common approximation of four characters per token, which is
+    close enough for budgeting history without loading a tokenizer.
+
+    Args:
+        text: Input text
+
+    Returns:
+        Estimated token count (at least 1)
+    """
+    return max(1, (len(text) + 3) // 4)
+
+
 class Message:
     """
     Represents a single message in a conversation.
 
+    Messages are slotted and store their creation time as an epoch float,
+    with interned role strings, to keep per-message overhead small.
+
     Attributes:
         role: The role of the message sender (user, assistant, system)
         content: The message content
-        timestamp: When the message was created
+        created: Creation time as seconds since the epoch
         metadata: Additional message metadata
+        tokens: Estimated token count, computed once when created
+    """
+
+    __slots__ = ("role", "content", "created", "metadata", "tokens")
+
+    def __init__(self, role: str, content: str,
+                 timestamp: Optional[Union[datetime, float]] = None,
+                 metadata: Optional[Dict[str, Any]] = None, tokens: int = -1):
+        """
+        Initialize a message.
+
+        Args:
+            role: Message role (user, assistant, system)
+            content: Message content
+            timestamp: Creation time as a datetime or epoch seconds.
+                Defaults to now.
+            metadata: Optional metadata
+            tokens: Token count; estimated from content if negative
+        """
+        if timestamp is None:
+            created = time.time()
+        elif isinstance(timestamp, datetime):
+            created = timestamp.timestamp()
+        else:
+            created = float(timestamp)
+        self.role = sys.intern(role)
+        self.content = content
+        self.created = created
+        self.metadata = metadata
+        self.tokens = tokens if tokens >= 0 else estimate_tokens(content)
+
+    @property
+    def timestamp(self) -> datetime:
+        """When the message was created, as a local datetime."""
+        return datetime.fromtimestamp(self.created)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Message):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def __repr__(self) -> str:
+        return (
+            f"Message(role={self.role!r}, content={self.content!r}, "
+            f"timestamp={self.timestamp!r}, metadata={self.metadata!r}, tokens={self.tokens})"
+        )
+
+
+class ColumnarMessages:
     """
-    role: str
-    content: str
-    timestamp: datetime = field(default_factory=datetime.now)
-    metadata: Optional[Dict[str, Any]] = None
+    Column-oriented message storage for a single session.
+
+    Stores each message field in its own compact column (role codes in a
+    byte array, timestamps and token counts in typed arrays, metadata only
+    for messages that have it) instead of one object per message. It
+    supports the deque operations ConversationSession uses; messages are
+    materialized as Message objects only when read.
+    """
+
+    _role_codes: Dict[str, int] = {}
+    _roles: List[str] = []
+    _roles_lock = threading.Lock()
+
+    def __init__(self) -> None:
+        """Initialize an empty message store."""
+        self.clear()
+
+    def clear(self) -> None:
+        """Remove all messages."""
+        self._role_col = array("B")
+        self._created_col = array("d")
+        self._tokens_col = array("I")
+        self._contents: List[str] = []
+        self._metadata: Dict[int, Dict[str, Any]] = {}
+        # Logical index 0 lives at physical offset _start; popped slots are
+        # reclaimed in bulk once they make up half the columns.
+        self._start = 0
+
+    @classmethod
+    def _role_code(cls, role: str) -> int:
+        code = cls._role_codes.get(role)
+        if code is None:
+            # The role tables are shared by sessions on every shard
+            with cls._roles_lock:
+                code = cls._role_codes.get(role)
+                if code is None:
+                    if len(cls._roles) >= 256:
+                        raise ValueError("Too many distinct message roles for columnar storage")
+                    code = len(cls._roles)
+                    cls._roles.append(sys.intern(role))
+                    cls._role_codes[role] = code
+        return code
+
+    def __len__(self) -> int:
+        return len(self._contents) - self._start
+
+    def _message_at(self, physical: int) -> Message:
+        return Message(
+            self._roles[self._role_col[physical]],
+            self._contents[physical],
+            timestamp=self._created_col[physical],
+            metadata=self._metadata.get(physical),
+            tokens=self._tokens_col[physical],
+        )
+
+    def __getitem__(self, index: int) -> Message:
+        length = len(self)
+        if index < 0:
+            index += length
+        if not 0 <= index < length:
+            raise IndexError("message index out of range")
+        return self._message_at(self._start + index)
+
+    def __iter__(self) -> Iterator[Message]:
+        for physical in range(self._start, len(self._contents)):
+            yield self._message_at(physical)
+
+    def __reversed__(self) -> Iterator[Message]:
+        for physical in range(len(self._contents) - 1, self._start - 1, -1):
+            yield self._message_at(physical)
+
+    def append(self, message: Message) -> None:
+        """Append a message, storing its fields column-wise."""
+        physical = len(self._contents)
+        self._role_col.append(self._role_code(message.role))
+        self._created_col.append(message.created)
+        self._tokens_col.append(message.tokens)
+        self._contents.append(message.content)
+        if message.metadata is not None:
+            self._metadata[physical] = message.metadata
+
+    def popleft(self) -> Message:
+        """Remove and return the oldest message."""
+        if not len(self):
+            raise IndexError("pop from an empty message store")
+        message = self._message_at(self._start)
+        self._metadata.pop(self._start, None)
+        self._contents[self._start] = ""
+        self._start += 1
+        if self._start * 2 >= len(self._contents):
+            self._compact()
+        return message
+
+    def _compact(self) -> None:
+        start = self._start
+        del self._role_col[:start]
+        del self._created_col[:start]
+        del self._tokens_col[:start]
+        del self._contents[:start]
+        self._metadata = {index - start: value for index, value in self._metadata.items()}
+        self._start = 0
 
 
 @dataclass
@@ -35,18 +208,102 @@ class ConversationSession:
     """
     Represents a conversation session.
 
+    History is a ring buffer: once it exceeds ``max_messages`` messages or
+    ``max_tokens`` estimated tokens, the oldest messages are dropped, so a
+    session uses bounded memory however long the conversation runs.
+
+    History changes are guarded by ``lock``. Callers that need a whole
+    turn to be atomic run it inside ``turn()`` (threads) or
+    ``turn_async()`` (coroutines). Both hold the same turn lock, so turns
+    in one session run one at a time whichever path they come from.
+    Sessions with a turn running or waiting are never evicted from the
+    manager's cache.
+
     Attributes:
         session_id: Unique session identifier
-        messages: List of messages in the conversation
+        messages: Messages in the conversation, oldest first
         context: Session context and metadata
         created_at: Session creation timestamp
         updated_at: Last update timestamp
+        max_messages: Optional cap on the number of stored messages
+        max_tokens: Optional cap on the total tokens of stored messages
+        total_tokens: Total estimated tokens of stored messages
+        on_update: Optional callback invoked after the session changes
+        on_change: Optional callback invoked with ``(session, "append",
+            message)`` or ``(session, "clear", None)`` when history changes
+        lock: Re-entrant lock guarding history changes
+        active_turns: Turns running or waiting for the turn lock
     """
     session_id: str
-    messages: List[Message] = field(default_factory=list)
+    messages: Union[Deque[Message], ColumnarMessages] = field(default_factory=deque)
     context: Dict[str, Any] = field(default_factory=dict)
     created_at: datetime = field(default_factory=datetime.now)
     updated_at: datetime = field(default_factory=datetime.now)
+    max_messages: Optional[int] = None
+    max_tokens: Optional[int] = None
+    total_tokens: int = 0
+    on_update: Optional[Callable[["ConversationSession"], None]] = field(
+        default=None, repr=False, compare=False
+    )
+    on_change: Optional[Callable[["ConversationSession", str, Optional[Message]], None]] = field(
+        default=None, repr=False, compare=False
+    )
+    lock: Any = field(default_factory=threading.RLock, repr=False, compare=False)
+    active_turns: int = field(default=0, init=False, repr=False, compare=False)
+    _turn_lock: Any = field(default_factory=threading.Lock, init=False, repr=False,
+                            compare=False)
+    _async_lock: Optional[asyncio.Lock] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+
+    def turn_lock_async(self) -> asyncio.Lock:
+        """Return the asyncio lock that queues this session's async turns."""
+        if self._async_lock is None:
+            with self.lock:
+                if self._async_lock is None:
+                    self._async_lock = asyncio.Lock()
+        return self._async_lock
+
+    def _pin(self, delta: int) -> None:
+        """Count a turn entering (1) or leaving (-1) the session."""
+        with self.lock:
+            self.active_turns += delta
+
+    @contextmanager
+    def turn(self) -> Iterator[None]:
+        """Run a turn from a thread, holding the session's turn lock."""
+        self._pin(1)
+        try:
+            with self._turn_lock:
+                yield
+        finally:
+            self._pin(-1)
+
+    @asynccontextmanager
+    async def turn_async(self) -> AsyncIterator[None]:
+        """
+        Run a turn from a coroutine, holding the session's turn lock.
+
+        Async turns first queue on an asyncio lock, so at most one of them
+        per session waits for the turn lock in a worker thread while a
+        thread's turn holds it.
+        """
+        self._pin(1)
+        try:
+            async with self.turn_lock_async():
+                await _acquire_lock_async(self._turn_lock)
+                try:
+                    yield
+                finally:
+                    self._turn_lock.release()
+        finally:
+            self._pin(-1)
+
+    def touch(self) -> None:
+        """Mark the session as updated now and notify the listener."""
+        self.updated_at = datetime.now()
+        if self.on_update is not None:
+            self.on_update(self)
 
     def add_message(self, role: str, content: str,
                    metadata: Optional[Dict[str, Any]] = None) -> None:
@@ -59,8 +316,13 @@ class ConversationSession:
             metadata: Optional metadata
         """
         message = Message(role=role, content=content, metadata=metadata)
-        self.messages.append(message)
-        self.updated_at = datetime.now()
+        with self.lock:
+            self.messages.append(message)
+            self.total_tokens += message.tokens
+            self._trim()
+            self.touch()
+            if self.on_change is not None:
+                self.on_change(self, "append", message)
         logger.debug(f"Added message to session {self.session_id}: {role}")
 
     def get_history(self, limit: Optional[int] = None) -> List[Dict[str, str]]:
@@ -73,41 +335,288 @@ class ConversationSession:
         Returns:
             List of messages as dictionaries
         """
-        messages = self.messages[-limit:] if limit else self.messages
-        return [
-            {
-                "role": msg.role,
-                "content": msg.content,
-                "timestamp": msg.timestamp.isoformat()
-            }
-            for msg in messages
-        ]
+        with self.lock:
+            start = max(0, len(self.messages) - limit) if limit else 0
+            return [self._as_dict(msg) for msg in islice(self.messages, start, None)]
+
+    def get_window(self, max_tokens: int) -> List[Dict[str, str]]:
+        """
+        Get the newest messages that fit within a token budget.
+
+        Uses the token counts cached on each message, so the cost grows
+        with the size of the window rather than the whole history.
+
+        Args:
+            max_tokens: Token budget for the returned messages
+
+        Returns:
+            List of messages as dictionaries, oldest first
+        """
+        window: List[Message] = []
+        used = 0
+        with self.lock:
+            for msg in reversed(self.messages):
+                if used + msg.tokens > max_tokens:
+                    break
+                used += msg.tokens
+                window.append(msg)
+        return [self._as_dict(msg) for msg in reversed(window)]
+
+    @staticmethod
+    def _as_dict(msg: Message) -> Dict[str, str]:
+        return {
+            "role": msg.role,
+            "content": msg.content,
+            "timestamp": msg.timestamp.isoformat()
+        }
+
+    def _trim(self) -> None:
+        """Drop the oldest messages until the history fits its caps."""
+        while self.messages and (
+            (self.max_messages is not None and len(self.messages) > self.max_messages)
+            or (self.max_tokens is not None and self.total_tokens > self.max_tokens
+                and len(self.messages) > 1)
+        ):
+            self.total_tokens -= self.messages.popleft().tokens
 
     def clear(self) -> None:
         """Clear all messages from the session."""
-        self.messages.clear()
-        self.updated_at = datetime.now()
+        with self.lock:
+            self.messages.clear()
+            self.total_tokens = 0
+            self.touch()
+            if self.on_change is not None:
+                self.on_change(self, "clear", None)
         logger.info(f"Cleared session {self.session_id}")
 
 
+async def _acquire_lock_async(lock: Any) -> None:
+    """Acquire a threading lock without blocking the event loop."""
+    if lock.acquire(blocking=False):
+        return
+    future = asyncio.get_running_loop().run_in_executor(None, lock.acquire)
+    try:
+        await asyncio.shield(future)
+    except asyncio.CancelledError:
+        # The thread still takes the lock; hand it back once it does
+        future.add_done_callback(lambda _: lock.release())
+        raise
+
+
+class _SessionShard:
+    """One independently locked slice of the session map."""
+
+    __slots__ = ("lock", "sessions", "expiry")
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.sessions: Dict[str, ConversationSession] = {}
+        self.expiry: "OrderedDict[str, None]" = OrderedDict()
+
+
+class _SessionView(Mapping):
+    """Read-only mapping of session id to session across all shards."""
+
+    def __init__(self, manager: "ConversationManager"):
+        self._manager = manager
+
+    def __getitem__(self, session_id: str) -> ConversationSession:
+        return self._manager._shard(session_id).sessions[session_id]
+
+    def __contains__(self, session_id: object) -> bool:
+        return isinstance(session_id, str) and session_id in self._manager._shard(session_id).sessions
+
+    def __iter__(self) -> Iterator[str]:
+        return chain.from_iterable(list(shard.sessions) for shard in self._manager._shards)
+
+    def __len__(self) -> int:
+        return sum(len(shard.sessions) for shard in self._manager._shards)
+
+
 class ConversationManager:
     """
     Manages conversation sessions and their lifecycle.
 
     This class handles session creation, retrieval, and cleanup,
     ensuring conversation context is properly maintained.
+
+    Sessions are also kept in an expiry index ordered by ``updated_at``:
+    every update moves a session to the back, so cleanup only visits the
+    sessions that have actually expired.
+
+    The session map is split into ``session_shards`` shards, each with its
+    own lock and expiry index, so threads working on unrelated sessions
+    rarely contend. All methods are safe to call from multiple threads.
+
+    With a SessionStore, the in-memory map acts as a cache in front of the
+    store: sessions missing from memory are loaded from the store, and
+    every change is queued to a write-behind thread that persists it in
+    batches, off the request path. The cache holds at most
+    ``session_cache_size`` sessions; the least recently updated ones are
+    evicted from memory and reloaded from the store on their next use.
     """
 
-    def __init__(self, config: Any):
+    def __init__(self, config: Any, store: Optional[Any] = None):
         """
         Initialize the ConversationManager.
 
         Args:
             config: Configuration object
+            store: Optional SessionStore for persistence. If None, one is
+                created from ``session_store`` in the config.
         """
         self.config = config
-        self.sessions: Dict[str, ConversationSession] = {}
-        logger.info("ConversationManager initialized")
+        self._shards = [_SessionShard() for _ in range(max(1, config.session_shards))]
+        self._sessions_view = _SessionView(self)
+        self._reaper: Optional["asyncio.Task[None]"] = None
+
+        self.store = store
+        self._writer: Optional[Any] = None
+        shard_capacity: Optional[int] = None
+        if store is not None or config.session_store != "none":
+            from intramind.services.database_service import (
+                SessionOp, WriteBehindQueue, create_session_store
+            )
+
+            if self.store is None:
+                self.store = create_session_store(config)
+            self._session_op = SessionOp
+            if config.session_cache_size:
+                shard_capacity = -(-config.session_cache_size // len(self._shards))
+            self._writer = WriteBehindQueue(
+                self.store,
+                batch_size=config.session_write_batch_size,
+                interval=config.session_write_interval_ms / 1000,
+            )
+        self._shard_capacity = shard_capacity
+        self.evictions = 0
+        logger.info(
+            f"ConversationManager initialized ({len(self._shards)} shards, "
+            f"store={self.store.name if self.store else 'none'})"
+        )
+
+    @property
+    def sessions(self) -> Mapping:
+        """Read-only mapping of session id to ConversationSession."""
+        return self._sessions_view
+
+    def _shard(self, session_id: str) -> _SessionShard:
+        """Return the shard that owns a session id."""
+        return self._shards[hash(session_id) % len(self._shards)]
+
+    def _on_session_update(self, session: ConversationSession) -> None:
+        """Move an updated session to the back of the expiry index."""
+        shard = self._shard(session.session_id)
+        with shard.lock:
+            if session.session_id in shard.expiry:
+                shard.expiry.move_to_end(session.session_id)
+
+    def _persist(self, kind: str, session_id: Optional[str], **fields: Any) -> None:
+        """Queue a write to the session store, if there is one."""
+        if self._writer is not None:
+            self._writer.submit(self._session_op(kind, session_id, **fields))
+
+    def _on_session_change(self, session: ConversationSession, kind: str,
+                           message: Optional[Message]) -> None:
+        """Queue a history change for persistence."""
+        if kind == "append":
+            self._persist("append", session.session_id, timestamp=message.created,
+                          message=message)
+        else:
+            self._persist(kind, session.session_id, timestamp=time.time())
+
+    def _new_message_store(self) -> Union[Deque[Message], ColumnarMessages]:
+        """Create the message container selected by ``history_storage``."""
+        if self.config.history_storage == "columnar":
+            return ColumnarMessages()
+        return deque()
+
+    def _new_session(self, session_id: str,
+                     context: Optional[Dict[str, Any]]) -> ConversationSession:
+        """Build a session configured from the manager's settings."""
+        return ConversationSession(
+            session_id=session_id,
+            messages=self._new_message_store(),
+            context=context or {},
+            max_messages=self.config.history_max_messages or None,
+            max_tokens=self.config.history_max_tokens or None,
+            on_update=self._on_session_update,
+            on_change=self._on_session_change if self._writer is not None else None
+        )
+
+    def _restore_session(self, stored: Any) -> ConversationSession:
+        """Rebuild a session loaded from the store. Loading counts as an update."""
+        session = self._new_session(stored.session_id, stored.context)
+        session.created_at = datetime.fromtimestamp(stored.created_at)
+        for message in stored.messages:
+            session.messages.append(message)
+            session.total_tokens += message.tokens
+        session._trim()
+        return session
+
+    def _adopt(self, session: ConversationSession) -> ConversationSession:
+        """Register a loaded session unless another caller got there first."""
+        shard = self._shard(session.session_id)
+        with shard.lock:
+            existing = shard.sessions.get(session.session_id)
+            if existing is not None:
+                return existing
+            self._register(shard, session)
+        logger.info(f"Loaded session from store: {session.session_id}")
+        return session
+
+    def _load_limit(self) -> Optional[int]:
+        return self.config.history_max_messages or None
+
+    def _register(self, shard: _SessionShard, session: ConversationSession) -> None:
+        """
+        Add a session to a shard. The caller holds the shard lock.
+
+        When the shard is over capacity, the least recently updated
+        sessions are dropped from memory; they remain in the store.
+        Sessions with an active turn are kept, since a reload would create
+        a second live copy of them; the shard may then briefly exceed its
+        capacity.
+        """
+        shard.sessions[session.session_id] = session
+        shard.expiry[session.session_id] = None
+        shard.expiry.move_to_end(session.session_id)
+        if self._shard_capacity is not None:
+            excess = len(shard.sessions) - self._shard_capacity
+            if excess > 0:
+                idle = (session_id for session_id in shard.expiry
+                        if not self._pinned(shard, session_id))
+                for evicted in list(islice(idle, excess)):
+                    del shard.expiry[evicted]
+                    shard.sessions.pop(evicted, None)
+                    self.evictions += 1
+
+    @staticmethod
+    def _pinned(shard: _SessionShard, session_id: str) -> bool:
+        """Return True if a session has a turn running or waiting."""
+        session = shard.sessions.get(session_id)
+        return session is not None and session.active_turns > 0
+
+    def _load(self, session_id: str) -> Optional[Any]:
+        """
+        Load a session from the store once its queued writes have landed.
+
+        Raises:
+            SessionWriteError: If queued writes for the session were lost,
+                so the stored history is stale
+        """
+        if self._writer is not None:
+            self._writer.wait_for(session_id)
+        return self.store.load(session_id, self._load_limit())
+
+    async def _load_async(self, session_id: str) -> Optional[Any]:
+        """Async version of _load."""
+        if self._writer is not None:
+            if self._writer.has_pending(session_id):
+                await asyncio.to_thread(self._writer.wait_for, session_id)
+            else:
+                self._writer.wait_for(session_id, timeout=0)
+        return await self.store.load_async(session_id, self._load_limit())
 
     def create_session(self, session_id: Optional[str] = None,
                       context: Optional[Dict[str, Any]] = None) -> ConversationSession:
@@ -124,14 +633,18 @@ class ConversationManager:
         if session_id is None:
             session_id = str(uuid.uuid4())
 
-        session = ConversationSession(
-            session_id=session_id,
-            context=context or {}
-        )
-        self.sessions[session_id] = session
+        session = self._new_session(session_id, context)
+        shard = self._shard(session_id)
+        with shard.lock:
+            self._register(shard, session)
+        self._persist_new(session)
         logger.info(f"Created new session: {session_id}")
         return session
 
+    def _persist_new(self, session: ConversationSession) -> None:
+        self._persist("upsert", session.session_id, context=session.context,
+                      timestamp=session.created_at.timestamp())
+
     def get_session(self, session_id: str) -> Optional[ConversationSession]:
         """
         Get an existing session.
@@ -142,13 +655,64 @@ class ConversationManager:
         Returns:
             ConversationSession if found, None otherwise
         """
-        return self.sessions.get(session_id)
+        session = self._shard(session_id).sessions.get(session_id)
+        if session is None and self.store is not None:
+            stored = self._load(session_id)
+            if stored is not None:
+                session = self._adopt(self._restore_session(stored))
+        return session
 
     def get_or_create_session(self, session_id: Optional[str] = None,
                              context: Optional[Dict[str, Any]] = None) -> ConversationSession:
         """
         Get existing session or create new one.
 
+        The lookup and the creation happen under the shard lock, so
+        concurrent callers with the same new session id all receive the
+        same session.
+
+        Args:
+            session_id: Optional session identifier
+            context: Optional context for new sessions
+
+        Returns:
+            ConversationSession
+        """
+        if not session_id:
+            return self.create_session(None, context)
+
+        shard = self._shard(session_id)
+        session = shard.sessions.get(session_id)
+        if session is not None:
+            return session
+        stored = self._load(session_id) if self.store else None
+        return self._get_or_register(session_id, context, stored)
+
+    def _get_or_register(self, session_id: str, context: Optional[Dict[str, Any]],
+                         stored: Optional[Any]) -> ConversationSession:
+        """Register a restored or new session unless one appeared meanwhile."""
+        if stored is not None:
+            return self._adopt(self._restore_session(stored))
+        shard = self._shard(session_id)
+        with shard.lock:
+            session = shard.sessions.get(session_id)
+            if session is not None:
+                return session
+            session = self._new_session(session_id, context)
+            self._register(shard, session)
+        self._persist_new(session)
+        logger.info(f"Created new session: {session_id}")
+        return session
+
+    async def get_or_create_session_async(self, session_id: Optional[str] = None,
+                                          context: Optional[Dict[str, Any]] = None
+                                          ) -> ConversationSession:
+        """
+        Async version of get_or_create_session.
+
+        Sessions already in memory are returned without leaving the event
+        loop; misses are loaded with the store's async API.
+
         Args:
             session_id: Optional session identifier
             context: Optional context for new sessions
@@ -156,9 +720,13 @@ class ConversationManager:
         Returns:
             ConversationSession
         """
-        if session_id and session_id in self.sessions:
-            return self.sessions[session_id]
-        return self.create_session(session_id, context)
+        if not session_id or self.store is None:
+            return self.get_or_create_session(session_id, context)
+        session = self._shard(session_id).sessions.get(session_id)
+        if session is not None:
+            return session
+        stored = await self._load_async(session_id)
+        return self._get_or_register(session_id, context, stored)
 
     def clear_session(self, session_id: str) -> bool:
         """
@@ -186,34 +754,178 @@ class ConversationManager:
         Returns:
             True if session was deleted, False if not found
         """
-        if session_id in self.sessions:
-            del self.sessions[session_id]
-            logger.info(f"Deleted session: {session_id}")
-            return True
-        return False
-
-    def cleanup_old_sessions(self, max_age_hours: int = 24) -> int:
+        shard = self._shard(session_id)
+        with shard.lock:
+            found = shard.sessions.pop(session_id, None) is not None
+            shard.expiry.pop(session_id, None)
+        if not found and self.store is not None:
+            found = self._load(session_id) is not None
+        if not found:
+            return False
+        self._persist("delete", session_id)
+        logger.info(f"Deleted session: {session_id}")
+        return True
+
+    def cleanup_old_sessions(self, max_age_hours: Optional[float] = None,
+                             time_budget: Optional[float] = None) -> int:
         """
         Remove sessions older than specified age.
 
+        Walks each shard's expiry index from the least recently updated
+        session and stops at the first one that is still fresh, so the cost
+        grows with the number of expired sessions rather than the total.
+        Sessions with a turn running are skipped and removed by a later
+        sweep.
+
         Args:
-            max_age_hours: Maximum age in hours
+            max_age_hours: Maximum age in hours. Defaults to
+                ``session_ttl_hours`` from the config.
+            time_budget: Optional seconds to spend before stopping early;
+                remaining expired sessions are removed on the next call
 
         Returns:
             Number of sessions removed
         """
-        now = datetime.now()
-        sessions_to_remove = []
+        return self._sweep(max_age_hours, time_budget)[0]
+
+    def _sweep(self, max_age_hours: Optional[float],
+               time_budget: Optional[float]) -> Tuple[int, bool]:
+        """
+        Remove expired sessions (see cleanup_old_sessions).
+
+        Returns:
+            Number of sessions removed, and whether the sweep stopped
+            because ``time_budget`` ran out
+        """
+        if max_age_hours is None:
+            max_age_hours = self.config.session_ttl_hours
+        cutoff = datetime.now() - timedelta(hours=max_age_hours)
+        deadline = time.monotonic() + time_budget if time_budget is not None else None
+
+        removed = 0
+        out_of_time = False
+        for shard in self._shards:
+            with shard.lock:
+                expired = []
+                for session_id in shard.expiry:
+                    session = shard.sessions.get(session_id)
+                    if session is not None and session.updated_at >= cutoff:
+                        break
+                    if session is not None and session.active_turns:
+                        continue
+                    expired.append(session_id)
+                    if (deadline is not None and (removed + len(expired)) % 256 == 0
+                            and time.monotonic() >= deadline):
+                        out_of_time = True
+                        break
+                for session_id in expired:
+                    del shard.expiry[session_id]
+                    shard.sessions.pop(session_id, None)
+                removed += len(expired)
+            if out_of_time:
+                break
+
+        if removed:
+            self._persist("expire", None, cutoff=cutoff.timestamp())
+            logger.info(f"Cleaned up {removed} old sessions")
+
+        return removed, out_of_time
+
+    def has_expired_sessions(self, max_age_hours: Optional[float] = None) -> bool:
+        """
+        Check whether any session is older than the given age.
 
-        for session_id, session in self.sessions.items():
-            age_hours = (now - session.updated_at).total_seconds() / 3600
-            if age_hours > max_age_hours:
-                sessions_to_remove.append(session_id)
+        Sessions with a turn running are not counted, since a sweep would
+        not remove them.
 
-        for session_id in sessions_to_remove:
-            del self.sessions[session_id]
+        Args:
+            max_age_hours: Maximum age in hours. Defaults to
+                ``session_ttl_hours`` from the config.
 
-        if sessions_to_remove:
-            logger.info(f"Cleaned up {len(sessions_to_remove)} old sessions")
+        Returns:
+            True if a shard holds an expired session that a sweep would remove
+        """
+        if max_age_hours is None:
+            max_age_hours = self.config.session_ttl_hours
+        cutoff = datetime.now() - timedelta(hours=max_age_hours)
+        for shard in self._shards:
+            with shard.lock:
+                for session_id in shard.expiry:
+                    session = shard.sessions.get(session_id)
+                    if session is None:
+                        return True
+                    if session.updated_at >= cutoff:
+                        break
+                    if not session.active_turns:
+                        return True
+        return False
 
-        return len(sessions_to_remove)
+    def start_reaper(self, interval: Optional[float] = None,
+                     max_age_hours: Optional[float] = None,
+                     time_budget: Optional[float] = None) -> "asyncio.Task[None]":
+        """
+        Start a background task that periodically removes expired sessions.
+
+        Each sweep runs for at most ``time_budget`` seconds; if it ran out
+        of time, the reaper yields to the event loop and continues
+        immediately instead of waiting a full interval.
+
+        Must be called from a running event loop.
+
+        Args:
+            interval: Seconds between sweeps. Defaults to
+                ``session_reaper_interval`` from the config.
+            max_age_hours: Maximum session age. Defaults to
+                ``session_ttl_hours`` from the config.
+            time_budget: Seconds per sweep. Defaults to
+                ``session_reaper_budget_ms`` from the config.
+
+        Returns:
+            The running reaper task
+        """
+        if self._reaper is not None and not self._reaper.done():
+            return self._reaper
+        if interval is None:
+            interval = self.config.session_reaper_interval
+        if time_budget is None:
+            time_budget = self.config.session_reaper_budget_ms / 1000
+
+        async def reap() -> None:
+            while True:
+                try:
+                    _, out_of_time = self._sweep(max_age_hours, time_budget)
+                    if out_of_time:
+                        await asyncio.sleep(0)
+                        continue
+                except Exception as e:
+                    logger.error(f"Session reaper sweep failed: {str(e)}")
+                await asyncio.sleep(interval)
+
+        self._reaper = asyncio.get_running_loop().create_task(reap())
+        logger.info(f"Session reaper started (interval={interval}s)")
+        return self._reaper
+
+    async def stop_reaper(self) -> None:
+        """Stop the background reaper task if it is running."""
+        if self._reaper is None:
+            return
+        self._reaper.cancel()
+        try:
+            await self._reaper
+        except asyncio.CancelledError:
+            pass
+        self._reaper = None
+        logger.info("Session reaper stopped")
+
+    def flush(self) -> None:
+        """Block until all queued session writes have reached the store."""
+        if self._writer is not None:
+            self._writer.flush()
+
+    def close(self) -> None:
+        """Flush queued session writes and close the session store."""
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        if self.store is not None:
+            self.store.close()
@@ -0,0 +1,315 @@
+"""
+Keyword matching for IntraMind.
+
+Provides a compiled multi-pattern matcher (Aho-Corasick automaton) used by
+the NLP engine to find intent and sentiment keywords in a single pass.
+"""
+
+import json
+import re
+from collections import deque
+from itertools import chain, repeat
+from pathlib import Path
+from typing import (
+    Any, Dict, Iterable, Iterator, List, Mapping, NamedTuple, Optional, Sequence, Tuple, Union
+)
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+# Default rule tables. Intents are listed in priority order: when a message
+# contains keywords for several intents, the first one listed wins.
+DEFAULT_RULES: Dict[str, Dict[str, List[str]]] = {
+    "intents": {
+        "greeting": ["hello", "hi", "hey"],
+        "farewell": ["bye", "goodbye", "see you"],
+        "help_request": ["help", "assist", "support"],
+    },
+    "sentiment": {
+        "positive": ["good", "great", "excellent", "happy", "love"],
+        "negative": ["bad", "terrible", "awful", "sad", "hate"],
+    },
+}
+
+# Words are runs of word characters; everything else is a boundary.
+_TOKEN_RE = re.compile(r"\w+")
+
+
+class KeywordHit(NamedTuple):
+    """
+    A single keyword occurrence found by the matcher.
+
+    Attributes:
+        start: Start offset of the match in the scanned text
+        end: End offset (exclusive) of the match
+        keyword: The matched keyword, normalized to single spaces
+        category: Rule category (e.g. "intents", "sentiment")
+        label: Label within the category (e.g. "greeting", "positive")
+    """
+    start: int
+    end: int
+    keyword: str
+    category: str
+    label: str
+
+
+class _Rule(NamedTuple):
+    """A compiled keyword rule attached to an automaton state."""
+    rule_id: int
+    length: int
+    keyword: str
+    category: str
+    label: str
+
+
+class KeywordMatcher:
+    """
+    Aho-Corasick keyword matcher with word-boundary semantics.
+
+    The automaton is compiled once from rule tables of the form
+    ``{category: {label: [keyword, ...]}}`` and then scans each message
+    in a single pass, regardless of how many keywords are loaded. Its
+    alphabet is the set of words used by the keywords, so matches always
+    start and end on word boundaries and multi-word keywords match across
+    any run of non-word characters.
+
+    Example:
+        >>> matcher = KeywordMatcher(DEFAULT_RULES)
+        >>> matcher.match("Hello, this is great")
+        {'intents': {'greeting': 1}, 'sentiment': {'positive': 1}}
+    """
+
+    def __init__(self, rules: Optional[Mapping[str, Mapping[str, Iterable[str]]]] = None):
+        """
+        Initialize and compile the matcher.
+
+        Args:
+            rules: Rule tables keyed by category and label. If None,
+                uses DEFAULT_RULES.
+        """
+        rules = DEFAULT_RULES if rules is None else rules
+
+        # Label order per category, preserved from the rule tables
+        self.labels: Dict[str, List[str]] = {}
+
+        # Flat (category, label) columns used by the batch matrix API
+        self.columns: List[Tuple[str, str]] = []
+        column_index: Dict[Tuple[str, str], int] = {}
+        rule_columns: List[int] = []
+        seen_rules = set()
+
+        # Keyword words are interned as integer ids; the trie is stored as
+        # parallel lists indexed by state id.
+        self._token_ids: Dict[str, int] = {}
+        self._goto: List[Dict[int, int]] = [{}]
+        self._fail: List[int] = [0]
+        pending: List[List[_Rule]] = [[]]
+
+        for category, table in rules.items():
+            self.labels[category] = list(table)
+            for label, keywords in table.items():
+                column = column_index.setdefault((category, label), len(self.columns))
+                if column == len(self.columns):
+                    self.columns.append((category, label))
+                for keyword in keywords:
+                    tokens = _TOKEN_RE.findall(keyword.lower())
+                    normalized = " ".join(tokens)
+                    if not tokens or (normalized, category, label) in seen_rules:
+                        continue
+                    seen_rules.add((normalized, category, label))
+                    state = self._insert(tokens, pending)
+                    pending[state].append(
+                        _Rule(len(rule_columns), len(tokens), normalized, category, label)
+                    )
+                    rule_columns.append(column)
+
+        self._rule_columns = np.asarray(rule_columns, dtype=np.intp)
+        self._outputs: List[Tuple[_Rule, ...]] = [tuple(out) for out in pending]
+        self._build_failure_links()
+        self.keyword_count = len(rule_columns)
+        logger.debug(
+            f"KeywordMatcher compiled {self.keyword_count} keywords "
+            f"into {len(self._goto)} states"
+        )
+
+    @classmethod
+    def from_file(cls, path: Union[str, Path]) -> "KeywordMatcher":
+        """
+        Build a matcher from a JSON rule file.
+
+        The file must contain an object of the same shape as DEFAULT_RULES.
+        Categories missing from the file fall back to the defaults.
+
+        Args:
+            path: Path to the JSON rule file
+
+        Returns:
+            Compiled KeywordMatcher
+        """
+        with open(path, encoding="utf-8") as handle:
+            loaded: Dict[str, Any] = json.load(handle)
+
+        rules: Dict[str, Mapping[str, Iterable[str]]] = dict(DEFAULT_RULES)
+        rules.update(loaded)
+        logger.info(f"Loaded keyword rules from {path}")
+        return cls(rules)
+
+    def _insert(self, tokens: List[str], pending: List[List[_Rule]]) -> int:
+        """Insert a tokenized keyword into the trie and return its terminal state."""
+        state = 0
+        for token in tokens:
+            token_id = self._token_ids.setdefault(token, len(self._token_ids))
+            next_state = self._goto[state].get(token_id)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][token_id] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                pending.append([])
+            state = next_state
+        return state
+
+    def _build_failure_links(self) -> None:
+        """Compute failure links breadth-first and merge output sets."""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for token_id, child in self._goto[state].items():
+                queue.append(child)
+                fallback = self._fail[state]
+                while fallback and token_id not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(token_id, 0)
+                if self._outputs[self._fail[child]]:
+                    self._outputs[child] = self._outputs[child] + self._outputs[self._fail[child]]
+
+    def _step(self, state: int, token_id: int) -> int:
+        """Advance the automaton by one keyword token."""
+        goto = self._goto
+        fail = self._fail
+        while state and token_id not in goto[state]:
+            state = fail[state]
+        return goto[state].get(token_id, 0)
+
+    def _iter_rules(self, token_ids: Iterable[int]) -> Iterator[Tuple[int, _Rule]]:
+        """
+        Run the automaton over a token id stream.
+
+        Unknown tokens (id -1) reset the automaton, since no keyword
+        contains them.
+
+        Yields:
+            (index of the last matched token, rule) pairs
+        """
+        outputs = self._outputs
+        state = 0
+        for index, token_id in enumerate(token_ids):
+            if token_id < 0:
+                state = 0
+                continue
+            state = self._step(state, token_id)
+            for rule in outputs[state]:
+                yield index, rule
+
+    def scan(self, text: str) -> List[KeywordHit]:
+        """
+        Scan text once and return every whole-word keyword occurrence.
+
+        Args:
+            text: Input text (matching is case-insensitive)
+
+        Returns:
+            List of KeywordHit in order of their end offset
+        """
+        words = list(_TOKEN_RE.finditer(text.lower()))
+        token_ids = map(self._token_ids.get, (word.group() for word in words), repeat(-1))
+        return [
+            KeywordHit(
+                words[index - rule.length + 1].start(),
+                words[index].end(),
+                rule.keyword,
+                rule.category,
+                rule.label,
+            )
+            for index, rule in self._iter_rules(token_ids)
+        ]
+
+    def match(self, text: str) -> Dict[str, Dict[str, int]]:
+        """
+        Count distinct matched keywords per category and label.
+
+        Args:
+            text: Input text
+
+        Returns:
+            Mapping of category to {label: number of distinct keywords hit}
+        """
+        tokens = _TOKEN_RE.findall(text.lower())
+        token_ids = map(self._token_ids.get, tokens, repeat(-1))
+
+        seen = set()
+        counts: Dict[str, Dict[str, int]] = {}
+        for _, rule in self._iter_rules(token_ids):
+            if rule.rule_id in seen:
+                continue
+            seen.add(rule.rule_id)
+            labels = counts.setdefault(rule.category, {})
+            labels[rule.label] = labels.get(rule.label, 0) + 1
+        return counts
+
+    def match_matrix(self, texts: Sequence[str]) -> np.ndarray:
+        """
+        Count distinct matched keywords for a batch of texts.
+
+        The whole batch is tokenized and mapped to keyword ids with NumPy;
+        the automaton only steps through runs of keyword tokens, and hits
+        are reduced into the count matrix in one vectorized pass. Row ``i``
+        holds the same counts as ``match(texts[i])``, laid out by
+        ``self.columns``.
+
+        Args:
+            texts: Batch of input texts
+
+        Returns:
+            Integer array of shape (len(texts), len(self.columns))
+        """
+        counts = np.zeros((len(texts), len(self.columns)), dtype=np.int32)
+        if not texts or not self.keyword_count:
+            return counts
+
+        token_lists = [_TOKEN_RE.findall(text.lower()) for text in texts]
+        lengths = np.fromiter(map(len, token_lists), dtype=np.intp, count=len(texts))
+        tokens = chain.from_iterable(token_lists)
+        token_ids = np.fromiter(map(self._token_ids.get, tokens, repeat(-1)),
+                                dtype=np.int64, count=int(lengths.sum()))
+
+        # Only keyword tokens can move the automaton; a run is broken by any
+        # other token or by the start of a new text.
+        rows = np.repeat(np.arange(len(texts)), lengths)
+        positions = np.flatnonzero(token_ids >= 0)
+        if not len(positions):
+            return counts
+        run_start = np.ones(len(positions), dtype=bool)
+        run_start[1:] = (np.diff(positions) != 1) | (np.diff(rows[positions]) != 0)
+
+        outputs = self._outputs
+        hit_positions = []
+        hit_rules = []
+        state = 0
+        for position, token_id, restart in zip(positions.tolist(),
+                                               token_ids[positions].tolist(),
+                                               run_start.tolist()):
+            state = self._step(0 if restart else state, token_id)
+            for rule in outputs[state]:
+                hit_positions.append(position)
+                hit_rules.append(rule.rule_id)
+        if not hit_rules:
+            return counts
+
+        rule_count = len(self._rule_columns)
+        pairs = np.unique(rows[hit_positions] * rule_count + np.asarray(hit_rules))
+        np.add.at(counts, (pairs // rule_count, self._rule_columns[pairs % rule_count]), 1)
+        return counts
@@ -5,12 +5,46 @@ Handles natural language processing tasks including intent recognition,
 entity extraction, and sentiment analysis.
 """
 
-from typing import Any, Dict, List, Optional
+import asyncio
+import inspect
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Sequence
 import logging
 
+import numpy as np
+
+from intramind.core.keyword_matcher import KeywordMatcher
+from intramind.services.ai_service import run_sync
+
+if TYPE_CHECKING:
+    from intramind.core.nlp_pool import NLPProcessPool
+
 logger = logging.getLogger(__name__)
 
 
+@dataclass
+class NLPStage:
+    """
+    A custom stage appended to the NLP pipeline.
+
+    Attributes:
+        name: Key under which the stage result is stored
+        func: Callable taking (text, result_so_far); may be a coroutine function
+        cpu_bound: Whether the stage blocks on CPU work. CPU-bound stages
+            run in the process pool when one is configured; otherwise
+            process_async runs them in the event loop's executor.
+    """
+    name: str
+    func: Callable[[str, Dict[str, Any]], Any]
+    cpu_bound: bool = False
+
+    @property
+    def is_async(self) -> bool:
+        """Whether the stage function is a coroutine function."""
+        return inspect.iscoroutinefunction(self.func)
+
+
 class NLPEngine:
     """
     Natural Language Processing engine.
@@ -20,6 +54,11 @@ class NLPEngine:
     - Entity extraction
     - Sentiment analysis
     - Language detection
+
+    With ``nlp_execution="process"``, the built-in analysis and CPU-bound
+    custom stages run in a pool of ``nlp_workers`` processes (see
+    NLPProcessPool); custom CPU-bound stage functions must then be
+    picklable, i.e. defined at module level.
     """
 
     def __init__(self, config: Any):
@@ -30,7 +69,49 @@ class NLPEngine:
             config: Configuration object
         """
         self.config = config
-        logger.info("NLP Engine initialized")
+        self.matcher = self._build_matcher()
+        self.stages: List[NLPStage] = []
+        self.pool: Optional["NLPProcessPool"] = None
+        if getattr(config, "nlp_execution", "inline") == "process":
+            from intramind.core.nlp_pool import NLPProcessPool
+
+            self.pool = NLPProcessPool(config)
+        logger.info(f"NLP Engine initialized ({'process pool' if self.pool else 'inline'})")
+
+    def add_stage(self, name: str, func: Callable[[str, Dict[str, Any]], Any],
+                  cpu_bound: bool = False) -> NLPStage:
+        """
+        Register a custom pipeline stage.
+
+        Stages run after the built-in analysis, in registration order, and
+        each stage's return value is stored in the result under its name.
+
+        Args:
+            name: Result key for the stage
+            func: Callable taking (text, result_so_far); may be async
+            cpu_bound: Declare the stage as CPU-bound so it runs in the
+                process pool (both paths) or, without one, in an executor
+                on the async path instead of on the event loop
+
+        Returns:
+            The registered NLPStage
+        """
+        stage = NLPStage(name=name, func=func, cpu_bound=cpu_bound)
+        self.stages.append(stage)
+        logger.info(f"Registered NLP stage: {name}")
+        return stage
+
+    def _build_matcher(self) -> KeywordMatcher:
+        """
+        Compile the keyword matcher from the configured rule tables.
+
+        Returns:
+            KeywordMatcher built from ``nlp_rules_file`` or the default rules
+        """
+        rules_file = getattr(self.config, "nlp_rules_file", None)
+        if rules_file:
+            return KeywordMatcher.from_file(rules_file)
+        return KeywordMatcher()
 
     def process(self, text: str) -> Dict[str, Any]:
         """
@@ -42,11 +123,91 @@ class NLPEngine:
         Returns:
             Dictionary containing NLP analysis results
         """
+        result = self.pool.analyze([text])[0] if self.pool else self._analyze(text)
+        for stage in self.stages:
+            result[stage.name] = self._run_stage(stage, text, result)
+        return result
+
+    async def process_async(self, text: str) -> Dict[str, Any]:
+        """
+        Process text through the NLP pipeline without blocking the event loop.
+
+        Built-in stages are cheap and run inline, or in the process pool
+        when one is configured. Custom async stages are awaited, and only
+        stages declared CPU-bound are sent to an executor.
+
+        Args:
+            text: Input text to process
+
+        Returns:
+            Dictionary containing NLP analysis results
+        """
+        if self.pool:
+            result = (await self.pool.analyze_async([text]))[0]
+        else:
+            result = self._analyze(text)
+        for stage in self.stages:
+            result[stage.name] = await self._run_stage_async(stage, text, result)
+        return result
+
+    def _run_stage(self, stage: NLPStage, text: str, result: Dict[str, Any]) -> Any:
+        """
+        Run a custom stage synchronously, returning None on failure.
+
+        Coroutine stages run on the shared background loop (run_sync), so
+        process() also works from a thread whose own loop is running.
+        CPU-bound stages run in the process pool when one is configured.
+        """
+        try:
+            if stage.is_async:
+                return run_sync(stage.func(text, result))
+            if stage.cpu_bound and self.pool:
+                return self.pool.executor.submit(stage.func, text, dict(result)).result()
+            return stage.func(text, result)
+        except Exception as e:
+            logger.error(f"Error in NLP stage {stage.name}: {str(e)}")
+            return None
+
+    @staticmethod
+    def _stage_result(stage: NLPStage, future: Future) -> Any:
+        """Wait for a stage submitted to the pool, returning None on failure."""
+        try:
+            return future.result()
+        except Exception as e:
+            logger.error(f"Error in NLP stage {stage.name}: {str(e)}")
+            return None
+
+    async def _run_stage_async(self, stage: NLPStage, text: str,
+                               result: Dict[str, Any]) -> Any:
+        """Run a custom stage on the event loop, returning None on failure."""
+        try:
+            if stage.is_async:
+                return await stage.func(text, result)
+            if stage.cpu_bound:
+                loop = asyncio.get_running_loop()
+                executor = self.pool.executor if self.pool else None
+                return await loop.run_in_executor(executor, stage.func, text, dict(result))
+            return stage.func(text, result)
+        except Exception as e:
+            logger.error(f"Error in NLP stage {stage.name}: {str(e)}")
+            return None
+
+    def _analyze(self, text: str) -> Dict[str, Any]:
+        """
+        Run the built-in analysis stages.
+
+        Args:
+            text: Input text to process
+
+        Returns:
+            Dictionary containing the built-in NLP results
+        """
         try:
+            keyword_hits = self.matcher.match(text)
             return {
-                "intent": self._detect_intent(text),
+                "intent": self._detect_intent(text, keyword_hits),
                 "entities": self._extract_entities(text),
-                "sentiment": self._analyze_sentiment(text),
+                "sentiment": self._analyze_sentiment(text, keyword_hits),
                 "language": self._detect_language(text),
                 "confidence": 0.85  # Placeholder
             }
@@ -60,7 +221,164 @@ class NLPEngine:
                 "confidence": 0.0
             }
 
-    def _detect_intent(self, text: str) -> str:
+    def process_batch(self, texts: Sequence[str]) -> List[Dict[str, Any]]:
+        """
+        Process a batch of texts through the NLP pipeline.
+
+        Keyword stages run once over the whole batch and are reduced with
+        NumPy feature matrices. Each result equals ``process(text)``.
+
+        Args:
+            texts: Input texts to process
+
+        Returns:
+            List of NLP analysis results, in input order
+        """
+        texts = list(texts)
+        if not texts:
+            return []
+
+        results = self.pool.analyze(texts) if self.pool else self._analyze_batch(texts)
+        for stage in self.stages:
+            if stage.cpu_bound and not stage.is_async and self.pool:
+                # Hand the whole batch to the workers before waiting on any of it
+                futures = [self.pool.executor.submit(stage.func, text, dict(result))
+                           for text, result in zip(texts, results)]
+                for result, future in zip(results, futures):
+                    result[stage.name] = self._stage_result(stage, future)
+                continue
+            for text, result in zip(texts, results):
+                result[stage.name] = self._run_stage(stage, text, result)
+        return results
+
+    async def process_batch_async(self, texts: Sequence[str]) -> List[Dict[str, Any]]:
+        """
+        Async version of process_batch.
+
+        The built-in analysis runs once for the batch (in the process pool
+        when one is configured) and custom stages run as in process_async.
+
+        Args:
+            texts: Input texts to process
+
+        Returns:
+            List of NLP analysis results, in input order
+        """
+        texts = list(texts)
+        if not texts:
+            return []
+
+        if self.pool:
+            results = await self.pool.analyze_async(texts)
+        else:
+            results = self._analyze_batch(texts)
+        for stage in self.stages:
+            for text, result in zip(texts, results):
+                result[stage.name] = await self._run_stage_async(stage, text, result)
+        return results
+
+    def _analyze_batch(self, texts: List[str]) -> List[Dict[str, Any]]:
+        """
+        Run the built-in analysis stages over a batch.
+
+        Args:
+            texts: Input texts
+
+        Returns:
+            Built-in NLP results, in input order
+        """
+        try:
+            keyword_counts = self.matcher.match_matrix(texts)
+            intents = self._detect_intent_batch(texts, keyword_counts)
+            sentiments = self._analyze_sentiment_batch(keyword_counts)
+            results = [
+                {
+                    "intent": intent,
+                    "entities": self._extract_entities(text),
+                    "sentiment": sentiment,
+                    "language": self._detect_language(text),
+                    "confidence": 0.85  # Placeholder
+                }
+                for text, intent, sentiment in zip(texts, intents, sentiments)
+            ]
+        except Exception as e:
+            logger.error(f"Error in batch NLP processing: {str(e)}")
+            results = [self._analyze(text) for text in texts]
+        return results
+
+    def warmup(self) -> None:
+        """
+        Prepare the pipeline ahead of the first request.
+
+        Starts the process pool's workers (each loads its own models) and
+        runs the built-in analysis once, so first-call costs such as lazy
+        model loads and regex/array setup are paid here. Custom stages are
+        not run, since they may have side effects.
+        """
+        if self.pool:
+            self.pool.start()
+            return
+        text = "Hello, I need help with my account?"
+        self._analyze(text)
+        self._analyze_batch([text, text])
+
+    def close(self) -> None:
+        """Stop the process pool, if one is running."""
+        if self.pool:
+            self.pool.close()
+
+    def _keyword_columns(self, category: str, labels: Sequence[str]) -> List[int]:
+        """Return matcher column indices for the given category labels."""
+        index = {column: i for i, column in enumerate(self.matcher.columns)}
+        return [index[(category, label)] for label in labels]
+
+    def _detect_intent_batch(self, texts: Sequence[str],
+                             keyword_counts: np.ndarray) -> List[str]:
+        """
+        Vectorized counterpart of _detect_intent.
+
+        Args:
+            texts: Input texts
+            keyword_counts: Matrix from KeywordMatcher.match_matrix
+
+        Returns:
+            Detected intent per text
+        """
+        intent_labels = self.matcher.labels.get("intents", [])
+        columns = self._keyword_columns("intents", intent_labels)
+        labels = np.array(intent_labels + ["question", "statement"], dtype=object)
+
+        is_question = np.fromiter(("?" in text for text in texts), dtype=bool, count=len(texts))
+        fallback = np.where(is_question, len(intent_labels), len(intent_labels) + 1)
+
+        if columns:
+            present = keyword_counts[:, columns] > 0
+            choice = np.where(present.any(axis=1), present.argmax(axis=1), fallback)
+        else:
+            choice = fallback
+        return labels[choice].tolist()
+
+    def _analyze_sentiment_batch(self, keyword_counts: np.ndarray) -> List[str]:
+        """
+        Vectorized counterpart of _analyze_sentiment.
+
+        Args:
+            keyword_counts: Matrix from KeywordMatcher.match_matrix
+
+        Returns:
+            Sentiment label per row
+        """
+        def column(label: str) -> np.ndarray:
+            if ("sentiment", label) not in self.matcher.columns:
+                return np.zeros(len(keyword_counts), dtype=np.int32)
+            return keyword_counts[:, self._keyword_columns("sentiment", [label])[0]]
+
+        balance = column("positive") - column("negative")
+        labels = np.array(["negative", "neutral", "positive"], dtype=object)
+        return labels[np.sign(balance) + 1].tolist()
+
+    def _detect_intent(self, text: str,
+                       keyword_hits: Optional[Dict[str, Dict[str, int]]] = None) -> str:
         """
         Detect the intent of the text.
 
@@ -69,23 +387,23 @@ class NLPEngine:
 
         Args:
             text: Input text
+            keyword_hits: Optional precomputed matcher result for the text
 
         Returns:
             Detected intent
         """
-        text_lower = text.lower()
+        if keyword_hits is None:
+            keyword_hits = self.matcher.match(text)
 
-        # Simple keyword-based intent detection (placeholder)
-        if any(word in text_lower for word in ["hello", "hi", "hey"]):
-            return "greeting"
-        elif any(word in text_lower for word in ["bye", "goodbye", "see you"]):
-            return "farewell"
-        elif any(word in text_lower for word in ["help", "assist", "support"]):
-            return "help_request"
-        elif "?" in text:
+        # Keyword-based intent detection (placeholder); rule order is priority
+        intent_hits = keyword_hits.get("intents", {})
+        for intent in self.matcher.labels.get("intents", []):
+            if intent_hits.get(intent):
+                return intent
+
+        if "?" in text:
             return "question"
-        else:
-            return "statement"
+        return "statement"
 
     def _extract_entities(self, text: str) -> Dict[str, List[str]]:
         """
@@ -108,7 +426,8 @@ class NLPEngine:
             "custom": []
         }
 
-    def _analyze_sentiment(self, text: str) -> str:
+    def _analyze_sentiment(self, text: str,
+                           keyword_hits: Optional[Dict[str, Dict[str, int]]] = None) -> str:
         """
         Analyze the sentiment of the text.
 
@@ -116,18 +435,18 @@ class NLPEngine:
 
         Args:
             text: Input text
+            keyword_hits: Optional precomputed matcher result for the text
 
         Returns:
             Sentiment label (positive, negative, neutral)
         """
-        text_lower = text.lower()
-
-        # Simple keyword-based sentiment (placeholder)
-        positive_words = ["good", "great", "excellent", "happy", "love"]
-        negative_words = ["bad", "terrible", "awful", "sad", "hate"]
+        if keyword_hits is None:
+            keyword_hits = self.matcher.match(text)
 
-        pos_count = sum(1 for word in positive_words if word in text_lower)
-        neg_count = sum(1 for word in negative_words if word in text_lower)
+        # Keyword-based sentiment (placeholder)
+        sentiment_hits = keyword_hits.get("sentiment", {})
+        pos_count = sentiment_hits.get("positive", 0)
+        neg_count = sentiment_hits.get("negative", 0)
 
         if pos_count > neg_count:
             return "positive"
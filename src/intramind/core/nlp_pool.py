@@ -0,0 +1,182 @@
+"""
+Process-pool execution for the IntraMind NLP pipeline.
+
+Runs the built-in NLP analysis in worker processes so model inference
+scales across cores instead of serializing on the GIL. Each worker builds
+its own NLPEngine (and loads its models) once, when the worker starts.
+"""
+
+import asyncio
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Per-process engine, built by the pool initializer
+_worker_engine: Optional[Any] = None
+
+# Compact wire form of one result: (intent, sentiment, language, confidence,
+# entities or None when every entity list is empty)
+EncodedResult = Tuple[str, str, str, float, Optional[Dict[str, List[str]]]]
+
+_ENTITY_TYPES = ("persons", "organizations", "locations", "dates", "custom")
+
+
+def encode_result(result: Dict[str, Any]) -> EncodedResult:
+    """
+    Pack an NLP result into the tuple sent between processes.
+
+    Args:
+        result: Result dictionary from NLPEngine
+
+    Returns:
+        Encoded result tuple
+    """
+    entities = result.get("entities") or {}
+    return (
+        result["intent"],
+        result["sentiment"],
+        result["language"],
+        result["confidence"],
+        entities if any(entities.values()) else None,
+    )
+
+
+def decode_result(encoded: EncodedResult) -> Dict[str, Any]:
+    """
+    Unpack a result tuple produced by encode_result.
+
+    Args:
+        encoded: Encoded result tuple
+
+    Returns:
+        Result dictionary in the NLPEngine format
+    """
+    intent, sentiment, language, confidence, entities = encoded
+    return {
+        "intent": intent,
+        "entities": entities if entities is not None else {t: [] for t in _ENTITY_TYPES},
+        "sentiment": sentiment,
+        "language": language,
+        "confidence": confidence,
+    }
+
+
+def _init_worker(config: Any) -> None:
+    """Build the worker's NLPEngine once, when the process starts."""
+    global _worker_engine
+    from intramind.core.nlp_engine import NLPEngine
+
+    worker_config = config.model_copy(update={"nlp_execution": "inline"})
+    _worker_engine = NLPEngine(worker_config)
+
+
+def _analyze_chunk(texts: List[str]) -> List[EncodedResult]:
+    """Analyze a chunk of texts in a worker process."""
+    if len(texts) == 1:
+        return [encode_result(_worker_engine.process(texts[0]))]
+    return [encode_result(result) for result in _worker_engine.process_batch(texts)]
+
+
+def _ping() -> int:
+    """Round trip used to start workers ahead of traffic."""
+    return multiprocessing.current_process().pid or 0
+
+
+class NLPProcessPool:
+    """
+    Pool of worker processes running the built-in NLP analysis.
+
+    Texts go to workers in chunks and results come back as compact tuples
+    (see encode_result), so IPC stays small relative to inference.
+    Workers use the "spawn" start method, which is safe alongside the
+    threads the rest of IntraMind starts.
+
+    Example:
+        >>> pool = NLPProcessPool(Config(workers=4))
+        >>> pool.analyze(["hello", "I need help"])[1]["intent"]
+        'help_request'
+    """
+
+    def __init__(self, config: Any, workers: Optional[int] = None):
+        """
+        Initialize the pool. Worker processes start on first use.
+
+        Args:
+            config: Configuration object, sent to each worker
+            workers: Number of worker processes. Defaults to
+                ``nlp_workers`` from the config, or ``workers`` when that
+                is 0.
+        """
+        self.config = config
+        self.workers = max(1, workers or config.nlp_workers or config.workers)
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    @property
+    def executor(self) -> Executor:
+        """The underlying process pool, started on first access."""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self.config,),
+            )
+            logger.info(f"NLP process pool started with {self.workers} workers")
+        return self._executor
+
+    def start(self) -> None:
+        """Start every worker process and wait until their engines are loaded."""
+        futures = [self.executor.submit(_ping) for _ in range(self.workers)]
+        for future in futures:
+            future.result()
+
+    def _chunks(self, texts: Sequence[str]) -> List[List[str]]:
+        """Split texts into one contiguous chunk per worker."""
+        size = -(-len(texts) // self.workers)
+        return [list(texts[i:i + size]) for i in range(0, len(texts), size)]
+
+    def analyze(self, texts: Sequence[str]) -> List[Dict[str, Any]]:
+        """
+        Analyze texts across the worker processes.
+
+        Args:
+            texts: Input texts
+
+        Returns:
+            NLP results in input order
+        """
+        if not texts:
+            return []
+        results: List[Dict[str, Any]] = []
+        for chunk in self.executor.map(_analyze_chunk, self._chunks(texts)):
+            results.extend(decode_result(encoded) for encoded in chunk)
+        return results
+
+    async def analyze_async(self, texts: Sequence[str]) -> List[Dict[str, Any]]:
+        """
+        Async version of analyze; the event loop is never blocked.
+
+        Args:
+            texts: Input texts
+
+        Returns:
+            NLP results in input order
+        """
+        if not texts:
+            return []
+        loop = asyncio.get_running_loop()
+        chunks = await asyncio.gather(*(
+            loop.run_in_executor(self.executor, _analyze_chunk, chunk)
+            for chunk in self._chunks(texts)
+        ))
+        return [decode_result(encoded) for chunk in chunks for encoded in chunk]
+
+    def close(self) -> None:
+        """Shut down the worker processes."""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+            logger.info("NLP process pool stopped")
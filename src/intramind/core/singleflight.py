@@ -0,0 +1,225 @@
+"""
+Single-flight request coalescing for IntraMind.
+
+When identical requests arrive while one is already running, the later
+ones wait for that call and share its result instead of starting their
+own. ChatBot uses this to send one provider generation for a burst of
+identical prompts; each caller still records the turn in its own session.
+
+Calls are coalesced per event loop. Synchronous callers all run provider
+calls on the shared background loop (ai_service.run_sync), so they
+coalesce with each other too.
+"""
+
+import asyncio
+import weakref
+from typing import (
+    Any, AsyncIterator, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple, TypeVar
+)
+import logging
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+FlightMap = Dict[Hashable, "_Flight"]
+
+
+class _Flight:
+    """
+    One in-flight call shared by a leader and its followers.
+
+    Attributes:
+        task: Task running the call
+        waiters: Callers still waiting on the call
+        chunks: Chunks produced so far (streams only)
+        done: True once the stream has finished (streams only)
+        error: Exception that ended the stream, if any (streams only)
+        changed: Set whenever a chunk arrives or the stream ends
+        wanted: Set when a subscriber has read every chunk so far
+    """
+
+    def __init__(self) -> None:
+        self.task: Optional[asyncio.Task] = None
+        self.waiters = 0
+        self.chunks: List[Any] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self.changed = asyncio.Event()
+        self.wanted = asyncio.Event()
+
+    def notify(self) -> None:
+        """Wake every subscriber waiting for the next chunk."""
+        self.changed.set()
+        self.changed = asyncio.Event()
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key.
+
+    The first caller for a key (the leader) starts the call; callers that
+    arrive while it runs (followers) wait for it and get the same result or
+    exception. Streams are shared chunk by chunk: a follower first replays
+    the chunks produced before it joined, then receives new ones as they
+    arrive. The shared stream is read only as fast as its fastest
+    subscriber, so a slow consumer's backpressure still reaches the
+    provider when it is alone. Once a call finishes its key is free, so
+    the next caller starts a new call.
+
+    The call runs in its own task, so a caller that is cancelled, or stops
+    reading a stream, does not cancel it for the others. The call is
+    cancelled only when every caller has gone.
+
+    Example:
+        >>> flights = SingleFlight()
+        >>> answer = await flights.do(key, lambda: provider.generate(messages))
+    """
+
+    def __init__(self) -> None:
+        self._flights: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, FlightMap]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self.leaders = 0
+        self.followers = 0
+
+    def _loop_flights(self) -> FlightMap:
+        """Return the in-flight calls for the running event loop."""
+        loop = asyncio.get_running_loop()
+        flights = self._flights.get(loop)
+        if flights is None:
+            flights = self._flights[loop] = {}
+        return flights
+
+    def _join(self, key: Hashable) -> Tuple[FlightMap, _Flight, bool]:
+        """
+        Find or register the flight for a key.
+
+        Returns:
+            The loop's flights, the flight, and whether the caller leads it
+        """
+        flights = self._loop_flights()
+        flight = flights.get(key)
+        leader = flight is None
+        if leader:
+            flight = flights[key] = _Flight()
+            self.leaders += 1
+        else:
+            self.followers += 1
+        flight.waiters += 1
+        return flights, flight, leader
+
+    @staticmethod
+    def _leave(flights: FlightMap, key: Hashable, flight: _Flight) -> None:
+        """Drop a caller, cancelling the call if it was the last one."""
+        flight.waiters -= 1
+        if flight.waiters == 0 and not flight.task.done():
+            flight.task.cancel()
+            if flights.get(key) is flight:
+                del flights[key]
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run ``func``, or wait for the identical call already running.
+
+        Args:
+            key: Identifies calls that may share a result
+            func: Starts the call; invoked only by the leader
+
+        Returns:
+            The call's result
+
+        Raises:
+            Exception: Whatever the shared call raised
+        """
+        flights, flight, leader = self._join(key)
+        if leader:
+            flight.task = asyncio.ensure_future(func())
+            flight.task.add_done_callback(lambda _: self._finish(flights, key, flight))
+        try:
+            return await asyncio.shield(flight.task)
+        finally:
+            self._leave(flights, key, flight)
+
+    async def stream(self, key: Hashable,
+                     func: Callable[[], AsyncIterator[T]]) -> AsyncIterator[T]:
+        """
+        Stream the chunks of ``func``, or of the identical stream already running.
+
+        Args:
+            key: Identifies streams that may be shared
+            func: Starts the stream; invoked only by the leader
+
+        Yields:
+            Every chunk of the shared stream, from the first
+
+        Raises:
+            Exception: Whatever the shared stream raised
+        """
+        flights, flight, leader = self._join(key)
+        if leader:
+            flight.task = asyncio.ensure_future(self._pump(flight, func))
+            flight.task.add_done_callback(lambda _: self._finish(flights, key, flight))
+        try:
+            position = 0
+            while True:
+                if position < len(flight.chunks):
+                    chunk = flight.chunks[position]
+                    position += 1
+                    yield chunk
+                    continue
+                if flight.done:
+                    break
+                changed = flight.changed
+                flight.wanted.set()
+                await changed.wait()
+            if flight.error is not None:
+                raise flight.error
+        finally:
+            self._leave(flights, key, flight)
+
+    @staticmethod
+    async def _pump(flight: _Flight, func: Callable[[], AsyncIterator[T]]) -> None:
+        """Read the leader's stream into the flight's chunk buffer."""
+        chunks = func()
+        try:
+            while True:
+                await flight.wanted.wait()
+                flight.wanted.clear()
+                try:
+                    chunk = await chunks.__anext__()
+                except StopAsyncIteration:
+                    break
+                flight.chunks.append(chunk)
+                flight.notify()
+        except Exception as e:
+            flight.error = e
+        finally:
+            flight.done = True
+            flight.notify()
+            # Release the provider's response when the last subscriber leaves early
+            aclose = getattr(chunks, "aclose", None)
+            if aclose is not None:
+                await aclose()
+
+    @staticmethod
+    def _finish(flights: FlightMap, key: Hashable, flight: _Flight) -> None:
+        """Free the key once its call has finished."""
+        if flights.get(key) is flight:
+            del flights[key]
+        if not flight.task.cancelled():
+            # Followers re-raise the error; this keeps asyncio from logging it
+            flight.task.exception()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Summarize coalescing.
+
+        Returns:
+            Dictionary of leader and follower counts and calls in flight
+        """
+        return {
+            "leaders": self.leaders,
+            "followers": self.followers,
+            "in_flight": sum(len(flights) for flights in list(self._flights.values())),
+        }
@@ -0,0 +1,34 @@
+"""
+Knowledge base for IntraMind.
+
+Ingests documents into an on-disk chunk store, vector index and BM25
+keyword index, and retrieves passages that ground chatbot answers.
+"""
+
+from importlib import import_module
+from typing import Any
+
+# Imported on first access; see intramind.__getattr__
+_EXPORTS = {
+    "BM25Index": "intramind.knowledge.bm25",
+    "HybridRanker": "intramind.knowledge.ranking",
+    "IngestionPipeline": "intramind.knowledge.ingestion",
+    "KnowledgeBase": "intramind.knowledge.knowledge_base",
+    "SearchHit": "intramind.knowledge.knowledge_base",
+}
+
+__all__ = ["BM25Index", "HybridRanker", "IngestionPipeline", "KnowledgeBase", "SearchHit"]
+
+
+def __getattr__(name: str) -> Any:
+    """Import public names on first access."""
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list:
+    return sorted(list(globals()) + __all__)
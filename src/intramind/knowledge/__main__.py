@@ -0,0 +1,65 @@
+"""
+Command-line entry point for the IntraMind knowledge base.
+
+Usage:
+    python -m intramind.knowledge ingest docs/ manuals/ [--out ./data/knowledge] [--restart]
+    python -m intramind.knowledge sync docs/ manuals/ [--out ./data/knowledge]
+    python -m intramind.knowledge search "reset password" [--out ./data/knowledge] [-k 5]
+"""
+
+import argparse
+import logging
+import sys
+
+from intramind.core.config import get_config
+from intramind.knowledge.ingestion import IngestionPipeline
+from intramind.knowledge.knowledge_base import KnowledgeBase
+
+
+def main(argv=None) -> int:
+    """Run the knowledge base command line."""
+    config = get_config()
+    parser = argparse.ArgumentParser(prog="python -m intramind.knowledge")
+    parser.add_argument("--out", default=config.knowledge_base_path,
+                        help="knowledge base directory (default: KNOWLEDGE_BASE_PATH)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    ingest = commands.add_parser("ingest", help="ingest documents")
+    ingest.add_argument("roots", nargs="+", help="files or directories to ingest")
+    ingest.add_argument("--restart", action="store_true",
+                        help="rebuild from scratch instead of resuming")
+
+    sync = commands.add_parser("sync", help="ingest only added, changed and deleted documents")
+    sync.add_argument("roots", nargs="+", help="files or directories to ingest")
+
+    search = commands.add_parser("search", help="search the knowledge base")
+    search.add_argument("query")
+    search.add_argument("-k", type=int, default=config.knowledge_top_k)
+
+    args = parser.parse_args(argv)
+    if not args.out:
+        parser.error("--out is required when KNOWLEDGE_BASE_PATH is not set")
+    logging.basicConfig(level=getattr(logging, config.log_level),
+                        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+
+    if args.command == "ingest":
+        pipeline = IngestionPipeline.from_config(config, directory=args.out)
+        stats = pipeline.run(args.roots, resume=not args.restart)
+        print(f"{stats.documents} documents, {stats.chunks} chunks ({stats.embedded} embedded) "
+              f"in {stats.seconds:.1f}s")
+    elif args.command == "sync":
+        pipeline = IngestionPipeline.from_config(config, directory=args.out)
+        result = pipeline.sync(args.roots)
+        print(f"{result.added} added, {result.changed} changed, {result.deleted} deleted, "
+              f"{result.unchanged} unchanged; {result.chunks} chunks ({result.embedded} embedded) "
+              f"in {result.seconds:.1f}s")
+    else:
+        kb = KnowledgeBase.open(args.out, retrieval=config.knowledge_retrieval)
+        for hit in kb.search(args.query, k=args.k):
+            print(f"{hit.score:.3f}  {hit.chunk_id}\n       {hit.text[:160]!r}")
+        kb.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,729 @@
+"""
+BM25 keyword index for the IntraMind knowledge base.
+
+Exact identifiers such as product codes and error strings are matched
+poorly by embeddings, so the knowledge base keeps an inverted index next
+to its vectors. Postings are stored per term in blocks of document-id
+deltas and term frequencies, varint-encoded, with a skip entry per block
+(last document, byte offset, maximum frequency, minimum length). Queries
+use block-max MaxScore early termination: once the best k scores exceed
+what a block and the remaining terms could add, that block is only
+decoded when it holds current candidates.
+
+The index is a list of immutable segments on disk. New documents are
+buffered and written as a segment on flush(); small segments are merged
+in tiers, dropping deleted documents. The segment list is published by
+atomically replacing ``segments.json``.
+"""
+
+import json
+import math
+import os
+import re
+import shutil
+from array import array
+from collections import Counter, defaultdict
+from itertools import repeat
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Union
+import logging
+
+import numpy as np
+
+from intramind.services.embeddings import STOPWORDS
+
+logger = logging.getLogger(__name__)
+
+# Postings per block; each block has one skip entry
+BLOCK_SIZE = 128
+
+# Postings encoded per vectorized step when writing a segment; bounds the
+# temporary arrays (about 100 bytes per posting)
+ENCODE_GROUP_POSTINGS = 1 << 16
+
+_TOKEN_RE = re.compile(r"[^\W_]+(?:[-_./:#][^\W_]+)*")
+_SPLIT_RE = re.compile(r"[-_./:#]")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into index terms.
+
+    Compound tokens like "ERR-4012", "0x8007.0005" or "v2.3.1" are kept
+    whole, so exact codes match exactly, and also split into their parts
+    so a query for "4012" still finds them. Terms are lowercased and
+    stopwords are dropped.
+
+    Args:
+        text: Text to tokenize
+
+    Returns:
+        Terms in text order
+    """
+    terms = []
+    for token in _TOKEN_RE.findall(text.lower()):
+        if token in STOPWORDS:
+            continue
+        terms.append(token)
+        if not token.isalnum():
+            terms.extend(part for part in _SPLIT_RE.split(token) if part not in STOPWORDS)
+    return terms
+
+
+# ============================================================================
+# Varint coding
+# ============================================================================
+
+def varint_lengths(values: np.ndarray) -> np.ndarray:
+    """Encoded size in bytes of each value."""
+    values = np.asarray(values, dtype=np.uint64)
+    lengths = np.ones(len(values), dtype=np.int64)
+    for shift in range(7, 64, 7):
+        lengths += values >= np.uint64(1 << shift)
+    return lengths
+
+
+def encode_varints(values: np.ndarray) -> bytes:
+    """
+    LEB128-encode non-negative integers: 7 bits per byte, high bit set on
+    every byte but the last of each value.
+
+    Args:
+        values: Non-negative integers
+
+    Returns:
+        Encoded bytes
+    """
+    values = np.asarray(values, dtype=np.uint64)
+    if len(values) == 0:
+        return b""
+    lengths = varint_lengths(values)
+    ends = np.cumsum(lengths)
+    starts = ends - lengths
+    out = np.zeros(int(ends[-1]), dtype=np.uint8)
+    for byte in range(int(lengths.max())):
+        present = lengths > byte
+        chunk = (values[present] >> np.uint64(7 * byte)) & np.uint64(0x7F)
+        more = (lengths[present] - 1 > byte).astype(np.uint64) << np.uint64(7)
+        out[starts[present] + byte] = (chunk | more).astype(np.uint8)
+    return out.tobytes()
+
+
+def decode_varints(data: np.ndarray) -> np.ndarray:
+    """
+    Decode a buffer of LEB128 varints.
+
+    Args:
+        data: uint8 array holding whole varints
+
+    Returns:
+        int64 array of decoded values
+    """
+    data = np.asarray(data, dtype=np.uint8)
+    if len(data) == 0:
+        return np.zeros(0, dtype=np.int64)
+    if not (data & 0x80).any():
+        return data.astype(np.int64)
+    ends = np.flatnonzero(data < 0x80)
+    starts = np.empty_like(ends)
+    starts[0] = 0
+    starts[1:] = ends[:-1] + 1
+    position = np.arange(len(data)) - np.repeat(starts, ends - starts + 1)
+    parts = (data & 0x7F).astype(np.int64) << (7 * position)
+    return np.add.reduceat(parts, starts)
+
+
+# ============================================================================
+# Segments
+# ============================================================================
+
+def _load_array(path: Path, dtype: type) -> np.ndarray:
+    """Memory-map a raw array file (an empty array for an empty file)."""
+    if os.path.getsize(path) == 0:
+        return np.zeros(0, dtype=dtype)
+    # A plain ndarray view of the map avoids np.memmap's per-slice overhead
+    return np.asarray(np.memmap(path, dtype=dtype, mode="r"))
+
+
+class _Postings:
+    """Decoded postings of one term in one segment."""
+
+    __slots__ = ("docs", "tfs")
+
+    def __init__(self, docs: np.ndarray, tfs: np.ndarray):
+        self.docs = docs
+        self.tfs = tfs
+
+
+class Segment:
+    """
+    An immutable on-disk slice of the BM25 index.
+
+    Documents are numbered locally from 0 in row order; ``rows`` maps
+    them to knowledge base rows.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        """
+        Open a segment directory.
+
+        Args:
+            path: Segment directory written by Segment.write
+        """
+        self.path = Path(path)
+        self.name = self.path.name
+        with open(self.path / "segment.json", encoding="utf-8") as f:
+            meta = json.load(f)
+        self.docs: int = meta["docs"]
+        self.total_length: int = meta["total_length"]
+        self.min_row: int = meta["min_row"]
+        self.max_row: int = meta["max_row"]
+        terms = (self.path / "terms.txt").read_text(encoding="utf-8")
+        self.terms: Dict[str, int] = {t: i for i, t in enumerate(terms.split("\n")) if t}
+        self.term_blocks = _load_array(self.path / "term_blocks.u64", np.uint64)
+        self.term_df = _load_array(self.path / "term_df.u32", np.uint32)
+        self.block_last = _load_array(self.path / "block_last.u32", np.uint32)
+        self.block_max_tf = _load_array(self.path / "block_max_tf.u32", np.uint32)
+        self.block_min_len = _load_array(self.path / "block_min_len.u32", np.uint32)
+        self.block_offset = _load_array(self.path / "block_offset.u64", np.uint64)
+        self.postings = _load_array(self.path / "postings.bin", np.uint8)
+        self.doc_len = _load_array(self.path / "doc_len.u32", np.uint32)
+        self.rows = _load_array(self.path / "doc_rows.i64", np.int64)
+
+    @staticmethod
+    def write(path: Path, doc_rows: np.ndarray, doc_len: np.ndarray,
+              terms: Iterator[Tuple[str, np.ndarray, np.ndarray]]) -> "Segment":
+        """
+        Write a segment.
+
+        Args:
+            path: Directory to create
+            doc_rows: Knowledge base row of each local document, ascending
+            doc_len: Term count of each local document
+            terms: (term, local doc ids, term frequencies) in term order,
+                doc ids ascending
+
+        Returns:
+            The opened Segment
+        """
+        path.mkdir(parents=True)
+        doc_len = np.asarray(doc_len, dtype=np.int64)
+        names: List[str] = []
+        group: List[Tuple[np.ndarray, np.ndarray]] = []
+        arrays: Dict[str, list] = defaultdict(list)
+        offset = 0
+        with open(path / "postings.bin", "wb") as postings:
+
+            def write_group() -> None:
+                nonlocal offset
+                encoded = _encode_terms(group, doc_len)
+                postings.write(encoded.pop("postings"))
+                encoded["block_offset"] = offset + np.cumsum(encoded.pop("block_bytes"))
+                offset = int(encoded["block_offset"][-1])
+                for name, values in encoded.items():
+                    arrays[name].append(values)
+                group.clear()
+
+            pending = 0
+            for term, docs, tfs in terms:
+                names.append(term)
+                group.append((docs, tfs))
+                pending += len(docs)
+                # Encode in groups to vectorize without holding the whole segment
+                if pending >= ENCODE_GROUP_POSTINGS:
+                    write_group()
+                    pending = 0
+            if group:
+                write_group()
+
+        def joined(name: str, dtype: type, head: Sequence[int] = ()) -> np.ndarray:
+            return np.concatenate([np.asarray(head, dtype=dtype)]
+                                  + [np.asarray(a, dtype=dtype) for a in arrays[name]])
+
+        (path / "terms.txt").write_text("\n".join(names), encoding="utf-8")
+        np.cumsum(joined("term_blocks", np.uint64, [0]), dtype=np.uint64).tofile(
+            path / "term_blocks.u64")
+        joined("term_df", np.uint32).tofile(path / "term_df.u32")
+        joined("block_last", np.uint32).tofile(path / "block_last.u32")
+        joined("block_max_tf", np.uint32).tofile(path / "block_max_tf.u32")
+        joined("block_min_len", np.uint32).tofile(path / "block_min_len.u32")
+        joined("block_offset", np.uint64, [0]).tofile(path / "block_offset.u64")
+        doc_len.astype(np.uint32).tofile(path / "doc_len.u32")
+        np.asarray(doc_rows, dtype=np.int64).tofile(path / "doc_rows.i64")
+        with open(path / "segment.json", "w", encoding="utf-8") as f:
+            json.dump({
+                "docs": len(doc_rows),
+                "total_length": int(doc_len.sum()),
+                "min_row": int(doc_rows[0]) if len(doc_rows) else 0,
+                "max_row": int(doc_rows[-1]) if len(doc_rows) else -1,
+            }, f)
+        return Segment(path)
+
+    def df(self, term: str) -> int:
+        """Number of documents in this segment containing a term."""
+        index = self.terms.get(term)
+        return 0 if index is None else int(self.term_df[index])
+
+    def blocks(self, term: str) -> Tuple[int, int]:
+        """Range of block numbers holding a term's postings."""
+        index = self.terms[term]
+        return int(self.term_blocks[index]), int(self.term_blocks[index + 1])
+
+    def decode(self, start: int, blocks: np.ndarray, df: int) -> _Postings:
+        """
+        Decode some blocks of one term.
+
+        Args:
+            start: The term's first block number
+            blocks: Block numbers to decode, ascending
+            df: The term's document frequency (sizes its last block)
+
+        Returns:
+            Postings in the blocks
+        """
+        blocks = np.asarray(blocks, dtype=np.int64)
+        counts = np.minimum(BLOCK_SIZE, df - (blocks - start) * BLOCK_SIZE)
+        low = self.block_offset[blocks].astype(np.int64)
+        high = self.block_offset[blocks + 1].astype(np.int64)
+        if len(blocks) and blocks[-1] - blocks[0] == len(blocks) - 1:
+            data = self.postings[low[0]:high[-1]]
+        else:
+            sizes = high - low
+            gather = np.repeat(low - (np.cumsum(sizes) - sizes), sizes) + np.arange(sizes.sum())
+            data = self.postings[gather]
+        values = decode_varints(data)
+        deltas, tfs = values[0::2], values[1::2]
+        # Deltas continue from the previous block of the same term
+        bases = np.where(blocks == start, -1,
+                         self.block_last[np.maximum(blocks - 1, 0)].astype(np.int64))
+        docs = np.cumsum(deltas)
+        firsts = np.cumsum(counts) - counts
+        docs += np.repeat(bases - (docs[firsts] - deltas[firsts]), counts)
+        return _Postings(docs, tfs)
+
+    def decode_term(self, term: str) -> _Postings:
+        """Decode all postings of a term."""
+        first, last = self.blocks(term)
+        return self.decode(first, np.arange(first, last), self.df(term))
+
+
+def _encode_terms(postings: List[Tuple[np.ndarray, np.ndarray]], doc_len: np.ndarray
+                  ) -> Dict[str, np.ndarray]:
+    """Block-encode the postings of consecutive terms in one vectorized pass."""
+    df = np.array([len(docs) for docs, _ in postings], dtype=np.int64)
+    docs = np.concatenate([d for d, _ in postings]).astype(np.int64)
+    tfs = np.concatenate([t for _, t in postings]).astype(np.int64)
+    term_start = np.cumsum(df) - df
+    position = np.arange(len(docs)) - np.repeat(term_start, df)
+    deltas = np.diff(docs, prepend=0)
+    deltas[term_start] = docs[term_start] + 1
+    term_blocks = (df + BLOCK_SIZE - 1) // BLOCK_SIZE
+    block = np.repeat(np.cumsum(term_blocks) - term_blocks, df) + position // BLOCK_SIZE
+    block_start = np.flatnonzero(np.diff(block, prepend=-1))
+    block_stop = np.append(block_start[1:], len(docs))
+    pairs = np.empty(2 * len(docs), dtype=np.int64)
+    pairs[0::2] = deltas
+    pairs[1::2] = tfs
+    sizes = varint_lengths(pairs)
+    return {
+        "postings": encode_varints(pairs),
+        "block_bytes": np.add.reduceat(sizes, 2 * block_start),
+        "term_blocks": term_blocks,
+        "term_df": df,
+        "block_last": docs[block_stop - 1],
+        "block_max_tf": np.maximum.reduceat(tfs, block_start),
+        "block_min_len": np.minimum.reduceat(doc_len[docs], block_start),
+    }
+
+
+class _Buffer:
+    """Documents added since the last flush, held in memory as flat postings."""
+
+    def __init__(self) -> None:
+        self.rows: List[int] = []
+        self.lengths: List[int] = []
+        self.vocabulary: Dict[str, int] = {}
+        # Typed arrays keep postings at 4 bytes per field instead of an int object
+        self.term_ids = array("I")
+        self.docs = array("I")
+        self.tfs = array("I")
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def add(self, row: int, text: str) -> None:
+        terms = tokenize(text)
+        counts = Counter(terms)
+        vocabulary = self.vocabulary
+        self.docs.extend(repeat(len(self.rows), len(counts)))
+        self.rows.append(row)
+        self.lengths.append(len(terms))
+        self.term_ids.extend(vocabulary.setdefault(t, len(vocabulary)) for t in counts)
+        self.tfs.extend(counts.values())
+
+    def terms(self) -> Iterator[Tuple[str, np.ndarray, np.ndarray]]:
+        names = list(self.vocabulary)
+        order = sorted(range(len(names)), key=names.__getitem__)
+        rank = np.empty(len(names), dtype=np.int64)
+        rank[order] = np.arange(len(names))
+        keys = rank[np.frombuffer(self.term_ids, dtype=np.uint32)]
+        # Documents were added in order, so a stable sort keeps doc ids ascending
+        perm = np.argsort(keys, kind="stable")
+        docs = np.frombuffer(self.docs, dtype=np.uint32).astype(np.int64)[perm]
+        tfs = np.frombuffer(self.tfs, dtype=np.uint32).astype(np.int64)[perm]
+        bounds = np.concatenate([[0], np.cumsum(np.bincount(keys, minlength=len(names)))])
+        for r, term_id in enumerate(order):
+            yield names[term_id], docs[bounds[r]:bounds[r + 1]], tfs[bounds[r]:bounds[r + 1]]
+
+
+def _live(rows: np.ndarray, deleted: Optional[np.ndarray]) -> np.ndarray:
+    """Mask of rows not flagged in a tombstone array."""
+    live = np.ones(len(rows), dtype=bool)
+    if deleted is not None and len(deleted) and len(rows):
+        in_range = rows < len(deleted)
+        live[in_range] = deleted[rows[in_range]] == 0
+    return live
+
+
+def _accumulate(docs: np.ndarray, scores: np.ndarray, new_docs: np.ndarray,
+                new_scores: np.ndarray, size: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Add scores to a sorted candidate list, inserting new documents."""
+    all_docs = np.concatenate([docs, new_docs])
+    all_scores = np.concatenate([scores, new_scores])
+    if len(all_docs) * 8 > size:
+        # Dense accumulation beats sorting once candidates are a sizable
+        # fraction of the segment
+        totals = np.bincount(all_docs, weights=all_scores, minlength=size)
+        seen = np.zeros(size, dtype=bool)
+        seen[all_docs] = True
+        merged = np.flatnonzero(seen)
+        return merged, totals[merged].astype(np.float32)
+    merged, inverse = np.unique(all_docs, return_inverse=True)
+    totals = np.bincount(inverse, weights=all_scores, minlength=len(merged))
+    return merged, totals.astype(np.float32)
+
+
+# ============================================================================
+# Index
+# ============================================================================
+
+class BM25Index:
+    """
+    Segmented BM25 index over knowledge base rows.
+
+    Example:
+        >>> index = BM25Index("kb/bm25")
+        >>> index.add([0, 1], ["Error ERR-4012 on login", "Reset the printer"])
+        >>> index.flush()
+        >>> rows, scores = index.search("ERR-4012", k=5)
+    """
+
+    MANIFEST = "segments.json"
+
+    def __init__(self, directory: Union[str, Path], k1: float = 1.2, b: float = 0.75,
+                 merge_factor: int = 8):
+        """
+        Open (or create) an index directory.
+
+        Args:
+            directory: Index directory
+            k1: BM25 term-frequency saturation
+            b: BM25 length normalization
+            merge_factor: Segments of similar size merged at once
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.k1 = k1
+        self.b = b
+        self.merge_factor = max(2, merge_factor)
+        self.buffer = _Buffer()
+        self.segments: List[Segment] = []
+        self._next = 0
+        manifest = self.directory / self.MANIFEST
+        if manifest.exists():
+            with open(manifest, encoding="utf-8") as f:
+                state = json.load(f)
+            self._next = state["next"]
+            self.segments = [Segment(self.directory / name) for name in state["segments"]]
+
+    def refresh(self) -> bool:
+        """
+        Switch to the segment list last published by another process.
+
+        Segments already open are reused.
+
+        Returns:
+            True if the segment list changed
+        """
+        manifest = self.directory / self.MANIFEST
+        if not manifest.exists():
+            return False
+        with open(manifest, encoding="utf-8") as f:
+            state = json.load(f)
+        if state["segments"] == [s.name for s in self.segments]:
+            return False
+        loaded = {s.name: s for s in self.segments}
+        self.segments = [loaded.get(name) or Segment(self.directory / name)
+                         for name in state["segments"]]
+        self._next = state["next"]
+        return True
+
+    @property
+    def covered_rows(self) -> int:
+        """One past the highest row indexed (flushed or buffered)."""
+        if len(self.buffer):
+            return self.buffer.rows[-1] + 1
+        return max((s.max_row + 1 for s in self.segments), default=0)
+
+    @property
+    def docs(self) -> int:
+        """Documents in the flushed segments."""
+        return sum(segment.docs for segment in self.segments)
+
+    def add(self, rows: Sequence[int], texts: Sequence[str]) -> None:
+        """
+        Buffer documents for the next flush.
+
+        Args:
+            rows: Knowledge base rows, ascending and above every indexed row
+            texts: Document texts
+        """
+        for row, text in zip(rows, texts):
+            self.buffer.add(int(row), text)
+
+    def flush(self, deleted: Optional[np.ndarray] = None) -> None:
+        """
+        Write buffered documents as a new segment and merge small segments.
+
+        Args:
+            deleted: Per-row tombstone flags; deleted rows are dropped
+                from merged segments
+        """
+        if not len(self.buffer):
+            return
+        segment = Segment.write(self._new_path(), np.asarray(self.buffer.rows, dtype=np.int64),
+                                np.asarray(self.buffer.lengths, dtype=np.int64),
+                                self.buffer.terms())
+        self.buffer = _Buffer()
+        self._publish(self.segments + [segment])
+        self._merge_tiers(deleted)
+
+    def _new_path(self) -> Path:
+        name = f"seg-{self._next:06d}"
+        self._next += 1
+        path = self.directory / name
+        if path.exists():
+            shutil.rmtree(path)
+        return path
+
+    def _publish(self, segments: List[Segment]) -> None:
+        """Atomically replace the segment list, then delete dropped segments."""
+        state = {"segments": [s.name for s in segments], "next": self._next}
+        tmp = self.directory / f"{self.MANIFEST}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.directory / self.MANIFEST)
+        kept = {s.name for s in segments}
+        for old in self.segments:
+            if old.name not in kept:
+                shutil.rmtree(old.path, ignore_errors=True)
+        self.segments = segments
+
+    def _merge_tiers(self, deleted: Optional[np.ndarray]) -> None:
+        """Merge runs of merge_factor segments that fall in the same size tier."""
+        while True:
+            tiers: Dict[int, List[int]] = defaultdict(list)
+            for position, segment in enumerate(self.segments):
+                tier = int(math.log(max(segment.docs, 1), self.merge_factor))
+                tiers[tier].append(position)
+            full = [positions for positions in tiers.values()
+                    if len(positions) >= self.merge_factor]
+            if not full:
+                return
+            self.merge(full[0], deleted)
+
+    def merge(self, positions: Optional[Sequence[int]] = None,
+              deleted: Optional[np.ndarray] = None) -> None:
+        """
+        Merge segments into one, dropping deleted documents.
+
+        Args:
+            positions: Indexes into ``segments`` to merge (default: all)
+            deleted: Per-row tombstone flags
+        """
+        positions = sorted(positions if positions is not None else range(len(self.segments)))
+        if not positions:
+            return
+        parts = [self.segments[p] for p in positions]
+        rows = np.concatenate([s.rows for s in parts])
+        lengths = np.concatenate([np.asarray(s.doc_len, dtype=np.int64) for s in parts])
+        order = np.argsort(rows, kind="stable")
+        keep = _live(rows, deleted)
+        # New local numbering: kept documents in row order
+        new_ids = np.full(len(rows), -1, dtype=np.int64)
+        kept_order = order[keep[order]]
+        new_ids[kept_order] = np.arange(len(kept_order))
+        bases = np.cumsum([0] + [s.docs for s in parts])
+
+        def merged_terms() -> Iterator[Tuple[str, np.ndarray, np.ndarray]]:
+            terms = sorted(set().union(*(s.terms for s in parts)))
+            for term in terms:
+                docs, tfs = [], []
+                for base, segment in zip(bases, parts):
+                    if term in segment.terms:
+                        postings = segment.decode_term(term)
+                        docs.append(new_ids[base + postings.docs])
+                        tfs.append(postings.tfs)
+                docs_all, tfs_all = np.concatenate(docs), np.concatenate(tfs)
+                live = docs_all >= 0
+                if live.any():
+                    sort = np.argsort(docs_all[live], kind="stable")
+                    yield term, docs_all[live][sort], tfs_all[live][sort]
+
+        merged = Segment.write(self._new_path(), rows[kept_order], lengths[kept_order],
+                               merged_terms())
+        remaining = [s for i, s in enumerate(self.segments) if i not in set(positions)]
+        segments = remaining[:positions[0]] + [merged] + remaining[positions[0]:]
+        self._publish(sorted(segments, key=lambda s: s.min_row))
+        logger.info(f"Merged {len(parts)} BM25 segments into {merged.name} "
+                    f"({merged.docs} documents)")
+
+    def truncate(self, rows: int) -> int:
+        """
+        Drop every segment holding rows at or above ``rows``.
+
+        Args:
+            rows: Number of knowledge base rows being kept
+
+        Returns:
+            The first row no longer indexed; rows from there up to
+            ``rows`` must be added again
+        """
+        self.buffer = _Buffer()
+        kept = [s for s in self.segments if s.max_row < rows]
+        if len(kept) != len(self.segments):
+            self._publish(kept)
+        return self.covered_rows
+
+    # ------------------------------------------------------------------
+    # Search
+    # ------------------------------------------------------------------
+
+    def _tfnorm(self, tf: np.ndarray, length: np.ndarray, avgdl: float) -> np.ndarray:
+        tf = tf.astype(np.float32)
+        return tf * (self.k1 + 1) / (tf + self.k1 * (1 - self.b + self.b * length / avgdl))
+
+    def search(self, query: str, k: int = 10, deleted: Optional[np.ndarray] = None
+               ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Find the rows with the highest BM25 score for a query.
+
+        Args:
+            query: Query text
+            k: Number of results
+            deleted: Per-row tombstone flags; deleted rows are skipped
+
+        Returns:
+            (rows, scores) arrays, best first
+        """
+        query_terms = Counter(tokenize(query))
+        total_docs = self.docs
+        if not query_terms or not total_docs or k <= 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+        avgdl = max(sum(s.total_length for s in self.segments) / total_docs, 1e-9)
+        dfs = {term: sum(segment.df(term) for segment in self.segments) for term in query_terms}
+        for term, count in list(query_terms.items()):
+            if dfs[term] and not term.isalnum():
+                # The exact code is indexed: its parts ("err", "4012") would
+                # only add noise and long postings lists
+                for part in _SPLIT_RE.split(term):
+                    if part in query_terms:
+                        query_terms[part] -= count
+        idf: Dict[str, float] = {}
+        for term, count in query_terms.items():
+            if dfs[term] and count > 0:
+                idf[term] = math.log(1 + (total_docs - dfs[term] + 0.5) / (dfs[term] + 0.5)) * count
+
+        best_rows = np.zeros(0, dtype=np.int64)
+        best_scores = np.zeros(0, dtype=np.float32)
+        for segment in self.segments:
+            rows, scores = self._search_segment(segment, idf, k, avgdl, deleted,
+                                                threshold=best_scores[-1]
+                                                if len(best_scores) >= k else 0.0)
+            best_rows = np.concatenate([best_rows, rows])
+            best_scores = np.concatenate([best_scores, scores])
+            order = np.argsort(-best_scores, kind="stable")[:k]
+            best_rows, best_scores = best_rows[order], best_scores[order]
+        return best_rows, best_scores
+
+    def _search_segment(self, segment: Segment, idf: Dict[str, float], k: int, avgdl: float,
+                        deleted: Optional[np.ndarray], threshold: float
+                        ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Block-max MaxScore search of one segment.
+
+        Terms are visited from the highest score bound down. Before each
+        term, ``threshold`` is raised to the k-th best score so far;
+        blocks whose bound plus the bounds of the terms still to come
+        cannot beat it are only decoded when they hold candidates.
+        """
+        terms = []
+        for term, weight in idf.items():
+            if term not in segment.terms:
+                continue
+            first, last = segment.blocks(term)
+            # Highest frequency in the shortest document bounds each block
+            block_bounds = weight * self._tfnorm(segment.block_max_tf[first:last],
+                                                 segment.block_min_len[first:last], avgdl)
+            terms.append((float(block_bounds.max()), first, last, weight, block_bounds,
+                          segment.df(term)))
+        terms.sort(key=lambda entry: -entry[0])
+
+        rows = segment.rows
+        docs = np.zeros(0, dtype=np.int64)
+        scores = np.zeros(0, dtype=np.float32)
+        remaining = sum(entry[0] for entry in terms)
+        for bound, first, last, weight, block_bounds, df in terms:
+            rest = remaining - bound
+            if len(scores) >= k:
+                threshold = max(threshold, float(np.partition(scores, -k)[-k]))
+            if threshold > 0 and len(docs):
+                alive = scores + remaining > threshold
+                docs, scores = docs[alive], scores[alive]
+            remaining = rest
+
+            last_docs = segment.block_last[first:last]
+            open_blocks = block_bounds + rest > threshold
+            needed = open_blocks.copy()
+            if len(docs):
+                owners = np.searchsorted(last_docs, docs)
+                needed[owners[owners < last - first]] = True
+            if not needed.any():
+                continue
+            postings = segment.decode(first, first + np.flatnonzero(needed), df)
+            new_docs, tfs = postings.docs, postings.tfs
+            keep = np.ones(len(new_docs), dtype=bool)
+            if deleted is not None:
+                keep = _live(rows[new_docs], deleted)
+            if not open_blocks.all():
+                # Closed blocks only update documents that are already candidates
+                in_open = open_blocks[np.searchsorted(last_docs, new_docs)]
+                if len(docs):
+                    found = np.minimum(np.searchsorted(docs, new_docs), len(docs) - 1)
+                    in_open |= docs[found] == new_docs
+                keep &= in_open
+            new_docs, tfs = new_docs[keep], tfs[keep]
+            contribution = weight * self._tfnorm(tfs, segment.doc_len[new_docs], avgdl)
+            docs, scores = _accumulate(docs, scores, new_docs, contribution, segment.docs)
+
+        if len(scores) > k:
+            top = np.argpartition(-scores, k)[:k]
+            docs, scores = docs[top], scores[top]
+        order = np.argsort(-scores, kind="stable")
+        return rows[docs[order]], scores[order]
+
+    def close(self) -> None:
+        """Release the segment maps."""
+        self.segments = []
@@ -0,0 +1,181 @@
+"""
+On-disk chunk text store for the IntraMind knowledge base.
+
+Chunks are appended as JSON lines to one data file, with a second file
+of uint64 start offsets so any row can be read with a single positioned
+read. Nothing is held in memory beyond the offsets map, which is
+memory-mapped. Reads do not move the file position, so one store can be
+shared by threads and by worker processes forked after it was opened.
+"""
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Iterable, List, NamedTuple, Optional, Union
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class Chunk(NamedTuple):
+    """
+    A passage of a source document.
+
+    Attributes:
+        doc_id: Identifier of the source document
+        position: Ordinal of the chunk within its document
+        text: Chunk text
+    """
+    doc_id: str
+    position: int
+    text: str
+
+    @property
+    def chunk_id(self) -> str:
+        """Stable identifier of the chunk."""
+        return f"{self.doc_id}#{self.position}"
+
+
+class ChunkStore:
+    """
+    Append-only store of chunk texts addressed by row number.
+
+    Row numbers match the vector index, so a search hit's id reads its
+    text back directly.
+
+    Example:
+        >>> store = ChunkStore("kb")
+        >>> store.append([Chunk("guide.md", 0, "Reset your password from...")])
+        >>> store.get(0).text
+        'Reset your password from...'
+    """
+
+    def __init__(self, directory: Union[str, Path]):
+        """
+        Open (or create) the store files in a directory.
+
+        Args:
+            directory: Knowledge base directory
+        """
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        self.data_path = directory / "chunks.jsonl"
+        self.offsets_path = directory / "chunks.offsets"
+        self.data_path.touch(exist_ok=True)
+        self.offsets_path.touch(exist_ok=True)
+        self._data = open(self.data_path, "r+b")
+        self._offsets = open(self.offsets_path, "r+b")
+        self._rows = os.path.getsize(self.offsets_path) // 8
+        self._size = os.path.getsize(self.data_path)
+        self._map: Optional[np.memmap] = None
+        # Guards the row counters and, where os.pread is missing, the file position
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._rows
+
+    def append(self, chunks: Iterable[Chunk]) -> None:
+        """
+        Append chunks as new rows.
+
+        Args:
+            chunks: Chunks to store, in row order
+        """
+        offsets: List[int] = []
+        lines: List[bytes] = []
+        position = self._size
+        for chunk in chunks:
+            line = json.dumps([chunk.doc_id, chunk.position, chunk.text],
+                              ensure_ascii=False).encode("utf-8") + b"\n"
+            offsets.append(position)
+            lines.append(line)
+            position += len(line)
+        with self._lock:
+            self._data.seek(self._size)
+            self._data.write(b"".join(lines))
+            self._offsets.seek(self._rows * 8)
+            self._offsets.write(np.asarray(offsets, dtype=np.uint64).tobytes())
+            self._rows += len(offsets)
+            self._size = position
+            self._map = None
+
+    def sync(self) -> None:
+        """Flush appended chunks to disk."""
+        for handle in (self._data, self._offsets):
+            handle.flush()
+            os.fsync(handle.fileno())
+
+    def truncate(self, rows: int) -> None:
+        """
+        Drop every row from ``rows`` on, e.g. to roll back to a checkpoint.
+
+        Args:
+            rows: Number of rows to keep
+        """
+        if rows >= self._rows:
+            return
+        size = int(self._offset_map()[rows])
+        self._map = None
+        self._offsets.truncate(rows * 8)
+        self._data.truncate(size)
+        self._rows = rows
+        self._size = size
+
+    def refresh(self, rows: Optional[int] = None) -> None:
+        """
+        Pick up rows appended by another process.
+
+        Args:
+            rows: Rows the writer has published; rows beyond it may still
+                be incomplete and are ignored
+        """
+        with self._lock:
+            available = os.path.getsize(self.offsets_path) // 8
+            self._rows = available if rows is None else min(rows, available)
+            self._size = os.path.getsize(self.data_path)
+            self._map = None
+
+    def _offset_map(self) -> np.ndarray:
+        if self._map is None or len(self._map) != self._rows:
+            self._data.flush()
+            self._offsets.flush()
+            self._map = np.memmap(self.offsets_path, dtype=np.uint64, mode="r",
+                                  shape=(self._rows,))
+        return self._map
+
+    def get(self, row: int) -> Chunk:
+        """
+        Read one chunk.
+
+        Args:
+            row: Row number
+
+        Returns:
+            The stored Chunk
+
+        Raises:
+            IndexError: If the row does not exist
+        """
+        if not 0 <= row < self._rows:
+            raise IndexError(f"chunk row {row} out of range")
+        offsets = self._offset_map()
+        start = int(offsets[row])
+        end = int(offsets[row + 1]) if row + 1 < self._rows else self._size
+        if hasattr(os, "pread"):
+            line = os.pread(self._data.fileno(), end - start, start)
+        else:
+            with self._lock:
+                self._data.seek(start)
+                line = self._data.read(end - start)
+        # After refresh() the last row may be followed by unpublished lines
+        doc_id, position, text = json.loads(line.partition(b"\n")[0])
+        return Chunk(doc_id, position, text)
+
+    def close(self) -> None:
+        """Close the store files."""
+        self._map = None
+        self._data.close()
+        self._offsets.close()
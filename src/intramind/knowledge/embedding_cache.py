@@ -0,0 +1,285 @@
+"""
+Content-addressed embedding cache for IntraMind ingestion.
+
+Embedding is the most expensive ingestion step, and re-chunking or
+rebuilding a knowledge base mostly produces chunks that were embedded
+before. The cache maps a 16-byte BLAKE2b digest of (model id, chunk
+text) to a vector, so unchanged chunks never reach the model again.
+
+Each model has its own directory holding a generation directory with an
+append-only vector file (FlatIndex) and a parallel file of keys. The key
+index is a sorted in-memory array of digests plus the row of each, built
+when the cache is opened; new keys are kept in a small dict until they
+are merged. Garbage collection copies the referenced entries into a new
+generation and switches to it by atomically replacing ``cache.json``.
+
+A cache directory supports one writer at a time.
+"""
+
+import hashlib
+import json
+import os
+import re
+import shutil
+import uuid
+from pathlib import Path
+from typing import Dict, Iterable, List, Sequence, Tuple, Union
+import logging
+
+import numpy as np
+
+from intramind.knowledge.vector_index import FlatIndex
+
+logger = logging.getLogger(__name__)
+
+KEY_BYTES = 16
+
+# New keys held in the pending dict before being merged into the sorted index
+MERGE_THRESHOLD = 65536
+
+# Rows copied per step during garbage collection
+GC_BLOCK_ROWS = 65536
+
+
+def content_key(model_id: str, text: str) -> bytes:
+    """
+    Cache key of a text embedded by a model.
+
+    Args:
+        model_id: Embedding model identifier
+        text: Chunk text
+
+    Returns:
+        16-byte digest
+    """
+    digest = hashlib.blake2b(digest_size=KEY_BYTES)
+    digest.update(model_id.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(text.encode("utf-8"))
+    return digest.digest()
+
+
+class EmbeddingCache:
+    """
+    On-disk vector cache keyed by chunk content and model.
+
+    Example:
+        >>> cache = EmbeddingCache("kb/embedding_cache", embedder.model_id, 512)
+        >>> vectors, missing = cache.get_many(texts)
+        >>> fresh = embedder.embed([texts[i] for i in missing])
+        >>> cache.put_many([cache.key(texts[i]) for i in missing], fresh)
+    """
+
+    META_FILE = "cache.json"
+
+    def __init__(self, directory: Union[str, Path], model_id: str, dimension: int):
+        """
+        Open (or create) the cache of one model.
+
+        Args:
+            directory: Cache directory, shared by all models
+            model_id: Embedding model identifier
+            dimension: Vector length
+
+        Raises:
+            ValueError: If the cache holds vectors of another dimension
+        """
+        slug = re.sub(r"[^A-Za-z0-9_.-]+", "_", model_id)
+        self.directory = Path(directory) / f"{slug}-{content_key('', model_id).hex()[:8]}"
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.model_id = model_id
+        self.dimension = dimension
+        self.hits = 0
+        self.misses = 0
+
+        meta_path = self.directory / self.META_FILE
+        if meta_path.exists():
+            with open(meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+            if meta["dimension"] != dimension:
+                raise ValueError(f"embedding cache holds {meta['dimension']}-dimensional vectors, "
+                                 f"not {dimension}")
+            self.generation = meta["generation"]
+        else:
+            self.generation = f"gen-{uuid.uuid4().hex[:12]}"
+            (self.directory / self.generation).mkdir()
+            self._write_meta()
+        self._open_generation()
+
+    def _write_meta(self) -> None:
+        meta = {"model_id": self.model_id, "dimension": self.dimension,
+                "generation": self.generation}
+        tmp = self.directory / f"{self.META_FILE}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.directory / self.META_FILE)
+
+    def _open_generation(self) -> None:
+        """Open the current generation's files and build the key index."""
+        path = self.directory / self.generation
+        self.vectors = FlatIndex(path / "vectors.f32", self.dimension)
+        keys_path = path / "keys.bin"
+        keys_path.touch(exist_ok=True)
+        self._keys_file = open(keys_path, "r+b")
+        # A crash between the two appends leaves one file ahead
+        rows = min(len(self.vectors), os.path.getsize(keys_path) // KEY_BYTES)
+        self.vectors.truncate(rows)
+        self._keys_file.truncate(rows * KEY_BYTES)
+        keys = np.fromfile(keys_path, dtype=f"S{KEY_BYTES}", count=rows)
+        order = np.argsort(keys, kind="stable")
+        self._sorted_keys = keys[order]
+        self._sorted_rows = order.astype(np.int64)
+        self._pending: Dict[bytes, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.vectors)
+
+    def key(self, text: str) -> bytes:
+        """Cache key of a text for this cache's model."""
+        return content_key(self.model_id, text)
+
+    def _merge_pending(self) -> None:
+        if not self._pending:
+            return
+        keys = np.array(list(self._pending), dtype=f"S{KEY_BYTES}")
+        rows = np.fromiter(self._pending.values(), dtype=np.int64, count=len(self._pending))
+        all_keys = np.concatenate([self._sorted_keys, keys])
+        all_rows = np.concatenate([self._sorted_rows, rows])
+        order = np.argsort(all_keys, kind="stable")
+        self._sorted_keys, self._sorted_rows = all_keys[order], all_rows[order]
+        self._pending = {}
+
+    def lookup(self, keys: Sequence[bytes]) -> np.ndarray:
+        """
+        Find the rows of several keys.
+
+        Args:
+            keys: Cache keys
+
+        Returns:
+            Row of each key, or -1 where the key is not cached
+        """
+        rows = np.full(len(keys), -1, dtype=np.int64)
+        if not len(keys):
+            return rows
+        wanted = np.array(keys, dtype=f"S{KEY_BYTES}")
+        if len(self._sorted_keys):
+            positions = np.searchsorted(self._sorted_keys, wanted)
+            positions = np.minimum(positions, len(self._sorted_keys) - 1)
+            found = self._sorted_keys[positions] == wanted
+            rows[found] = self._sorted_rows[positions[found]]
+        if self._pending:
+            for i in np.flatnonzero(rows < 0).tolist():
+                rows[i] = self._pending.get(keys[i], -1)
+        return rows
+
+    def get_many(self, texts: Sequence[str]) -> Tuple[np.ndarray, List[int]]:
+        """
+        Batch lookup of texts.
+
+        Args:
+            texts: Chunk texts
+
+        Returns:
+            (vectors, missing): a (len(texts), dimension) float32 array
+            filled for every cached text, and the indexes of the texts
+            that still need embedding
+        """
+        rows = self.lookup([self.key(text) for text in texts])
+        vectors = np.zeros((len(texts), self.dimension), dtype=np.float32)
+        cached = rows >= 0
+        if cached.any():
+            vectors[cached] = self.vectors.vectors()[rows[cached]]
+        missing = np.flatnonzero(~cached).tolist()
+        self.hits += len(texts) - len(missing)
+        self.misses += len(missing)
+        return vectors, missing
+
+    def put_many(self, keys: Sequence[bytes], vectors: np.ndarray) -> int:
+        """
+        Add vectors; keys already cached (or repeated) are skipped.
+
+        Args:
+            keys: Cache keys, from key()
+            vectors: One vector per key
+
+        Returns:
+            Number of entries added
+        """
+        existing = self.lookup(keys)
+        new: Dict[bytes, int] = {}
+        for i, key in enumerate(keys):
+            if existing[i] < 0 and key not in new:
+                new[key] = i
+        if not new:
+            return 0
+        start = len(self.vectors)
+        self.vectors.append(np.asarray(vectors, dtype=np.float32)[list(new.values())])
+        self._keys_file.seek(start * KEY_BYTES)
+        self._keys_file.write(b"".join(new))
+        for offset, key in enumerate(new):
+            self._pending[key] = start + offset
+        if len(self._pending) >= MERGE_THRESHOLD:
+            self._merge_pending()
+        return len(new)
+
+    def sync(self) -> None:
+        """Flush appended entries to disk."""
+        self.vectors.sync()
+        self._keys_file.flush()
+        os.fsync(self._keys_file.fileno())
+
+    def gc(self, referenced: Iterable[bytes]) -> int:
+        """
+        Drop every entry whose key is not referenced.
+
+        The kept entries are copied into a new generation, which replaces
+        the current one atomically.
+
+        Args:
+            referenced: Keys still in use
+
+        Returns:
+            Number of entries removed
+        """
+        keys = list(dict.fromkeys(referenced))
+        rows = self.lookup(keys)
+        rows = np.sort(rows[rows >= 0])
+        removed = len(self) - len(rows)
+        if not removed:
+            return 0
+
+        self.sync()
+        generation = f"gen-{uuid.uuid4().hex[:12]}"
+        path = self.directory / generation
+        path.mkdir()
+        source_vectors = self.vectors.vectors()
+        source_keys = np.fromfile(self.directory / self.generation / "keys.bin",
+                                  dtype=f"S{KEY_BYTES}", count=len(self))
+        target = FlatIndex(path / "vectors.f32", self.dimension)
+        with open(path / "keys.bin", "wb") as key_file:
+            for start in range(0, len(rows), GC_BLOCK_ROWS):
+                block = rows[start:start + GC_BLOCK_ROWS]
+                target.append(source_vectors[block])
+                key_file.write(source_keys[block].tobytes())
+            key_file.flush()
+            os.fsync(key_file.fileno())
+        target.sync()
+        target.close()
+
+        old = self.directory / self.generation
+        self.close()
+        self.generation = generation
+        self._write_meta()
+        shutil.rmtree(old, ignore_errors=True)
+        self._open_generation()
+        logger.info(f"Embedding cache GC removed {removed} entries, kept {len(rows)}")
+        return removed
+
+    def close(self) -> None:
+        """Close the cache files."""
+        self.vectors.close()
+        self._keys_file.close()
+
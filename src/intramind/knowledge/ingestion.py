@@ -0,0 +1,840 @@
+"""
+Streaming document ingestion for the IntraMind knowledge base.
+
+Ingestion is a chain of generators: sources are discovered, loaded and
+extracted, split into chunks, embedded in batches and appended to the
+knowledge base. Each stage pulls from the previous one, and the parallel
+stages keep a fixed number of items in flight, so memory use is bounded
+by the batch and window sizes rather than by the corpus.
+
+Embeddings are looked up in a content-addressed EmbeddingCache first,
+so re-ingesting unchanged text (after a rebuild or a change of chunking
+settings) does not call the embedding model again.
+
+Runs checkpoint periodically. An interrupted run rolls the knowledge
+base back to its last checkpoint and resumes after the last source
+that was fully written.
+
+Every ingested document is recorded in a Manifest with its file's size,
+mtime and content hash and the rows of its chunks. IngestionPipeline.sync
+uses it to ingest only added and changed documents and to delete the
+chunks of changed and removed ones, then publishes the result so
+processes searching the knowledge base switch to it.
+"""
+
+import json
+import os
+import re
+import time
+from collections import deque
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from functools import partial
+from html.parser import HTMLParser
+from itertools import islice
+from pathlib import Path
+from typing import (
+    Any, Callable, Deque, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence,
+    Tuple, TypeVar, Union
+)
+import logging
+
+import numpy as np
+
+from intramind.knowledge.chunk_store import Chunk
+from intramind.knowledge.embedding_cache import EmbeddingCache
+from intramind.knowledge.knowledge_base import KnowledgeBase
+from intramind.knowledge.manifest import DocumentRecord, Fingerprint, Manifest, fingerprint
+from intramind.knowledge.vector_index import IVFIndex
+from intramind.services.embeddings import Embedder
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# Sort key of a source: (root index, path parts below the root)
+SourceKey = Tuple[Any, ...]
+
+_WORD_RE = re.compile(r"\S+")
+
+# Default embedding cache location inside a knowledge base directory
+EMBEDDING_CACHE_DIR = "embedding_cache"
+
+# A sync rebuilds the IVF index once rows added since the last build
+# exceed this fraction of the indexed rows (until then they are scanned
+# exactly)
+IVF_REBUILD_FRACTION = 0.1
+
+
+class Source(NamedTuple):
+    """
+    A document file discovered under an ingestion root.
+
+    Attributes:
+        key: Position of the file in the deterministic walk order
+        doc_id: Identifier of the document (root name plus relative path)
+        path: File path
+    """
+    key: SourceKey
+    doc_id: str
+    path: Path
+
+
+class Document(NamedTuple):
+    """
+    Extracted text of a source document.
+
+    Attributes:
+        source: The source the text was extracted from
+        text: Plain text content
+        fingerprint: Size, mtime and hash of the file when it was read
+    """
+    source: Source
+    text: str
+    fingerprint: Fingerprint
+
+
+class _Piece(NamedTuple):
+    """A chunk tagged with where it came from in the source walk."""
+    chunk: Chunk
+    key: SourceKey
+    last: bool
+    fingerprint: Fingerprint
+
+
+class _Batch(NamedTuple):
+    """
+    Chunks to embed. ``vectors`` holds cached embeddings and ``missing``
+    the indexes still to embed; without a cache, vectors is None.
+    """
+    pieces: List[_Piece]
+    keys: List[bytes]
+    vectors: Optional[np.ndarray]
+    missing: List[int]
+
+
+# ============================================================================
+# Extraction
+# ============================================================================
+
+def extract_plain_text(path: Path) -> str:
+    """Read a text file, replacing undecodable bytes."""
+    return path.read_text(encoding="utf-8", errors="replace")
+
+
+class _HTMLTextParser(HTMLParser):
+    """Collects visible text, with line breaks at block-level tags."""
+
+    _SKIP = {"script", "style", "noscript", "template", "head"}
+    _BLOCK = {"p", "div", "br", "li", "tr", "h1", "h2", "h3", "h4", "h5", "h6",
+              "section", "article", "pre", "blockquote", "table", "ul", "ol"}
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.parts: List[str] = []
+        self._skipping = 0
+
+    def handle_starttag(self, tag: str, attrs: Any) -> None:
+        if tag in self._SKIP:
+            self._skipping += 1
+        elif tag in self._BLOCK:
+            self.parts.append("\n")
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag in self._SKIP:
+            self._skipping = max(0, self._skipping - 1)
+        elif tag in self._BLOCK:
+            self.parts.append("\n")
+
+    def handle_data(self, data: str) -> None:
+        if not self._skipping:
+            self.parts.append(data)
+
+
+def extract_html(path: Path) -> str:
+    """Extract the visible text of an HTML file."""
+    parser = _HTMLTextParser()
+    parser.feed(extract_plain_text(path))
+    parser.close()
+    lines = (" ".join(line.split()) for line in "".join(parser.parts).splitlines())
+    return "\n".join(line for line in lines if line)
+
+
+def extract_pdf(path: Path) -> str:
+    """
+    Extract the text layer of a PDF file.
+
+    Requires the optional ``pypdf`` package.
+    """
+    try:
+        from pypdf import PdfReader
+    except ImportError as e:
+        raise ImportError("PDF ingestion requires pypdf: pip install pypdf") from e
+
+    reader = PdfReader(str(path))
+    return "\n".join(page.extract_text() or "" for page in reader.pages)
+
+
+# Text extractors by lowercase file suffix
+EXTRACTORS: Dict[str, Callable[[Path], str]] = {
+    ".txt": extract_plain_text,
+    ".md": extract_plain_text,
+    ".rst": extract_plain_text,
+    ".csv": extract_plain_text,
+    ".html": extract_html,
+    ".htm": extract_html,
+    ".pdf": extract_pdf,
+}
+
+
+def register_extractor(suffix: str, func: Callable[[Path], str]) -> None:
+    """
+    Register a text extractor for a file suffix.
+
+    Args:
+        suffix: File suffix including the dot, e.g. ".docx"
+        func: Callable taking a Path and returning its plain text
+    """
+    EXTRACTORS[suffix.lower()] = func
+
+
+# ============================================================================
+# Generator stages
+# ============================================================================
+
+def iter_sources(roots: Sequence[Union[str, Path]],
+                 suffixes: Optional[Iterable[str]] = None) -> Iterator[Source]:
+    """
+    Walk ingestion roots in a deterministic order.
+
+    Files are yielded sorted by path within each root, and roots in the
+    order given, so source keys increase monotonically; checkpoints rely
+    on this to skip finished sources on resume.
+
+    Args:
+        roots: Files or directories to ingest
+        suffixes: File suffixes to include. Defaults to every suffix with
+            a registered extractor.
+
+    Yields:
+        Source for each matching file
+    """
+    wanted = {s.lower() for s in (suffixes if suffixes is not None else EXTRACTORS)}
+
+    def walk(directory: Path, parts: Tuple[str, ...]) -> Iterator[Tuple[Tuple[str, ...], Path]]:
+        with os.scandir(directory) as entries:
+            ordered = sorted(entries, key=lambda entry: entry.name)
+        for entry in ordered:
+            if entry.is_dir(follow_symlinks=False):
+                yield from walk(Path(entry.path), parts + (entry.name,))
+            elif entry.is_file() and os.path.splitext(entry.name)[1].lower() in wanted:
+                yield parts + (entry.name,), Path(entry.path)
+
+    for index, root in enumerate(roots):
+        root = Path(root)
+        if root.is_file():
+            files = iter([((root.name,), root)])
+        else:
+            files = walk(root, (root.name,))
+        for parts, path in files:
+            yield Source(key=(index,) + parts, doc_id="/".join(parts), path=path)
+
+
+def load_document(source: Source) -> Optional[Document]:
+    """
+    Extract the text of one source.
+
+    Args:
+        source: Source to load
+
+    Returns:
+        Document, or None if the file could not be extracted
+    """
+    extractor = EXTRACTORS.get(source.path.suffix.lower())
+    if extractor is None:
+        logger.warning(f"No extractor for {source.path}")
+        return None
+    try:
+        stamp = fingerprint(source.path)
+        return Document(source, extractor(source.path), stamp)
+    except Exception as e:
+        logger.error(f"Failed to extract {source.path}: {str(e)}")
+        return None
+
+
+def chunk_text(text: str, size: int = 200, overlap: int = 40) -> Iterator[str]:
+    """
+    Split text into windows of words.
+
+    Each chunk holds up to ``size`` whitespace-separated words and repeats
+    the last ``overlap`` words of the previous chunk, so passages that
+    straddle a boundary are still retrievable. Original spacing and line
+    breaks inside a chunk are kept.
+
+    Args:
+        text: Text to split
+        size: Words per chunk
+        overlap: Words shared by consecutive chunks
+
+    Yields:
+        Chunk texts
+    """
+    if not 0 <= overlap < size:
+        raise ValueError("chunk overlap must be at least 0 and less than the chunk size")
+    spans = [match.span() for match in _WORD_RE.finditer(text)]
+    step = size - overlap
+    for start in range(0, len(spans), step):
+        window = spans[start:start + size]
+        yield text[window[0][0]:window[-1][1]]
+        if start + size >= len(spans):
+            break
+
+
+def chunk_documents(documents: Iterable[Optional[Document]], size: int,
+                    overlap: int) -> Iterator[_Piece]:
+    """Split each document into chunks, marking each document's last chunk."""
+    for document in documents:
+        if document is None:
+            continue
+        source = document.source
+        previous: Optional[Chunk] = None
+        for position, text in enumerate(chunk_text(document.text, size, overlap)):
+            if previous is not None:
+                yield _Piece(previous, source.key, False, document.fingerprint)
+            previous = Chunk(source.doc_id, position, text)
+        if previous is not None:
+            yield _Piece(previous, source.key, True, document.fingerprint)
+
+
+def batched(items: Iterable[T], size: int) -> Iterator[List[T]]:
+    """
+    Group an iterable into lists of ``size`` items (the last may be shorter).
+
+    Args:
+        items: Items to group
+        size: Items per batch
+
+    Yields:
+        Batches in order
+    """
+    iterator = iter(items)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def ordered_map(func: Callable[[T], R], items: Iterable[T], executor: Executor,
+                window: int) -> Iterator[R]:
+    """
+    Map a function over items in parallel, yielding results in input order.
+
+    At most ``window`` calls are in flight, and items are pulled from the
+    input only as results are consumed, so a lazy input is never read
+    ahead by more than the window.
+
+    Args:
+        func: Function to apply
+        items: Input items
+        executor: Executor that runs the calls
+        window: Maximum number of calls in flight
+
+    Yields:
+        func(item) for each item, in order
+    """
+    pending: Deque[Future] = deque()
+    for item in items:
+        pending.append(executor.submit(func, item))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def _embed_batch(embedder: Embedder, batch: _Batch) -> _Batch:
+    """
+    Embed the chunks of a batch that are not cached.
+
+    A module-level function (bound with functools.partial) so batches can
+    be embedded in a process pool.
+    """
+    if batch.vectors is None:
+        vectors = embedder.embed([piece.chunk.text for piece in batch.pieces])
+        return batch._replace(vectors=vectors, missing=list(range(len(batch.pieces))))
+    if batch.missing:
+        batch.vectors[batch.missing] = embedder.embed(
+            [batch.pieces[i].chunk.text for i in batch.missing])
+    return batch
+
+
+def _check_source(item: Tuple[Source, Optional[DocumentRecord]]
+                  ) -> Tuple[Source, Optional[DocumentRecord], Optional[Fingerprint]]:
+    """
+    Compare a source file with its manifest record.
+
+    Returns the item with the file's fingerprint, or with None when the
+    file's size and mtime match the record, in which case it is taken as
+    unchanged without being read.
+    """
+    source, record = item
+    try:
+        stat = source.path.stat()
+        if record is not None and (stat.st_size, stat.st_mtime_ns) == (record.size,
+                                                                       record.mtime_ns):
+            return source, record, None
+        return source, record, fingerprint(source.path)
+    except OSError as e:
+        # Most likely removed since the walk; the next sync deletes it
+        logger.warning(f"Cannot read {source.path}: {str(e)}")
+        return source, record, None
+
+
+# ============================================================================
+# Pipeline
+# ============================================================================
+
+class IngestionStats(NamedTuple):
+    """
+    Summary of an ingestion run.
+
+    Attributes:
+        documents: Documents whose chunks were written by this run
+        chunks: Chunks written by this run
+        skipped: Sources skipped because an earlier run finished them
+        seconds: Wall-clock duration of the run
+        embedded: Chunks sent to the embedding model (the rest came from
+            the embedding cache)
+    """
+    documents: int
+    chunks: int
+    skipped: int
+    seconds: float
+    embedded: int = 0
+
+
+class SyncStats(NamedTuple):
+    """
+    Summary of an incremental sync.
+
+    Attributes:
+        added: Documents ingested for the first time
+        changed: Documents whose content changed, ingested again
+        deleted: Documents whose files were removed
+        unchanged: Documents left as they were
+        chunks: Chunks written
+        embedded: Chunks sent to the embedding model
+        seconds: Wall-clock duration of the sync
+    """
+    added: int
+    changed: int
+    deleted: int
+    unchanged: int
+    chunks: int
+    embedded: int
+    seconds: float
+
+
+class IngestionPipeline:
+    """
+    Builds a knowledge base from document files.
+
+    Stages: iter_sources -> load_document (parallel) -> chunk_documents
+    -> embedding cache lookup -> embed missing chunks (parallel) -> append
+    to the KnowledgeBase and the cache. Extraction
+    and embedding run on a shared executor, ``workers`` threads by
+    default; pass a process pool to ``executor`` when the embedder is
+    pure Python and picklable.
+
+    run() ingests every document; sync() afterwards ingests only the
+    documents that changed.
+
+    Example:
+        >>> pipeline = IngestionPipeline("kb/", create_embedder("hashing"))
+        >>> stats = pipeline.run(["docs/"])
+        >>> KnowledgeBase.open("kb/").search("reset password")
+        >>> pipeline.sync(["docs/"])  # later, after some files were edited
+    """
+
+    CHECKPOINT_FILE = "checkpoint.json"
+
+    def __init__(self, directory: Union[str, Path], embedder: Embedder,
+                 chunk_size: int = 200, chunk_overlap: int = 40, batch_size: int = 64,
+                 workers: int = 4, checkpoint_interval: int = 16,
+                 executor: Optional[Executor] = None, index: str = "flat",
+                 nlist: Optional[int] = None, cache_embeddings: bool = True,
+                 cache_dir: Optional[Union[str, Path]] = None):
+        """
+        Initialize the pipeline.
+
+        Args:
+            directory: Knowledge base directory (created if missing)
+            embedder: Embedder for chunk vectors
+            chunk_size: Words per chunk
+            chunk_overlap: Words shared by consecutive chunks
+            batch_size: Chunks embedded per call
+            workers: Parallel extraction and embedding calls
+            checkpoint_interval: Batches written between checkpoints
+            executor: Executor to run stages on. Defaults to a thread pool
+                of ``workers`` threads owned by each run.
+            index: "flat" for exact search only, or "ivf" to build an IVF
+                index once the run completes
+            nlist: Number of IVF lists (default: about 4 * sqrt(rows))
+            cache_embeddings: Reuse vectors of previously embedded chunk
+                texts from an EmbeddingCache
+            cache_dir: Embedding cache directory. Defaults to
+                ``embedding_cache`` inside the knowledge base, which is
+                garbage-collected after each complete run; a shared
+                directory is never collected automatically.
+        """
+        if not 0 <= chunk_overlap < chunk_size:
+            raise ValueError("chunk_overlap must be at least 0 and less than chunk_size")
+        self.directory = Path(directory)
+        self.embedder = embedder
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.batch_size = max(1, batch_size)
+        self.workers = max(1, workers)
+        self.checkpoint_interval = max(1, checkpoint_interval)
+        self.executor = executor
+        self.index = index
+        self.nlist = nlist
+        self.cache_embeddings = cache_embeddings
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+
+    @classmethod
+    def from_config(cls, config: Any, embedder: Optional[Embedder] = None,
+                    directory: Optional[Union[str, Path]] = None) -> "IngestionPipeline":
+        """
+        Create a pipeline from the knowledge settings of a Config.
+
+        Args:
+            config: Configuration object
+            embedder: Embedder to use. Defaults to ``embedding_model``.
+            directory: Knowledge base directory. Defaults to
+                ``knowledge_base_path``.
+
+        Returns:
+            IngestionPipeline instance
+        """
+        if embedder is None:
+            from intramind.services.embeddings import create_embedder
+
+            embedder = create_embedder(config.embedding_model)
+        directory = directory or config.knowledge_base_path
+        if not directory:
+            raise ValueError("knowledge_base_path is not set")
+        return cls(
+            directory, embedder,
+            chunk_size=config.knowledge_chunk_size,
+            chunk_overlap=config.knowledge_chunk_overlap,
+            batch_size=config.knowledge_ingest_batch_size,
+            workers=config.knowledge_ingest_workers,
+            checkpoint_interval=config.knowledge_checkpoint_interval,
+            index=config.knowledge_index,
+            nlist=config.knowledge_ivf_nlist or None,
+            cache_embeddings=config.knowledge_embedding_cache_enabled,
+            cache_dir=config.knowledge_embedding_cache_path,
+        )
+
+    @property
+    def _settings(self) -> Dict[str, Any]:
+        """Settings a resumed run must share with the interrupted one."""
+        return {"model_id": self.embedder.model_id, "chunk_size": self.chunk_size,
+                "chunk_overlap": self.chunk_overlap}
+
+    def _read_checkpoint(self) -> Optional[Dict[str, Any]]:
+        path = self.directory / self.CHECKPOINT_FILE
+        if not path.exists():
+            return None
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def _check_settings(self, checkpoint: Dict[str, Any]) -> None:
+        changed = {k for k, v in self._settings.items() if checkpoint.get(k) != v}
+        if changed:
+            raise ValueError(f"checkpoint was made with different settings: {sorted(changed)}; "
+                             "rerun with resume=False to rebuild")
+
+    def _write_checkpoint(self, kb: KnowledgeBase, manifest: Manifest, rows: int,
+                          last_key: Optional[SourceKey], complete: bool) -> None:
+        """
+        Sync the knowledge base files and manifest, atomically record
+        progress, then publish the rows to readers.
+
+        ``rows`` is the row count at the end of the last complete
+        document; rows after it belong to a document that is still being
+        written and are rolled back on resume.
+        """
+        kb.sync()
+        manifest.commit()
+        state = {
+            **self._settings,
+            "rows": rows,
+            "last_source": list(last_key) if last_key is not None else None,
+            "complete": complete,
+        }
+        path = self.directory / self.CHECKPOINT_FILE
+        tmp = path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+        kb.publish(rows)
+
+    def _open_cache(self, kb: KnowledgeBase) -> Optional[EmbeddingCache]:
+        if not self.cache_embeddings:
+            return None
+        directory = self.cache_dir or self.directory / EMBEDDING_CACHE_DIR
+        return EmbeddingCache(directory, self.embedder.model_id, kb.dimension)
+
+    def _collect_cache(self, cache: EmbeddingCache, kb: KnowledgeBase) -> None:
+        """Drop cache entries of chunks the knowledge base no longer holds."""
+        if self.cache_dir is not None or len(cache) <= 2 * kb.live:
+            return
+        deleted = kb.vectors.deleted()
+        cache.gc(cache.key(kb.chunks.get(row).text) for row in range(len(kb))
+                 if not deleted[row])
+
+    def _ingest(self, kb: KnowledgeBase, cache: Optional[EmbeddingCache],
+                sources: Iterable[Source], executor: Executor
+                ) -> Iterator[Tuple[_Batch, List[Tuple[SourceKey, DocumentRecord]]]]:
+        """
+        Run the stages over sources, appending their chunks to the knowledge base.
+
+        Yields:
+            (batch, finished) after each batch is written; finished holds
+            the walk key and manifest record of each document whose last
+            chunk was in the batch
+        """
+
+        def lookup(pieces: List[_Piece]) -> _Batch:
+            if cache is None:
+                return _Batch(pieces, [], None, [])
+            texts = [piece.chunk.text for piece in pieces]
+            vectors, missing = cache.get_many(texts)
+            return _Batch(pieces, [cache.key(texts[i]) for i in missing], vectors, missing)
+
+        window = self.workers * 2
+        loaded = ordered_map(load_document, sources, executor, window)
+        pieces = chunk_documents(loaded, self.chunk_size, self.chunk_overlap)
+        # Cache lookups run here, in the calling thread, as batches are queued
+        lookups = (lookup(batch) for batch in batched(pieces, self.batch_size))
+        embedded = ordered_map(partial(_embed_batch, self.embedder), lookups, executor, window)
+        document_start = len(kb)
+        for batch in embedded:
+            first_row = len(kb)
+            kb.append([piece.chunk for piece in batch.pieces], batch.vectors)
+            if cache is not None and batch.missing:
+                cache.put_many(batch.keys, batch.vectors[batch.missing])
+            finished = []
+            for row, piece in enumerate(batch.pieces, first_row):
+                if piece.chunk.position == 0:
+                    document_start = row
+                if piece.last:
+                    stamp = piece.fingerprint
+                    finished.append((piece.key, DocumentRecord(
+                        piece.chunk.doc_id, stamp.size, stamp.mtime_ns, stamp.digest,
+                        document_start, row + 1 - document_start)))
+            yield batch, finished
+
+    def _update_index(self, kb: KnowledgeBase, rebuild: bool) -> None:
+        """Build the IVF index if configured, then publish it to readers."""
+        if self.index != "ivf" or not len(kb):
+            return
+        built = kb.index.built_rows if isinstance(kb.index, IVFIndex) else 0
+        if rebuild or len(kb) - built > IVF_REBUILD_FRACTION * built:
+            kb.build_index(self.nlist)
+            kb.publish()
+
+    def run(self, roots: Sequence[Union[str, Path]], resume: bool = True,
+            suffixes: Optional[Iterable[str]] = None) -> IngestionStats:
+        """
+        Ingest every document under the given roots.
+
+        Args:
+            roots: Files or directories to ingest
+            resume: Continue from the last checkpoint of an interrupted
+                run. With False, the knowledge base is rebuilt from scratch.
+            suffixes: File suffixes to include (default: all with extractors)
+
+        Returns:
+            IngestionStats for this run
+
+        Raises:
+            ValueError: If resuming a run made with different chunking or
+                embedding settings
+        """
+        started = time.perf_counter()
+        checkpoint = self._read_checkpoint() if resume else None
+        if checkpoint is not None:
+            self._check_settings(checkpoint)
+
+        kb = KnowledgeBase.create(self.directory, self.embedder, overwrite=checkpoint is None)
+        manifest = Manifest(self.directory / Manifest.FILE)
+        resume_after: Optional[SourceKey] = None
+        if checkpoint is not None:
+            kb.truncate(checkpoint["rows"])
+            manifest.truncate(len(kb))
+            if checkpoint["last_source"] is not None:
+                resume_after = tuple(checkpoint["last_source"])
+            logger.info(f"Resuming ingestion after {resume_after} ({len(kb)} chunks indexed)")
+
+        skipped = 0
+
+        def pending_sources() -> Iterator[Source]:
+            nonlocal skipped
+            for source in iter_sources(roots, suffixes):
+                if resume_after is not None and source.key <= resume_after:
+                    skipped += 1
+                    continue
+                yield source
+
+        cache = self._open_cache(kb)
+        executor = self.executor or ThreadPoolExecutor(self.workers,
+                                                       thread_name_prefix="intramind-ingest")
+        documents = chunks = batches = embedded_chunks = 0
+        last_key = resume_after
+        boundary = len(kb)
+        try:
+            for batch, finished in self._ingest(kb, cache, pending_sources(), executor):
+                chunks += len(batch.pieces)
+                embedded_chunks += len(batch.missing)
+                if finished:
+                    documents += len(finished)
+                    last_key, record = finished[-1]
+                    boundary = record.first_row + record.rows
+                    manifest.put_many(record for _, record in finished)
+                batches += 1
+                if batches % self.checkpoint_interval == 0:
+                    if cache is not None:
+                        cache.sync()
+                    self._write_checkpoint(kb, manifest, boundary, last_key, complete=False)
+                    logger.info(f"Ingestion checkpoint: {documents} documents, {chunks} chunks")
+            self._write_checkpoint(kb, manifest, len(kb), last_key, complete=True)
+            if cache is not None:
+                cache.sync()
+                self._collect_cache(cache, kb)
+            if chunks:
+                self._update_index(kb, rebuild=True)
+        finally:
+            if self.executor is None:
+                executor.shutdown(wait=True, cancel_futures=True)
+            if cache is not None:
+                cache.close()
+            manifest.close()
+            kb.close()
+
+        stats = IngestionStats(documents, chunks, skipped, time.perf_counter() - started,
+                               embedded_chunks)
+        logger.info(f"Ingestion finished: {stats.documents} documents, {stats.chunks} chunks "
+                    f"({stats.chunks - stats.embedded} from the embedding cache) "
+                    f"in {stats.seconds:.1f}s ({stats.skipped} sources already done)")
+        return stats
+
+    def sync(self, roots: Sequence[Union[str, Path]],
+             suffixes: Optional[Iterable[str]] = None) -> SyncStats:
+        """
+        Bring the knowledge base up to date with the files under the roots.
+
+        Only documents added or changed since they were last ingested are
+        loaded, chunked and embedded, and the chunks of changed and
+        removed documents are deleted. Files whose size and mtime match
+        the manifest are not read; the others are hashed, and a file
+        whose content is unchanged only has its manifest entry updated.
+
+        New chunks and deletions are published together when the sync
+        finishes. Processes searching the knowledge base meanwhile keep
+        using the previous state and then switch to the new one (see
+        KnowledgeBase.refresh). An interrupted sync is rolled back and
+        redone by the next one.
+
+        A knowledge base without a manifest (or without any complete
+        run) is built from scratch with run().
+
+        Args:
+            roots: Files or directories to ingest
+            suffixes: File suffixes to include (default: all with extractors)
+
+        Returns:
+            SyncStats for this sync
+
+        Raises:
+            ValueError: If the knowledge base was built with different
+                chunking or embedding settings
+        """
+        started = time.perf_counter()
+        checkpoint = self._read_checkpoint()
+        if checkpoint is not None and not checkpoint["complete"]:
+            # Finish the interrupted run; the comparison below then also
+            # catches files changed before its resume point
+            self.run(roots, resume=True, suffixes=suffixes)
+            checkpoint = self._read_checkpoint()
+        if checkpoint is None or not (self.directory / Manifest.FILE).exists():
+            stats = self.run(roots, resume=False, suffixes=suffixes)
+            return SyncStats(stats.documents, 0, 0, 0, stats.chunks, stats.embedded,
+                             time.perf_counter() - started)
+        self._check_settings(checkpoint)
+
+        kb = KnowledgeBase.open(self.directory, self.embedder)
+        manifest = Manifest(self.directory / Manifest.FILE)
+        # Roll back the rows of an interrupted sync; readers never saw them
+        kb.truncate(checkpoint["rows"])
+        manifest.truncate(len(kb))
+        cache = self._open_cache(kb)
+        executor = self.executor or ThreadPoolExecutor(self.workers,
+                                                       thread_name_prefix="intramind-sync")
+        added = changed = unchanged = chunks = embedded_chunks = 0
+        last_key = tuple(checkpoint["last_source"]) if checkpoint["last_source"] else None
+        replaced: List[range] = []
+
+        def changed_sources() -> Iterator[Source]:
+            nonlocal added, changed, unchanged, last_key
+            # Manifest lookups run here; stat and hashing run on the executor
+            items = ((source, manifest.get(source.doc_id))
+                     for source in iter_sources(roots, suffixes))
+            for source, record, stamp in ordered_map(_check_source, items, executor,
+                                                     self.workers * 2):
+                manifest.mark_seen(source.doc_id)
+                last_key = source.key if last_key is None else max(last_key, source.key)
+                if stamp is None:
+                    unchanged += 1
+                elif record is not None and stamp.digest == record.digest:
+                    manifest.put_many([record._replace(size=stamp.size, mtime_ns=stamp.mtime_ns)])
+                    unchanged += 1
+                else:
+                    if record is None:
+                        added += 1
+                    else:
+                        changed += 1
+                        replaced.append(record.row_range)
+                    yield source
+
+        try:
+            for batch, finished in self._ingest(kb, cache, changed_sources(), executor):
+                chunks += len(batch.pieces)
+                embedded_chunks += len(batch.missing)
+                manifest.put_many(record for _, record in finished)
+            removed = manifest.unseen()
+            manifest.remove_many(record.doc_id for record in removed)
+            kb.delete(row for rows in replaced + [r.row_range for r in removed] for row in rows)
+            self._write_checkpoint(kb, manifest, len(kb), last_key, complete=True)
+            if cache is not None:
+                cache.sync()
+                self._collect_cache(cache, kb)
+            self._update_index(kb, rebuild=False)
+        finally:
+            if self.executor is None:
+                executor.shutdown(wait=True, cancel_futures=True)
+            if cache is not None:
+                cache.close()
+            manifest.close()
+            kb.close()
+
+        stats = SyncStats(added, changed, len(removed), unchanged, chunks, embedded_chunks,
+                          time.perf_counter() - started)
+        logger.info(f"Sync finished: {stats.added} added, {stats.changed} changed, "
+                    f"{stats.deleted} deleted, {stats.unchanged} unchanged; {stats.chunks} chunks "
+                    f"({stats.embedded} embedded) in {stats.seconds:.1f}s")
+        return stats
@@ -0,0 +1,432 @@
+"""
+Knowledge base storage and retrieval for IntraMind.
+
+A knowledge base is a directory holding chunk texts (ChunkStore), their
+vectors (FlatIndex, optionally with an IVFIndex built over them), a BM25
+keyword index and a small metadata file naming the embedding model.
+Documents are added by the IngestionPipeline; ChatBot searches the
+knowledge base to ground its answers.
+
+One process writes a knowledge base while others search it. The writer
+appends and tombstones rows, then publishes the number of complete rows
+in ``state.json``; readers notice the new state and switch each index
+to it (new vector rows, BM25 segment list, IVF generation) without
+stopping searches.
+"""
+
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import Any, Iterable, List, NamedTuple, Optional, Sequence, Tuple, Union
+import logging
+
+import numpy as np
+
+from intramind.knowledge.bm25 import BM25Index
+from intramind.knowledge.chunk_store import Chunk, ChunkStore
+from intramind.knowledge.ranking import HybridRanker
+from intramind.knowledge.vector_index import FlatIndex, IVFIndex
+from intramind.services.embeddings import Embedder
+
+logger = logging.getLogger(__name__)
+
+
+class SearchHit(NamedTuple):
+    """
+    A retrieved chunk.
+
+    Attributes:
+        chunk_id: Stable chunk identifier ("<doc_id>#<position>")
+        doc_id: Identifier of the source document
+        text: Chunk text
+        score: Similarity to the query (cosine, for normalized embedders,
+            in vector mode; BM25 or fused score otherwise)
+        row: Row number of the chunk in the knowledge base
+    """
+    chunk_id: str
+    doc_id: str
+    text: str
+    score: float
+    row: int
+
+
+class KnowledgeBase:
+    """
+    On-disk store of embedded document chunks.
+
+    Example:
+        >>> kb = KnowledgeBase.open("kb/")
+        >>> for hit in kb.search("How do I reset my password?", k=3):
+        ...     print(hit.doc_id, hit.score)
+    """
+
+    META_FILE = "meta.json"
+    STATE_FILE = "state.json"
+    KEYWORD_DIR = "bm25"
+    RETRIEVAL_MODES = ("vector", "keyword", "hybrid")
+    FILES = ("meta.json", "vectors.f32", "vectors.deleted", "chunks.jsonl", "chunks.offsets",
+             "checkpoint.json", "manifest.sqlite3", "manifest.sqlite3-journal", STATE_FILE,
+             IVFIndex.META_FILE)
+
+    def __init__(self, directory: Union[str, Path], embedder: Embedder, dimension: int,
+                 nprobe: int = 8, retrieval: str = "hybrid",
+                 ranker: Optional[HybridRanker] = None, refresh_interval: float = 1.0):
+        """
+        Open the knowledge base files. Use create() or open() instead.
+
+        Args:
+            directory: Knowledge base directory
+            embedder: Embedder used for queries (and ingestion)
+            dimension: Vector length
+            nprobe: Inverted lists searched per query when an IVF index
+                has been built
+            retrieval: "vector", "keyword" (BM25) or "hybrid" (both, fused)
+            ranker: Fuses vector and keyword hits in hybrid mode
+                (default: reciprocal rank fusion)
+            refresh_interval: Seconds between checks for a state published
+                by another process (0 disables them)
+        """
+        if retrieval not in self.RETRIEVAL_MODES:
+            raise ValueError(f"retrieval must be one of {list(self.RETRIEVAL_MODES)}")
+        self.directory = Path(directory)
+        self.embedder = embedder
+        self.dimension = dimension
+        self.nprobe = nprobe
+        self.chunks = ChunkStore(self.directory)
+        self.vectors = FlatIndex(self.directory / "vectors.f32", dimension)
+        self.index: Union[FlatIndex, IVFIndex] = self.vectors
+        if IVFIndex.exists(self.directory):
+            self.index = IVFIndex(self.vectors, self.directory, nprobe)
+        self.retrieval = retrieval
+        self.ranker = ranker or HybridRanker()
+        self.keywords = BM25Index(self.directory / self.KEYWORD_DIR)
+        if self.keywords.covered_rows < len(self):
+            self._reindex_keywords(self.keywords.covered_rows, len(self))
+        self.refresh_interval = refresh_interval
+        self._state_id = self._stat_state()
+        self._checked = time.monotonic()
+
+    @classmethod
+    def create(cls, directory: Union[str, Path], embedder: Embedder,
+               overwrite: bool = False) -> "KnowledgeBase":
+        """
+        Create a knowledge base, or reopen one built with the same embedder.
+
+        Args:
+            directory: Knowledge base directory (created if missing)
+            embedder: Embedder for chunk and query vectors
+            overwrite: Delete any existing knowledge base files first
+
+        Returns:
+            KnowledgeBase instance
+        """
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        dimension = None
+        if overwrite and (directory / cls.META_FILE).exists():
+            with open(directory / cls.META_FILE, encoding="utf-8") as f:
+                meta = json.load(f)
+            if meta["model_id"] == embedder.model_id:
+                dimension = meta["dimension"]
+        if overwrite:
+            for name in cls.FILES:
+                if (directory / name).exists():
+                    os.remove(directory / name)
+            for generation in directory.glob("ivf-*"):
+                shutil.rmtree(generation, ignore_errors=True)
+            shutil.rmtree(directory / cls.KEYWORD_DIR, ignore_errors=True)
+        elif (directory / cls.META_FILE).exists():
+            return cls.open(directory, embedder)
+
+        if dimension is None:
+            dimension = int(embedder.embed_one("dimension probe").shape[0])
+        with open(directory / cls.META_FILE, "w", encoding="utf-8") as f:
+            json.dump({"model_id": embedder.model_id, "dimension": dimension}, f)
+        return cls(directory, embedder, dimension)
+
+    @classmethod
+    def open(cls, directory: Union[str, Path], embedder: Optional[Embedder] = None,
+             nprobe: int = 8, retrieval: str = "hybrid", ranker: Optional[HybridRanker] = None,
+             refresh_interval: float = 1.0) -> "KnowledgeBase":
+        """
+        Open an existing knowledge base.
+
+        Args:
+            directory: Knowledge base directory
+            embedder: Embedder for queries. Defaults to the model the
+                knowledge base was built with.
+            nprobe: Inverted lists searched per query (IVF only)
+            retrieval: "vector", "keyword" or "hybrid"
+            ranker: Fuses vector and keyword hits in hybrid mode
+            refresh_interval: Seconds between checks for newly published
+                documents (0 disables them)
+
+        Returns:
+            KnowledgeBase instance
+
+        Raises:
+            FileNotFoundError: If the directory holds no knowledge base
+            ValueError: If the embedder differs from the one used to build it
+        """
+        directory = Path(directory)
+        with open(directory / cls.META_FILE, encoding="utf-8") as f:
+            meta = json.load(f)
+        if embedder is None:
+            from intramind.services.embeddings import create_embedder
+
+            embedder = create_embedder(meta["model_id"])
+        elif embedder.model_id != meta["model_id"]:
+            raise ValueError(f"knowledge base was built with {meta['model_id']}, "
+                             f"not {embedder.model_id}")
+        return cls(directory, embedder, meta["dimension"], nprobe=nprobe, retrieval=retrieval,
+                   ranker=ranker, refresh_interval=refresh_interval)
+
+    @classmethod
+    def from_config(cls, config: Any) -> "KnowledgeBase":
+        """
+        Open the knowledge base at ``knowledge_base_path``.
+
+        Args:
+            config: Configuration object
+
+        Returns:
+            KnowledgeBase instance
+        """
+        ranker = HybridRanker(config.knowledge_hybrid_method, alpha=config.knowledge_hybrid_alpha)
+        return cls.open(config.knowledge_base_path, nprobe=config.knowledge_ivf_nprobe,
+                        retrieval=config.knowledge_retrieval, ranker=ranker,
+                        refresh_interval=config.knowledge_refresh_interval)
+
+    def __len__(self) -> int:
+        # An interrupted ingestion may leave one file a batch ahead
+        return min(len(self.chunks), len(self.vectors))
+
+    @property
+    def live(self) -> int:
+        """Number of chunks that have not been deleted."""
+        return self.vectors.live - (len(self.vectors) - len(self))
+
+    @property
+    def generation(self) -> str:
+        """
+        Identifier of the published state searches run against.
+
+        Checks for a newer state first, so it changes once a state
+        published by the writer has been picked up.
+        """
+        self._maybe_refresh()
+        state = self._state_id
+        return "" if state is None else f"{state[0]}.{state[1]}"
+
+    def append(self, chunks: Sequence[Chunk], vectors: np.ndarray) -> None:
+        """
+        Add embedded chunks.
+
+        Args:
+            chunks: Chunks to add
+            vectors: Their vectors, one row per chunk
+        """
+        if len(chunks) != len(vectors):
+            raise ValueError(f"got {len(vectors)} vectors for {len(chunks)} chunks")
+        start = len(self)
+        self.vectors.append(vectors)
+        self.chunks.append(chunks)
+        self.keywords.add(range(start, start + len(chunks)), [chunk.text for chunk in chunks])
+
+    def _reindex_keywords(self, start: int, stop: int) -> None:
+        """Add rows [start, stop) to the keyword index from the chunk store."""
+        logger.info(f"Indexing keywords of rows {start}-{stop} in {self.directory}")
+        batch = 4096
+        for first in range(start, stop, batch):
+            rows = range(first, min(first + batch, stop))
+            self.keywords.add(rows, [self.chunks.get(row).text for row in rows])
+        self.keywords.flush(self.vectors.deleted())
+
+    def delete(self, rows: Iterable[int]) -> int:
+        """
+        Delete chunks so searches no longer return them.
+
+        Args:
+            rows: Row numbers of the chunks
+
+        Returns:
+            Number of chunks newly deleted
+        """
+        return self.vectors.delete(rows)
+
+    def build_index(self, nlist: Optional[int] = None) -> IVFIndex:
+        """
+        Build (or rebuild) the IVF index over the current chunks.
+
+        Searches switch to the new index once it is published; chunks
+        added later are searched exactly until the next build.
+
+        Args:
+            nlist: Number of inverted lists (default: about 4 * sqrt(rows))
+
+        Returns:
+            The new IVFIndex
+        """
+        self.vectors.sync()
+        self.index = IVFIndex.build(self.vectors, self.directory, nlist=nlist,
+                                    nprobe=self.nprobe)
+        return self.index
+
+    def sync(self) -> None:
+        """Flush all files to disk, writing buffered keywords as a segment."""
+        self.vectors.sync()
+        self.chunks.sync()
+        self.keywords.flush(self.vectors.deleted())
+
+    def _stat_state(self) -> Optional[Tuple[int, int]]:
+        """Identity of the published state file; os.replace() changes it."""
+        try:
+            stat = os.stat(self.directory / self.STATE_FILE)
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns
+
+    def publish(self, rows: Optional[int] = None) -> None:
+        """
+        Make chunks visible to readers in other processes.
+
+        Call after sync(); the first ``rows`` rows must be complete.
+
+        Args:
+            rows: Number of rows to publish (default: all)
+        """
+        path = self.directory / self.STATE_FILE
+        tmp = path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"rows": len(self) if rows is None else rows}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+        self._state_id = self._stat_state()
+
+    def refresh(self) -> bool:
+        """
+        Switch to the state last published by the writing process.
+
+        Every index moves to the new state in one assignment, so searches
+        already running finish on the previous one and none wait.
+
+        Returns:
+            True if a newer state was loaded
+        """
+        state_id = self._stat_state()
+        if state_id is None or state_id == self._state_id:
+            return False
+        try:
+            with open(self.directory / self.STATE_FILE, encoding="utf-8") as f:
+                rows = json.load(f)["rows"]
+            self.keywords.refresh()
+            if IVFIndex.exists(self.directory):
+                if isinstance(self.index, IVFIndex):
+                    self.index.refresh()
+                else:
+                    self.index = IVFIndex(self.vectors, self.directory, self.nprobe)
+            else:
+                self.index = self.vectors
+        except FileNotFoundError:
+            # The writer replaced files while we read them; retry on the next check
+            return False
+        self.vectors.refresh(rows)
+        self.chunks.refresh(rows)
+        self._state_id = state_id
+        logger.info(f"Refreshed knowledge base {self.directory}: {rows} rows")
+        return True
+
+    def _maybe_refresh(self) -> None:
+        if self.refresh_interval <= 0:
+            return
+        now = time.monotonic()
+        if now - self._checked >= self.refresh_interval:
+            self._checked = now
+            self.refresh()
+
+    def truncate(self, rows: int) -> None:
+        """
+        Drop every chunk from row ``rows`` on.
+
+        Args:
+            rows: Number of rows to keep
+        """
+        if isinstance(self.index, IVFIndex) and rows < self.index.built_rows:
+            # The lists refer to rows being dropped; fall back to exact search
+            os.remove(self.directory / IVFIndex.META_FILE)
+            self.index = self.vectors
+        self.vectors.truncate(rows)
+        self.chunks.truncate(rows)
+        covered = self.keywords.truncate(rows)
+        if covered < rows:
+            self._reindex_keywords(covered, rows)
+
+    def search(self, query: str, k: int = 3, min_score: float = 0.0) -> List[SearchHit]:
+        """
+        Find the chunks most relevant to a query.
+
+        Args:
+            query: Query text
+            k: Maximum number of hits
+            min_score: Drop vector hits scoring below this (keyword hits
+                are kept: an exact term match is evidence on its own)
+
+        Returns:
+            Hits, best first
+        """
+        return self.search_batch([query], k, min_score)[0]
+
+    def search_batch(self, queries: Sequence[str], k: int = 3,
+                     min_score: float = 0.0) -> List[List[SearchHit]]:
+        """
+        Search several queries with one pass over the vector index.
+
+        Args:
+            queries: Query texts
+            k: Maximum number of hits per query
+            min_score: Drop vector hits scoring below this
+
+        Returns:
+            One list of hits per query, best first
+        """
+        if not queries:
+            return []
+        self._maybe_refresh()
+        rows = len(self)
+        # Fusion needs more than k candidates from each side
+        depth = k if self.retrieval == "vector" else max(4 * k, 20)
+        empty = (np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32))
+        vector_hits = [empty] * len(queries)
+        if self.retrieval != "keyword":
+            ids, scores = self.index.search(self.embedder.embed(list(queries)), depth)
+            keep = (ids >= 0) & (ids < rows) & (scores >= min_score)
+            vector_hits = [(i[m], s[m]) for i, s, m in zip(ids, scores, keep)]
+
+        deleted = self.vectors.deleted() if self.vectors.live < len(self.vectors) else None
+        results = []
+        for query, vector in zip(queries, vector_hits):
+            if self.retrieval == "vector":
+                ranked = list(zip(*(side.tolist() for side in vector)))
+            else:
+                keyword_ids, keyword_scores = self.keywords.search(query, depth, deleted)
+                keep = keyword_ids < rows
+                keyword = (keyword_ids[keep], keyword_scores[keep])
+                if self.retrieval == "keyword":
+                    ranked = list(zip(*(side.tolist() for side in keyword)))[:k]
+                else:
+                    ranked = self.ranker.fuse(vector, keyword, k)
+            hits = []
+            for row, score in ranked:
+                chunk = self.chunks.get(row)
+                hits.append(SearchHit(chunk.chunk_id, chunk.doc_id, chunk.text, score, row))
+            results.append(hits)
+        return results
+
+    def close(self) -> None:
+        """Close the knowledge base files."""
+        self.keywords.close()
+        self.vectors.close()
+        self.chunks.close()
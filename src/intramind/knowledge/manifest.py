@@ -0,0 +1,184 @@
+"""
+Source document manifest for incremental IntraMind ingestion.
+
+The manifest records, for every ingested document, the size,
+modification time and content hash of its file and the knowledge base
+rows holding its chunks. A sync compares the files under the ingestion
+roots against it: matching size and mtime mean a file is unchanged, and
+only files whose stat differs are hashed, so a file that was touched
+but not edited is not ingested again.
+
+It is a SQLite database in the knowledge base directory. Changes are
+made inside one transaction and become durable together on commit().
+"""
+
+import hashlib
+import os
+import sqlite3
+from pathlib import Path
+from typing import Iterable, Iterator, List, NamedTuple, Optional, Union
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Bytes read per step while hashing a file
+HASH_BLOCK_BYTES = 1 << 20
+
+
+class Fingerprint(NamedTuple):
+    """
+    Identity of a file's content.
+
+    Attributes:
+        size: File size in bytes
+        mtime_ns: Modification time in nanoseconds
+        digest: Hex BLAKE2b digest of the file bytes
+    """
+    size: int
+    mtime_ns: int
+    digest: str
+
+
+class DocumentRecord(NamedTuple):
+    """
+    A document in the manifest.
+
+    Attributes:
+        doc_id: Identifier of the document
+        size: File size when it was ingested
+        mtime_ns: File modification time when it was ingested
+        digest: Content digest when it was ingested
+        first_row: First knowledge base row of its chunks
+        rows: Number of chunks (consecutive rows from first_row)
+    """
+    doc_id: str
+    size: int
+    mtime_ns: int
+    digest: str
+    first_row: int
+    rows: int
+
+    @property
+    def row_range(self) -> range:
+        """Knowledge base rows holding the document's chunks."""
+        return range(self.first_row, self.first_row + self.rows)
+
+
+def fingerprint(path: Union[str, Path]) -> Fingerprint:
+    """
+    Stat and hash a file.
+
+    The stat is taken before reading, so a file modified while it is
+    hashed looks changed again at the next sync rather than unchanged.
+
+    Args:
+        path: File to fingerprint
+
+    Returns:
+        Fingerprint of the file
+    """
+    stat = os.stat(path)
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_BYTES), b""):
+            digest.update(block)
+    return Fingerprint(stat.st_size, stat.st_mtime_ns, digest.hexdigest())
+
+
+class Manifest:
+    """
+    Persistent table of ingested documents.
+
+    Example:
+        >>> manifest = Manifest("kb/manifest.sqlite3")
+        >>> record = manifest.get("docs/guide.md")
+        >>> record.row_range
+        range(120, 134)
+    """
+
+    FILE = "manifest.sqlite3"
+
+    def __init__(self, path: Union[str, Path]):
+        """
+        Open (or create) a manifest database.
+
+        Args:
+            path: Database file
+        """
+        self.path = Path(path)
+        self._db = sqlite3.connect(str(self.path))
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS documents ("
+            " doc_id TEXT PRIMARY KEY, size INTEGER NOT NULL, mtime_ns INTEGER NOT NULL,"
+            " digest TEXT NOT NULL, first_row INTEGER NOT NULL, rows INTEGER NOT NULL)")
+        self._db.execute("CREATE TEMP TABLE seen (doc_id TEXT PRIMARY KEY)")
+        self._db.commit()
+
+    def __len__(self) -> int:
+        return self._db.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+
+    def get(self, doc_id: str) -> Optional[DocumentRecord]:
+        """
+        Look up one document.
+
+        Args:
+            doc_id: Document identifier
+
+        Returns:
+            Its record, or None if it is not in the manifest
+        """
+        row = self._db.execute("SELECT * FROM documents WHERE doc_id = ?", (doc_id,)).fetchone()
+        return DocumentRecord(*row) if row else None
+
+    def put_many(self, records: Iterable[DocumentRecord]) -> None:
+        """Insert or replace records."""
+        self._db.executemany("INSERT OR REPLACE INTO documents VALUES (?, ?, ?, ?, ?, ?)",
+                             records)
+
+    def remove_many(self, doc_ids: Iterable[str]) -> None:
+        """Remove documents from the manifest."""
+        self._db.executemany("DELETE FROM documents WHERE doc_id = ?",
+                             ((doc_id,) for doc_id in doc_ids))
+
+    def mark_seen(self, doc_id: str) -> None:
+        """Note a document found by the current scan (see unseen())."""
+        self._db.execute("INSERT OR IGNORE INTO seen VALUES (?)", (doc_id,))
+
+    def unseen(self) -> List[DocumentRecord]:
+        """
+        Records of documents not marked seen since the last call.
+
+        Returns:
+            Documents whose files have disappeared, in row order
+        """
+        rows = self._db.execute(
+            "SELECT * FROM documents WHERE doc_id NOT IN (SELECT doc_id FROM seen)"
+            " ORDER BY first_row").fetchall()
+        self._db.execute("DELETE FROM seen")
+        return [DocumentRecord(*row) for row in rows]
+
+    def truncate(self, rows: int) -> int:
+        """
+        Remove documents whose chunks extend to row ``rows`` or beyond.
+
+        Args:
+            rows: Number of knowledge base rows being kept
+
+        Returns:
+            Number of documents removed
+        """
+        return self._db.execute("DELETE FROM documents WHERE first_row + rows > ?",
+                                (rows,)).rowcount
+
+    def __iter__(self) -> Iterator[DocumentRecord]:
+        for row in self._db.execute("SELECT * FROM documents ORDER BY first_row"):
+            yield DocumentRecord(*row)
+
+    def commit(self) -> None:
+        """Make every change since the last commit durable."""
+        self._db.commit()
+
+    def close(self) -> None:
+        """Discard uncommitted changes and close the database."""
+        self._db.rollback()
+        self._db.close()
@@ -0,0 +1,72 @@
+"""
+Hybrid ranking for IntraMind knowledge base search.
+
+Fuses the vector and BM25 result lists for a query into one ranking,
+either by reciprocal rank fusion (scale-free, robust default) or by a
+weighted sum of min-max normalized scores.
+"""
+
+from typing import Dict, List, Tuple
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+FUSION_METHODS = ("rrf", "weighted")
+
+
+class HybridRanker:
+    """
+    Fuse vector and keyword hits.
+
+    Example:
+        >>> ranker = HybridRanker("rrf")
+        >>> ranker.fuse((vector_rows, vector_scores), (bm25_rows, bm25_scores), k=5)
+        [(12, 0.032), (7, 0.016), ...]
+    """
+
+    def __init__(self, method: str = "rrf", alpha: float = 0.5, rrf_k: int = 60):
+        """
+        Initialize the ranker.
+
+        Args:
+            method: "rrf" (reciprocal rank fusion) or "weighted"
+            alpha: Weight of the vector side (1 - alpha for keywords)
+            rrf_k: RRF damping constant; larger values flatten rank differences
+        """
+        if method not in FUSION_METHODS:
+            raise ValueError(f"method must be one of {list(FUSION_METHODS)}")
+        self.method = method
+        self.alpha = alpha
+        self.rrf_k = rrf_k
+
+    def _contributions(self, scores: np.ndarray, weight: float) -> np.ndarray:
+        if self.method == "rrf":
+            return weight / (self.rrf_k + 1 + np.arange(len(scores)))
+        low, high = float(scores.min()), float(scores.max())
+        if high - low < 1e-12:
+            return np.full(len(scores), weight)
+        return weight * (scores - low) / (high - low)
+
+    def fuse(self, vector: Tuple[np.ndarray, np.ndarray], keyword: Tuple[np.ndarray, np.ndarray],
+             k: int) -> List[Tuple[int, float]]:
+        """
+        Combine two ranked result lists.
+
+        Args:
+            vector: (rows, scores) from vector search, best first
+            keyword: (rows, scores) from BM25 search, best first
+            k: Number of results
+
+        Returns:
+            (row, fused score) pairs, best first
+        """
+        fused: Dict[int, float] = {}
+        for (rows, scores), weight in ((vector, self.alpha), (keyword, 1 - self.alpha)):
+            if not len(rows):
+                continue
+            contributions = self._contributions(np.asarray(scores, dtype=np.float64), weight)
+            for row, contribution in zip(np.asarray(rows).tolist(), contributions.tolist()):
+                fused[row] = fused.get(row, 0.0) + contribution
+        return sorted(fused.items(), key=lambda item: (-item[1], item[0]))[:k]
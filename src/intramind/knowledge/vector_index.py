@@ -0,0 +1,571 @@
+"""
+Vector indexes for the IntraMind knowledge base.
+
+Vectors live in a raw float32 file that is appended to during ingestion
+and memory-mapped for search, so an index larger than RAM is scanned
+page by page instead of being loaded into the heap, and worker processes
+that open the same knowledge base share one copy of its pages through
+the OS page cache.
+
+FlatIndex scores every row exactly. IVFIndex clusters the rows into
+inverted lists, stored contiguously on disk, and scores only the lists
+nearest to each query, trading a little recall for much lower latency.
+"""
+
+import json
+import os
+import shutil
+import uuid
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Rows scored per block during a search scan
+SEARCH_BLOCK_ROWS = 65536
+
+
+def top_k(scores: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Select the k highest scores of each row.
+
+    Args:
+        scores: 2-D array of scores, one row per query
+        k: Number of results per row
+
+    Returns:
+        (indices, scores) arrays of shape (rows, min(k, columns)), best first
+    """
+    k = min(k, scores.shape[1])
+    if k == 0:
+        empty = np.empty((scores.shape[0], 0))
+        return empty.astype(np.int64), empty.astype(np.float32)
+    if k < scores.shape[1]:
+        part = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    else:
+        part = np.broadcast_to(np.arange(scores.shape[1]), scores.shape)
+    part_scores = np.take_along_axis(scores, part, axis=1)
+    order = np.argsort(-part_scores, axis=1, kind="stable")
+    return np.take_along_axis(part, order, axis=1), np.take_along_axis(part_scores, order, axis=1)
+
+
+def recall_at_k(approximate: np.ndarray, exact: np.ndarray) -> float:
+    """
+    Fraction of the exact top-k ids that an approximate search returned.
+
+    Args:
+        approximate: (queries, k) ids from the approximate index
+        exact: (queries, k) ids from an exact search
+
+    Returns:
+        Mean recall over the queries, between 0 and 1
+    """
+    found = sum(len(np.intersect1d(a[a >= 0], e[e >= 0])) for a, e in zip(approximate, exact))
+    total = sum(int((e >= 0).sum()) for e in exact)
+    return found / total if total else 1.0
+
+
+def _mask_deleted(scores: np.ndarray, rows: np.ndarray, deleted: np.ndarray) -> np.ndarray:
+    """Set the scores of deleted rows to -inf, in place."""
+    if len(deleted):
+        scores[:, deleted[rows].astype(bool)] = -np.inf
+    return scores
+
+
+def _drop_deleted(ids: np.ndarray, scores: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Replace hits on deleted rows (score -inf) with id -1."""
+    ids = np.where(np.isneginf(scores), -1, ids)
+    return ids, scores
+
+
+class FlatIndex:
+    """
+    Exact inner-product index over an append-only vector file.
+
+    Row numbers are the vector ids. Rows are appended in batches during
+    ingestion; searches memory-map the file and score it in blocks, so
+    memory use stays bounded however many rows there are. Deleted rows
+    are flagged in a one-byte-per-row tombstone file and skipped by
+    searches; their ids are never reused.
+
+    Example:
+        >>> index = FlatIndex("kb/vectors.f32", dimension=512)
+        >>> index.append(vectors)
+        >>> ids, scores = index.search(query_vectors, k=5)
+    """
+
+    def __init__(self, path: Union[str, Path], dimension: int):
+        """
+        Open (or create) an index file.
+
+        Args:
+            path: Path of the raw float32 vector file
+            dimension: Vector length
+        """
+        self.path = Path(path)
+        self.dimension = dimension
+        self.path.touch(exist_ok=True)
+        self._file = open(self.path, "r+b")
+        self._file.seek(0, os.SEEK_END)
+        self._rows = self._file.tell() // self._row_bytes
+        self._map: Optional[np.memmap] = None
+        self.deleted_path = self.path.with_suffix(".deleted")
+        self.deleted_path.touch(exist_ok=True)
+        self._deleted = open(self.deleted_path, "r+b")
+        self._deleted.truncate(self._rows)
+        self._deleted_map: Optional[np.memmap] = None
+        self._deleted_count: Optional[int] = None
+
+    @property
+    def _row_bytes(self) -> int:
+        return self.dimension * 4
+
+    def __len__(self) -> int:
+        return self._rows
+
+    def append(self, vectors: np.ndarray) -> None:
+        """
+        Append vectors to the end of the index.
+
+        Args:
+            vectors: float32 array of shape (n, dimension)
+        """
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        if vectors.ndim != 2 or vectors.shape[1] != self.dimension:
+            raise ValueError(f"expected vectors of shape (n, {self.dimension}), "
+                             f"got {vectors.shape}")
+        self._file.seek(self._rows * self._row_bytes)
+        self._file.write(vectors.tobytes())
+        self._rows += len(vectors)
+        self._deleted.truncate(self._rows)
+        self._map = None
+        self._deleted_map = None
+
+    def delete(self, ids: Iterable[int]) -> int:
+        """
+        Flag rows as deleted so searches skip them.
+
+        Args:
+            ids: Row numbers to delete
+
+        Returns:
+            Number of rows newly deleted
+        """
+        flags = self.deleted()
+        newly = 0
+        for row in sorted(set(int(i) for i in ids)):
+            if 0 <= row < self._rows and not flags[row]:
+                self._deleted.seek(row)
+                self._deleted.write(b"\x01")
+                newly += 1
+        if newly:
+            self._deleted.flush()
+            self._deleted_map = None
+            self._deleted_count = None
+        return newly
+
+    def deleted(self) -> np.ndarray:
+        """Return a read-only memory map of the per-row tombstone flags."""
+        if self._rows == 0:
+            return np.zeros(0, dtype=np.uint8)
+        if self._deleted_map is None or len(self._deleted_map) != self._rows:
+            self._deleted.flush()
+            self._deleted_map = np.memmap(self.deleted_path, dtype=np.uint8, mode="r",
+                                          shape=(self._rows,))
+        return self._deleted_map
+
+    @property
+    def live(self) -> int:
+        """Number of rows that are not deleted."""
+        if self._deleted_count is None:
+            self._deleted_count = int(np.count_nonzero(self.deleted()))
+        return self._rows - self._deleted_count
+
+    def sync(self) -> None:
+        """Flush appended vectors and deletions to disk."""
+        for handle in (self._file, self._deleted):
+            handle.flush()
+            os.fsync(handle.fileno())
+
+    def truncate(self, rows: int) -> None:
+        """
+        Drop every row from ``rows`` on, e.g. to roll back to a checkpoint.
+
+        Args:
+            rows: Number of rows to keep
+        """
+        self._map = None
+        self._deleted_map = None
+        self._deleted_count = None
+        self._file.truncate(rows * self._row_bytes)
+        self._rows = min(self._rows, rows)
+        self._deleted.truncate(self._rows)
+
+    def refresh(self, rows: Optional[int] = None) -> None:
+        """
+        Pick up rows appended and deleted by another process.
+
+        Args:
+            rows: Rows the writer has published; rows beyond it may still
+                be incomplete and are ignored
+        """
+        self._file.seek(0, os.SEEK_END)
+        available = self._file.tell() // self._row_bytes
+        self._rows = available if rows is None else min(rows, available)
+        self._map = None
+        self._deleted_map = None
+        self._deleted_count = None
+
+    def vectors(self) -> np.ndarray:
+        """Return a read-only memory map of all rows."""
+        if self._rows == 0:
+            return np.empty((0, self.dimension), dtype=np.float32)
+        if self._map is None or len(self._map) != self._rows:
+            self._file.flush()
+            self._map = np.memmap(self.path, dtype=np.float32, mode="r",
+                                  shape=(self._rows, self.dimension))
+        return self._map
+
+    def search(self, queries: np.ndarray, k: int = 10) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Find the rows with the highest inner product for each query.
+
+        Args:
+            queries: float32 array of shape (q, dimension), or one vector
+            k: Number of results per query
+
+        Returns:
+            (ids, scores) arrays of shape (q, min(k, len(self))), best first
+        """
+        return self.search_range(queries, k, 0, self._rows)
+
+    def search_range(self, queries: np.ndarray, k: int, start: int,
+                     stop: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Exact search restricted to rows ``start`` to ``stop``.
+
+        Deleted rows are never returned; when fewer than k live rows
+        match, the remaining slots hold id -1 and score -inf.
+
+        Args:
+            queries: float32 array of shape (q, dimension), or one vector
+            k: Number of results per query
+            start: First row to score
+            stop: Row after the last row to score
+
+        Returns:
+            (ids, scores) arrays, best first
+        """
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        vectors = self.vectors()
+        deleted = self.deleted() if self.live < self._rows else np.zeros(0, dtype=np.uint8)
+        best_ids: List[np.ndarray] = []
+        best_scores: List[np.ndarray] = []
+        for block_start in range(start, stop, SEARCH_BLOCK_ROWS):
+            block_stop = min(stop, block_start + SEARCH_BLOCK_ROWS)
+            scores = queries @ vectors[block_start:block_stop].T
+            _mask_deleted(scores, np.arange(block_start, block_stop), deleted)
+            ids, scores = top_k(scores, k)
+            best_ids.append(ids + block_start)
+            best_scores.append(scores)
+        if not best_ids:
+            return top_k(np.empty((len(queries), 0), dtype=np.float32), k)
+        ids, scores = np.hstack(best_ids), np.hstack(best_scores)
+        order, scores = top_k(scores, k)
+        return _drop_deleted(np.take_along_axis(ids, order, axis=1), scores)
+
+    def close(self) -> None:
+        """Close the index files."""
+        self._map = None
+        self._deleted_map = None
+        self._file.close()
+        self._deleted.close()
+
+
+def kmeans(vectors: np.ndarray, clusters: int, iterations: int = 10,
+           seed: int = 0) -> np.ndarray:
+    """
+    Spherical k-means over unit vectors.
+
+    Args:
+        vectors: float32 array of shape (n, dimension), n >= clusters
+        clusters: Number of centroids
+        iterations: Lloyd iterations
+        seed: Random seed for the initial centroids
+
+    Returns:
+        float32 array of unit-length centroids, shape (clusters, dimension)
+    """
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(len(vectors), clusters, replace=False)].copy()
+    for _ in range(iterations):
+        assignment = np.argmax(vectors @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignment, vectors)
+        counts = np.bincount(assignment, minlength=clusters)
+        empty = np.flatnonzero(counts == 0)
+        # Reseed empty clusters with random points so every list is used
+        sums[empty] = vectors[rng.choice(len(vectors), len(empty), replace=False)]
+        norms = np.linalg.norm(sums, axis=1, keepdims=True)
+        centroids = np.divide(sums, norms, out=sums, where=norms > 0)
+    return centroids.astype(np.float32)
+
+
+class IVFIndex:
+    """
+    Inverted-file (IVF) approximate index on top of a FlatIndex.
+
+    build() clusters the rows around ``nlist`` centroids and writes each
+    cluster's vectors contiguously (the inverted lists), so a query reads
+    only the ``nprobe`` lists whose centroids are nearest to it. Rows
+    appended after a build form an exact-searched tail until the next
+    build; deletions are read from the FlatIndex tombstones, so both are
+    visible to searches immediately.
+
+    The lists are written to a fresh generation directory and published
+    by atomically replacing ``ivf.json``, so readers (including other
+    processes) keep searching the previous generation until they
+    refresh().
+
+    Example:
+        >>> index = IVFIndex.build(flat, "kb/", nlist=1024)
+        >>> ids, scores = index.search(queries, k=10)
+    """
+
+    META_FILE = "ivf.json"
+
+    def __init__(self, flat: FlatIndex, directory: Union[str, Path], nprobe: int = 8):
+        """
+        Open the published IVF generation of a directory.
+
+        Args:
+            flat: Vector store the lists were built from
+            directory: Directory holding ``ivf.json``
+            nprobe: Lists searched per query
+        """
+        self.flat = flat
+        self.directory = Path(directory)
+        self.nprobe = max(1, nprobe)
+        self.generation: Optional[str] = None
+        self.refresh()
+
+    @classmethod
+    def exists(cls, directory: Union[str, Path]) -> bool:
+        """Whether an IVF generation has been published in a directory."""
+        return (Path(directory) / cls.META_FILE).exists()
+
+    @staticmethod
+    def default_nlist(rows: int) -> int:
+        """Number of lists used when none is given: about 4 * sqrt(rows)."""
+        return int(max(1, min(65536, 4 * np.sqrt(max(rows, 1)))))
+
+    @classmethod
+    def build(cls, flat: FlatIndex, directory: Union[str, Path], nlist: Optional[int] = None,
+              nprobe: int = 8, sample_size: Optional[int] = None,
+              seed: int = 0) -> "IVFIndex":
+        """
+        Cluster the live rows of a FlatIndex and publish the inverted lists.
+
+        Args:
+            flat: Vector store to index
+            directory: Directory to write the generation to
+            nlist: Number of lists (default: default_nlist of the row count)
+            nprobe: Lists searched per query
+            sample_size: Rows sampled to train the centroids
+                (default: 64 per list)
+            seed: Random seed for sampling and training
+
+        Returns:
+            IVFIndex serving the new generation
+        """
+        directory = Path(directory)
+        vectors = flat.vectors()
+        deleted = flat.deleted()
+        live_rows = np.flatnonzero(deleted == 0) if len(deleted) else np.arange(0)
+        nlist = max(1, min(nlist or cls.default_nlist(len(live_rows)), max(len(live_rows), 1)))
+
+        rng = np.random.default_rng(seed)
+        sample_size = min(len(live_rows), sample_size or nlist * 64)
+        if len(live_rows):
+            sample = np.sort(rng.choice(live_rows, sample_size, replace=False))
+            centroids = kmeans(np.asarray(vectors[sample]), nlist, seed=seed)
+        else:
+            centroids = np.zeros((1, flat.dimension), dtype=np.float32)
+            nlist = 1
+
+        # Assign live rows to their nearest centroid, block by block
+        assignment = np.empty(len(live_rows), dtype=np.int32)
+        for start in range(0, len(live_rows), SEARCH_BLOCK_ROWS):
+            rows = live_rows[start:start + SEARCH_BLOCK_ROWS]
+            assignment[start:start + len(rows)] = np.argmax(vectors[rows] @ centroids.T, axis=1)
+        order = np.argsort(assignment, kind="stable")
+        list_rows = live_rows[order].astype(np.int64)
+        offsets = np.zeros(nlist + 1, dtype=np.int64)
+        np.cumsum(np.bincount(assignment, minlength=nlist), out=offsets[1:])
+
+        generation = f"ivf-{uuid.uuid4().hex[:12]}"
+        target = directory / generation
+        target.mkdir(parents=True)
+        centroids.tofile(target / "centroids.f32")
+        list_rows.tofile(target / "rows.i64")
+        offsets.tofile(target / "offsets.i64")
+        with open(target / "lists.f32", "wb") as f:
+            for start in range(0, len(list_rows), SEARCH_BLOCK_ROWS):
+                f.write(np.ascontiguousarray(vectors[list_rows[start:start + SEARCH_BLOCK_ROWS]]))
+            f.flush()
+            os.fsync(f.fileno())
+
+        meta = {"generation": generation, "nlist": nlist, "rows": len(flat),
+                "dimension": flat.dimension}
+        tmp = directory / f"{cls.META_FILE}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+            f.flush()
+            os.fsync(f.fileno())
+        previous = cls._read_meta(directory)
+        os.replace(tmp, directory / cls.META_FILE)
+        if previous and previous["generation"] != generation:
+            # Open maps of the old files stay valid until their readers refresh
+            shutil.rmtree(directory / previous["generation"], ignore_errors=True)
+        logger.info(f"Built IVF index over {len(list_rows)} vectors in {nlist} lists")
+        return cls(flat, directory, nprobe)
+
+    @classmethod
+    def _read_meta(cls, directory: Path) -> Optional[Dict[str, int]]:
+        path = directory / cls.META_FILE
+        if not path.exists():
+            return None
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def refresh(self) -> bool:
+        """
+        Switch to the latest published generation.
+
+        Returns:
+            True if a new generation was loaded
+        """
+        meta = self._read_meta(self.directory)
+        if meta is None:
+            raise FileNotFoundError(f"no IVF index in {self.directory}")
+        if meta["generation"] == self.generation:
+            return False
+        target = self.directory / meta["generation"]
+        dimension = meta["dimension"]
+        self.nlist = meta["nlist"]
+        self.built_rows = meta["rows"]
+        self.centroids = np.fromfile(target / "centroids.f32", dtype=np.float32).reshape(
+            self.nlist, dimension)
+        self.offsets = np.fromfile(target / "offsets.i64", dtype=np.int64)
+        total = int(self.offsets[-1])
+        if total:
+            self.list_rows = np.memmap(target / "rows.i64", dtype=np.int64, mode="r",
+                                       shape=(total,))
+            self.lists = np.memmap(target / "lists.f32", dtype=np.float32, mode="r",
+                                   shape=(total, dimension))
+        else:
+            self.list_rows = np.zeros(0, dtype=np.int64)
+            self.lists = np.zeros((0, dimension), dtype=np.float32)
+        self.generation = meta["generation"]
+        return True
+
+    # Storage operations go to the underlying FlatIndex
+
+    @property
+    def dimension(self) -> int:
+        return self.flat.dimension
+
+    def __len__(self) -> int:
+        return len(self.flat)
+
+    @property
+    def live(self) -> int:
+        return self.flat.live
+
+    @property
+    def tail(self) -> int:
+        """Rows appended since the last build, searched exactly."""
+        return max(0, len(self.flat) - self.built_rows)
+
+    def append(self, vectors: np.ndarray) -> None:
+        self.flat.append(vectors)
+
+    def delete(self, ids: Iterable[int]) -> int:
+        return self.flat.delete(ids)
+
+    def deleted(self) -> np.ndarray:
+        return self.flat.deleted()
+
+    def vectors(self) -> np.ndarray:
+        return self.flat.vectors()
+
+    def sync(self) -> None:
+        self.flat.sync()
+
+    def truncate(self, rows: int) -> None:
+        if rows < self.built_rows:
+            raise ValueError("cannot truncate below the rows of the IVF build; rebuild instead")
+        self.flat.truncate(rows)
+
+    def search(self, queries: np.ndarray, k: int = 10,
+               nprobe: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Approximate search over the nearest lists, plus the exact tail.
+
+        Queries in a batch that probe the same list share one read of it.
+
+        Args:
+            queries: float32 array of shape (q, dimension), or one vector
+            k: Number of results per query
+            nprobe: Lists searched per query (default: the index setting)
+
+        Returns:
+            (ids, scores) arrays of shape (q, k), best first; missing
+            results have id -1 and score -inf
+        """
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        nprobe = min(nprobe or self.nprobe, self.nlist)
+        probes, _ = top_k(queries @ self.centroids.T, nprobe)
+        deleted = self.flat.deleted() if self.flat.live < len(self.flat) \
+            else np.zeros(0, dtype=np.uint8)
+
+        candidate_ids: List[List[np.ndarray]] = [[] for _ in range(len(queries))]
+        candidate_scores: List[List[np.ndarray]] = [[] for _ in range(len(queries))]
+        for list_id in np.unique(probes):
+            start, stop = int(self.offsets[list_id]), int(self.offsets[list_id + 1])
+            if start == stop:
+                continue
+            members = np.flatnonzero((probes == list_id).any(axis=1))
+            rows = np.asarray(self.list_rows[start:stop])
+            scores = _mask_deleted(queries[members] @ self.lists[start:stop].T, rows, deleted)
+            ids, scores = top_k(scores, k)
+            for member, member_ids, member_scores in zip(members, ids, scores):
+                candidate_ids[member].append(rows[member_ids])
+                candidate_scores[member].append(member_scores)
+
+        if self.tail:
+            tail_ids, tail_scores = self.flat.search_range(queries, k, self.built_rows,
+                                                           len(self.flat))
+            for query in range(len(queries)):
+                candidate_ids[query].append(tail_ids[query])
+                candidate_scores[query].append(tail_scores[query])
+
+        result_ids = np.full((len(queries), k), -1, dtype=np.int64)
+        result_scores = np.full((len(queries), k), -np.inf, dtype=np.float32)
+        for query in range(len(queries)):
+            if not candidate_ids[query]:
+                continue
+            ids = np.concatenate(candidate_ids[query])
+            scores = np.concatenate(candidate_scores[query])[None, :]
+            order, best = top_k(scores, k)
+            result_ids[query, :order.shape[1]] = ids[order[0]]
+            result_scores[query, :order.shape[1]] = best[0]
+        return _drop_deleted(result_ids, result_scores)
+
+    def close(self) -> None:
+        """Release the list maps and close the underlying FlatIndex."""
+        self.lists = self.list_rows = None
+        self.flat.close()
@@ -0,0 +1,116 @@
+"""
+AI provider integration for IntraMind.
+
+Defines the provider interface used by the ChatBot to generate and
+stream responses from language models, and create_provider(), which
+builds the provider selected by ``Config.ai_provider``. The HTTP client
+for OpenAI-compatible APIs lives in intramind.services.provider_client
+and is imported only when that provider is used.
+"""
+
+import asyncio
+import os
+import threading
+from abc import ABC, abstractmethod
+from typing import Any, AsyncIterator, Awaitable, Dict, List, Optional, TypeVar
+import logging
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Background event loop that runs provider calls made from synchronous code
+_sync_loop: Optional[asyncio.AbstractEventLoop] = None
+_sync_loop_lock = threading.Lock()
+
+
+class AIProvider(ABC):
+    """
+    Base class for AI model providers.
+
+    Providers receive the conversation as a list of ``{"role", "content"}``
+    messages and produce the assistant reply, either in one piece or as a
+    stream of text chunks.
+    """
+
+    name: str = "base"
+
+    @abstractmethod
+    def stream(self, messages: List[Dict[str, str]], **kwargs: Any) -> AsyncIterator[str]:
+        """
+        Stream the response as text chunks, as the model produces them.
+
+        Args:
+            messages: Conversation messages, oldest first
+            **kwargs: Provider-specific generation options
+
+        Returns:
+            Async iterator of text chunks
+        """
+
+    async def generate(self, messages: List[Dict[str, str]], **kwargs: Any) -> str:
+        """
+        Generate the complete response text.
+
+        The default implementation assembles the stream.
+
+        Args:
+            messages: Conversation messages, oldest first
+            **kwargs: Provider-specific generation options
+
+        Returns:
+            Generated response text
+        """
+        chunks = [chunk async for chunk in self.stream(messages, **kwargs)]
+        return "".join(chunks)
+
+
+def run_sync(coro: Awaitable[T]) -> T:
+    """
+    Run a provider coroutine from synchronous code.
+
+    All synchronous callers in a process share one background event loop,
+    so connections pooled by the provider survive between calls (a new
+    loop per call, as asyncio.run would create, cannot reuse them).
+
+    Args:
+        coro: Coroutine to run
+
+    Returns:
+        The coroutine's result
+    """
+    global _sync_loop
+    with _sync_loop_lock:
+        if _sync_loop is None:
+            _sync_loop = asyncio.new_event_loop()
+            threading.Thread(target=_sync_loop.run_forever, name="intramind-provider-loop",
+                             daemon=True).start()
+    return asyncio.run_coroutine_threadsafe(coro, _sync_loop).result()
+
+
+def _reset_sync_loop() -> None:
+    """Forget the parent's background loop in a forked child; its thread is gone."""
+    global _sync_loop, _sync_loop_lock
+    _sync_loop = None
+    _sync_loop_lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_sync_loop)
+
+
+def create_provider(config: Any) -> Optional[AIProvider]:
+    """
+    Create the provider selected by ``config.ai_provider``.
+
+    Args:
+        config: Configuration object
+
+    Returns:
+        AIProvider, or None for ``none`` (placeholder responses)
+    """
+    if config.ai_provider == "none":
+        return None
+    from intramind.services.provider_client import OpenAIProvider
+
+    return OpenAIProvider.from_config(config)
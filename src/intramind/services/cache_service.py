@@ -0,0 +1,419 @@
+"""
+Response caching for IntraMind.
+
+Provides a two-tier cache for generated responses: a bounded in-process
+LRU tier in front of an optional shared Redis tier. Both tiers expire
+entries after ``Config.cache_ttl`` seconds.
+"""
+
+import asyncio
+import hashlib
+import inspect
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+_WORD_RE = re.compile(r"\w+")
+
+
+def normalize_message(message: str) -> str:
+    """
+    Normalize a message for cache lookups.
+
+    Case, punctuation and whitespace differences are ignored, so
+    near-verbatim repeats share a key.
+
+    Args:
+        message: Raw user message
+
+    Returns:
+        Normalized message text
+    """
+    return " ".join(_WORD_RE.findall(message.casefold()))
+
+
+def is_async_client(client: Any) -> bool:
+    """
+    Return True for ``redis.asyncio``-style clients.
+
+    Their commands return awaitables. Synchronous clients block on the
+    network, so async callers run them in a worker thread instead.
+
+    Args:
+        client: Redis client
+
+    Returns:
+        True if the client's commands must be awaited
+    """
+    return inspect.iscoroutinefunction(getattr(client, "execute_command", None))
+
+
+def context_digest(session: Any, history_messages: int) -> str:
+    """
+    Digest the parts of a session that influence its next response.
+
+    Args:
+        session: Conversation session
+        history_messages: Number of most recent history messages to include
+
+    Returns:
+        Hex digest of the session context and recent history
+    """
+    history = session.get_history(history_messages) if history_messages else []
+    payload = json.dumps(
+        {
+            "context": session.context,
+            "history": [(msg["role"], msg["content"]) for msg in history],
+        },
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LRUCache:
+    """
+    Thread-safe in-process LRU cache with per-entry expiry.
+
+    Attributes:
+        max_entries: Maximum number of entries kept
+        ttl: Seconds before an entry expires
+        evictions: Entries dropped to stay within max_entries
+        expirations: Entries dropped because their TTL elapsed
+    """
+
+    def __init__(self, max_entries: int, ttl: float,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Initialize the LRU tier.
+
+        Args:
+            max_entries: Maximum number of entries kept
+            ttl: Seconds before an entry expires
+            clock: Monotonic time source, injectable for tests
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.evictions = 0
+        self.expirations = 0
+        self._clock = clock
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Return the cached value and mark it most recently used.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Cached value, or None on a miss or expired entry
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= self._clock():
+                del self._entries[key]
+                self.expirations += 1
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str, ttl: Optional[float] = None) -> None:
+        """
+        Store a value, evicting the least recently used entries if full.
+
+        Args:
+            key: Cache key
+            value: Value to cache
+            ttl: Seconds to keep the entry. Defaults to the cache's ``ttl``.
+        """
+        if ttl is None:
+            ttl = self.ttl
+        if self.max_entries <= 0 or ttl <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (self._clock() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: str) -> None:
+        """Remove a key if present."""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        with self._lock:
+            self._entries.clear()
+
+
+class RedisCache:
+    """
+    Shared cache tier backed by Redis.
+
+    Works with both synchronous and ``redis.asyncio`` clients. The async
+    methods await an asynchronous client, and run a synchronous one in a
+    worker thread so a Redis round trip never blocks the event loop. Redis
+    errors are logged and treated as misses so the cache never fails a
+    request.
+    """
+
+    def __init__(self, client: Any, ttl: int, prefix: str = "intramind:response:"):
+        """
+        Initialize the Redis tier.
+
+        Args:
+            client: Redis client exposing get/set
+            ttl: Seconds before an entry expires
+            prefix: Key namespace prefix
+        """
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+        self.errors = 0
+        self._async = is_async_client(client)
+
+    @staticmethod
+    def _decode(value: Any) -> Optional[str]:
+        if value is None:
+            return None
+        return value.decode("utf-8") if isinstance(value, bytes) else str(value)
+
+    @staticmethod
+    def _remaining(pttl: Any) -> Optional[float]:
+        """Seconds left from a PTTL reply: 0 once the key is gone, None without expiry."""
+        pttl = int(pttl)
+        if pttl == -2:
+            return 0.0
+        return pttl / 1000 if pttl >= 0 else None
+
+    def get(self, key: str) -> Tuple[Optional[str], Optional[float]]:
+        """
+        Return the cached value and the seconds it has left to live.
+
+        The TTL is only fetched on a hit, so a miss is one round trip.
+
+        Returns:
+            Value (None on a miss or error) and remaining TTL (None if
+            the key has no expiry or was missed)
+        """
+        try:
+            value = self._decode(self.client.get(self.prefix + key))
+            if value is None:
+                return None, None
+            return value, self._remaining(self.client.pttl(self.prefix + key))
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Redis cache get failed: {str(e)}")
+            return None, None
+
+    def set(self, key: str, value: str) -> None:
+        """Store a value with the configured TTL."""
+        try:
+            self.client.set(self.prefix + key, value, ex=self.ttl)
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Redis cache set failed: {str(e)}")
+
+    async def get_async(self, key: str) -> Tuple[Optional[str], Optional[float]]:
+        """Async version of get."""
+        if not self._async:
+            return await asyncio.to_thread(self.get, key)
+        try:
+            value = self._decode(await self.client.get(self.prefix + key))
+            if value is None:
+                return None, None
+            return value, self._remaining(await self.client.pttl(self.prefix + key))
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Redis cache get failed: {str(e)}")
+            return None, None
+
+    async def set_async(self, key: str, value: str) -> None:
+        """Async version of set."""
+        try:
+            if self._async:
+                await self.client.set(self.prefix + key, value, ex=self.ttl)
+            else:
+                await asyncio.to_thread(self.client.set, self.prefix + key, value, ex=self.ttl)
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Redis cache set failed: {str(e)}")
+
+
+class ResponseCache:
+    """
+    Two-tier cache for generated responses.
+
+    Keys combine the normalized message, the detected intent, a digest
+    of the session context and recent history, and a namespace naming what
+    the answer was generated with (model, knowledge base state).
+
+    Lookups check the local LRU tier first, then Redis; Redis hits are
+    promoted into the LRU tier for the time they have left in Redis, so
+    neither tier serves an entry longer than ``cache_ttl``.
+
+    Example:
+        >>> cache = ResponseCache(config)
+        >>> key = cache.make_key("How do I reset my password?", "question", session)
+        >>> cache.get(key) is None
+        True
+    """
+
+    def __init__(self, config: Any, redis_client: Optional[Any] = None):
+        """
+        Initialize the response cache.
+
+        Args:
+            config: Configuration object
+            redis_client: Optional Redis client for the shared tier. If None
+                and ``cache_redis_enabled`` is set, a client is created from
+                ``redis_url``.
+        """
+        self.config = config
+        self.context_messages = config.cache_context_messages
+        self.local = LRUCache(config.cache_max_size, config.cache_ttl)
+        self.hits = 0
+        self.local_hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+
+        if redis_client is None and config.cache_redis_enabled:
+            redis_client = self._connect_redis(config.redis_url)
+        self.redis = RedisCache(redis_client, config.cache_ttl) if redis_client else None
+        logger.info(
+            f"ResponseCache initialized (max_size={config.cache_max_size}, "
+            f"ttl={config.cache_ttl}s, redis={'on' if self.redis else 'off'})"
+        )
+
+    @staticmethod
+    def _connect_redis(redis_url: str) -> Optional[Any]:
+        """Create a Redis client, or return None if redis is unavailable."""
+        try:
+            import redis
+        except ImportError:
+            logger.warning("redis package not installed; Redis cache tier disabled")
+            return None
+        return redis.Redis.from_url(redis_url)
+
+    def make_key(self, message: str, intent: Optional[str], session: Any,
+                 namespace: str = "") -> str:
+        """
+        Build the cache key for a turn.
+
+        Must be called before the user message is added to the session,
+        so the history digest covers only prior turns.
+
+        Args:
+            message: User's input message
+            intent: Detected intent
+            session: Current conversation session
+            namespace: Identifies the model and knowledge base state the
+                answer is generated with, so a change misses the cache
+
+        Returns:
+            Hex digest cache key
+        """
+        context = context_digest(session, self.context_messages)
+        digest = hashlib.sha256()
+        for part in (normalize_message(message), intent or "", context, namespace):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\x00")
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up a cached response.
+
+        Args:
+            key: Key from make_key
+
+        Returns:
+            Cached response text, or None on a miss
+        """
+        value = self.local.get(key)
+        if value is not None:
+            return self._record_hit(local=True, value=value)
+        if self.redis is not None:
+            value, ttl = self.redis.get(key)
+            if value is not None:
+                self.local.set(key, value, ttl=ttl)
+                return self._record_hit(local=False, value=value)
+        self.misses += 1
+        return None
+
+    def set(self, key: str, value: str) -> None:
+        """
+        Store a response in both tiers.
+
+        Args:
+            key: Key from make_key
+            value: Response text
+        """
+        self.local.set(key, value)
+        if self.redis is not None:
+            self.redis.set(key, value)
+
+    async def get_async(self, key: str) -> Optional[str]:
+        """Async version of get."""
+        value = self.local.get(key)
+        if value is not None:
+            return self._record_hit(local=True, value=value)
+        if self.redis is not None:
+            value, ttl = await self.redis.get_async(key)
+            if value is not None:
+                self.local.set(key, value, ttl=ttl)
+                return self._record_hit(local=False, value=value)
+        self.misses += 1
+        return None
+
+    async def set_async(self, key: str, value: str) -> None:
+        """Async version of set."""
+        self.local.set(key, value)
+        if self.redis is not None:
+            await self.redis.set_async(key, value)
+
+    def _record_hit(self, local: bool, value: str) -> str:
+        self.hits += 1
+        if local:
+            self.local_hits += 1
+        else:
+            self.redis_hits += 1
+        return value
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Return cache counters.
+
+        Returns:
+            Dictionary of hit, miss, eviction and error counts
+        """
+        return {
+            "hits": self.hits,
+            "local_hits": self.local_hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "evictions": self.local.evictions,
+            "expirations": self.local.expirations,
+            "redis_errors": self.redis.errors if self.redis else 0,
+            "size": len(self.local),
+        }
+
+    def clear(self) -> None:
+        """Clear the local tier. Redis entries expire on their own."""
+        self.local.clear()
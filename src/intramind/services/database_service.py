@@ -0,0 +1,721 @@
+"""
+Session persistence for IntraMind.
+
+Provides the SessionStore interface used by ConversationManager to keep
+conversations across restarts and share them between worker processes,
+with in-memory, SQLite, async PostgreSQL and Redis backends. Writes go through
+a write-behind queue that batches them on a background thread, so
+persistence stays off the request path.
+"""
+
+import asyncio
+import json
+import queue
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import Counter
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Set, Tuple
+import logging
+
+from intramind.core.conversation import Message
+
+logger = logging.getLogger(__name__)
+
+
+class SessionWriteError(RuntimeError):
+    """Raised when queued writes for a session were lost to store errors."""
+
+
+class SessionOp(NamedTuple):
+    """
+    A single session write.
+
+    Attributes:
+        kind: One of "upsert", "append", "clear", "delete" or "expire"
+        session_id: Session identifier (None for "expire")
+        context: Session context, for "upsert"
+        timestamp: Epoch seconds: creation time for "upsert", otherwise
+            when the write happened
+        message: The appended message, for "append"
+        cutoff: Epoch seconds for "expire": sessions last updated before
+            it are removed
+    """
+    kind: str
+    session_id: Optional[str]
+    context: Optional[Dict[str, Any]] = None
+    timestamp: float = 0.0
+    message: Optional[Message] = None
+    cutoff: Optional[float] = None
+
+
+class StoredSession(NamedTuple):
+    """
+    A session as loaded from a store.
+
+    Attributes:
+        session_id: Session identifier
+        context: Session context
+        created_at: Creation time in epoch seconds
+        updated_at: Last update time in epoch seconds
+        messages: Most recent messages, oldest first
+    """
+    session_id: str
+    context: Dict[str, Any]
+    created_at: float
+    updated_at: float
+    messages: List[Message]
+
+
+class SessionStore(ABC):
+    """
+    Base class for session persistence backends.
+
+    Stores apply ordered batches of SessionOp writes and load sessions
+    back by id. ``write`` is called from the write-behind thread; ``load``
+    is called when a session is not in memory.
+    """
+
+    name: str = "base"
+
+    @abstractmethod
+    def load(self, session_id: str, limit: Optional[int] = None) -> Optional[StoredSession]:
+        """
+        Load a session.
+
+        Args:
+            session_id: Session identifier
+            limit: Optional number of most recent messages to load
+
+        Returns:
+            StoredSession, or None if the session is not stored
+        """
+
+    @abstractmethod
+    def write(self, ops: Sequence[SessionOp]) -> None:
+        """
+        Apply a batch of writes in order.
+
+        Args:
+            ops: Session writes, oldest first
+        """
+
+    async def load_async(self, session_id: str,
+                         limit: Optional[int] = None) -> Optional[StoredSession]:
+        """Async version of load. Runs load in a worker thread by default."""
+        return await asyncio.to_thread(self.load, session_id, limit)
+
+    def close(self) -> None:
+        """Release the store's resources."""
+
+
+class MemorySessionStore(SessionStore):
+    """
+    Session store kept in process memory.
+
+    Useful for tests and development; nothing survives a restart.
+    """
+
+    name = "memory"
+
+    def __init__(self) -> None:
+        """Initialize an empty store."""
+        self._sessions: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def load(self, session_id: str, limit: Optional[int] = None) -> Optional[StoredSession]:
+        with self._lock:
+            row = self._sessions.get(session_id)
+            if row is None:
+                return None
+            messages = row["messages"][-limit:] if limit else row["messages"]
+            return StoredSession(session_id, dict(row["context"]), row["created_at"],
+                                 row["updated_at"], list(messages))
+
+    async def load_async(self, session_id: str,
+                         limit: Optional[int] = None) -> Optional[StoredSession]:
+        return self.load(session_id, limit)
+
+    def write(self, ops: Sequence[SessionOp]) -> None:
+        with self._lock:
+            for op in ops:
+                if op.kind == "upsert":
+                    row = self._sessions.setdefault(op.session_id, {
+                        "context": {}, "created_at": op.timestamp,
+                        "updated_at": op.timestamp, "messages": [],
+                    })
+                    row["context"] = dict(op.context or {})
+                elif op.kind == "append":
+                    row = self._sessions.get(op.session_id)
+                    if row is not None:
+                        row["messages"].append(op.message)
+                        row["updated_at"] = max(row["updated_at"], op.timestamp)
+                elif op.kind == "clear":
+                    row = self._sessions.get(op.session_id)
+                    if row is not None:
+                        row["messages"] = []
+                        row["updated_at"] = max(row["updated_at"], op.timestamp)
+                elif op.kind == "delete":
+                    self._sessions.pop(op.session_id, None)
+                elif op.kind == "expire":
+                    expired = [sid for sid, row in self._sessions.items()
+                               if row["updated_at"] < op.cutoff]
+                    for sid in expired:
+                        del self._sessions[sid]
+
+
+# Statements shared by the SQL backends, written with "?" placeholders
+_SQL = {
+    "upsert": (
+        "INSERT INTO sessions (session_id, context, created_at, updated_at) "
+        "VALUES (?, ?, ?, ?) "
+        "ON CONFLICT (session_id) DO UPDATE SET context = excluded.context"
+    ),
+    "append": (
+        "INSERT INTO messages (session_id, role, content, created, tokens, metadata) "
+        "VALUES (?, ?, ?, ?, ?, ?)"
+    ),
+    "touch": "UPDATE sessions SET updated_at = ? WHERE session_id = ? AND updated_at < ?",
+    "clear": "DELETE FROM messages WHERE session_id = ?",
+    "delete_messages": "DELETE FROM messages WHERE session_id = ?",
+    "delete": "DELETE FROM sessions WHERE session_id = ?",
+    "expire_messages": (
+        "DELETE FROM messages WHERE session_id IN "
+        "(SELECT session_id FROM sessions WHERE updated_at < ?)"
+    ),
+    "expire": "DELETE FROM sessions WHERE updated_at < ?",
+    "load_session": (
+        "SELECT context, created_at, updated_at FROM sessions WHERE session_id = ?"
+    ),
+    "load_messages": (
+        "SELECT role, content, created, tokens, metadata FROM messages "
+        "WHERE session_id = ? ORDER BY id DESC LIMIT ?"
+    ),
+}
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS sessions ("
+    " session_id TEXT PRIMARY KEY,"
+    " context TEXT NOT NULL,"
+    " created_at DOUBLE PRECISION NOT NULL,"
+    " updated_at DOUBLE PRECISION NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS messages ("
+    " id {serial} PRIMARY KEY,"
+    " session_id TEXT NOT NULL,"
+    " role TEXT NOT NULL,"
+    " content TEXT NOT NULL,"
+    " created DOUBLE PRECISION NOT NULL,"
+    " tokens INTEGER NOT NULL,"
+    " metadata TEXT)",
+    "CREATE INDEX IF NOT EXISTS messages_session_idx ON messages (session_id, id)",
+)
+
+
+def _statements(ops: Sequence[SessionOp]) -> List[Tuple[str, List[tuple]]]:
+    """
+    Translate a batch of writes into runs of (statement, parameter rows).
+
+    Consecutive writes of the same kind are grouped so each run can be
+    sent with one executemany call. Session ``updated_at`` bumps only ever
+    move forward, so they are collapsed to one per session and applied
+    before the next expiry sweep or at the end of the batch.
+    """
+    runs: List[Tuple[str, List[tuple]]] = []
+    touched: Dict[str, float] = {}
+
+    def emit(key: str, params: tuple) -> None:
+        if runs and runs[-1][0] == key:
+            runs[-1][1].append(params)
+        else:
+            runs.append((key, [params]))
+
+    for op in ops:
+        if op.kind == "upsert":
+            emit("upsert", (op.session_id, json.dumps(op.context or {}, default=str),
+                            op.timestamp, op.timestamp))
+        elif op.kind == "append":
+            message = op.message
+            metadata = json.dumps(message.metadata, default=str) if message.metadata else None
+            emit("append", (op.session_id, message.role, message.content,
+                            message.created, message.tokens, metadata))
+        elif op.kind == "clear":
+            emit("clear", (op.session_id,))
+        elif op.kind == "delete":
+            emit("delete_messages", (op.session_id,))
+            emit("delete", (op.session_id,))
+            touched.pop(op.session_id, None)
+            continue
+        elif op.kind == "expire":
+            if touched:
+                runs.append(("touch", [(ts, sid, ts) for sid, ts in touched.items()]))
+                touched = {}
+            emit("expire_messages", (op.cutoff,))
+            emit("expire", (op.cutoff,))
+            continue
+        touched[op.session_id] = max(op.timestamp, touched.get(op.session_id, 0.0))
+
+    if touched:
+        runs.append(("touch", [(ts, sid, ts) for sid, ts in touched.items()]))
+    return runs
+
+
+def _stored_session(session_id: str, session_row: Sequence[Any],
+                    message_rows: Sequence[Sequence[Any]]) -> StoredSession:
+    """Build a StoredSession from SQL rows (messages newest first)."""
+    context, created_at, updated_at = session_row
+    messages = [
+        Message(role, content, timestamp=created, tokens=tokens,
+                metadata=json.loads(metadata) if metadata else None)
+        for role, content, created, tokens, metadata in reversed(message_rows)
+    ]
+    return StoredSession(session_id, json.loads(context), created_at, updated_at, messages)
+
+
+class SQLiteSessionStore(SessionStore):
+    """
+    Session store backed by a SQLite database file.
+
+    Uses one connection in WAL mode, so several worker processes can
+    share the file. Each write batch runs in a single transaction.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path: str = ":memory:"):
+        """
+        Initialize the store and create its tables.
+
+        Args:
+            path: Database file path, or ":memory:"
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        if path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._conn:
+            for statement in _SCHEMA:
+                self._conn.execute(statement.format(serial="INTEGER"))
+        logger.info(f"SQLiteSessionStore opened: {path}")
+
+    def load(self, session_id: str, limit: Optional[int] = None) -> Optional[StoredSession]:
+        with self._lock:
+            session_row = self._conn.execute(_SQL["load_session"], (session_id,)).fetchone()
+            if session_row is None:
+                return None
+            message_rows = self._conn.execute(
+                _SQL["load_messages"], (session_id, limit if limit else -1)
+            ).fetchall()
+        return _stored_session(session_id, session_row, message_rows)
+
+    def write(self, ops: Sequence[SessionOp]) -> None:
+        with self._lock, self._conn:
+            for key, rows in _statements(ops):
+                self._conn.executemany(_SQL[key], rows)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def _postgres_sql(statement: str) -> str:
+    """Rewrite "?" placeholders as PostgreSQL's "$n" form."""
+    parts = statement.split("?")
+    return "".join(
+        part + (f"${index}" if index < len(parts) else "")
+        for index, part in enumerate(parts, start=1)
+    )
+
+
+class PostgresSessionStore(SessionStore):
+    """
+    Session store backed by PostgreSQL through an asyncpg pool.
+
+    The pool lives on a private event loop thread, so the synchronous
+    write-behind thread and async callers share the same connections.
+    """
+
+    name = "postgres"
+
+    def __init__(self, dsn: str, pool_size: int = 20):
+        """
+        Initialize the store, open the pool and create its tables.
+
+        Args:
+            dsn: PostgreSQL connection URL (``Config.database_url``)
+            pool_size: Maximum pool connections (``Config.database_pool_size``)
+        """
+        import asyncpg
+
+        self.dsn = dsn
+        self.pool_size = pool_size
+        self._sql = {key: _postgres_sql(statement) for key, statement in _SQL.items()}
+        self._sql["load_messages"] = self._sql["load_messages"].replace(
+            "LIMIT $2", "LIMIT $2::bigint"
+        )
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._loop.run_forever, name="intramind-postgres", daemon=True
+        )
+        self._thread.start()
+        self._pool = self._run(asyncpg.create_pool(dsn, min_size=1, max_size=pool_size))
+        self._run(self._create_schema())
+        logger.info(f"PostgresSessionStore connected (pool_size={pool_size})")
+
+    def _run(self, coro: Any) -> Any:
+        """Run a coroutine on the store's loop and wait for its result."""
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    async def _create_schema(self) -> None:
+        async with self._pool.acquire() as conn:
+            for statement in _SCHEMA:
+                await conn.execute(statement.format(serial="BIGSERIAL"))
+
+    async def _load(self, session_id: str, limit: Optional[int]) -> Optional[StoredSession]:
+        async with self._pool.acquire() as conn:
+            session_row = await conn.fetchrow(self._sql["load_session"], session_id)
+            if session_row is None:
+                return None
+            message_rows = await conn.fetch(self._sql["load_messages"], session_id, limit)
+        return _stored_session(session_id, tuple(session_row),
+                               [tuple(row) for row in message_rows])
+
+    async def _write(self, ops: Sequence[SessionOp]) -> None:
+        async with self._pool.acquire() as conn:
+            async with conn.transaction():
+                for key, rows in _statements(ops):
+                    await conn.executemany(self._sql[key], rows)
+
+    def load(self, session_id: str, limit: Optional[int] = None) -> Optional[StoredSession]:
+        return self._run(self._load(session_id, limit))
+
+    async def load_async(self, session_id: str,
+                         limit: Optional[int] = None) -> Optional[StoredSession]:
+        future = asyncio.run_coroutine_threadsafe(self._load(session_id, limit), self._loop)
+        return await asyncio.wrap_future(future)
+
+    def write(self, ops: Sequence[SessionOp]) -> None:
+        self._run(self._write(ops))
+
+    def close(self) -> None:
+        self._run(self._pool.close())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+
+
+# KEYS: the updated_at index. ARGV: cutoff, session key prefix.
+# Deletes every session last updated before the cutoff; returns how many.
+EXPIRE_SCRIPT = """
+local ids = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', '(' .. ARGV[1])
+for _, id in ipairs(ids) do
+  redis.call('DEL', ARGV[2] .. id, ARGV[2] .. id .. ':messages')
+end
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', '(' .. ARGV[1])
+return #ids
+"""
+
+
+class RedisSessionStore(SessionStore):
+    """
+    Session store backed by Redis.
+
+    Each session is a hash (context, created_at, updated_at) plus a list
+    of JSON-encoded messages capped at ``max_messages``; with ``ttl`` both
+    keys also expire after that many seconds without writes. A sorted set
+    indexes sessions by ``updated_at``, so "expire" writes remove idle
+    sessions with the same cutoff as the SQL stores, in one Lua script. A
+    load is one pipelined round trip, and each write batch is sent as a
+    single pipeline with one RPUSH per session (plus one script call per
+    expiry sweep).
+    """
+
+    name = "redis"
+
+    def __init__(self, client: Any, ttl: Optional[int] = None,
+                 max_messages: Optional[int] = None, prefix: str = "intramind:session:",
+                 index_key: str = "intramind:session-index"):
+        """
+        Initialize the store.
+
+        Args:
+            client: Synchronous Redis client
+            ttl: Optional seconds of inactivity before a session expires
+            max_messages: Optional cap on stored messages per session
+            prefix: Key namespace prefix
+            index_key: Sorted set of session ids scored by ``updated_at``
+        """
+        self.client = client
+        self.ttl = ttl
+        self.max_messages = max_messages
+        self.prefix = prefix
+        self.index_key = index_key
+        self._expire_script: Optional[Any] = None
+
+    def _keys(self, session_id: str) -> Tuple[str, str]:
+        """Return the (hash, message list) keys of a session."""
+        key = self.prefix + session_id
+        return key, key + ":messages"
+
+    @staticmethod
+    def _text(value: Any) -> str:
+        return value.decode("utf-8") if isinstance(value, bytes) else str(value)
+
+    def load(self, session_id: str, limit: Optional[int] = None) -> Optional[StoredSession]:
+        meta_key, list_key = self._keys(session_id)
+        pipe = self.client.pipeline(transaction=False)
+        pipe.hgetall(meta_key)
+        pipe.lrange(list_key, -limit if limit else 0, -1)
+        meta, rows = pipe.execute()
+        if not meta:
+            return None
+
+        fields = {self._text(k): self._text(v) for k, v in meta.items()}
+        updated_at = float(fields.get("updated_at", 0.0))
+        messages = []
+        for row in rows:
+            role, content, created, tokens, metadata = json.loads(row)
+            messages.append(Message(role, content, timestamp=created, tokens=tokens,
+                                    metadata=metadata))
+        return StoredSession(
+            session_id,
+            json.loads(fields.get("context", "{}")),
+            float(fields.get("created_at", updated_at)),
+            updated_at,
+            messages,
+        )
+
+    def write(self, ops: Sequence[SessionOp]) -> None:
+        pipe = self.client.pipeline(transaction=False)
+        touched: Dict[str, float] = {}
+        pushes: Dict[str, List[str]] = {}
+
+        def flush_touched() -> None:
+            for session_id, updated_at in touched.items():
+                meta_key, list_key = self._keys(session_id)
+                values = pushes.pop(session_id, None)
+                if values:
+                    pipe.rpush(list_key, *values)
+                if self.max_messages:
+                    pipe.ltrim(list_key, -self.max_messages, -1)
+                pipe.hset(meta_key, "updated_at", updated_at)
+                pipe.zadd(self.index_key, {session_id: updated_at})
+                if self.ttl:
+                    pipe.expire(meta_key, self.ttl)
+                    pipe.expire(list_key, self.ttl)
+            touched.clear()
+
+        for op in ops:
+            if op.kind == "expire":
+                # Earlier writes must land first, as in the SQL stores
+                flush_touched()
+                pipe.execute()
+                if self._expire_script is None:
+                    self._expire_script = self.client.register_script(EXPIRE_SCRIPT)
+                self._expire_script(keys=[self.index_key], args=[op.cutoff, self.prefix])
+                pipe = self.client.pipeline(transaction=False)
+                continue
+            meta_key, list_key = self._keys(op.session_id)
+            if op.kind == "upsert":
+                pipe.hsetnx(meta_key, "created_at", op.timestamp)
+                pipe.hsetnx(meta_key, "updated_at", op.timestamp)
+                pipe.hset(meta_key, "context", json.dumps(op.context or {}, default=str))
+            elif op.kind == "append":
+                message = op.message
+                pushes.setdefault(op.session_id, []).append(json.dumps(
+                    [message.role, message.content, message.created, message.tokens,
+                     message.metadata], default=str
+                ))
+            elif op.kind == "clear":
+                pushes.pop(op.session_id, None)
+                pipe.delete(list_key)
+            elif op.kind == "delete":
+                pushes.pop(op.session_id, None)
+                touched.pop(op.session_id, None)
+                pipe.delete(meta_key, list_key)
+                pipe.zrem(self.index_key, op.session_id)
+                continue
+            touched[op.session_id] = max(op.timestamp, touched.get(op.session_id, 0.0))
+
+        flush_touched()
+        pipe.execute()
+
+
+class WriteBehindQueue:
+    """
+    Batches session writes and applies them on a background thread.
+
+    ``submit`` only enqueues, so callers never wait on the store. The
+    flusher thread applies up to ``batch_size`` writes per store call and
+    waits at most ``interval`` seconds to fill a batch. A failed batch is
+    retried ``max_retries`` times with exponential backoff, then logged,
+    counted and dropped so a store outage cannot grow the queue without
+    bound. Sessions that lost writes are remembered, and the next
+    ``wait_for`` on them raises SessionWriteError.
+
+    Attributes:
+        batches: Number of batches written
+        written: Number of writes applied
+        failed: Number of writes lost to store errors
+    """
+
+    _STOP = object()
+
+    def __init__(self, store: SessionStore, batch_size: int = 256, interval: float = 0.05,
+                 max_retries: int = 2, retry_backoff: float = 0.1):
+        """
+        Initialize and start the flusher thread.
+
+        Args:
+            store: Store the writes are applied to
+            batch_size: Maximum writes per store call
+            interval: Seconds to wait for more writes before flushing a batch
+            max_retries: Extra attempts for a batch the store rejected
+            retry_backoff: Seconds before the first retry; doubles per retry
+        """
+        self.store = store
+        self.batch_size = max(1, batch_size)
+        self.interval = interval
+        self.max_retries = max(0, max_retries)
+        self.retry_backoff = retry_backoff
+        self.batches = 0
+        self.written = 0
+        self.failed = 0
+        self._queue: "queue.Queue[Any]" = queue.Queue()
+        self._pending: "Counter[str]" = Counter()
+        self._lost: Set[str] = set()
+        self._pending_lock = threading.Condition()
+        self._thread = threading.Thread(
+            target=self._run, name="intramind-session-writer", daemon=True
+        )
+        self._thread.start()
+
+    def submit(self, op: SessionOp) -> None:
+        """Queue a write without waiting for it."""
+        if op.session_id is not None:
+            with self._pending_lock:
+                self._pending[op.session_id] += 1
+        self._queue.put(op)
+
+    def has_pending(self, session_id: str) -> bool:
+        """Return True if writes for a session are still queued."""
+        return self._pending.get(session_id, 0) > 0
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is self._STOP:
+                self._queue.task_done()
+                return
+            batch = [item]
+            stop = False
+            deadline = time.monotonic() + self.interval
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if item is self._STOP:
+                    stop = True
+                    break
+                batch.append(item)
+            self._apply(batch)
+            for _ in range(len(batch) + stop):
+                self._queue.task_done()
+            if stop:
+                return
+
+    def _apply(self, batch: List[SessionOp]) -> None:
+        session_ids = {op.session_id for op in batch if op.session_id is not None}
+        lost = False
+        for attempt in range(self.max_retries + 1):
+            try:
+                self.store.write(batch)
+                self.batches += 1
+                self.written += len(batch)
+                break
+            except Exception as e:
+                if attempt < self.max_retries:
+                    logger.warning(f"Session store write of {len(batch)} ops failed, "
+                                   f"retrying: {str(e)}")
+                    time.sleep(self.retry_backoff * 2 ** attempt)
+                    continue
+                self.failed += len(batch)
+                lost = True
+                logger.error(f"Session store write of {len(batch)} ops failed: {str(e)}")
+        with self._pending_lock:
+            if lost:
+                self._lost.update(session_ids)
+            self._pending.subtract(op.session_id for op in batch
+                                   if op.session_id is not None)
+            for session_id in session_ids:
+                if self._pending[session_id] <= 0:
+                    del self._pending[session_id]
+            self._pending_lock.notify_all()
+
+    def wait_for(self, session_id: str, timeout: Optional[float] = None) -> bool:
+        """
+        Block until the writes queued for one session have been applied.
+
+        Writes for other sessions are not waited for, so a steady stream
+        of them cannot hold the caller up.
+
+        Args:
+            session_id: Session identifier
+            timeout: Maximum seconds to wait; None waits as long as needed
+
+        Returns:
+            True if no writes for the session are still queued
+
+        Raises:
+            SessionWriteError: If writes for the session were dropped after
+                failing; reported once
+        """
+        with self._pending_lock:
+            done = self._pending_lock.wait_for(lambda: not self._pending.get(session_id),
+                                               timeout)
+            if session_id in self._lost:
+                self._lost.discard(session_id)
+                raise SessionWriteError(
+                    f"Queued writes for session {session_id} were lost to store errors"
+                )
+        return done
+
+    def flush(self) -> None:
+        """Block until every write submitted so far has been applied."""
+        self._queue.join()
+
+    def close(self) -> None:
+        """Flush pending writes and stop the flusher thread."""
+        if self._thread.is_alive():
+            self._queue.put(self._STOP)
+            self._thread.join()
+
+
+def create_session_store(config: Any) -> Optional[SessionStore]:
+    """
+    Create the session store selected by ``Config.session_store``.
+
+    Args:
+        config: Configuration object
+
+    Returns:
+        SessionStore, or None when persistence is disabled
+    """
+    kind = config.session_store
+    if kind == "memory":
+        return MemorySessionStore()
+    if kind == "sqlite":
+        return SQLiteSessionStore(config.session_store_path)
+    if kind == "postgres":
+        return PostgresSessionStore(config.database_url, config.database_pool_size)
+    if kind == "redis":
+        import redis
+
+        return RedisSessionStore(
+            redis.Redis.from_url(config.redis_url),
+            ttl=int(config.session_ttl_hours * 3600) or None,
+            max_messages=config.history_max_messages or None,
+        )
+    return None
@@ -0,0 +1,194 @@
+"""
+Text embedding providers for IntraMind.
+
+Embedders turn text into L2-normalized float32 vectors for similarity
+search. A deterministic hashing embedder works offline with no model
+downloads; a sentence-transformers embedder is available for production.
+"""
+
+import hashlib
+import re
+from abc import ABC, abstractmethod
+from functools import lru_cache
+from typing import Any, Optional, Sequence
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_WORD_RE = re.compile(r"\w+")
+
+# Function words that carry little meaning for similarity matching
+STOPWORDS = frozenset(
+    "a an and are as at be can do does for from how i in is it me my of on or "
+    "our please should the this to we what when where which who why will with "
+    "you your".split()
+)
+
+
+class Embedder(ABC):
+    """
+    Base class for text embedders.
+
+    Attributes:
+        model_id: Identifier of the embedding model, used in cache keys
+        dimension: Length of the produced vectors
+        cpu_bound: Whether embedding blocks on CPU work and should be run
+            in an executor from async code
+    """
+
+    model_id: str = "base"
+    dimension: int = 0
+    cpu_bound: bool = False
+
+    @abstractmethod
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        """
+        Embed a batch of texts.
+
+        Args:
+            texts: Input texts
+
+        Returns:
+            float32 array of shape (len(texts), dimension) with unit-length
+            rows (all-zero rows for texts with no content)
+        """
+
+    def embed_one(self, text: str) -> np.ndarray:
+        """Embed a single text and return its vector."""
+        return self.embed([text])[0]
+
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """
+    Scale each row to unit length, leaving all-zero rows untouched.
+
+    Args:
+        vectors: 2-D array of vectors
+
+    Returns:
+        float32 array of normalized rows
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    np.divide(vectors, norms, out=vectors, where=norms > 0)
+    return vectors
+
+
+class HashingEmbedder(Embedder):
+    """
+    Deterministic feature-hashing embedder.
+
+    Each content word (lowercased, stopwords removed, plural "s" stripped)
+    is hashed into one of ``dimension`` buckets with a signed weight.
+    Texts that share vocabulary get high cosine similarity, which is
+    enough for paraphrase caching and for offline tests.
+
+    Example:
+        >>> embedder = HashingEmbedder()
+        >>> a, b = embedder.embed(["reset my password", "password reset steps"])
+        >>> float(a @ b) > 0.8
+        True
+    """
+
+    cpu_bound = False
+
+    def __init__(self, dimension: int = 512):
+        """
+        Initialize the embedder.
+
+        Args:
+            dimension: Number of hash buckets (vector length)
+        """
+        self.dimension = dimension
+        self.model_id = f"hashing-{dimension}"
+
+    @staticmethod
+    def terms(text: str) -> Sequence[str]:
+        """Return the content words of a text, as used for hashing."""
+        terms = []
+        for word in _WORD_RE.findall(text.lower()):
+            if word in STOPWORDS:
+                continue
+            if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+                word = word[:-1]
+            terms.append(word)
+        return terms
+
+    def _bucket(self, term: str) -> int:
+        digest = hashlib.blake2b(term.encode("utf-8"), digest_size=8).digest()
+        return int.from_bytes(digest, "little")
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dimension), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for term in self.terms(text):
+                code = self._bucket(term)
+                sign = 1.0 if code & 1 else -1.0
+                vectors[row, (code >> 1) % self.dimension] += sign
+        return normalize_rows(vectors)
+
+
+class SentenceTransformerEmbedder(Embedder):
+    """
+    Embedder backed by a sentence-transformers model.
+
+    The model is loaded lazily on first use so importing IntraMind stays
+    cheap.
+    """
+
+    cpu_bound = True
+
+    def __init__(self, model_name: str, device: Optional[str] = None):
+        """
+        Initialize the embedder.
+
+        Args:
+            model_name: sentence-transformers model name or path
+            device: Optional torch device (e.g. "cpu", "cuda")
+        """
+        self.model_id = model_name
+        self.device = device
+        self._model: Optional[Any] = None
+
+    @property
+    def model(self) -> Any:
+        """The loaded SentenceTransformer model."""
+        if self._model is None:
+            from sentence_transformers import SentenceTransformer
+
+            self._model = SentenceTransformer(self.model_id, device=self.device)
+            logger.info(f"Loaded embedding model: {self.model_id}")
+        return self._model
+
+    @property
+    def dimension(self) -> int:  # type: ignore[override]
+        return int(self.model.get_sentence_embedding_dimension())
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        vectors = self.model.encode(list(texts), convert_to_numpy=True)
+        return normalize_rows(vectors.reshape(len(texts), -1))
+
+
+@lru_cache(maxsize=None)
+def create_embedder(model: str) -> Embedder:
+    """
+    Create an embedder from a model setting.
+
+    Embedders are stateless, so one instance per model is shared by the
+    whole process (and, when loaded before a server forks, by its
+    workers).
+
+    Args:
+        model: "hashing" (optionally "hashing-<dimension>") or a
+            sentence-transformers model name
+
+    Returns:
+        Embedder instance
+    """
+    if model == "hashing":
+        return HashingEmbedder()
+    if model.startswith("hashing-"):
+        return HashingEmbedder(int(model.split("-", 1)[1]))
+    return SentenceTransformerEmbedder(model)
@@ -0,0 +1,476 @@
+"""
+Pooled HTTP client for OpenAI-compatible chat completion APIs.
+
+Every provider in a process shares one keep-alive httpx.AsyncClient per
+event loop (shared_client), using HTTP/2 when the h2 package is
+installed, so turns reuse warm connections instead of paying for TCP and
+TLS setup each time. Clients are dropped in forked children, which build
+their own.
+
+OpenAIProvider adds three controls on top of the pool:
+
+- A per-provider semaphore caps requests in flight (``max_concurrency``),
+  so a burst queues locally instead of overrunning the provider's
+  concurrency limits.
+- Transport errors and retryable statuses (429, 5xx) are retried with
+  full-jitter exponential backoff, honoring Retry-After. Streams are only
+  retried before their first token.
+- Optional hedging for generate(): when a request is still running after
+  the recent p95 latency, a duplicate is sent and whichever answers first
+  wins. Hedges are limited to a fraction of requests (``hedge_budget``),
+  so a provider-wide slowdown does not double the load.
+"""
+
+import asyncio
+import importlib.util
+import json
+import os
+import random
+import time
+import weakref
+from collections import deque
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, List, Optional, TypeVar
+import logging
+
+import httpx
+
+from intramind.services.ai_service import AIProvider
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+RETRY_STATUSES = frozenset({408, 409, 429, 500, 502, 503, 504})
+
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = (
+    weakref.WeakKeyDictionary()
+)
+
+if hasattr(os, "register_at_fork"):
+    # The parent's connections must not be shared with forked workers
+    os.register_at_fork(after_in_child=_clients.clear)
+
+
+def shared_client(max_connections: int = 100, http2: bool = True) -> httpx.AsyncClient:
+    """
+    Return the process's pooled HTTP client for the running event loop.
+
+    The first call on a loop creates the client; later calls return it
+    whatever their arguments.
+
+    Args:
+        max_connections: Connection pool size
+        http2: Use HTTP/2 when the h2 package is installed
+
+    Returns:
+        Shared httpx.AsyncClient
+    """
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None or client.is_closed:
+        if http2 and importlib.util.find_spec("h2") is None:
+            logger.warning("h2 package not installed; provider client uses HTTP/1.1 keep-alive")
+            http2 = False
+        client = httpx.AsyncClient(
+            http2=http2,
+            limits=httpx.Limits(max_connections=max_connections,
+                                max_keepalive_connections=max_connections,
+                                keepalive_expiry=60.0),
+        )
+        _clients[loop] = client
+    return client
+
+
+async def close_shared_client() -> None:
+    """Close the running event loop's shared client, if it has one."""
+    client = _clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+class ProviderError(Exception):
+    """
+    A provider request failed.
+
+    Attributes:
+        status: HTTP status, or None for transport errors
+        retryable: Whether the request may succeed if retried
+        retry_after: Seconds the provider asked to wait, if it said
+    """
+
+    def __init__(self, message: str, status: Optional[int] = None,
+                 retryable: bool = False, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.status = status
+        self.retryable = retryable
+        self.retry_after = retry_after
+
+
+class LatencyTracker:
+    """
+    Recent request latencies and their quantiles.
+
+    Attributes:
+        min_samples: Samples needed before quantiles are reported
+    """
+
+    def __init__(self, size: int = 200, min_samples: int = 20):
+        """
+        Initialize the tracker.
+
+        Args:
+            size: Number of most recent latencies kept
+            min_samples: Samples needed before quantiles are reported
+        """
+        self.min_samples = min_samples
+        self._samples: Deque[float] = deque(maxlen=size)
+        self._sorted: Optional[List[float]] = None
+
+    def record(self, seconds: float) -> None:
+        """Add a latency sample."""
+        self._samples.append(seconds)
+        self._sorted = None
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Return the ``q`` quantile of the recent samples.
+
+        Args:
+            q: Quantile between 0 and 1
+
+        Returns:
+            Latency in seconds, or None with fewer than min_samples samples
+        """
+        if len(self._samples) < self.min_samples:
+            return None
+        if self._sorted is None:
+            self._sorted = sorted(self._samples)
+        return self._sorted[min(len(self._sorted) - 1, int(q * len(self._sorted)))]
+
+
+class OpenAIProvider(AIProvider):
+    """
+    Provider for OpenAI-compatible ``/chat/completions`` APIs.
+
+    Attributes:
+        requests: Calls to generate() or stream()
+        retries: Attempts retried after a transient failure
+        hedges: Hedged duplicates sent
+        hedge_wins: Hedged duplicates that answered first
+        failures: Calls that failed after all retries
+        latency: Recent latencies of successful generate() attempts
+    """
+
+    name = "openai"
+
+    def __init__(self, api_key: Optional[str], model: str = "gpt-4",
+                 base_url: str = "https://api.openai.com/v1",
+                 temperature: float = 0.7, max_tokens: int = 2000,
+                 organization: Optional[str] = None, timeout: float = 60.0,
+                 max_concurrency: int = 64, max_connections: int = 100, http2: bool = True,
+                 max_retries: int = 3, backoff: float = 0.25, backoff_max: float = 8.0,
+                 hedging: bool = False, hedge_quantile: float = 0.95,
+                 hedge_budget: float = 0.1, hedge_min_samples: int = 20):
+        """
+        Initialize the provider.
+
+        Args:
+            api_key: API key sent as a bearer token
+            model: Model name
+            base_url: API base URL, up to and excluding ``/chat/completions``
+            temperature: Sampling temperature
+            max_tokens: Maximum tokens per reply
+            organization: Optional OpenAI organization id
+            timeout: Seconds allowed per attempt
+            max_concurrency: Requests in flight at once per event loop
+            max_connections: Size of the shared connection pool
+            http2: Use HTTP/2 when available
+            max_retries: Retries after the first attempt
+            backoff: Base backoff delay in seconds
+            backoff_max: Upper bound of a backoff delay in seconds
+            hedging: Send a duplicate request when one is slower than
+                the ``hedge_quantile`` latency
+            hedge_quantile: Latency quantile after which to hedge
+            hedge_budget: Maximum fraction of requests that may be hedged
+            hedge_min_samples: Latency samples needed before hedging starts
+        """
+        self.model = model
+        self.url = base_url.rstrip("/") + "/chat/completions"
+        self.temperature = temperature
+        self.max_tokens = max_tokens
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency
+        self.max_connections = max_connections
+        self.http2 = http2
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self.hedging = hedging
+        self.hedge_quantile = hedge_quantile
+        self.hedge_budget = hedge_budget
+        self.headers = {"Content-Type": "application/json"}
+        if api_key:
+            self.headers["Authorization"] = f"Bearer {api_key}"
+        if organization:
+            self.headers["OpenAI-Organization"] = organization
+        self.latency = LatencyTracker(min_samples=hedge_min_samples)
+        self.requests = 0
+        self.retries = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.failures = 0
+        # asyncio semaphores belong to one event loop
+        self._semaphores: "weakref.WeakKeyDictionary[Any, asyncio.Semaphore]" = \
+            weakref.WeakKeyDictionary()
+
+    @classmethod
+    def from_config(cls, config: Any) -> "OpenAIProvider":
+        """
+        Create a provider from the configuration.
+
+        Args:
+            config: Configuration object
+
+        Returns:
+            OpenAIProvider
+        """
+        return cls(
+            api_key=config.openai_api_key,
+            model=config.model_name,
+            base_url=config.ai_base_url,
+            temperature=config.temperature,
+            max_tokens=config.max_tokens,
+            organization=config.openai_org_id,
+            timeout=config.ai_timeout,
+            max_concurrency=config.ai_max_concurrency,
+            max_connections=config.ai_max_connections,
+            http2=config.ai_http2,
+            max_retries=config.ai_max_retries,
+            backoff=config.ai_retry_backoff,
+            backoff_max=config.ai_retry_backoff_max,
+            hedging=config.ai_hedging_enabled,
+            hedge_quantile=config.ai_hedge_quantile,
+            hedge_budget=config.ai_hedge_budget,
+        )
+
+    def _client(self) -> httpx.AsyncClient:
+        """The shared client of the running event loop."""
+        return shared_client(self.max_connections, self.http2)
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        """The concurrency limit of the running event loop."""
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self.max_concurrency)
+        return semaphore
+
+    def _payload(self, messages: List[Dict[str, str]], stream: bool,
+                 **kwargs: Any) -> Dict[str, Any]:
+        """Request body for a chat completion."""
+        return {
+            "model": self.model,
+            "messages": messages,
+            "temperature": self.temperature,
+            "max_tokens": self.max_tokens,
+            "stream": stream,
+            **kwargs,
+        }
+
+    @staticmethod
+    def _status_error(response: httpx.Response) -> ProviderError:
+        """Build the error for a response with a failure status."""
+        try:
+            detail = response.json()["error"]["message"]
+        except Exception:
+            detail = response.text[:200]
+        retry_after = response.headers.get("retry-after")
+        try:
+            retry_after = float(retry_after) if retry_after is not None else None
+        except ValueError:
+            retry_after = None
+        return ProviderError(
+            f"Provider returned HTTP {response.status_code}: {detail}",
+            status=response.status_code,
+            retryable=response.status_code in RETRY_STATUSES,
+            retry_after=retry_after,
+        )
+
+    def _retry_delay(self, error: ProviderError, attempt: int) -> Optional[float]:
+        """
+        Decide whether to retry after a failed attempt.
+
+        Args:
+            error: The failure
+            attempt: Zero-based number of the failed attempt
+
+        Returns:
+            Seconds to wait before retrying, or None to give up
+        """
+        if not error.retryable or attempt >= self.max_retries:
+            return None
+        # Full jitter: spreads retries from many clients over the window
+        delay = random.uniform(0, min(self.backoff_max, self.backoff * 2 ** attempt))
+        if error.retry_after is not None:
+            delay = max(delay, min(error.retry_after, self.backoff_max))
+        self.retries += 1
+        logger.warning(f"{str(error)}; retrying in {delay:.2f}s "
+                       f"(attempt {attempt + 2}/{self.max_retries + 1})")
+        return delay
+
+    async def _with_retries(self, attempt: Callable[[], Awaitable[T]]) -> T:
+        """Run ``attempt`` until it succeeds, fails permanently or retries run out."""
+        tries = 0
+        while True:
+            try:
+                return await attempt()
+            except ProviderError as e:
+                delay = self._retry_delay(e, tries)
+                if delay is None:
+                    self.failures += 1
+                    raise
+            tries += 1
+            await asyncio.sleep(delay)
+
+    async def _complete(self, payload: Dict[str, Any]) -> str:
+        """One non-streaming attempt."""
+        async with self._semaphore():
+            start = time.perf_counter()
+            try:
+                response = await self._client().post(self.url, json=payload,
+                                                     headers=self.headers, timeout=self.timeout)
+            except httpx.TransportError as e:
+                raise ProviderError(f"Provider request failed: {type(e).__name__} {str(e)}",
+                                    retryable=True) from e
+            if response.status_code >= 400:
+                raise self._status_error(response)
+            self.latency.record(time.perf_counter() - start)
+        try:
+            return response.json()["choices"][0]["message"]["content"] or ""
+        except (ValueError, KeyError, IndexError, TypeError) as e:
+            raise ProviderError(
+                f"Provider returned a malformed response: {type(e).__name__} {str(e)}",
+                status=response.status_code) from e
+
+    def _hedge_delay(self) -> Optional[float]:
+        """Seconds after which to hedge the current request, or None not to."""
+        if not self.hedging or self.hedges >= self.hedge_budget * self.requests:
+            return None
+        return self.latency.quantile(self.hedge_quantile)
+
+    async def generate(self, messages: List[Dict[str, str]], **kwargs: Any) -> str:
+        """
+        Generate the complete response text.
+
+        Args:
+            messages: Conversation messages, oldest first
+            **kwargs: Extra request fields, e.g. ``stop``
+
+        Returns:
+            Generated response text
+
+        Raises:
+            ProviderError: If the request failed after all retries
+        """
+        payload = self._payload(messages, stream=False, **kwargs)
+        self.requests += 1
+        delay = self._hedge_delay()
+        if delay is None:
+            return await self._with_retries(lambda: self._complete(payload))
+
+        primary = asyncio.ensure_future(self._with_retries(lambda: self._complete(payload)))
+        tasks = {primary}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if done:
+                return primary.result()
+            self.hedges += 1
+            hedge = asyncio.ensure_future(self._with_retries(lambda: self._complete(payload)))
+            tasks.add(hedge)
+            error: Optional[BaseException] = None
+            while tasks:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            self.hedge_wins += 1
+                        return task.result()
+                    error = error or task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def stream(self, messages: List[Dict[str, str]], **kwargs: Any) -> AsyncIterator[str]:
+        """
+        Stream the response as text chunks from server-sent events.
+
+        Failures before the first chunk are retried; later ones are raised,
+        since the caller has already consumed part of the reply.
+
+        Args:
+            messages: Conversation messages, oldest first
+            **kwargs: Extra request fields
+
+        Yields:
+            Text chunks
+
+        Raises:
+            ProviderError: If the request failed
+        """
+        payload = self._payload(messages, stream=True, **kwargs)
+        self.requests += 1
+        tries = 0
+        while True:
+            started = False
+            try:
+                async with self._semaphore():
+                    async for delta in self._stream_attempt(payload):
+                        started = True
+                        yield delta
+                return
+            except ProviderError as e:
+                delay = None if started else self._retry_delay(e, tries)
+                if delay is None:
+                    self.failures += 1
+                    raise
+            tries += 1
+            await asyncio.sleep(delay)
+
+    async def _stream_attempt(self, payload: Dict[str, Any]) -> AsyncIterator[str]:
+        """One streaming attempt."""
+        try:
+            async with self._client().stream("POST", self.url, json=payload,
+                                             headers=self.headers,
+                                             timeout=self.timeout) as response:
+                if response.status_code >= 400:
+                    await response.aread()
+                    raise self._status_error(response)
+                async for line in response.aiter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    data = line[5:].strip()
+                    if data == "[DONE]":
+                        break
+                    try:
+                        delta = json.loads(data)["choices"][0]["delta"].get("content")
+                    except (ValueError, KeyError, IndexError, TypeError, AttributeError) as e:
+                        raise ProviderError(
+                            f"Provider sent a malformed stream event: {type(e).__name__} {str(e)}",
+                            status=response.status_code) from e
+                    if delta:
+                        yield delta
+        except httpx.TransportError as e:
+            raise ProviderError(f"Provider stream failed: {type(e).__name__} {str(e)}",
+                                retryable=True) from e
+
+    def stats(self) -> Dict[str, Any]:
+        """Return request, retry and hedging counters and the current p95 latency."""
+        return {
+            "requests": self.requests,
+            "retries": self.retries,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "failures": self.failures,
+            "p95_latency": self.latency.quantile(0.95),
+        }
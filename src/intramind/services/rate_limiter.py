@@ -0,0 +1,343 @@
+"""
+Rate limiting for IntraMind.
+
+Enforces ``Config.rate_limit_per_minute``, ``rate_limit_per_hour`` and
+``rate_limit_per_day`` per caller key (an API key or a session id). Two
+backends share the RateLimiter interface:
+
+- TokenBucketLimiter keeps one token bucket per key and limit in process
+  memory. A check refills the buckets from the time elapsed since the
+  key was last seen, so it costs O(1) and needs no background timer.
+- RedisRateLimiter keeps a sliding-window counter per key and limit in
+  Redis, shared by every worker and host. The count is the current fixed
+  window plus the previous one weighted by how much of it still overlaps
+  the sliding window. A single Lua script reads, checks and updates all
+  of a key's windows atomically in one round trip, using the Redis
+  server clock.
+
+A check consumes from every limit only if all of them allow the request.
+"""
+
+import asyncio
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+import logging
+
+from intramind.services.cache_service import is_async_client
+
+logger = logging.getLogger(__name__)
+
+# KEYS: one state hash per limit. ARGV: cost, then window_ms and limit per key.
+# Returns {1, 0} when allowed, or {0, retry_after_ms}.
+SLIDING_WINDOW_SCRIPT = """
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) * 1000 + math.floor(tonumber(clock[2]) / 1000)
+local cost = tonumber(ARGV[1])
+local states = {}
+local retry = 0
+for i, key in ipairs(KEYS) do
+  local window = tonumber(ARGV[2 * i])
+  local limit = tonumber(ARGV[2 * i + 1])
+  local index = math.floor(now / window)
+  local elapsed = now - index * window
+  local state = redis.call('HMGET', key, 'w', 'c', 'p')
+  local last = tonumber(state[1])
+  local current = tonumber(state[2]) or 0
+  local previous = tonumber(state[3]) or 0
+  if last ~= index then
+    if last == index - 1 then previous = current else previous = 0 end
+    current = 0
+  end
+  if previous * (window - elapsed) / window + current + cost > limit then
+    local wait = window - elapsed
+    if previous > 0 and limit - current - cost >= 0 then
+      wait = wait - (limit - current - cost) * window / previous
+    end
+    retry = math.max(retry, wait, 1)
+  end
+  states[i] = {index, current, previous, window}
+end
+if retry > 0 then
+  return {0, math.ceil(retry)}
+end
+for i, key in ipairs(KEYS) do
+  local s = states[i]
+  redis.call('HSET', key, 'w', s[1], 'c', s[2] + cost, 'p', s[3])
+  redis.call('PEXPIRE', key, s[4] * 2)
+end
+return {1, 0}
+"""
+
+
+class RateLimitDecision(NamedTuple):
+    """
+    Outcome of a rate limit check.
+
+    Attributes:
+        allowed: Whether the request may proceed
+        retry_after: Seconds until a rejected request would be allowed
+    """
+    allowed: bool
+    retry_after: float = 0.0
+
+
+ALLOWED = RateLimitDecision(True)
+
+
+def config_limits(config: Any) -> List[Tuple[int, float]]:
+    """
+    Read the configured limits as ``(requests, window_seconds)`` pairs.
+
+    Args:
+        config: Configuration object
+
+    Returns:
+        Limits with a positive request count
+    """
+    limits = [
+        (config.rate_limit_per_minute, 60.0),
+        (config.rate_limit_per_hour, 3600.0),
+        (config.rate_limit_per_day, 86400.0),
+    ]
+    return [(requests, window) for requests, window in limits if requests > 0]
+
+
+class RateLimiter(ABC):
+    """
+    Base class for rate limiters.
+
+    Attributes:
+        limits: ``(requests, window_seconds)`` pairs enforced per key
+        allowed: Requests allowed so far
+        rejected: Requests rejected so far
+    """
+
+    def __init__(self, limits: Sequence[Tuple[int, float]]):
+        """
+        Initialize the limiter.
+
+        Args:
+            limits: ``(requests, window_seconds)`` pairs enforced per key
+        """
+        if not limits:
+            raise ValueError("At least one rate limit is required")
+        self.limits = [(int(requests), float(window)) for requests, window in limits]
+        self.allowed = 0
+        self.rejected = 0
+
+    @abstractmethod
+    def check(self, key: str, cost: int = 1) -> RateLimitDecision:
+        """
+        Consume ``cost`` requests for ``key`` if every limit allows it.
+
+        Args:
+            key: Caller key, e.g. an API key or session id
+            cost: Number of requests to consume
+
+        Returns:
+            RateLimitDecision
+        """
+
+    async def check_async(self, key: str, cost: int = 1) -> RateLimitDecision:
+        """Async version of check."""
+        return self.check(key, cost)
+
+    def _record(self, decision: RateLimitDecision) -> RateLimitDecision:
+        """Count a decision and return it."""
+        if decision.allowed:
+            self.allowed += 1
+        else:
+            self.rejected += 1
+        return decision
+
+    def stats(self) -> Dict[str, Any]:
+        """Return allowed/rejected counters."""
+        return {"allowed": self.allowed, "rejected": self.rejected}
+
+
+class TokenBucketLimiter(RateLimiter):
+    """
+    In-process token buckets, one per key and limit.
+
+    Each bucket holds up to ``requests`` tokens and refills at
+    ``requests / window`` tokens per second. Keys are kept in LRU order
+    and the least recently seen is dropped beyond ``max_keys``; a dropped
+    key starts again with full buckets.
+    """
+
+    def __init__(self, limits: Sequence[Tuple[int, float]], max_keys: int = 100000,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Initialize the limiter.
+
+        Args:
+            limits: ``(requests, window_seconds)`` pairs enforced per key
+            max_keys: Maximum number of keys tracked
+            clock: Time source in seconds
+        """
+        super().__init__(limits)
+        self.max_keys = max_keys
+        self._rates = [(float(requests), requests / window) for requests, window in self.limits]
+        self._clock = clock
+        # key -> [tokens per limit..., last refill time]
+        self._buckets: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def check(self, key: str, cost: int = 1) -> RateLimitDecision:
+        """
+        Consume ``cost`` tokens for ``key`` from every bucket if all have them.
+
+        Args:
+            key: Caller key, e.g. an API key or session id
+            cost: Number of requests to consume
+
+        Returns:
+            RateLimitDecision
+        """
+        now = self._clock()
+        with self._lock:
+            state = self._buckets.get(key)
+            if state is None:
+                state = [capacity for capacity, _ in self._rates]
+                state.append(now)
+                self._buckets[key] = state
+                if len(self._buckets) > self.max_keys:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+
+            elapsed = now - state[-1]
+            state[-1] = now
+            retry_after = 0.0
+            for i, (capacity, rate) in enumerate(self._rates):
+                tokens = min(capacity, state[i] + elapsed * rate)
+                state[i] = tokens
+                if tokens < cost:
+                    retry_after = max(retry_after, (cost - tokens) / rate)
+            if retry_after > 0:
+                return self._record(RateLimitDecision(False, retry_after))
+            for i in range(len(self._rates)):
+                state[i] -= cost
+            return self._record(ALLOWED)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return counters and the number of tracked keys."""
+        return {**super().stats(), "keys": len(self._buckets)}
+
+
+class RedisRateLimiter(RateLimiter):
+    """
+    Sliding-window counters in Redis, shared across processes.
+
+    Works with both synchronous and ``redis.asyncio`` clients.
+    check_async awaits an asynchronous client and runs a synchronous one
+    in a worker thread, so the script never blocks the event loop. Redis
+    errors are logged and counted, and the request is allowed (fail open),
+    so an unavailable Redis does not take the chatbot down with it.
+
+    Attributes:
+        errors: Checks that failed because of a Redis error
+    """
+
+    def __init__(self, client: Any, limits: Sequence[Tuple[int, float]],
+                 prefix: str = "intramind:ratelimit:"):
+        """
+        Initialize the limiter.
+
+        Args:
+            client: Redis client exposing register_script
+            limits: ``(requests, window_seconds)`` pairs enforced per key
+            prefix: Prefix of the Redis keys
+        """
+        super().__init__(limits)
+        self.client = client
+        self.prefix = prefix
+        self.errors = 0
+        self._script = client.register_script(SLIDING_WINDOW_SCRIPT)
+        self._async = is_async_client(client)
+        self._args = [1]
+        for requests, window in self.limits:
+            self._args.extend([int(window * 1000), requests])
+
+    def _keys(self, key: str) -> List[str]:
+        """Redis keys holding the window state of ``key``, one per limit."""
+        return [f"{self.prefix}{key}:{int(window)}" for _, window in self.limits]
+
+    def _args_for(self, cost: int) -> List[int]:
+        """Script arguments for a check of ``cost`` requests."""
+        return self._args if cost == 1 else [cost] + self._args[1:]
+
+    def _decide(self, result: Any) -> RateLimitDecision:
+        """Convert the script's reply to a decision."""
+        allowed, retry_ms = int(result[0]), int(result[1])
+        return self._record(ALLOWED if allowed else RateLimitDecision(False, retry_ms / 1000))
+
+    def _failed(self, error: Exception) -> RateLimitDecision:
+        """Allow a request whose check failed."""
+        self.errors += 1
+        logger.warning(f"Redis rate limit check failed: {str(error)}")
+        return self._record(ALLOWED)
+
+    def check(self, key: str, cost: int = 1) -> RateLimitDecision:
+        """
+        Count ``cost`` requests for ``key`` if every window allows it.
+
+        Args:
+            key: Caller key, e.g. an API key or session id
+            cost: Number of requests to consume
+
+        Returns:
+            RateLimitDecision
+        """
+        try:
+            return self._decide(self._script(keys=self._keys(key), args=self._args_for(cost)))
+        except Exception as e:
+            return self._failed(e)
+
+    async def check_async(self, key: str, cost: int = 1) -> RateLimitDecision:
+        """Async version of check."""
+        keys, args = self._keys(key), self._args_for(cost)
+        try:
+            if self._async:
+                result = await self._script(keys=keys, args=args)
+            else:
+                result = await asyncio.to_thread(self._script, keys=keys, args=args)
+            return self._decide(result)
+        except Exception as e:
+            return self._failed(e)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return counters including Redis errors."""
+        return {**super().stats(), "errors": self.errors}
+
+
+def create_rate_limiter(config: Any, redis_client: Optional[Any] = None) -> Optional[RateLimiter]:
+    """
+    Create the rate limiter selected by the configuration.
+
+    Args:
+        config: Configuration object
+        redis_client: Redis client for the ``redis`` backend. If None, one
+            is created from ``redis_url``.
+
+    Returns:
+        RateLimiter, or None when rate limiting is disabled or no limit
+        is set
+    """
+    limits = config_limits(config)
+    if not config.rate_limit_enabled or not limits:
+        return None
+    if config.rate_limit_backend == "redis":
+        if redis_client is None:
+            try:
+                import redis
+            except ImportError:
+                logger.warning("redis package not installed; using in-process rate limits")
+            else:
+                redis_client = redis.Redis.from_url(config.redis_url)
+        if redis_client is not None:
+            return RedisRateLimiter(redis_client, limits)
+    return TokenBucketLimiter(limits, max_keys=config.rate_limit_max_keys)
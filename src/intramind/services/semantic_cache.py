@@ -0,0 +1,208 @@
+"""
+Semantic answer caching for IntraMind.
+
+Caches generated answers by meaning rather than exact text: incoming
+messages are embedded and compared against cached queries by cosine
+similarity, so paraphrases of a cached question reuse its answer.
+"""
+
+import hashlib
+import threading
+import time
+from typing import Any, Callable, Dict, List, Mapping, NamedTuple, Optional
+import logging
+
+import numpy as np
+
+from intramind.services.embeddings import Embedder
+
+logger = logging.getLogger(__name__)
+
+
+class SemanticHit(NamedTuple):
+    """
+    A semantic cache hit.
+
+    Attributes:
+        answer: Cached answer text
+        score: Cosine similarity between the query and the cached query
+        query: The cached query that matched
+    """
+    answer: str
+    score: float
+    query: str
+
+
+class SemanticCache:
+    """
+    Embedding-similarity answer cache backed by a NumPy matrix.
+
+    Cached query vectors live in a preallocated ``(capacity, dimension)``
+    matrix, so a lookup is one matrix-vector product. Entries only match
+    queries with the same intent and scope (e.g. a digest of the session
+    context), and each intent may set its own similarity threshold. When
+    full, the least recently used entry is replaced.
+
+    Example:
+        >>> cache = SemanticCache(HashingEmbedder(), capacity=1000)
+        >>> cache.add("how do I reset my password", "question", "Go to ...")
+        >>> cache.lookup("password reset steps", "question").answer
+        'Go to ...'
+    """
+
+    def __init__(self, embedder: Embedder, capacity: int = 10000,
+                 threshold: float = 0.8,
+                 intent_thresholds: Optional[Mapping[str, float]] = None,
+                 ttl: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Initialize the semantic cache.
+
+        Args:
+            embedder: Embedder used for queries
+            capacity: Maximum number of cached answers
+            threshold: Default minimum cosine similarity for a hit
+            intent_thresholds: Per-intent overrides of the threshold
+            ttl: Optional seconds before an entry expires
+            clock: Monotonic time source, injectable for tests
+        """
+        self.embedder = embedder
+        self.capacity = capacity
+        self.threshold = threshold
+        self.intent_thresholds: Dict[str, float] = dict(intent_thresholds or {})
+        self.ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+
+        self._vectors: Optional[np.ndarray] = None
+        self._groups = np.zeros(capacity, dtype=np.int64)
+        self._last_used = np.zeros(capacity, dtype=np.float64)
+        self._expires = np.full(capacity, np.inf, dtype=np.float64)
+        self._queries: List[Optional[str]] = [None] * capacity
+        self._answers: List[Optional[str]] = [None] * capacity
+        self._size = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def threshold_for(self, intent: Optional[str]) -> float:
+        """Return the similarity threshold used for an intent."""
+        return self.intent_thresholds.get(intent or "", self.threshold)
+
+    @staticmethod
+    def _group(intent: Optional[str], scope: Optional[str]) -> int:
+        """Hash (intent, scope) into the int64 group id stored per entry."""
+        key = f"{intent or ''}\x00{scope or ''}".encode("utf-8")
+        digest = hashlib.blake2b(key, digest_size=8).digest()
+        return int.from_bytes(digest, "little", signed=True)
+
+    def embed(self, message: str) -> np.ndarray:
+        """Embed a query with the cache's embedder."""
+        return self.embedder.embed_one(message)
+
+    def lookup(self, message: str, intent: Optional[str] = None,
+               scope: Optional[str] = None,
+               vector: Optional[np.ndarray] = None) -> Optional[SemanticHit]:
+        """
+        Find a cached answer for a semantically similar query.
+
+        Args:
+            message: User's input message
+            intent: Detected intent; only entries with the same intent match
+            scope: Optional scope key; only entries with the same scope match
+            vector: Precomputed embedding of the message
+
+        Returns:
+            SemanticHit, or None on a miss
+        """
+        if vector is None:
+            vector = self.embed(message)
+
+        group = self._group(intent, scope)
+        with self._lock:
+            if self._vectors is None or not self._size or not vector.any():
+                self.misses += 1
+                return None
+
+            size = self._size
+            scores = self._vectors[:size] @ vector
+            valid = (self._groups[:size] == group) & (self._expires[:size] > self._clock())
+            scores = np.where(valid, scores, -np.inf)
+            slot = int(np.argmax(scores))
+            score = float(scores[slot])
+
+            if score < self.threshold_for(intent):
+                self.misses += 1
+                return None
+
+            self._last_used[slot] = self._clock()
+            self.hits += 1
+            return SemanticHit(self._answers[slot], score, self._queries[slot])
+
+    def add(self, message: str, intent: Optional[str], answer: str,
+            scope: Optional[str] = None, vector: Optional[np.ndarray] = None) -> None:
+        """
+        Cache an answer for a query.
+
+        Args:
+            message: The query the answer was generated for
+            intent: Detected intent of the query
+            answer: Generated answer text
+            scope: Optional scope key (e.g. session context digest)
+            vector: Precomputed embedding of the message
+        """
+        if self.capacity <= 0:
+            return
+        if vector is None:
+            vector = self.embed(message)
+        if not vector.any():
+            return
+
+        with self._lock:
+            if self._vectors is None:
+                self._vectors = np.zeros((self.capacity, len(vector)), dtype=np.float32)
+
+            now = self._clock()
+            if self._size < self.capacity:
+                slot = self._size
+                self._size += 1
+            else:
+                expired = np.flatnonzero(self._expires <= now)
+                if len(expired):
+                    slot = int(expired[0])
+                else:
+                    slot = int(np.argmin(self._last_used))
+                    self.evictions += 1
+
+            self._vectors[slot] = vector
+            self._groups[slot] = self._group(intent, scope)
+            self._last_used[slot] = now
+            self._expires[slot] = now + self.ttl if self.ttl else np.inf
+            self._queries[slot] = message
+            self._answers[slot] = answer
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return cache counters.
+
+        Returns:
+            Dictionary of hit, miss and eviction counts and current size
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": self._size,
+            "capacity": self.capacity,
+        }
+
+    def clear(self) -> None:
+        """Remove all cached answers."""
+        with self._lock:
+            self._queries = [None] * self.capacity
+            self._answers = [None] * self.capacity
+            self._size = 0
@@ -1,7 +1,9 @@
 """
 Main application entry point for IntraMind.
 
-This module starts the FastAPI server and initializes all services.
+This module starts the FastAPI server: shared models and indexes are
+loaded once, then ``WORKERS`` worker processes are forked to serve
+requests (see intramind.api.server).
 """
 
 import logging
@@ -11,12 +13,14 @@ from pathlib import Path
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent))
 
-from intramind.core.config import config
+from intramind.core.config import get_config
+
+config = get_config()
 
 # Configure logging
 logging.basicConfig(
     level=getattr(logging, config.log_level),
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    format='%(asctime)s - %(process)d - %(name)s - %(levelname)s - %(message)s'
 )
 
 logger = logging.getLogger(__name__)
@@ -26,33 +30,18 @@ def main():
     """
     Main application entry point.
 
-    Initializes and starts the IntraMind server.
+    Initializes and starts the IntraMind server, returning once every
+    worker has drained after SIGTERM or SIGINT.
     """
     try:
+        from intramind.api.server import serve
+
         logger.info(f"Starting IntraMind v1.0.0")
         logger.info(f"Environment: {config.app_env}")
         logger.info(f"Debug mode: {config.debug}")
+        logger.info(f"AI Provider: {config.ai_provider}")
 
-        # TODO: Initialize FastAPI application
-        # TODO: Set up database connections
-        # TODO: Initialize Redis cache
-        # TODO: Configure middleware
-        # TODO: Register API routes
-        # TODO: Start uvicorn server
-
-        logger.info(f"Server would start on {config.host}:{config.port}")
-        logger.info("IntraMind is ready to accept connections")
-
-        print("\n" + "="*60)
-        print("  IntraMind - Enterprise AI Conversational Chatbot")
-        print("="*60)
-        print(f"  Environment: {config.app_env}")
-        print(f"  Server: {config.host}:{config.port}")
-        print(f"  AI Provider: {config.ai_provider}")
-        print("="*60 + "\n")
-        print("  NOTE: This is a template setup.")
-        print("  Please integrate your actual application code.")
-        print("="*60 + "\n")
+        sys.exit(serve(config))
 
     except Exception as e:
         logger.error(f"Failed to start IntraMind: {str(e)}")
@@ -0,0 +1,434 @@
+"""
+Shared fixtures for the IntraMind test suite.
+"""
+
+import asyncio
+import json
+import time
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Sequence, Tuple
+
+import pytest
+
+try:
+    import lupa
+except ImportError:
+    lupa = None
+
+from intramind.services.ai_service import AIProvider
+
+
+class FakeStreamingProvider(AIProvider):
+    """
+    Local provider that emits fixed tokens with configurable delays.
+
+    Attributes:
+        calls: Message lists received, one entry per request
+    """
+
+    name = "fake"
+
+    def __init__(self, tokens: Sequence[str] = ("Hello", ", ", "world", "!"),
+                 first_token_delay: float = 0.0, token_delay: float = 0.0,
+                 fail_after: Optional[int] = None):
+        self.tokens = list(tokens)
+        self.first_token_delay = first_token_delay
+        self.token_delay = token_delay
+        self.fail_after = fail_after
+        self.calls: List[List[Dict[str, str]]] = []
+
+    async def stream(self, messages: List[Dict[str, str]], **kwargs: Any) -> AsyncIterator[str]:
+        self.calls.append(list(messages))
+        await asyncio.sleep(self.first_token_delay)
+        for index, token in enumerate(self.tokens):
+            if self.fail_after is not None and index >= self.fail_after:
+                raise RuntimeError("provider failed mid-stream")
+            if index:
+                await asyncio.sleep(self.token_delay)
+            yield token
+
+
+class MockProviderServer:
+    """
+    Local OpenAI-compatible ``/chat/completions`` server over HTTP/1.1.
+
+    Connections are kept alive. Latency and failures are injected per
+    request, in arrival order.
+
+    Attributes:
+        url: Base URL to point a provider at
+        latency: Returns the delay in seconds for the n-th request
+        failures: HTTP statuses returned by the next requests, in order
+        malformed: Number of next requests answered 200 with a body that is
+            not a completion
+        tokens: Reply text, streamed one token per event
+        connections: TCP connections accepted
+        requests: Requests received
+        max_active: Most requests handled at the same time
+    """
+
+    def __init__(self, tokens: Sequence[str] = ("Hello", " from", " the", " mock")):
+        self.url = ""
+        self.latency: Callable[[int], float] = lambda index: 0.0
+        self.failures: List[int] = []
+        self.malformed = 0
+        self.tokens = list(tokens)
+        self.connections = 0
+        self.requests = 0
+        self.max_active = 0
+        self._active = 0
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self) -> "MockProviderServer":
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        port = self._server.sockets[0].getsockname()[1]
+        self.url = f"http://127.0.0.1:{port}/v1"
+        return self
+
+    async def stop(self) -> None:
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        try:
+            while await reader.readline():
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+                await self._respond(json.loads(body), writer)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _respond(self, payload: Dict[str, Any], writer: asyncio.StreamWriter) -> None:
+        index = self.requests
+        self.requests += 1
+        self._active += 1
+        self.max_active = max(self.max_active, self._active)
+        try:
+            await asyncio.sleep(self.latency(index))
+            if self.failures:
+                status = self.failures.pop(0)
+                body = json.dumps({"error": {"message": f"injected {status}"}}).encode()
+                writer.write(f"HTTP/1.1 {status} Error\r\nContent-Type: application/json\r\n"
+                             f"Content-Length: {len(body)}\r\n\r\n".encode() + body)
+            elif self.malformed:
+                self.malformed -= 1
+                if payload.get("stream"):
+                    body = b"data: <html>Bad gateway</html>\n\n"
+                else:
+                    body = json.dumps({"model": payload["model"], "choices": []}).encode()
+                writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                             + f"Content-Length: {len(body)}\r\n\r\n".encode() + body)
+            elif payload.get("stream"):
+                writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\n"
+                             b"Transfer-Encoding: chunked\r\n\r\n")
+                events = [{"choices": [{"delta": {"content": token}}]} for token in self.tokens]
+                for event in [f"data: {json.dumps(e)}\n\n" for e in events] + ["data: [DONE]\n\n"]:
+                    data = event.encode()
+                    writer.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+                    await writer.drain()
+                writer.write(b"0\r\n\r\n")
+            else:
+                body = json.dumps({
+                    "model": payload["model"],
+                    "choices": [{"message": {"role": "assistant", "content": "".join(self.tokens)}}],
+                }).encode()
+                writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                             + f"Content-Length: {len(body)}\r\n\r\n".encode() + body)
+            await writer.drain()
+        finally:
+            self._active -= 1
+
+
+class FakePipeline:
+    """Buffers FakeRedis commands and runs them in one round trip."""
+
+    def __init__(self, client: "FakeRedis"):
+        self.client = client
+        self.queued: List[Any] = []
+
+    def __getattr__(self, name: str) -> Any:
+        method = getattr(self.client, name)
+
+        def queue(*args: Any, **kwargs: Any) -> "FakePipeline":
+            self.queued.append((method, args, kwargs))
+            return self
+
+        return queue
+
+    def execute(self) -> List[Any]:
+        self.client.round_trips += 1
+        self.client.pipelined = True
+        try:
+            results = [method(*args, **kwargs) for method, args, kwargs in self.queued]
+        finally:
+            self.client.pipelined = False
+        self.queued = []
+        return results
+
+
+class FakeScript:
+    """Lua script registered with FakeRedis, run with lupa like EVALSHA."""
+
+    def __init__(self, client: "FakeRedis", source: str):
+        if lupa is None:
+            pytest.skip("lupa is required to run Redis Lua scripts")
+        self.client = client
+        self.source = source
+
+    def __call__(self, keys: Sequence[str] = (), args: Sequence[Any] = (),
+                 client: Optional["FakeRedis"] = None) -> Any:
+        client = client or self.client
+        client.round_trips += 1
+        runtime = lupa.LuaRuntime(unpack_returned_tuples=True)
+        lua_globals = runtime.globals()
+
+        def call(command: str, *arguments: Any) -> Any:
+            result = client.lua_command(command, *arguments)
+            if isinstance(result, list):
+                return runtime.table_from([False if item is None else item for item in result])
+            return False if result is None else result
+
+        lua_globals.KEYS = runtime.table_from([str(key) for key in keys])
+        lua_globals.ARGV = runtime.table_from([str(arg) for arg in args])
+        lua_globals.redis = runtime.table_from({"call": call})
+        client.pipelined = True
+        try:
+            return self._to_python(runtime.execute(self.source))
+        finally:
+            client.pipelined = False
+
+    @classmethod
+    def _to_python(cls, value: Any) -> Any:
+        """Convert a script reply the way Redis does (tables to lists, numbers to integers)."""
+        if lupa.lua_type(value) == "table":
+            return [cls._to_python(value[i]) for i in range(1, len(value) + 1)]
+        if isinstance(value, float):
+            return int(value)
+        if isinstance(value, str):
+            return value.encode("utf-8")
+        return value
+
+
+class FakeRedis:
+    """
+    In-memory stand-in for a synchronous redis.Redis client.
+
+    Supports strings, lists and hashes. Values are stored as bytes, like
+    the real client returns them. Lua scripts run through lupa when it is
+    installed; tests using them are skipped otherwise.
+
+    Attributes:
+        commands: Number of commands executed
+        round_trips: Number of network round trips (a pipeline or script is one)
+        clock: Time source for the TIME command
+    """
+
+    def __init__(self):
+        self.store: Dict[str, Any] = {}
+        self.expires: Dict[str, float] = {}
+        self.commands = 0
+        self.round_trips = 0
+        self.pipelined = False
+        self.clock = time.time
+
+    def _count(self) -> None:
+        self.commands += 1
+        if not self.pipelined:
+            self.round_trips += 1
+
+    def pipeline(self, transaction: bool = True) -> FakePipeline:
+        return FakePipeline(self)
+
+    def _alive(self, key: str) -> bool:
+        expires_at = self.expires.get(key)
+        if expires_at is not None and expires_at <= time.monotonic():
+            self.store.pop(key, None)
+            self.expires.pop(key, None)
+        return key in self.store
+
+    @staticmethod
+    def _encode(value: Any) -> bytes:
+        return value if isinstance(value, bytes) else str(value).encode("utf-8")
+
+    def get(self, key: str) -> Optional[bytes]:
+        self._count()
+        return self.store[key] if self._alive(key) else None
+
+    def set(self, key: str, value: Any, ex: Optional[float] = None) -> bool:
+        self._count()
+        self.store[key] = self._encode(value)
+        if ex is not None:
+            self.expires[key] = time.monotonic() + ex
+        else:
+            self.expires.pop(key, None)
+        return True
+
+    def delete(self, *keys: str) -> int:
+        self._count()
+        removed = 0
+        for key in keys:
+            if self._alive(key):
+                removed += 1
+            self.store.pop(key, None)
+            self.expires.pop(key, None)
+        return removed
+
+    def expire(self, key: str, seconds: float) -> bool:
+        self._count()
+        if not self._alive(key):
+            return False
+        self.expires[key] = time.monotonic() + seconds
+        return True
+
+    def rpush(self, key: str, *values: Any) -> int:
+        self._count()
+        self._alive(key)
+        items = self.store.setdefault(key, [])
+        items.extend(self._encode(value) for value in values)
+        return len(items)
+
+    @staticmethod
+    def _slice(items: List[bytes], start: int, end: int) -> List[bytes]:
+        start = max(0, start + len(items)) if start < 0 else start
+        end = end + len(items) if end < 0 else end
+        return items[start:end + 1]
+
+    def lrange(self, key: str, start: int, end: int) -> List[bytes]:
+        self._count()
+        return self._slice(self.store[key], start, end) if self._alive(key) else []
+
+    def ltrim(self, key: str, start: int, end: int) -> bool:
+        self._count()
+        if self._alive(key):
+            self.store[key] = self._slice(self.store[key], start, end)
+        return True
+
+    def hset(self, key: str, field: str, value: Any) -> int:
+        self._count()
+        self._alive(key)
+        fields = self.store.setdefault(key, {})
+        added = field.encode("utf-8") not in fields
+        fields[field.encode("utf-8")] = self._encode(value)
+        return int(added)
+
+    def hsetnx(self, key: str, field: str, value: Any) -> int:
+        self._count()
+        self._alive(key)
+        fields = self.store.setdefault(key, {})
+        if field.encode("utf-8") in fields:
+            return 0
+        fields[field.encode("utf-8")] = self._encode(value)
+        return 1
+
+    def hgetall(self, key: str) -> Dict[bytes, bytes]:
+        self._count()
+        return dict(self.store[key]) if self._alive(key) else {}
+
+    def hmget(self, key: str, *fields: str) -> List[Optional[bytes]]:
+        self._count()
+        values = self.store[key] if self._alive(key) else {}
+        return [values.get(field.encode("utf-8")) for field in fields]
+
+    @staticmethod
+    def _score_range(low: Any, high: Any) -> Callable[[float], bool]:
+        """Membership test for a ZRANGEBYSCORE-style score range."""
+        def bound(value: Any) -> Tuple[float, bool]:
+            text = value.decode() if isinstance(value, bytes) else str(value)
+            return (float(text[1:]), True) if text.startswith("(") else (float(text), False)
+
+        (lo, lo_open), (hi, hi_open) = bound(low), bound(high)
+        return lambda score: ((score > lo if lo_open else score >= lo)
+                              and (score < hi if hi_open else score <= hi))
+
+    def zadd(self, key: str, mapping: Dict[str, float]) -> int:
+        self._count()
+        self._alive(key)
+        members = self.store.setdefault(key, {})
+        added = 0
+        for member, score in mapping.items():
+            added += self._encode(member) not in members
+            members[self._encode(member)] = float(score)
+        return added
+
+    def zrem(self, key: str, *members: str) -> int:
+        self._count()
+        scores = self.store.get(key, {}) if self._alive(key) else {}
+        return sum(scores.pop(self._encode(member), None) is not None for member in members)
+
+    def zrangebyscore(self, key: str, low: Any, high: Any) -> List[bytes]:
+        self._count()
+        scores = self.store.get(key, {}) if self._alive(key) else {}
+        inside = self._score_range(low, high)
+        return [member for member, score in sorted(scores.items(), key=lambda item: item[1])
+                if inside(score)]
+
+    def zremrangebyscore(self, key: str, low: Any, high: Any) -> int:
+        self._count()
+        scores = self.store.get(key, {}) if self._alive(key) else {}
+        inside = self._score_range(low, high)
+        removed = [member for member, score in scores.items() if inside(score)]
+        for member in removed:
+            del scores[member]
+        return len(removed)
+
+    def pttl(self, key: str) -> int:
+        self._count()
+        if not self._alive(key):
+            return -2
+        if key not in self.expires:
+            return -1
+        return int((self.expires[key] - time.monotonic()) * 1000)
+
+    def pexpire(self, key: str, milliseconds: float) -> bool:
+        return self.expire(key, float(milliseconds) / 1000)
+
+    def register_script(self, source: str) -> FakeScript:
+        return FakeScript(self, source)
+
+    def lua_command(self, command: str, *args: Any) -> Any:
+        """Run a command issued by redis.call inside a Lua script."""
+        command = command.upper()
+        if command == "TIME":
+            self._count()
+            now = self.clock()
+            return [str(int(now)), str(int(now % 1 * 1_000_000))]
+        if command == "DEL":
+            return self.delete(*args)
+        if command == "HSET":
+            return sum(self.hset(args[0], field, value)
+                       for field, value in zip(args[1::2], args[2::2]))
+        return getattr(self, command.lower())(*args)
+
+
+@pytest.fixture
+def fake_redis():
+    """Create an empty in-memory Redis stand-in."""
+    return FakeRedis()
+
+
+@pytest.fixture
+def fake_provider_factory():
+    """Return the FakeStreamingProvider class for per-test configuration."""
+    return FakeStreamingProvider
+
+
+@pytest.fixture
+async def mock_provider_server():
+    """Start a local OpenAI-compatible server for the test."""
+    server = await MockProviderServer().start()
+    yield server
+    await server.stop()
+
+
+@pytest.fixture
+def mock_provider_server_factory():
+    """Return the MockProviderServer class for servers started elsewhere."""
+    return MockProviderServer
@@ -0,0 +1,157 @@
+"""
+Unit tests for the pooled provider client, against a local mock server.
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from intramind import ChatBot, Config
+from intramind.services.ai_service import create_provider, run_sync
+from intramind.services.provider_client import (
+    OpenAIProvider, ProviderError, close_shared_client
+)
+
+MESSAGES = [{"role": "user", "content": "Hello!"}]
+
+
+@pytest.fixture
+async def make_provider(mock_provider_server):
+    """Build providers pointed at the mock server with fast backoff."""
+
+    def make(**kwargs):
+        options = {"api_key": "test-key", "base_url": mock_provider_server.url,
+                   "backoff": 0.01, "backoff_max": 0.05, **kwargs}
+        return OpenAIProvider(**options)
+
+    yield make
+    await close_shared_client()
+
+
+class TestOpenAIProvider:
+    """Test suite for OpenAIProvider."""
+
+    async def test_connections_are_reused(self, make_provider, mock_provider_server):
+        """Test that sequential requests share one keep-alive connection."""
+        provider = make_provider()
+        replies = [await provider.generate(MESSAGES) for _ in range(10)]
+        other = make_provider(model="other-model")
+        await other.generate(MESSAGES)
+
+        assert set(replies) == {"Hello from the mock"}
+        assert mock_provider_server.requests == 11
+        assert mock_provider_server.connections == 1
+
+    async def test_concurrency_is_capped(self, make_provider, mock_provider_server):
+        """Test that no more than max_concurrency requests are in flight."""
+        mock_provider_server.latency = lambda index: 0.05
+        provider = make_provider(max_concurrency=3)
+        replies = await asyncio.gather(*(provider.generate(MESSAGES) for _ in range(10)))
+
+        assert len(replies) == 10
+        assert mock_provider_server.max_active == 3
+
+    async def test_transient_failures_are_retried(self, make_provider, mock_provider_server):
+        """Test that 5xx and 429 responses are retried until one succeeds."""
+        mock_provider_server.failures = [503, 429, 502]
+        provider = make_provider(max_retries=3)
+
+        assert await provider.generate(MESSAGES) == "Hello from the mock"
+        assert provider.retries == 3
+        assert mock_provider_server.requests == 4
+
+    async def test_permanent_failures_are_raised(self, make_provider, mock_provider_server):
+        """Test that client errors are not retried and exhausted retries raise."""
+        mock_provider_server.failures = [400, 503, 503]
+        provider = make_provider(max_retries=1)
+
+        with pytest.raises(ProviderError) as bad_request:
+            await provider.generate(MESSAGES)
+        with pytest.raises(ProviderError) as unavailable:
+            await provider.generate(MESSAGES)
+
+        assert bad_request.value.status == 400
+        assert "injected 400" in str(bad_request.value)
+        assert unavailable.value.status == 503
+        assert mock_provider_server.requests == 3
+        assert provider.stats()["failures"] == 2
+
+    async def test_slow_request_is_hedged(self, make_provider, mock_provider_server):
+        """Test that a request slower than p95 gets a duplicate that answers first."""
+        mock_provider_server.latency = lambda index: 2.0 if index == 30 else 0.01
+        provider = make_provider(hedging=True)
+        for _ in range(30):
+            await provider.generate(MESSAGES)
+
+        start = time.perf_counter()
+        reply = await provider.generate(MESSAGES)
+        elapsed = time.perf_counter() - start
+
+        assert reply == "Hello from the mock"
+        assert elapsed < 0.5
+        assert provider.hedges == 1 and provider.hedge_wins == 1
+
+    async def test_stream_retries_before_first_token(self, make_provider,
+                                                     mock_provider_server):
+        """Test that server-sent events are parsed and a failed start is retried."""
+        mock_provider_server.failures = [503]
+        provider = make_provider()
+        chunks = [chunk async for chunk in provider.stream(MESSAGES)]
+
+        assert chunks == ["Hello", " from", " the", " mock"]
+        assert provider.retries == 1
+
+    async def test_malformed_responses_raise_provider_error(self, make_provider,
+                                                            mock_provider_server):
+        """Test that a 200 response without a completion is not retried and raises."""
+        mock_provider_server.malformed = 2
+        provider = make_provider(max_retries=3)
+
+        with pytest.raises(ProviderError) as completion:
+            await provider.generate(MESSAGES)
+        with pytest.raises(ProviderError) as stream:
+            [chunk async for chunk in provider.stream(MESSAGES)]
+
+        assert "malformed response" in str(completion.value)
+        assert "malformed stream event" in str(stream.value)
+        assert completion.value.status == stream.value.status == 200
+        assert not completion.value.retryable
+        assert mock_provider_server.requests == 2
+
+
+class TestProviderWiring:
+    """Test suite for creating the provider from Config."""
+
+    def test_none_keeps_placeholder_responses(self):
+        """Test that ai_provider=none creates no provider."""
+        assert create_provider(Config(ai_provider="none")) is None
+        assert ChatBot(Config(cache_enabled=False)).provider is None
+
+    def test_sync_chat_reuses_connections(self, mock_provider_server_factory):
+        """Test that chat() calls share the background loop's pooled connection."""
+        server = run_sync(mock_provider_server_factory().start())
+        try:
+            config = Config(ai_provider="openai", ai_base_url=server.url, model_name="mock",
+                            cache_enabled=False)
+            bot = ChatBot(config)
+            replies = [bot.chat(f"Question {i}", session_id="wired").message for i in range(3)]
+        finally:
+            run_sync(server.stop())
+
+        assert isinstance(bot.provider, OpenAIProvider)
+        assert replies == ["Hello from the mock"] * 3
+        assert server.connections == 1
+
+    async def test_async_chat_uses_provider(self, mock_provider_server):
+        """Test that chat_async and chat_stream go through the configured provider."""
+        config = Config(ai_provider="openai", ai_base_url=mock_provider_server.url,
+                        cache_enabled=False)
+        bot = ChatBot(config)
+        response = await bot.chat_async("Hello!", session_id="async-wired")
+        chunks = [chunk async for chunk in bot.chat_stream("More", session_id="async-wired")]
+        await close_shared_client()
+
+        assert response.message == "Hello from the mock"
+        assert [c.delta for c in chunks[:-1]] == ["Hello", " from", " the", " mock"]
+        assert mock_provider_server.connections == 1
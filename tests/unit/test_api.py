@@ -0,0 +1,381 @@
+"""
+Unit tests for the ASGI application and the pre-fork server.
+"""
+
+import asyncio
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import httpx
+import numpy as np
+import pytest
+from fastapi import WebSocketDisconnect
+from fastapi.testclient import TestClient
+
+from intramind import ChatBot, Config
+from intramind.api.app import create_app
+from intramind.api.responses import ORJSONResponse
+from intramind.api import server
+from intramind.api.server import Preloaded, worker_config
+from intramind.api.websocket import ChatConnection
+from intramind.core.nlp_pool import NLPProcessPool
+from intramind.services.ai_service import AIProvider
+
+SRC = Path(__file__).resolve().parents[2] / "src"
+
+
+def free_port():
+    """Return a TCP port that is currently free."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class TestApp:
+    """Test suite for the FastAPI application."""
+
+    def test_chat_turns_share_a_session(self):
+        """Test that chat turns are answered and recorded in their session."""
+        bot = ChatBot(Config(cache_enabled=False))
+        with TestClient(create_app(bot)) as client:
+            first = client.post("/api/v1/chat", json={"message": "Hello!", "session_id": "s1"})
+            client.post("/api/v1/chat", json={"message": "I need help", "session_id": "s1"})
+            history = client.get("/api/v1/sessions/s1/history").json()
+            deleted = client.delete("/api/v1/sessions/s1").json()
+        bot.close()
+
+        assert first.status_code == 200
+        assert first.json()["session_id"] == "s1"
+        assert first.json()["intent"] == "greeting"
+        assert [m["role"] for m in history["messages"]] == ["user", "assistant"] * 2
+        assert deleted["deleted"] is True
+
+    def test_empty_message_is_rejected(self):
+        """Test that request validation runs before the ChatBot."""
+        with TestClient(create_app(ChatBot(Config(cache_enabled=False)))) as client:
+            response = client.post("/api/v1/chat", json={"message": ""})
+
+        assert response.status_code == 422
+
+    def test_readiness_fails_while_draining(self):
+        """Test that /ready reports draining once shutdown has started."""
+        created = []
+
+        def factory():
+            created.append(ChatBot(Config(cache_enabled=False)))
+            return created[-1]
+
+        app = create_app(chatbot_factory=factory, config=Config(cache_enabled=False))
+        with TestClient(app) as client:
+            assert client.get("/ready").status_code == 200
+            app.state.draining = True
+            assert client.get("/ready").status_code == 503
+            assert client.get("/health").json()["status"] == "ok"
+
+        assert len(created) == 1
+
+    def test_rate_limited_chat_returns_429(self):
+        """Test that callers over their limit get 429 with Retry-After, keyed by API key."""
+        config = Config(cache_enabled=False, rate_limit_enabled=True, rate_limit_per_minute=2)
+        bot = ChatBot(config)
+        with TestClient(create_app(bot)) as client:
+            statuses = [
+                client.post("/api/v1/chat", json={"message": "Hello!"},
+                            headers={"X-API-Key": "tenant-a"}).status_code
+                for _ in range(3)
+            ]
+            limited = client.post("/api/v1/chat", json={"message": "Hello!"},
+                                  headers={"Authorization": "Bearer tenant-a"})
+            other = client.post("/api/v1/chat", json={"message": "Hello!"},
+                                headers={"X-API-Key": "tenant-b"})
+        bot.close()
+
+        assert statuses == [200, 200, 429]
+        assert limited.status_code == 429
+        assert int(limited.headers["retry-after"]) >= 1
+        assert limited.json()["metadata"]["error"] == "rate_limited"
+        assert other.status_code == 200
+
+    def test_orjson_response_serializes_numpy(self):
+        """Test that NumPy values in metadata are serialized."""
+        response = ORJSONResponse({"score": np.float32(0.5), "rows": np.arange(3)})
+
+        assert response.body == b'{"score":0.5,"rows":[0,1,2]}'
+
+
+def receive_reply(ws):
+    """Read frames until a response or error frame; return (chunks, final frame)."""
+    chunks = []
+    while True:
+        frame = ws.receive_json()
+        if frame["type"] == "chunk":
+            chunks.append(frame)
+        elif frame["type"] in ("response", "error"):
+            return chunks, frame
+
+
+class CountingProvider(AIProvider):
+    """Provider that yields many tokens and counts how many were pulled."""
+
+    name = "counting"
+
+    def __init__(self, tokens=200):
+        self.tokens = tokens
+        self.produced = 0
+
+    async def stream(self, messages, **kwargs):
+        for index in range(self.tokens):
+            self.produced += 1
+            yield f"t{index} "
+
+
+class StalledSocket:
+    """WebSocket double whose client reads nothing until `reading` is set."""
+
+    def __init__(self, frames):
+        self.query_params = {}
+        self.headers = {}
+        self.client = None
+        self.incoming = asyncio.Queue()
+        for frame in frames:
+            self.incoming.put_nowait(json.dumps(frame))
+        self.reading = asyncio.Event()
+        self.sent = []
+
+    async def accept(self):
+        pass
+
+    async def receive(self):
+        text = await self.incoming.get()
+        if text is None:
+            return {"type": "websocket.disconnect", "code": 1000}
+        return {"type": "websocket.receive", "text": text}
+
+    async def send_text(self, text):
+        await self.reading.wait()
+        self.sent.append(json.loads(text))
+
+    async def close(self, code=1000):
+        pass
+
+
+class TestWebSocket:
+    """Test suite for the /ws/chat endpoint."""
+
+    def test_connection_streams_into_one_session(self, fake_provider_factory):
+        """Test that replies stream as chunks and all turns share the connection's session."""
+        bot = ChatBot(Config(cache_enabled=False), provider=fake_provider_factory())
+        with TestClient(create_app(bot)) as client:
+            with client.websocket_connect("/ws/chat") as ws:
+                ws.send_json({"type": "message", "id": 1, "content": "Hello!"})
+                chunks, first = receive_reply(ws)
+                ws.send_json({"type": "message", "id": 2, "content": "I need help"})
+                _, second = receive_reply(ws)
+        bot.close()
+
+        assert "".join(c["delta"] for c in chunks) == first["message"] == "Hello, world!"
+        assert first["id"] == 1 and second["id"] == 2
+        assert second["session_id"] == first["session_id"] == chunks[0]["session_id"]
+        assert len(bot.get_session_history(first["session_id"])) == 4
+
+    def test_messages_beyond_inflight_cap_are_rejected(self, fake_provider_factory):
+        """Test that a connection cannot queue more than ws_max_inflight messages."""
+        config = Config(cache_enabled=False, ws_max_inflight=1)
+        bot = ChatBot(config, provider=fake_provider_factory(first_token_delay=0.3))
+        with TestClient(create_app(bot)) as client:
+            with client.websocket_connect("/ws/chat?session_id=ws-cap") as ws:
+                ws.send_json({"type": "message", "id": 1, "content": "Hello!"})
+                ws.send_json({"type": "message", "id": 2, "content": "Hello again!"})
+                _, rejected = receive_reply(ws)
+                _, answered = receive_reply(ws)
+        bot.close()
+
+        assert rejected["type"] == "error" and rejected["id"] == 2
+        assert answered["type"] == "response" and answered["id"] == 1
+        assert answered["session_id"] == "ws-cap"
+
+    async def test_slow_client_pauses_generation(self):
+        """Test that tokens stop being pulled while the send queue is full."""
+        provider = CountingProvider()
+        bot = ChatBot(Config(cache_enabled=False), provider=provider)
+        socket_ = StalledSocket([{"type": "message", "id": 1, "content": "Tell me everything"}])
+        connection = ChatConnection(socket_, bot, Config(ws_send_queue_size=4))
+        task = asyncio.create_task(connection.run())
+
+        await asyncio.sleep(0.2)
+        paused_at = provider.produced
+        socket_.reading.set()
+        while not any(frame["type"] == "response" for frame in socket_.sent):
+            await asyncio.sleep(0.01)
+        socket_.incoming.put_nowait(None)
+        await asyncio.wait_for(task, 5)
+        bot.close()
+
+        # The queue, the frame being sent and the chunk being queued
+        assert paused_at <= 4 + 2
+        assert provider.produced == 200
+        assert len([frame for frame in socket_.sent if frame["type"] == "chunk"]) == 200
+
+    def test_frame_size_is_measured_in_bytes(self):
+        """Test that multi-byte text counts against ws_max_message_bytes in bytes."""
+        bot = ChatBot(Config(cache_enabled=False, ws_max_message_bytes=100))
+        with TestClient(create_app(bot)) as client:
+            with client.websocket_connect("/ws/chat") as ws:
+                ws.send_text(json.dumps({"content": "é" * 60}, ensure_ascii=False))
+                with pytest.raises(WebSocketDisconnect) as closed:
+                    ws.receive_json()
+        bot.close()
+
+        assert closed.value.code == 1009
+
+    async def test_receiver_keeps_reading_when_client_stalls(self):
+        """Test that pongs are dropped rather than blocking the receiver."""
+        bot = ChatBot(Config(cache_enabled=False))
+        socket_ = StalledSocket([{"type": "ping"}] * 20)
+        connection = ChatConnection(socket_, bot, Config(ws_send_queue_size=4))
+        task = asyncio.create_task(connection.run())
+
+        await asyncio.sleep(0.05)
+        drained = socket_.incoming.empty()
+        socket_.incoming.put_nowait(None)
+        socket_.reading.set()
+        await asyncio.wait_for(task, 5)
+        bot.close()
+
+        assert drained
+        assert len(socket_.sent) <= 4 + 1
+
+    def test_generation_error_is_reported_per_message(self, fake_provider_factory):
+        """Test that a failed reply sends an error frame and the connection stays up."""
+        bot = ChatBot(Config(cache_enabled=False), provider=fake_provider_factory())
+        chat_stream = bot.chat_stream
+        calls = []
+
+        async def flaky_stream(*args, **kwargs):
+            calls.append(args)
+            if len(calls) == 1:
+                raise RuntimeError("provider exploded")
+            async for chunk in chat_stream(*args, **kwargs):
+                yield chunk
+
+        bot.chat_stream = flaky_stream
+        with TestClient(create_app(bot)) as client:
+            with client.websocket_connect("/ws/chat") as ws:
+                ws.send_json({"type": "message", "id": 1, "content": "Hello!"})
+                _, failed = receive_reply(ws)
+                ws.send_json({"type": "message", "id": 2, "content": "Hello again!"})
+                _, answered = receive_reply(ws)
+        bot.close()
+
+        assert failed == {"type": "error", "id": 1, "error": "Failed to generate a reply"}
+        assert answered["type"] == "response" and answered["message"] == "Hello, world!"
+
+    def test_invalid_frames_are_rejected_per_message(self):
+        """Test that binary frames and non-object context get error frames, not a disconnect."""
+        bot = ChatBot(Config(cache_enabled=False))
+        with TestClient(create_app(bot)) as client:
+            with client.websocket_connect("/ws/chat") as ws:
+                ws.send_bytes(b"\x00\x01")
+                binary = ws.receive_json()
+                ws.send_json({"type": "message", "id": 1, "content": "Hi", "context": ["x"]})
+                context = ws.receive_json()
+                ws.send_json({"type": "message", "id": 2, "content": "Hello!"})
+                _, answered = receive_reply(ws)
+        bot.close()
+
+        assert binary == {"type": "error", "id": None, "error": "Frames must be JSON text"}
+        assert context == {"type": "error", "id": 1, "error": "context must be a JSON object"}
+        assert answered["type"] == "response" and answered["id"] == 2
+
+    def test_failed_first_turn_keeps_the_session(self, fake_provider_factory):
+        """Test that the connection is bound to a session even when its first reply fails."""
+        provider = fake_provider_factory()
+        bot = ChatBot(Config(cache_enabled=False), provider=provider)
+        with TestClient(create_app(bot)) as client:
+            with client.websocket_connect("/ws/chat") as ws:
+                provider.fail_after = 0
+                ws.send_json({"type": "message", "id": 1, "content": "Hello!"})
+                _, failed = receive_reply(ws)
+                provider.fail_after = None
+                ws.send_json({"type": "message", "id": 2, "content": "Hello again!"})
+                _, answered = receive_reply(ws)
+        bot.close()
+
+        assert "error" in failed["metadata"]
+        assert failed["session_id"] is not None
+        assert answered["session_id"] == failed["session_id"]
+
+    def test_idle_connection_is_closed(self):
+        """Test that the server pings and then closes a silent connection."""
+        config = Config(cache_enabled=False, ws_heartbeat_interval=0.05, ws_idle_timeout=0.3)
+        bot = ChatBot(config)
+        with TestClient(create_app(bot)) as client:
+            with client.websocket_connect("/ws/chat") as ws:
+                assert ws.receive_json() == {"type": "ping"}
+                with pytest.raises(WebSocketDisconnect) as closed:
+                    while True:
+                        ws.receive_json()
+        bot.close()
+
+        assert closed.value.code == 1001
+
+
+class TestServer:
+    """Test suite for the pre-fork launcher."""
+
+    def test_workers_serve_and_drain(self):
+        """Test that forked workers answer requests and exit cleanly on SIGTERM."""
+        port = free_port()
+        env = dict(os.environ, PYTHONPATH=str(SRC), HOST="127.0.0.1", PORT=str(port),
+                   WORKERS="2", CACHE_ENABLED="false", SHUTDOWN_TIMEOUT="5")
+        process = subprocess.Popen(
+            [sys.executable, "-c", "from intramind.api.server import serve; serve()"],
+            env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            deadline = time.monotonic() + 20
+            while True:
+                try:
+                    health = httpx.get(f"http://127.0.0.1:{port}/health", timeout=1)
+                    break
+                except httpx.TransportError:
+                    assert time.monotonic() < deadline, "server did not start"
+                    time.sleep(0.1)
+            reply = httpx.post(f"http://127.0.0.1:{port}/api/v1/chat",
+                               json={"message": "Hello!"}, timeout=5)
+        finally:
+            process.send_signal(signal.SIGTERM)
+            status = process.wait(timeout=20)
+
+        assert health.json()["pid"] != process.pid
+        assert reply.json()["intent"] == "greeting"
+        assert status == 0
+
+    @pytest.mark.parametrize("workers, nlp_workers, expected", [(4, 0, 1), (4, 2, 2), (1, 0, 1)])
+    def test_nlp_pool_is_sized_per_worker(self, workers, nlp_workers, expected):
+        """Test that forked workers do not each start a WORKERS-sized NLP pool."""
+        config = worker_config(Config(workers=workers, nlp_workers=nlp_workers))
+
+        assert NLPProcessPool(config).workers == expected
+
+    def test_single_worker_closes_knowledge_base(self, monkeypatch):
+        """Test that the in-process path releases the socket and knowledge base."""
+        class Closeable:
+            closed = False
+
+            def close(self):
+                self.closed = True
+
+        knowledge_base = Closeable()
+        sock = socket.socket()
+        monkeypatch.setattr(server, "preload", lambda config: Preloaded(None, knowledge_base))
+        monkeypatch.setattr(server, "run_worker", lambda config, preloaded, sock: None)
+
+        assert server.serve(Config(workers=1), sock) == 0
+        assert knowledge_base.closed
+        assert sock.fileno() == -1
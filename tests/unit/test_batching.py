@@ -0,0 +1,186 @@
+"""
+Unit tests for the micro-batching scheduler.
+"""
+
+import asyncio
+import concurrent.futures
+import threading
+import time
+
+import pytest
+
+from intramind import ChatBot, Config
+from intramind.core.batching import MicroBatcher
+
+
+class RecordingBatch:
+    """Batch function that doubles its inputs and records batch sizes."""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.sizes = []
+
+    async def __call__(self, items):
+        self.sizes.append(len(items))
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        return [item * 2 for item in items]
+
+
+class TestMicroBatcher:
+    """Test suite for MicroBatcher."""
+
+    async def test_concurrent_requests_share_batches(self):
+        """Test that concurrent submits are grouped up to the maximum size."""
+        func = RecordingBatch()
+        batcher = MicroBatcher(func, max_batch_size=32, max_wait=0.01)
+
+        results = await asyncio.gather(*(batcher.submit(i) for i in range(100)))
+
+        assert results == [i * 2 for i in range(100)]
+        assert func.sizes == [32, 32, 32, 4]
+        assert batcher.stats()["mean_batch_size"] == 25
+
+    async def test_single_request_waits_for_window(self):
+        """Test that a lone request is dispatched once the wait window expires."""
+        func = RecordingBatch()
+        batcher = MicroBatcher(func, max_batch_size=32, max_wait=0.02)
+
+        start = time.perf_counter()
+        assert await batcher.submit(5) == 10
+        elapsed = time.perf_counter() - start
+
+        assert 0.015 <= elapsed < 0.5
+        assert func.sizes == [1]
+
+    async def test_full_batch_skips_window(self):
+        """Test that a full batch is dispatched without waiting."""
+        batcher = MicroBatcher(RecordingBatch(), max_batch_size=4, max_wait=5)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(batcher.submit(i) for i in range(4)))
+
+        assert time.perf_counter() - start < 1
+
+    async def test_requests_queue_while_batch_runs(self):
+        """Test that arrivals during a running batch form the next batch."""
+        func = RecordingBatch(delay=0.02)
+        batcher = MicroBatcher(func, max_batch_size=64, max_wait=0)
+
+        first = asyncio.ensure_future(batcher.submit(0))
+        await asyncio.sleep(0.005)
+        rest = [asyncio.ensure_future(batcher.submit(i)) for i in range(1, 11)]
+        await asyncio.gather(first, *rest)
+
+        assert func.sizes == [1, 10]
+
+    async def test_sync_batch_function(self):
+        """Test that plain functions can be batched."""
+        batcher = MicroBatcher(lambda items: [len(item) for item in items], max_wait=0)
+
+        assert await asyncio.gather(batcher.submit("ab"), batcher.submit("abc")) == [2, 3]
+
+    async def test_errors_reach_every_caller(self):
+        """Test that a failing batch fails each of its requests."""
+        def explode(items):
+            raise RuntimeError("model crashed")
+
+        batcher = MicroBatcher(explode, max_wait=0)
+        results = await asyncio.gather(batcher.submit(1), batcher.submit(2),
+                                       return_exceptions=True)
+
+        assert all(isinstance(r, RuntimeError) for r in results)
+
+    async def test_result_count_mismatch(self):
+        """Test that a batch function returning the wrong count is an error."""
+        batcher = MicroBatcher(lambda items: items[:1], max_wait=0)
+
+        with pytest.raises(ValueError):
+            await asyncio.gather(batcher.submit(1), batcher.submit(2))
+
+    async def test_latency_ceiling(self):
+        """Test that requests give up at the latency ceiling."""
+        batcher = MicroBatcher(RecordingBatch(delay=0.2), max_wait=0, timeout=0.02)
+
+        with pytest.raises(asyncio.TimeoutError):
+            await batcher.submit(1)
+        assert batcher.stats()["timeouts"] == 1
+        await batcher.close()
+
+    async def test_metrics(self):
+        """Test that per-batch size and wait metrics are recorded."""
+        batcher = MicroBatcher(RecordingBatch(), max_batch_size=2, max_wait=0.01)
+        await asyncio.gather(*(batcher.submit(i) for i in range(5)))
+        stats = batcher.stats()
+
+        assert stats["batches"] == 3
+        assert stats["items"] == 5
+        assert stats["size_histogram"] == {1: 1, 2: 2}
+        assert 0 <= stats["mean_wait_ms"] <= stats["max_wait_ms"]
+        assert stats["queued"] == 0
+
+    async def test_close_cancels_running_batches(self):
+        """Test that close() releases callers whose batch is already dispatched."""
+        batcher = MicroBatcher(RecordingBatch(delay=10), max_wait=0, max_concurrency=2)
+        calls = [asyncio.ensure_future(batcher.submit(i)) for i in range(3)]
+        await asyncio.sleep(0.01)
+
+        start = time.perf_counter()
+        await batcher.close()
+        results = await asyncio.gather(*calls, return_exceptions=True)
+
+        assert time.perf_counter() - start < 1
+        assert all(isinstance(r, asyncio.CancelledError) for r in results)
+        assert await asyncio.wait_for(MicroBatcher(RecordingBatch()).submit(2), 1) == 4
+
+    async def test_switching_loops_with_queued_requests_is_rejected(self):
+        """Test that a batcher busy on another open loop refuses new requests."""
+        batcher = MicroBatcher(RecordingBatch(), max_wait=10)
+        other = asyncio.new_event_loop()
+        thread = threading.Thread(target=other.run_forever, daemon=True)
+        thread.start()
+        try:
+            queued = asyncio.run_coroutine_threadsafe(batcher.submit(1), other)
+            time.sleep(0.05)
+            with pytest.raises(RuntimeError):
+                await batcher.submit(2)
+            asyncio.run_coroutine_threadsafe(batcher.close(), other).result(1)
+            with pytest.raises(concurrent.futures.CancelledError):
+                queued.result(1)
+        finally:
+            other.call_soon_threadsafe(other.stop)
+            thread.join()
+            other.close()
+
+        batcher.max_wait = 0
+        assert await batcher.submit(3) == 6
+        await batcher.close()
+
+
+class TestChatBotBatching:
+    """Test suite for micro-batched NLP in ChatBot.chat_async."""
+
+    async def test_batched_chat_matches_unbatched(self):
+        """Test that batching changes throughput, not results."""
+        messages = [f"hello, I need help with item {i}?" for i in range(40)]
+        plain = ChatBot(Config(cache_enabled=False))
+        batched = ChatBot(Config(cache_enabled=False, nlp_batching_enabled=True))
+
+        expected = [await plain.chat_async(m) for m in messages]
+        actual = await asyncio.gather(*(batched.chat_async(m) for m in messages))
+
+        assert [(r.message, r.intent) for r in actual] == [(r.message, r.intent) for r in expected]
+        assert batched.nlp_batcher.stats()["batches"] < len(messages)
+
+    async def test_aclose_stops_batcher(self):
+        """Test that ChatBot.aclose cancels NLP requests waiting in the batcher."""
+        bot = ChatBot(Config(cache_enabled=False, nlp_batching_enabled=True,
+                             nlp_batch_max_wait_ms=10000))
+        pending = asyncio.ensure_future(bot.chat_async("Hello!"))
+        await asyncio.sleep(0.01)
+
+        await bot.aclose()
+
+        with pytest.raises(asyncio.CancelledError):
+            await pending
+        assert bot.nlp_batcher.stats()["queued"] == 0
@@ -0,0 +1,139 @@
+"""
+Unit tests for the BM25 keyword index and hybrid ranking.
+"""
+
+import math
+from collections import Counter
+
+import numpy as np
+import pytest
+
+from intramind.knowledge.bm25 import BM25Index, decode_varints, encode_varints, tokenize
+from intramind.knowledge.ranking import HybridRanker
+
+
+def zipf_corpus(documents=3000, words=30, vocabulary=2000, seed=0):
+    """Texts over a Zipf-distributed vocabulary, so some terms are very common."""
+    rng = np.random.default_rng(seed)
+    ranks = np.minimum(rng.zipf(1.3, size=(documents, words)), vocabulary) - 1
+    return [" ".join(f"w{r}" for r in row) for row in ranks]
+
+
+def brute_force(counts, query, k, deleted=None, k1=1.2, b=0.75):
+    """Score every document (given as term counts) directly with the BM25 formula."""
+    lengths = np.array([sum(c.values()) for c in counts])
+    avgdl = lengths.mean()
+    scores = np.zeros(len(counts))
+    for term, qtf in Counter(tokenize(query)).items():
+        df = sum(term in c for c in counts)
+        if not df:
+            continue
+        idf = math.log(1 + (len(counts) - df + 0.5) / (df + 0.5)) * qtf
+        for i, c in enumerate(counts):
+            tf = c.get(term, 0)
+            if tf:
+                scores[i] += idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * lengths[i] / avgdl))
+    if deleted is not None:
+        scores[deleted.astype(bool)] = 0
+    scores = np.sort(scores)[::-1][:k]
+    return scores[scores > 0]
+
+
+def build(directory, texts, flush_every, **kwargs):
+    """Index texts, flushing a segment every `flush_every` documents."""
+    index = BM25Index(directory, **kwargs)
+    for start in range(0, len(texts), flush_every):
+        stop = min(start + flush_every, len(texts))
+        index.add(range(start, stop), texts[start:stop])
+        index.flush()
+    return index
+
+
+class TestEncoding:
+    """Test suite for tokenization and postings compression."""
+
+    def test_codes_are_kept_whole_and_split(self):
+        """Test that product codes index as one term and as their parts."""
+        terms = tokenize("The printer failed with ERR-4012 on v2.3")
+
+        assert "the" not in terms
+        assert {"err-4012", "err", "4012", "v2.3", "printer"} <= set(terms)
+
+    def test_varint_round_trip(self):
+        """Test that varints decode to the encoded values."""
+        values = np.array([0, 1, 127, 128, 16383, 16384, 2 ** 31, 2 ** 42], dtype=np.int64)
+        encoded = np.frombuffer(encode_varints(values), dtype=np.uint8)
+
+        assert len(encoded) == 1 + 1 + 1 + 2 + 2 + 3 + 5 + 7
+        assert decode_varints(encoded).tolist() == values.tolist()
+
+
+class TestBM25Index:
+    """Test suite for BM25Index."""
+
+    def test_matches_brute_force(self, tmp_path):
+        """Test that early-terminated top-k scores equal exhaustive BM25."""
+        texts = zipf_corpus()
+        index = build(tmp_path, texts, flush_every=250, merge_factor=3)
+        counts = [Counter(tokenize(text)) for text in texts]
+        rng = np.random.default_rng(1)
+
+        assert 1 < len(index.segments) < 12
+        for _ in range(30):
+            query = " ".join(f"w{t}" for t in rng.integers(0, 300, size=rng.integers(1, 6)))
+            _, scores = index.search(query, k=10)
+            assert np.allclose(scores, brute_force(counts, query, 10), rtol=1e-4)
+
+    def test_deleted_rows_are_skipped(self, tmp_path):
+        """Test that tombstoned rows are not returned and are dropped on merge."""
+        texts = zipf_corpus(documents=1000)
+        index = build(tmp_path, texts, flush_every=200)
+        deleted = np.zeros(len(texts), dtype=np.uint8)
+        deleted[np.arange(0, 1000, 3)] = 1
+
+        rows, scores = index.search("w3 w17 w40", k=10, deleted=deleted)
+        index.merge(deleted=deleted)
+
+        assert not deleted[rows].any()
+        assert np.allclose(scores, brute_force([Counter(tokenize(t)) for t in texts], "w3 w17 w40", 10,
+                                               deleted), rtol=1e-4)
+        assert len(index.segments) == 1 and index.docs == 666
+
+    def test_persistence_and_truncate(self, tmp_path):
+        """Test that segments survive reopening and truncation drops whole segments."""
+        texts = [f"ticket {i} about error ERR-{i:04d}" for i in range(300)]
+        build(tmp_path, texts, flush_every=100, merge_factor=8).close()
+
+        index = BM25Index(tmp_path)
+        rows, _ = index.search("ERR-0150", k=3)
+        covered = index.truncate(250)
+
+        assert rows[0] == 150
+        assert covered == 200
+        assert index.search("ERR-0220", k=5)[0].max() < 200
+
+
+class TestHybridRanker:
+    """Test suite for HybridRanker."""
+
+    def test_rrf_rewards_agreement(self):
+        """Test that rows ranked by both retrievers come first."""
+        ranker = HybridRanker("rrf")
+        fused = ranker.fuse((np.array([1, 2, 3]), np.array([0.9, 0.8, 0.7])),
+                            (np.array([3, 4]), np.array([12.0, 3.0])), k=3)
+
+        assert fused[0][0] == 3
+        assert len(fused) == 3
+
+    def test_weighted_alpha(self):
+        """Test that alpha moves the weighted ranking between the two sides."""
+        vector = (np.array([1, 2]), np.array([0.9, 0.1]))
+        keyword = (np.array([2, 1]), np.array([8.0, 1.0]))
+
+        assert HybridRanker("weighted", alpha=0.8).fuse(vector, keyword, k=1)[0][0] == 1
+        assert HybridRanker("weighted", alpha=0.2).fuse(vector, keyword, k=1)[0][0] == 2
+
+    def test_unknown_method(self):
+        """Test that an unknown fusion method is rejected."""
+        with pytest.raises(ValueError):
+            HybridRanker("borda")
@@ -0,0 +1,243 @@
+"""
+Unit tests for the two-tier response cache.
+"""
+
+import asyncio
+import time
+
+from intramind import ChatBot, Config
+from intramind.core.conversation import ConversationSession
+from intramind.services.cache_service import LRUCache, ResponseCache, normalize_message
+
+
+class FakeClock:
+    """Manually advanced clock for expiry tests."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestLRUCache:
+    """Test suite for the in-process LRU tier."""
+
+    def test_evicts_least_recently_used(self):
+        """Test that the oldest untouched entry is evicted first."""
+        cache = LRUCache(max_entries=2, ttl=60)
+        cache.set("a", "1")
+        cache.set("b", "2")
+        cache.get("a")
+        cache.set("c", "3")
+
+        assert cache.get("b") is None
+        assert cache.get("a") == "1"
+        assert cache.evictions == 1
+
+    def test_entries_expire(self):
+        """Test that entries expire after the TTL."""
+        clock = FakeClock()
+        cache = LRUCache(max_entries=10, ttl=5, clock=clock)
+        cache.set("a", "1")
+        clock.now = 4.9
+        assert cache.get("a") == "1"
+        clock.now = 5.0
+        assert cache.get("a") is None
+        assert cache.expirations == 1
+
+
+class TestResponseCache:
+    """Test suite for ResponseCache."""
+
+    def test_normalize_message(self):
+        """Test that near-verbatim repeats normalize to the same text."""
+        assert normalize_message("  How do I reset my PASSWORD? ") == \
+            normalize_message("how do i reset my password")
+
+    def test_key_depends_on_intent_and_context(self):
+        """Test that intent and session context are part of the key."""
+        cache = ResponseCache(Config())
+        session = ConversationSession(session_id="k1")
+        other = ConversationSession(session_id="k2", context={"tenant": "acme"})
+
+        key = cache.make_key("Hello", "greeting", session)
+        assert key == cache.make_key("hello!", "greeting", ConversationSession("k3"))
+        assert key != cache.make_key("Hello", "question", session)
+        assert key != cache.make_key("Hello", "greeting", other)
+
+        session.add_message("user", "earlier question")
+        assert key != cache.make_key("Hello", "greeting", session)
+
+    def test_redis_tier_hits_and_promotion(self, fake_redis):
+        """Test that Redis hits are counted and promoted to the LRU tier."""
+        writer = ResponseCache(Config(), redis_client=fake_redis)
+        writer.set("key", "answer")
+
+        reader = ResponseCache(Config(), redis_client=fake_redis)
+        assert reader.get("key") == "answer"
+        assert reader.get("key") == "answer"
+        assert reader.get("missing") is None
+        assert reader.stats()["redis_hits"] == 1
+        assert reader.stats()["local_hits"] == 1
+        assert reader.stats()["misses"] == 1
+
+    def test_redis_ttl(self, fake_redis):
+        """Test that Redis entries are written with cache_ttl."""
+        cache = ResponseCache(Config(cache_ttl=120), redis_client=fake_redis)
+        cache.set("key", "answer")
+
+        assert fake_redis.expires["intramind:response:key"] > 0
+
+    def test_promoted_entry_keeps_redis_expiry(self, fake_redis):
+        """Test that a Redis hit is kept locally only for its remaining TTL."""
+        clock = FakeClock()
+        writer = ResponseCache(Config(cache_ttl=120), redis_client=fake_redis)
+        writer.set("key", "answer")
+        fake_redis.expires["intramind:response:key"] = time.monotonic() + 30
+
+        reader = ResponseCache(Config(cache_ttl=120), redis_client=fake_redis)
+        reader.local._clock = clock
+        assert reader.get("key") == "answer"
+        clock.now = 29
+        assert reader.local.get("key") == "answer"
+        clock.now = 31
+        assert reader.local.get("key") is None
+
+    def test_redis_errors_are_misses(self):
+        """Test that a failing Redis client degrades to a miss."""
+        class BrokenRedis:
+            def get(self, key):
+                raise ConnectionError("down")
+
+            def set(self, key, value, ex=None):
+                raise ConnectionError("down")
+
+        cache = ResponseCache(Config(), redis_client=BrokenRedis())
+        cache.set("key", "answer")
+        cache.local.clear()
+
+        assert cache.get("key") is None
+        assert cache.stats()["redis_errors"] == 2
+
+    async def test_async_tier_access(self, fake_redis):
+        """Test the async lookup path."""
+        cache = ResponseCache(Config(), redis_client=fake_redis)
+        await cache.set_async("key", "answer")
+        cache.local.clear()
+
+        assert await cache.get_async("key") == "answer"
+
+    async def test_sync_client_does_not_block_loop(self):
+        """Test that async lookups run a blocking client off the event loop."""
+        class SlowRedis:
+            def get(self, key):
+                time.sleep(0.2)
+                return None
+
+            def set(self, key, value, ex=None):
+                time.sleep(0.2)
+
+        cache = ResponseCache(Config(), redis_client=SlowRedis())
+        ticks = []
+
+        async def ticker():
+            for _ in range(8):
+                ticks.append(time.perf_counter())
+                await asyncio.sleep(0.02)
+
+        await asyncio.gather(cache.get_async("key"), cache.set_async("key", "answer"), ticker())
+
+        assert max(b - a for a, b in zip(ticks, ticks[1:])) < 0.1
+
+    async def test_asyncio_client_is_awaited(self):
+        """Test that redis.asyncio-style clients are awaited directly."""
+        class AsyncRedis:
+            def __init__(self):
+                self.data = {}
+
+            async def execute_command(self, *args):
+                raise NotImplementedError
+
+            async def get(self, key):
+                return self.data.get(key)
+
+            async def set(self, key, value, ex=None):
+                self.data[key] = value.encode("utf-8")
+
+            async def pttl(self, key):
+                return -1
+
+        cache = ResponseCache(Config(), redis_client=AsyncRedis())
+        await cache.set_async("key", "answer")
+        cache.local.clear()
+
+        assert await cache.get_async("key") == "answer"
+
+
+class TestChatBotCaching:
+    """Test suite for response caching in ChatBot."""
+
+    def test_repeat_question_is_cached(self):
+        """Test that a repeated first question is served from the cache."""
+        bot = ChatBot()
+        first = bot.chat("How do I reset my password?")
+        second = bot.chat("  how do I reset my PASSWORD?")
+
+        assert first.metadata["cached"] is False
+        assert second.metadata["cached"] is True
+        assert second.message == first.message
+        assert len(bot.get_session_history(second.session_id)) == 2
+
+    def test_cache_disabled(self):
+        """Test that cache_enabled=False bypasses the cache."""
+        bot = ChatBot(Config(cache_enabled=False))
+        bot.chat("Hello")
+
+        assert bot.response_cache is None
+        assert bot.chat("Hello").metadata["cached"] is False
+
+    async def test_provider_called_once(self, fake_provider_factory, fake_redis):
+        """Test that cached turns skip the provider, across bots sharing Redis."""
+        provider = fake_provider_factory(tokens=["reset ", "it"])
+        first_bot = ChatBot(provider=provider,
+                            response_cache=ResponseCache(Config(), redis_client=fake_redis))
+        second_bot = ChatBot(provider=provider,
+                             response_cache=ResponseCache(Config(), redis_client=fake_redis))
+
+        await first_bot.chat_async("password reset?")
+        response = await second_bot.chat_async("Password reset?")
+        chunks = [c async for c in first_bot.chat_stream("password reset?")]
+
+        assert len(provider.calls) == 1
+        assert response.message == "reset it"
+        assert chunks[-1].response.metadata["cached"] is True
+
+    def test_plain_text_entries_are_served(self, fake_redis):
+        """Test that answers cached as plain text by earlier versions still hit."""
+        cache = ResponseCache(Config(), redis_client=fake_redis)
+        bot = ChatBot(response_cache=cache)
+        first = bot.chat("How do I reset my password?")
+        for key in list(fake_redis.store):
+            fake_redis.store[key] = b"Use the self-service portal."
+        cache.local.clear()
+
+        response = bot.chat("How do I reset my password?")
+
+        assert first.metadata["cached"] is False
+        assert response.metadata["cached"] is True
+        assert response.message == "Use the self-service portal."
+        assert "sources" not in response.metadata
+
+    def test_model_change_misses_cache(self, fake_redis):
+        """Test that answers cached for one model are not served for another."""
+        def bot(model_name):
+            config = Config(model_name=model_name)
+            return ChatBot(config, response_cache=ResponseCache(config, redis_client=fake_redis))
+
+        bot("gpt-4").chat("Hello")
+        other_model = bot("gpt-4o").chat("Hello")
+        same_model = bot("gpt-4").chat("Hello")
+
+        assert other_model.metadata["cached"] is False
+        assert same_model.metadata["cached"] is True
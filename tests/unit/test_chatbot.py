@@ -2,8 +2,17 @@
 Unit tests for the ChatBot class.
 """
 
+import asyncio
+import os
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
 import pytest
-from intramind import ChatBot, Config
+from intramind import ChatBot, Config, get_config
 from intramind.core.chatbot import ChatResponse
 
 
@@ -78,6 +87,33 @@ class TestChatBot:
         assert isinstance(history, list)
         assert len(history) >= 2
 
+    def test_chat_batch(self):
+        """Test that chat_batch matches chat for each message."""
+        messages = ["Hello", "Can you help?", "Goodbye"]
+        session_ids = ["batch-1", "batch-2", None]
+
+        batch = ChatBot().chat_batch(messages, session_ids)
+        single_bot = ChatBot()
+        single = [single_bot.chat(m, session_id=s) for m, s in zip(messages, session_ids)]
+
+        assert [r.message for r in batch] == [r.message for r in single]
+        assert [r.intent for r in batch] == [r.intent for r in single]
+        assert [r.session_id for r in batch[:2]] == ["batch-1", "batch-2"]
+        assert batch[2].session_id is not None
+
+    def test_chat_batch_records_history(self):
+        """Test that chat_batch appends each turn to its session."""
+        bot = ChatBot()
+        bot.chat_batch(["Hi", "Help me"], ["batch-3", "batch-3"])
+
+        history = bot.get_session_history("batch-3")
+        assert [m["content"] for m in history[::2]] == ["Hi", "Help me"]
+
+    def test_chat_batch_length_mismatch(self):
+        """Test that mismatched session_ids raise ValueError."""
+        with pytest.raises(ValueError):
+            ChatBot().chat_batch(["a", "b"], ["only-one"])
+
     @pytest.mark.asyncio
     async def test_chat_async(self):
         """Test async chat functionality."""
@@ -87,6 +123,40 @@ class TestChatBot:
         assert isinstance(response, ChatResponse)
         assert response.message is not None
 
+    async def test_chat_async_matches_chat(self):
+        """Test that the native async path returns what chat returns."""
+        bot = ChatBot()
+        sync_response = bot.chat("Hello there", session_id="async-sync")
+        async_response = await bot.chat_async("Hello there", session_id="async-async")
+
+        assert async_response.message == sync_response.message
+        assert async_response.intent == sync_response.intent
+        assert len(bot.get_session_history("async-async")) == 2
+
+    async def test_chat_async_does_not_use_threads(self):
+        """Test that many in-flight chats do not need executor threads."""
+        class SlowBot(ChatBot):
+            async def _generate_response_async(self, message, nlp_result, session, passages=()):
+                await asyncio.sleep(0.05)
+                return "done"
+
+        loop = asyncio.get_running_loop()
+        executor = ThreadPoolExecutor(max_workers=1)
+        loop.set_default_executor(executor)
+        bot = SlowBot()
+        threads_before = threading.active_count()
+
+        start = time.perf_counter()
+        responses = await asyncio.gather(
+            *(bot.chat_async(f"message {i}", session_id=f"s-{i}") for i in range(2000))
+        )
+        elapsed = time.perf_counter() - start
+
+        assert all(r.message == "done" for r in responses)
+        assert elapsed < 5
+        assert threading.active_count() == threads_before
+        executor.shutdown()
+
 
 class TestChatResponse:
     """Test suite for ChatResponse dataclass."""
@@ -104,3 +174,47 @@ class TestChatResponse:
         assert response.confidence == 0.95
         assert response.intent == "greeting"
         assert response.session_id == "test-001"
+
+
+class TestStartup:
+    """Test suite for lazy imports, the shared config and warm-up."""
+
+    def test_package_import_is_lazy(self):
+        """Test that importing intramind does not load the chatbot stack."""
+        code = (
+            "import sys, intramind\n"
+            "assert 'intramind.core.chatbot' not in sys.modules\n"
+            "assert 'numpy' not in sys.modules\n"
+            "from intramind import ChatBot\n"
+            "assert 'intramind.core.chatbot' in sys.modules\n"
+            "assert 'intramind.core.nlp_pool' not in sys.modules\n"
+            "assert 'intramind.services.semantic_cache' not in sys.modules\n"
+        )
+        src = str(Path(__file__).resolve().parents[2] / "src")
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                                env={**os.environ, "PYTHONPATH": src})
+
+        assert result.returncode == 0, result.stderr
+
+    def test_default_config_is_shared(self):
+        """Test that bots built without a config reuse one Config instance."""
+        from intramind.core import config as config_module
+
+        assert ChatBot().config is ChatBot().config is get_config()
+        assert config_module.config is get_config()
+
+    def test_warmup(self):
+        """Test that warm-up touches each configured component."""
+        class WarmProvider:
+            warmed = False
+
+            def warmup(self):
+                self.warmed = True
+
+        provider = WarmProvider()
+        bot = ChatBot(Config(semantic_cache_enabled=True), provider=provider)
+        timings = bot.warmup()
+
+        assert set(timings) == {"nlp", "embedder", "provider"}
+        assert provider.warmed
+        assert bot.chat("Hello!").message
@@ -0,0 +1,435 @@
+"""
+Unit tests for conversation sessions and the ConversationManager.
+"""
+
+import asyncio
+import sys
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+
+from intramind import ChatBot, Config
+from intramind.core.conversation import (
+    ColumnarMessages, ConversationManager, ConversationSession, Message, estimate_tokens
+)
+
+
+@pytest.fixture
+def manager():
+    """Create a ConversationManager with default config."""
+    return ConversationManager(Config())
+
+
+def age_session(manager, session_id, hours):
+    """Backdate a session and move it to the front of the expiry index."""
+    manager.sessions[session_id].updated_at = datetime.now() - timedelta(hours=hours)
+    manager._shard(session_id).expiry.move_to_end(session_id, last=False)
+
+
+class TestSessionExpiry:
+    """Test suite for session expiry and cleanup."""
+
+    def test_cleanup_removes_only_expired(self, manager):
+        """Test that only sessions past the age limit are removed."""
+        for i in range(5):
+            manager.create_session(f"s{i}")
+        age_session(manager, "s1", 30)
+        age_session(manager, "s0", 48)
+
+        assert manager.cleanup_old_sessions(max_age_hours=24) == 2
+        assert sorted(manager.sessions) == ["s2", "s3", "s4"]
+
+    def test_update_refreshes_expiry_order(self):
+        """Test that add_message moves a session to the back of the index."""
+        manager = ConversationManager(Config(session_shards=1))
+        manager.create_session("old")
+        manager.create_session("new")
+        manager.get_session("old").add_message("user", "still here")
+
+        assert list(manager._shard("old").expiry) == ["new", "old"]
+
+    def test_cleanup_stops_at_first_fresh_session(self):
+        """Test that cleanup does not visit sessions after the first fresh one."""
+        manager = ConversationManager(Config(session_shards=1))
+        for i in range(1000):
+            manager.create_session(f"s{i}")
+        age_session(manager, "s0", 48)
+
+        visited = []
+
+        class TrackingDict(dict):
+            def get(self, session_id, default=None):
+                visited.append(session_id)
+                return super().get(session_id, default)
+
+        shard = manager._shard("s0")
+        shard.sessions = TrackingDict(shard.sessions)
+        removed = manager.cleanup_old_sessions(max_age_hours=24)
+
+        assert removed == 1
+        assert len(visited) == 2
+
+    def test_time_budget_limits_sweep(self, manager):
+        """Test that a zero time budget stops after the first batch."""
+        for i in range(600):
+            manager.create_session(f"s{i}")
+        for session in manager.sessions.values():
+            session.updated_at = datetime.now() - timedelta(hours=48)
+
+        assert manager.cleanup_old_sessions(max_age_hours=24, time_budget=0) == 256
+        assert manager.has_expired_sessions(max_age_hours=24)
+        assert manager.cleanup_old_sessions(max_age_hours=24) == 344
+        assert not manager.has_expired_sessions(max_age_hours=24)
+
+    def test_sweep_skips_sessions_in_a_turn(self):
+        """Test that an expired session with a turn running does not stop the sweep."""
+        manager = ConversationManager(Config(session_shards=1))
+        for i in range(4):
+            manager.create_session(f"s{i}")
+        for session_id in ("s2", "s1", "s0"):
+            age_session(manager, session_id, 48)
+
+        with manager.get_session("s0").turn():
+            removed = manager.cleanup_old_sessions(max_age_hours=24)
+            pending = manager.has_expired_sessions(max_age_hours=24)
+
+        assert removed == 2
+        assert not pending
+        assert sorted(manager.sessions) == ["s0", "s3"]
+        assert manager.cleanup_old_sessions(max_age_hours=24) == 1
+
+    async def test_reaper_waits_while_expired_session_is_busy(self):
+        """Test that a pinned expired session does not make the reaper spin."""
+        manager = ConversationManager(Config(session_ttl_hours=1))
+        manager.create_session("busy")
+        age_session(manager, "busy", 2)
+        sweeps = []
+        sweep = manager._sweep
+        manager._sweep = lambda *args: sweeps.append(1) or sweep(*args)
+
+        with manager.get_session("busy").turn():
+            manager.start_reaper(interval=0.05)
+            await asyncio.sleep(0.12)
+            await manager.stop_reaper()
+
+        assert len(sweeps) <= 3
+        assert "busy" in manager.sessions
+
+    def test_delete_session_updates_index(self, manager):
+        """Test that deleted sessions leave the expiry index."""
+        manager.create_session("gone")
+        manager.delete_session("gone")
+
+        assert "gone" not in manager._shard("gone").expiry
+
+    async def test_background_reaper(self):
+        """Test that the reaper removes expired sessions on its interval."""
+        manager = ConversationManager(Config(session_ttl_hours=1))
+        for i in range(3):
+            manager.create_session(f"s{i}")
+        age_session(manager, "s0", 2)
+
+        manager.start_reaper(interval=0.01)
+        await asyncio.sleep(0.05)
+        await manager.stop_reaper()
+
+        assert sorted(manager.sessions) == ["s1", "s2"]
+
+
+class TestBoundedHistory:
+    """Test suite for ring-buffer history and token windowing."""
+
+    def test_message_token_count_cached(self):
+        """Test that token counts are computed when a message is added."""
+        session = ConversationSession(session_id="t0")
+        session.add_message("user", "x" * 40)
+
+        assert session.messages[0].tokens == estimate_tokens("x" * 40) == 10
+        assert session.total_tokens == 10
+
+    def test_message_cap(self):
+        """Test that the oldest messages are dropped past max_messages."""
+        session = ConversationSession(session_id="t1", max_messages=3)
+        for i in range(10):
+            session.add_message("user", f"message {i}")
+
+        assert [m["content"] for m in session.get_history()] == \
+            ["message 7", "message 8", "message 9"]
+        assert session.total_tokens == sum(m.tokens for m in session.messages)
+
+    def test_token_cap(self):
+        """Test that the oldest messages are dropped past max_tokens."""
+        session = ConversationSession(session_id="t2", max_tokens=25)
+        for i in range(5):
+            session.add_message("user", "y" * 40)
+
+        assert len(session.messages) == 2
+        assert session.total_tokens == 20
+
+    def test_oversized_message_is_kept(self):
+        """Test that a single message larger than the cap is still stored."""
+        session = ConversationSession(session_id="t3", max_tokens=5)
+        session.add_message("user", "z" * 400)
+
+        assert len(session.messages) == 1
+
+    def test_get_window(self):
+        """Test that the window holds the newest messages within budget."""
+        session = ConversationSession(session_id="t4")
+        for i in range(6):
+            session.add_message("user" if i % 2 == 0 else "assistant", f"{i}" * 40)
+
+        window = session.get_window(max_tokens=30)
+        assert [m["content"][0] for m in window] == ["3", "4", "5"]
+        assert session.get_window(max_tokens=5) == []
+
+    def test_get_history_limit(self):
+        """Test that get_history still honors its limit."""
+        session = ConversationSession(session_id="t5")
+        for i in range(4):
+            session.add_message("user", str(i))
+
+        assert [m["content"] for m in session.get_history(2)] == ["2", "3"]
+        assert len(session.get_history()) == 4
+
+    def test_manager_applies_config_caps(self):
+        """Test that new sessions take their caps from the config."""
+        manager = ConversationManager(Config(history_max_messages=4, history_max_tokens=0))
+        session = manager.create_session("t6")
+        for i in range(10):
+            session.add_message("user", str(i))
+
+        assert len(session.messages) == 4
+        assert session.max_tokens is None
+
+    def test_clear_resets_tokens(self):
+        """Test that clear resets the token total."""
+        session = ConversationSession(session_id="t7")
+        session.add_message("user", "hello")
+        session.clear()
+
+        assert session.total_tokens == 0
+
+    async def test_provider_prompt_is_windowed(self, fake_provider_factory):
+        """Test that providers receive only the budgeted history window."""
+        provider = fake_provider_factory(tokens=["r" * 40])
+        bot = ChatBot(Config(history_window_tokens=50, cache_enabled=False),
+                      provider=provider)
+        for i in range(5):
+            await bot.chat_async("q" * 40 + str(i), session_id="t8")
+
+        assert all(sum(estimate_tokens(m["content"]) for m in call) <= 50
+                   for call in provider.calls)
+        assert provider.calls[-1][-1]["content"].endswith("4")
+
+
+class TestMessageStorage:
+    """Test suite for slotted messages and columnar message storage."""
+
+    def test_message_is_slotted(self):
+        """Test that messages carry no per-instance __dict__."""
+        message = Message("user", "hello")
+
+        assert not hasattr(message, "__dict__")
+        assert message.tokens == estimate_tokens("hello")
+
+    def test_message_timestamp_round_trip(self):
+        """Test that datetime timestamps are preserved."""
+        when = datetime(2025, 1, 17, 9, 30, 15, 250000)
+        message = Message("user", "hello", timestamp=when)
+
+        assert message.timestamp == when
+
+    def test_columnar_round_trip(self):
+        """Test that columnar storage returns the messages it was given."""
+        store = ColumnarMessages()
+        messages = [
+            Message("user", "hi", metadata={"source": "web"}),
+            Message("assistant", "hello there"),
+            Message("system", "be brief", tokens=3),
+        ]
+        for message in messages:
+            store.append(message)
+
+        assert list(store) == messages
+        assert list(reversed(store)) == messages[::-1]
+        assert store[-1] == messages[2]
+        assert len(store) == 3
+
+    def test_columnar_popleft_compacts(self):
+        """Test that popping from the left keeps order and reclaims space."""
+        store = ColumnarMessages()
+        for i in range(10):
+            store.append(Message("user", str(i), metadata={"i": i} if i % 2 else None))
+        popped = [store.popleft().content for _ in range(6)]
+
+        assert popped == [str(i) for i in range(6)]
+        assert [m.content for m in store] == ["6", "7", "8", "9"]
+        assert [m.metadata for m in store] == [None, {"i": 7}, None, {"i": 9}]
+        assert len(store._contents) < 10
+
+    def test_new_roles_from_threads_keep_their_codes(self):
+        """Test that roles first seen concurrently on different threads read back intact."""
+        stores = [ColumnarMessages() for _ in range(16)]
+        barrier = threading.Barrier(len(stores))
+
+        def append(i):
+            barrier.wait()
+            stores[i].append(Message(f"tool-{i}", "result"))
+
+        threads = [threading.Thread(target=append, args=(i,)) for i in range(len(stores))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert [store[0].role for store in stores] == [f"tool-{i}" for i in range(16)]
+
+    def test_columnar_session_matches_objects(self):
+        """Test that columnar sessions behave like object-backed sessions."""
+        objects = ConversationSession(session_id="o", max_messages=5, max_tokens=40)
+        columnar = ConversationSession(session_id="c", messages=ColumnarMessages(),
+                                       max_messages=5, max_tokens=40)
+        for i in range(20):
+            for session in (objects, columnar):
+                session.add_message("user" if i % 2 else "assistant", "m" * (i % 7) + str(i))
+
+        strip = lambda history: [(m["role"], m["content"]) for m in history]  # noqa: E731
+        assert strip(columnar.get_history()) == strip(objects.get_history())
+        assert strip(columnar.get_window(20)) == strip(objects.get_window(20))
+        assert columnar.total_tokens == objects.total_tokens
+
+    def test_manager_uses_configured_storage(self):
+        """Test that HISTORY_STORAGE selects the message container."""
+        manager = ConversationManager(Config(history_storage="columnar"))
+        session = manager.create_session("t9")
+        session.add_message("user", "hello")
+
+        assert isinstance(session.messages, ColumnarMessages)
+        assert session.get_history()[0]["content"] == "hello"
+
+    def test_invalid_storage_rejected(self):
+        """Test that unknown storage layouts are rejected."""
+        with pytest.raises(ValueError):
+            Config(history_storage="rows")
+
+
+def run_threads(count, target):
+    """Start count threads that call target(i) together and wait for them."""
+    barrier = threading.Barrier(count)
+
+    def run(i):
+        barrier.wait()
+        target(i)
+
+    previous = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        threads = [threading.Thread(target=run, args=(i,)) for i in range(count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        sys.setswitchinterval(previous)
+
+
+def roles_alternate(session):
+    """Check that every user message is directly followed by its reply."""
+    roles = [m["role"] for m in session.get_history()]
+    return roles == ["user", "assistant"] * (len(roles) // 2)
+
+
+class TestConcurrency:
+    """Stress tests for concurrent access to the ConversationManager."""
+
+    def test_get_or_create_returns_single_session(self, manager):
+        """Test that racing creators of one session id share one session."""
+        seen = [None] * 1000
+
+        def create(i):
+            seen[i] = manager.get_or_create_session("shared")
+
+        run_threads(1000, create)
+
+        assert len({id(session) for session in seen}) == 1
+        assert len(manager.sessions) == 1
+
+    def test_concurrent_chat_threads(self, fake_provider_factory):
+        """Test thousands of threads chatting across a set of sessions."""
+        provider = fake_provider_factory(tokens=["ok"], token_delay=0.0001)
+        bot = ChatBot(Config(cache_enabled=False, history_max_messages=0,
+                             history_max_tokens=0), provider=provider)
+        errors = []
+
+        def chat(i):
+            response = bot.chat(f"message {i}", session_id=f"s{i % 40}")
+            if response.metadata.get("error"):
+                errors.append(response.metadata["error"])
+
+        run_threads(2000, chat)
+
+        manager = bot.conversation_manager
+        assert not errors
+        assert len(manager.sessions) == 40
+        for session in manager.sessions.values():
+            assert len(session.messages) == 100
+            assert roles_alternate(session)
+            assert session.total_tokens == sum(m.tokens for m in session.messages)
+
+    def test_concurrent_creates_and_deletes(self, manager):
+        """Test that mixed creates, updates and deletes keep the index consistent."""
+        def churn(i):
+            session = manager.get_or_create_session(f"s{i % 50}")
+            session.add_message("user", str(i))
+            if i % 7 == 0:
+                manager.delete_session(f"s{i % 50}")
+
+        run_threads(2000, churn)
+
+        indexed = {sid for shard in manager._shards for sid in shard.expiry}
+        assert indexed == set(manager.sessions)
+
+    async def test_async_turns_are_serialized(self, fake_provider_factory):
+        """Test that concurrent async turns in one session do not interleave."""
+        provider = fake_provider_factory(tokens=["a", "b"], token_delay=0.001)
+        bot = ChatBot(Config(cache_enabled=False, history_max_messages=0,
+                             history_max_tokens=0), provider=provider)
+
+        await asyncio.gather(*(bot.chat_async(f"q{i}", session_id="one")
+                               for i in range(100)))
+
+        session = bot.conversation_manager.get_session("one")
+        assert len(session.messages) == 200
+        assert roles_alternate(session)
+
+    async def test_sync_and_async_turns_share_one_lock(self, fake_provider_factory):
+        """Test that chat() threads and chat_async turns in one session do not interleave."""
+        provider = fake_provider_factory(tokens=["a", "b"], token_delay=0.001)
+        bot = ChatBot(Config(cache_enabled=False, history_max_messages=0,
+                             history_max_tokens=0), provider=provider)
+
+        threads = asyncio.to_thread(run_threads, 20,
+                                    lambda i: bot.chat(f"t{i}", session_id="mixed"))
+        await asyncio.gather(threads, *(bot.chat_async(f"a{i}", session_id="mixed")
+                                        for i in range(20)))
+
+        session = bot.conversation_manager.get_session("mixed")
+        assert len(session.messages) == 80
+        assert roles_alternate(session)
+        assert session.active_turns == 0
+
+    def test_sessions_in_a_turn_are_not_evicted(self):
+        """Test that eviction skips a session whose turn is running."""
+        manager = ConversationManager(Config(session_store="memory", session_cache_size=1,
+                                             session_shards=1))
+        busy = manager.create_session("busy")
+        with busy.turn():
+            manager.create_session("other")
+            assert manager.get_session("busy") is busy
+        manager.create_session("third")
+
+        assert "busy" not in manager.sessions
+        assert manager.evictions == 2
+        manager.close()
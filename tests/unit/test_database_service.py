@@ -0,0 +1,401 @@
+"""
+Unit tests for session persistence and write-behind batching.
+"""
+
+import threading
+import time
+
+import pytest
+
+from intramind import ChatBot, Config
+from intramind.core.conversation import ConversationManager, Message
+from intramind.services.database_service import (
+    MemorySessionStore, RedisSessionStore, SessionOp, SessionWriteError, SQLiteSessionStore,
+    WriteBehindQueue
+)
+
+
+@pytest.fixture(params=["memory", "sqlite", "redis"])
+def store(request, tmp_path):
+    """Create each offline-capable session store."""
+    if request.param == "memory":
+        store = MemorySessionStore()
+    elif request.param == "sqlite":
+        store = SQLiteSessionStore(str(tmp_path / "sessions.db"))
+    else:
+        store = RedisSessionStore(request.getfixturevalue("fake_redis"))
+    yield store
+    store.close()
+
+
+class RecordingStore(MemorySessionStore):
+    """Memory store that records batch sizes and can be held closed."""
+
+    def __init__(self):
+        super().__init__()
+        self.batch_sizes = []
+        self.gate = threading.Event()
+        self.gate.set()
+
+    def write(self, ops):
+        self.gate.wait()
+        self.batch_sizes.append(len(ops))
+        super().write(ops)
+
+
+class TestSessionStores:
+    """Test suite shared by the session store backends."""
+
+    def test_round_trip(self, store):
+        """Test that appended messages load back in order."""
+        store.write([
+            SessionOp("upsert", "s1", context={"user": "ana"}, timestamp=100.0),
+            SessionOp("append", "s1", timestamp=101.0,
+                      message=Message("user", "hi", timestamp=101.0, metadata={"k": 1})),
+            SessionOp("append", "s1", timestamp=102.0,
+                      message=Message("assistant", "hello", timestamp=102.0)),
+        ])
+        stored = store.load("s1")
+
+        assert stored.context == {"user": "ana"}
+        assert stored.created_at == 100.0
+        assert stored.updated_at == 102.0
+        assert [(m.role, m.content, m.metadata) for m in stored.messages] == [
+            ("user", "hi", {"k": 1}), ("assistant", "hello", None)
+        ]
+
+    def test_load_limit(self, store):
+        """Test that load returns only the newest messages when limited."""
+        ops = [SessionOp("upsert", "s1", timestamp=1.0)]
+        ops += [SessionOp("append", "s1", timestamp=2.0 + i, message=Message("user", str(i)))
+                for i in range(10)]
+        store.write(ops)
+
+        assert [m.content for m in store.load("s1", limit=3).messages] == ["7", "8", "9"]
+
+    def test_clear_and_delete(self, store):
+        """Test that clear and delete writes are applied."""
+        store.write([
+            SessionOp("upsert", "a", timestamp=10.0),
+            SessionOp("upsert", "b", timestamp=10.0),
+            SessionOp("append", "a", timestamp=50.0, message=Message("user", "x")),
+            SessionOp("clear", "a", timestamp=60.0),
+            SessionOp("append", "a", timestamp=70.0, message=Message("user", "y")),
+            SessionOp("append", "b", timestamp=70.0, message=Message("user", "z")),
+            SessionOp("delete", "b"),
+        ])
+
+        assert [m.content for m in store.load("a").messages] == ["y"]
+        assert store.load("b") is None
+
+    @pytest.mark.parametrize("kind", ["memory", "sqlite"])
+    def test_expire(self, kind):
+        """Test that expiry sweeps drop sessions idle since the cutoff."""
+        store = MemorySessionStore() if kind == "memory" else SQLiteSessionStore()
+        store.write([
+            SessionOp("upsert", "a", timestamp=10.0),
+            SessionOp("upsert", "b", timestamp=10.0),
+            SessionOp("append", "a", timestamp=50.0, message=Message("user", "x")),
+            SessionOp("expire", None, cutoff=20.0),
+        ])
+
+        assert store.load("a") is not None
+        assert store.load("b") is None
+
+    def test_missing_session(self, store):
+        """Test that unknown sessions load as None."""
+        assert store.load("nope") is None
+
+
+class TestWriteBehindQueue:
+    """Test suite for write-behind batching."""
+
+    def test_writes_are_batched(self):
+        """Test that queued writes reach the store in batches."""
+        store = RecordingStore()
+        store.gate.clear()
+        writer = WriteBehindQueue(store, batch_size=100, interval=0.01)
+        writer.submit(SessionOp("upsert", "s1"))
+        for i in range(250):
+            writer.submit(SessionOp("append", "s1", message=Message("user", str(i))))
+        store.gate.set()
+        writer.close()
+
+        assert sum(store.batch_sizes) == 251
+        assert len(store.batch_sizes) <= 4
+        assert len(store.load("s1").messages) == 250
+
+    def test_submit_does_not_wait_for_store(self):
+        """Test that a stalled store does not block the request path."""
+        store = RecordingStore()
+        store.gate.clear()
+        manager = ConversationManager(Config(), store=store)
+        session = manager.create_session("s1")
+
+        start = time.perf_counter()
+        for i in range(100):
+            session.add_message("user", str(i))
+        elapsed = time.perf_counter() - start
+
+        assert elapsed < 0.5
+        assert store.batch_sizes == []
+        store.gate.set()
+        manager.close()
+        assert len(store.load("s1").messages) == 100
+
+    def test_failed_batches_are_counted(self):
+        """Test that store errors are counted without stopping the writer."""
+        class BrokenStore(MemorySessionStore):
+            def write(self, ops):
+                raise RuntimeError("database down")
+
+        writer = WriteBehindQueue(BrokenStore(), interval=0, max_retries=0)
+        writer.submit(SessionOp("upsert", "s1"))
+        writer.flush()
+        writer.submit(SessionOp("upsert", "s2"))
+        writer.close()
+
+        assert writer.failed == 2
+        assert writer.written == 0
+
+    def test_failed_batch_is_retried(self):
+        """Test that a batch rejected once is written on retry."""
+        class FlakyStore(MemorySessionStore):
+            attempts = 0
+
+            def write(self, ops):
+                self.attempts += 1
+                if self.attempts == 1:
+                    raise RuntimeError("connection reset")
+                super().write(ops)
+
+        store = FlakyStore()
+        writer = WriteBehindQueue(store, interval=0, retry_backoff=0.01)
+        writer.submit(SessionOp("upsert", "s1"))
+        writer.close()
+
+        assert (writer.written, writer.failed) == (1, 0)
+        assert store.load("s1") is not None
+
+    def test_lost_writes_are_reported(self):
+        """Test that waiting on a session whose writes were dropped raises once."""
+        class BrokenStore(MemorySessionStore):
+            def write(self, ops):
+                raise RuntimeError("database down")
+
+        writer = WriteBehindQueue(BrokenStore(), interval=0, max_retries=1, retry_backoff=0.01)
+        writer.submit(SessionOp("upsert", "s1"))
+
+        with pytest.raises(SessionWriteError):
+            writer.wait_for("s1")
+        assert writer.wait_for("s1")
+        assert writer.wait_for("s2")
+        writer.close()
+
+    def test_wait_for_ignores_other_sessions(self):
+        """Test that waiting on one session does not wait for others' writes."""
+        class GatedStore(RecordingStore):
+            def write(self, ops):
+                if any(op.session_id == "busy" for op in ops):
+                    self.gate.wait()
+                MemorySessionStore.write(self, ops)
+
+        store = GatedStore()
+        store.gate.clear()
+        writer = WriteBehindQueue(store, batch_size=1, interval=0)
+        writer.submit(SessionOp("upsert", "s1"))
+        writer.submit(SessionOp("upsert", "busy"))
+
+        assert writer.wait_for("s1", timeout=1.0)
+        assert not writer.wait_for("busy", timeout=0.01)
+        store.gate.set()
+        writer.close()
+
+
+class TestPersistentManager:
+    """Test suite for ConversationManager backed by a SessionStore."""
+
+    def config(self, tmp_path, **overrides):
+        return Config(session_store="sqlite", session_store_path=str(tmp_path / "s.db"),
+                      **overrides)
+
+    def test_sessions_survive_restart(self, tmp_path):
+        """Test that a new ChatBot sees conversations from a previous one."""
+        bot = ChatBot(self.config(tmp_path))
+        bot.chat("Hello there", session_id="s1", context={"team": "it"})
+        bot.chat("I need help", session_id="s1")
+        bot.close()
+
+        restarted = ChatBot(self.config(tmp_path))
+        history = restarted.get_session_history("s1")
+        session = restarted.conversation_manager.get_session("s1")
+        restarted.close()
+
+        assert [m["content"] for m in history][::2] == ["Hello there", "I need help"]
+        assert session.context == {"team": "it"}
+        assert session.total_tokens == sum(m.tokens for m in session.messages)
+
+    def test_restore_applies_history_caps(self, tmp_path):
+        """Test that restored sessions load only the capped history."""
+        manager = ConversationManager(self.config(tmp_path, history_max_messages=4))
+        session = manager.create_session("s1")
+        for i in range(10):
+            session.add_message("user", str(i))
+        manager.close()
+
+        restored = ConversationManager(self.config(tmp_path, history_max_messages=4))
+        contents = [m["content"] for m in restored.get_or_create_session("s1").get_history()]
+        restored.close()
+
+        assert contents == ["6", "7", "8", "9"]
+
+    def test_delete_and_clear_persist(self, tmp_path):
+        """Test that deletes and clears reach the store."""
+        manager = ConversationManager(self.config(tmp_path))
+        manager.create_session("gone").add_message("user", "x")
+        manager.create_session("empty").add_message("user", "y")
+        manager.delete_session("gone")
+        manager.clear_session("empty")
+        manager.flush()
+
+        assert manager.store.load("gone") is None
+        assert manager.store.load("empty").messages == []
+        manager.close()
+
+    def test_delete_session_only_in_store(self, tmp_path):
+        """Test that sessions not yet loaded into memory can be deleted."""
+        manager = ConversationManager(self.config(tmp_path))
+        manager.create_session("s1")
+        manager.close()
+
+        other = ConversationManager(self.config(tmp_path))
+        assert other.delete_session("s1")
+        other.flush()
+        assert other.store.load("s1") is None
+        other.close()
+
+    async def test_async_load(self, tmp_path):
+        """Test that async callers load stored sessions."""
+        manager = ConversationManager(self.config(tmp_path))
+        manager.create_session("s1").add_message("user", "persisted")
+        manager.close()
+
+        restored = ConversationManager(self.config(tmp_path))
+        session = await restored.get_or_create_session_async("s1")
+        restored.close()
+
+        assert [m["content"] for m in session.get_history()] == ["persisted"]
+
+
+class TestRedisSessionStore:
+    """Test suite for the Redis session backend."""
+
+    def test_load_is_one_round_trip(self, fake_redis):
+        """Test that loading a session pipelines its hash and list reads."""
+        store = RedisSessionStore(fake_redis)
+        store.write([
+            SessionOp("upsert", "s1", context={"a": 1}, timestamp=1.0),
+            SessionOp("append", "s1", timestamp=2.0, message=Message("user", "hi")),
+        ])
+        fake_redis.round_trips = 0
+
+        stored = store.load("s1")
+
+        assert fake_redis.round_trips == 1
+        assert stored.context == {"a": 1}
+        assert [m.content for m in stored.messages] == ["hi"]
+
+    def test_batch_is_one_pipeline(self, fake_redis):
+        """Test that a write batch is one round trip with one RPUSH per session."""
+        store = RedisSessionStore(fake_redis, ttl=60, max_messages=3)
+        ops = [SessionOp("upsert", "s1", timestamp=1.0), SessionOp("upsert", "s2", timestamp=1.0)]
+        for i in range(5):
+            for sid in ("s1", "s2"):
+                ops.append(SessionOp("append", sid, timestamp=2.0 + i,
+                                     message=Message("user", f"{sid}-{i}")))
+        pushes = []
+        original = fake_redis.rpush
+        fake_redis.rpush = lambda key, *values: pushes.append(len(values)) or original(key, *values)
+
+        store.write(ops)
+
+        assert fake_redis.round_trips == 1
+        assert pushes == [5, 5]
+        assert [m.content for m in store.load("s1").messages] == ["s1-2", "s1-3", "s1-4"]
+        assert "intramind:session:s1:messages" in fake_redis.expires
+
+    def test_expire_without_ttl(self, fake_redis):
+        """Test that expiry sweeps remove idle sessions even when keys have no TTL."""
+        store = RedisSessionStore(fake_redis)
+        store.write([
+            SessionOp("upsert", "a", timestamp=10.0),
+            SessionOp("upsert", "b", timestamp=10.0),
+            SessionOp("append", "b", timestamp=10.0, message=Message("user", "old")),
+            SessionOp("append", "a", timestamp=50.0, message=Message("user", "x")),
+            SessionOp("expire", None, cutoff=20.0),
+            SessionOp("upsert", "c", timestamp=30.0),
+        ])
+
+        assert store.load("a") is not None
+        assert store.load("b") is None
+        assert "intramind:session:b:messages" not in fake_redis.store
+        assert store.load("c") is not None
+        assert fake_redis.zrangebyscore(store.index_key, "-inf", "+inf") == [b"c", b"a"]
+
+    def test_turns_share_pipelines(self, fake_redis):
+        """Test that chat turns reach Redis in far fewer round trips than turns."""
+        bot = ChatBot(Config(cache_enabled=False), session_store=RedisSessionStore(fake_redis))
+        for i in range(50):
+            bot.chat(f"message {i}", session_id=f"s{i % 5}")
+        bot.close()
+
+        # Five session loads plus batched writes, instead of several per turn
+        assert fake_redis.round_trips < 50
+        assert len(RedisSessionStore(fake_redis).load("s0").messages) == 20
+
+    def test_sessions_shared_between_workers(self, fake_redis):
+        """Test that a second worker continues a conversation from Redis."""
+        first = ChatBot(Config(cache_enabled=False), session_store=RedisSessionStore(fake_redis))
+        first.chat("Hello", session_id="shared", context={"dept": "hr"})
+        first.close()
+
+        second = ChatBot(Config(cache_enabled=False), session_store=RedisSessionStore(fake_redis))
+        second.chat("Still there?", session_id="shared")
+        session = second.conversation_manager.get_session("shared")
+        second.close()
+
+        assert [m.content for m in session.messages][::2] == ["Hello", "Still there?"]
+        assert session.context == {"dept": "hr"}
+
+
+class TestHotSessionCache:
+    """Test suite for the bounded in-memory session cache."""
+
+    def test_cold_sessions_are_evicted_and_reloaded(self, fake_redis):
+        """Test that sessions past the cache size are reloaded on demand."""
+        manager = ConversationManager(Config(session_cache_size=2, session_shards=1),
+                                      store=RedisSessionStore(fake_redis))
+        manager.create_session("s1").add_message("user", "first")
+        manager.create_session("s2")
+        manager.create_session("s3")
+
+        assert manager.evictions == 1
+        assert "s1" not in manager.sessions
+        assert [m["content"] for m in manager.get_session("s1").get_history()] == ["first"]
+        assert len(manager.sessions) == 2
+        manager.close()
+
+    def test_reload_waits_for_queued_writes(self):
+        """Test that a session evicted with unflushed writes reloads them."""
+        store = RecordingStore()
+        store.gate.clear()
+        manager = ConversationManager(Config(session_cache_size=1, session_shards=1),
+                                      store=store)
+        manager.create_session("s1").add_message("user", "unflushed")
+        manager.create_session("s2")
+        threading.Timer(0.05, store.gate.set).start()
+
+        session = manager.get_session("s1")
+
+        assert [m["content"] for m in session.get_history()] == ["unflushed"]
+        manager.close()
@@ -0,0 +1,136 @@
+"""
+Unit tests for the content-addressed embedding cache.
+"""
+
+import numpy as np
+import pytest
+
+from intramind.knowledge import embedding_cache
+from intramind.knowledge.embedding_cache import EmbeddingCache
+from intramind.knowledge.ingestion import IngestionPipeline
+from intramind.knowledge.knowledge_base import KnowledgeBase
+from intramind.services.embeddings import HashingEmbedder
+
+
+class CountingEmbedder(HashingEmbedder):
+    """Hashing embedder that counts the texts it embeds."""
+
+    def __init__(self):
+        super().__init__()
+        self.texts = 0
+
+    def embed(self, texts):
+        self.texts += len(texts)
+        return super().embed(texts)
+
+
+def write_docs(root, documents=12):
+    """Write documents with distinct text."""
+    root.mkdir(parents=True, exist_ok=True)
+    for i in range(documents):
+        words = " ".join(f"topic{i} word{j}" for j in range(40))
+        (root / f"doc{i:02d}.txt").write_text(words)
+    return root
+
+
+class TestEmbeddingCache:
+    """Test suite for EmbeddingCache."""
+
+    def test_batch_lookup_and_persistence(self, tmp_path, monkeypatch):
+        """Test that stored vectors are found again, also after reopening."""
+        monkeypatch.setattr(embedding_cache, "MERGE_THRESHOLD", 3)
+        embedder = HashingEmbedder(dimension=16)
+        texts = [f"chunk {i}" for i in range(10)]
+        cache = EmbeddingCache(tmp_path, embedder.model_id, 16)
+
+        _, missing = cache.get_many(texts)
+        keys = [cache.key(texts[i]) for i in missing]
+        added = cache.put_many(keys + keys[:2], embedder.embed(texts + texts[:2]))
+        cache.close()
+        cache = EmbeddingCache(tmp_path, embedder.model_id, 16)
+        vectors, missing_after = cache.get_many(texts[::-1] + ["new chunk"])
+        cache.close()
+
+        assert missing == list(range(10))
+        assert added == 10
+        assert missing_after == [10]
+        assert np.allclose(vectors[:10], embedder.embed(texts[::-1]))
+
+    def test_keys_include_the_model(self, tmp_path):
+        """Test that the same text is cached separately per model."""
+        first = EmbeddingCache(tmp_path, "model-a", 4)
+        first.put_many([first.key("text")], np.ones((1, 4)))
+        second = EmbeddingCache(tmp_path, "model-b", 4)
+
+        assert first.key("text") != second.key("text")
+        assert second.get_many(["text"])[1] == [0]
+        first.close()
+        second.close()
+
+    def test_gc_keeps_referenced_entries(self, tmp_path):
+        """Test that GC drops unreferenced entries and keeps the rest readable."""
+        cache = EmbeddingCache(tmp_path, "model", 4)
+        texts = [f"t{i}" for i in range(20)]
+        vectors = np.arange(80, dtype=np.float32).reshape(20, 4)
+        cache.put_many([cache.key(t) for t in texts], vectors)
+
+        removed = cache.gc(cache.key(t) for t in texts[::4])
+        cache.close()
+        cache = EmbeddingCache(tmp_path, "model", 4)
+        kept, missing = cache.get_many(texts[::4])
+
+        assert removed == 15
+        assert len(cache) == 5 and missing == []
+        assert np.array_equal(kept, vectors[::4])
+        assert len(list(cache.directory.glob("gen-*"))) == 1
+        cache.close()
+
+    def test_dimension_mismatch(self, tmp_path):
+        """Test that a cache cannot be reopened with another vector length."""
+        EmbeddingCache(tmp_path, "model", 4).close()
+
+        with pytest.raises(ValueError):
+            EmbeddingCache(tmp_path, "model", 8)
+
+
+class TestIngestionCache:
+    """Test suite for cached embeddings during ingestion."""
+
+    def test_rebuild_does_not_embed_again(self, tmp_path):
+        """Test that rebuilding a knowledge base reuses every embedding."""
+        corpus = write_docs(tmp_path / "docs")
+        embedder = CountingEmbedder()
+        first = IngestionPipeline(tmp_path / "kb", embedder, chunk_size=30,
+                                  chunk_overlap=5).run([corpus])
+        calls = embedder.texts
+        rebuilt = IngestionPipeline(tmp_path / "kb", embedder, chunk_size=30,
+                                    chunk_overlap=5).run([corpus], resume=False)
+
+        kb = KnowledgeBase.open(tmp_path / "kb")
+        hits = kb.search("topic3 word7", k=1)
+        kb.close()
+
+        assert first.embedded == first.chunks
+        assert rebuilt.embedded == 0
+        assert embedder.texts == calls
+        assert hits[0].doc_id.endswith("doc03.txt")
+
+    def test_only_changed_chunks_are_embedded(self, tmp_path):
+        """Test that after editing one document only its chunks reach the model."""
+        corpus = write_docs(tmp_path / "docs")
+        settings = dict(chunk_size=30, chunk_overlap=5)
+        IngestionPipeline(tmp_path / "kb", HashingEmbedder(), **settings).run([corpus])
+        (corpus / "doc05.txt").write_text("a completely rewritten document about badges")
+
+        stats = IngestionPipeline(tmp_path / "kb", HashingEmbedder(), **settings).run(
+            [corpus], resume=False)
+
+        assert stats.embedded == 1
+
+    def test_cache_can_be_disabled(self, tmp_path):
+        """Test that no cache directory is written when caching is off."""
+        corpus = write_docs(tmp_path / "docs", documents=2)
+        IngestionPipeline(tmp_path / "kb", HashingEmbedder(),
+                          cache_embeddings=False).run([corpus])
+
+        assert not (tmp_path / "kb" / "embedding_cache").exists()
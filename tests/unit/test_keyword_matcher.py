@@ -0,0 +1,94 @@
+"""
+Unit tests for the KeywordMatcher and its use in the NLPEngine.
+"""
+
+import json
+
+from intramind import Config
+from intramind.core.keyword_matcher import DEFAULT_RULES, KeywordMatcher
+from intramind.core.nlp_engine import NLPEngine
+
+
+class TestKeywordMatcher:
+    """Test suite for KeywordMatcher."""
+
+    def test_match_default_rules(self):
+        """Test that intent and sentiment hits come back from one scan."""
+        matcher = KeywordMatcher()
+        result = matcher.match("Hello there, this is great")
+
+        assert result == {"intents": {"greeting": 1}, "sentiment": {"positive": 1}}
+
+    def test_word_boundaries(self):
+        """Test that keywords only match whole words."""
+        matcher = KeywordMatcher()
+
+        assert matcher.match("this is shipping") == {}
+        assert matcher.match("hi!") == {"intents": {"greeting": 1}}
+
+    def test_multi_word_and_overlapping_keywords(self):
+        """Test phrases and keywords that share suffixes."""
+        matcher = KeywordMatcher({"intents": {"a": ["see you", "you"], "b": ["he", "she"]}})
+        hits = matcher.scan("I will see you, she said")
+
+        assert [(h.keyword, h.label) for h in hits] == [
+            ("see you", "a"),
+            ("you", "a"),
+            ("she", "b"),
+        ]
+
+    def test_distinct_keyword_counts(self):
+        """Test that repeated keywords are counted once."""
+        matcher = KeywordMatcher()
+        result = matcher.match("bad bad awful")
+
+        assert result["sentiment"]["negative"] == 2
+
+    def test_large_rule_table(self):
+        """Test compiling and matching thousands of keywords."""
+        keywords = [f"product{i}" for i in range(5000)]
+        matcher = KeywordMatcher({"faq": {"catalog": keywords}})
+
+        assert matcher.keyword_count == 5000
+        assert matcher.match("where is product4999 sold") == {"faq": {"catalog": 1}}
+        assert matcher.match("where is product49999 sold") == {}
+
+    def test_from_file(self, tmp_path):
+        """Test loading rule tables from a JSON file."""
+        rules_file = tmp_path / "rules.json"
+        rules_file.write_text(json.dumps({"intents": {"billing": ["invoice"]}}))
+
+        matcher = KeywordMatcher.from_file(rules_file)
+
+        assert matcher.labels["intents"] == ["billing"]
+        assert matcher.labels["sentiment"] == list(DEFAULT_RULES["sentiment"])
+
+
+class TestNLPEngineKeywords:
+    """Test suite for keyword-driven NLPEngine stages."""
+
+    def test_intent_priority(self):
+        """Test that the first listed intent wins."""
+        engine = NLPEngine(Config())
+
+        assert engine.process("hello, can you help?")["intent"] == "greeting"
+        assert engine.process("can you help?")["intent"] == "help_request"
+        assert engine.process("what is this?")["intent"] == "question"
+        assert engine.process("This is a test")["intent"] == "statement"
+
+    def test_sentiment(self):
+        """Test keyword-based sentiment."""
+        engine = NLPEngine(Config())
+
+        assert engine.process("I love it, great job")["sentiment"] == "positive"
+        assert engine.process("this is terrible")["sentiment"] == "negative"
+        assert engine.process("good and bad")["sentiment"] == "neutral"
+
+    def test_rules_file_from_config(self, tmp_path):
+        """Test that NLPEngine loads rules from Config.nlp_rules_file."""
+        rules_file = tmp_path / "rules.json"
+        rules_file.write_text(json.dumps({"intents": {"billing": ["invoice", "refund"]}}))
+
+        engine = NLPEngine(Config(nlp_rules_file=str(rules_file)))
+
+        assert engine.process("I need a refund")["intent"] == "billing"
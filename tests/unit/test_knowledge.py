@@ -0,0 +1,336 @@
+"""
+Unit tests for knowledge base ingestion and retrieval.
+"""
+
+import os
+import threading
+from itertools import count
+
+import pytest
+
+from intramind import ChatBot, Config
+from intramind.knowledge.ingestion import (
+    IngestionPipeline, chunk_text, extract_html, iter_sources, ordered_map
+)
+from intramind.knowledge.knowledge_base import KnowledgeBase
+from intramind.knowledge.vector_index import IVFIndex
+from intramind.services.embeddings import HashingEmbedder
+
+TOPICS = ["vpn", "payroll", "printer", "laptop", "badge", "expense", "wifi", "email"]
+
+
+def write_corpus(root, documents=24, paragraphs=6):
+    """Write a small corpus with one topic per document."""
+    root.mkdir(parents=True, exist_ok=True)
+    for i in range(documents):
+        topic = TOPICS[i % len(TOPICS)]
+        text = "\n\n".join(
+            f"Section {p} of the {topic} guide number {i}. To fix {topic} issues, "
+            f"restart the {topic} service and contact the {topic} desk."
+            for p in range(paragraphs)
+        )
+        (root / f"doc{i:03d}.txt").write_text(text)
+    return root
+
+
+class FlakyEmbedder(HashingEmbedder):
+    """Hashing embedder that fails after a number of batches."""
+
+    def __init__(self, fail_after):
+        super().__init__()
+        self.batches = count()
+        self.fail_after = fail_after
+
+    def embed(self, texts):
+        if len(texts) > 1 and next(self.batches) >= self.fail_after:
+            raise RuntimeError("embedding service down")
+        return super().embed(texts)
+
+
+class TestChunking:
+    """Test suite for the generator stages."""
+
+    def test_chunk_windows_overlap(self):
+        """Test that chunks hold `size` words and repeat `overlap` words."""
+        words = [f"w{i}" for i in range(25)]
+        chunks = list(chunk_text(" ".join(words), size=10, overlap=3))
+
+        assert chunks[0].split() == words[:10]
+        assert chunks[1].split()[:3] == words[7:10]
+        assert chunks[-1].split()[-1] == "w24"
+        assert len(chunks) == 4
+
+    def test_invalid_overlap(self):
+        """Test that an overlap not smaller than the size is rejected."""
+        with pytest.raises(ValueError):
+            list(chunk_text("a b c", size=5, overlap=5))
+
+    def test_sources_are_sorted_and_filtered(self, tmp_path):
+        """Test that sources are walked in path order, by suffix."""
+        (tmp_path / "b").mkdir()
+        for name in ("b/2.txt", "b/1.md", "a.txt", "skip.bin"):
+            (tmp_path / name).write_text("x")
+
+        sources = list(iter_sources([tmp_path]))
+
+        assert [s.doc_id.split("/", 1)[1] for s in sources] == ["a.txt", "b/1.md", "b/2.txt"]
+        assert sources == sorted(sources, key=lambda s: s.key)
+
+    def test_html_extraction(self, tmp_path):
+        """Test that HTML text is extracted without scripts or styles."""
+        page = tmp_path / "page.html"
+        page.write_text("<html><head><style>p{}</style></head><body><h1>Title</h1>"
+                        "<script>alert(1)</script><p>Body &amp; text</p></body></html>")
+
+        assert extract_html(page) == "Title\nBody & text"
+
+    def test_ordered_map_is_bounded(self):
+        """Test that parallel stages keep order and read ahead only `window` items."""
+        from concurrent.futures import ThreadPoolExecutor
+
+        pulled = []
+
+        def source():
+            for i in range(100):
+                pulled.append(i)
+                yield i
+
+        with ThreadPoolExecutor(4) as executor:
+            results = ordered_map(lambda x: x * x, source(), executor, window=4)
+            first = [next(results) for _ in range(3)]
+            assert len(pulled) <= 3 + 4
+            assert first + list(results) == [i * i for i in range(100)]
+
+
+class TestIngestion:
+    """Test suite for the ingestion pipeline and knowledge base."""
+
+    def test_ingest_and_search(self, tmp_path):
+        """Test that ingested documents can be retrieved by topic."""
+        corpus = write_corpus(tmp_path / "docs")
+        stats = IngestionPipeline(tmp_path / "kb", HashingEmbedder(), chunk_size=30,
+                                  chunk_overlap=5, batch_size=8).run([corpus])
+
+        kb = KnowledgeBase.open(tmp_path / "kb")
+        hits = kb.search("how do I fix payroll issues", k=3)
+        kb.close()
+
+        assert stats.documents == 24
+        assert len(kb) == stats.chunks
+        assert hits and all("payroll" in hit.text for hit in hits)
+        assert hits[0].score >= hits[-1].score
+
+    def test_ivf_index(self, tmp_path):
+        """Test that an IVF index is built after ingestion and used for search."""
+        corpus = write_corpus(tmp_path / "docs")
+        IngestionPipeline(tmp_path / "kb", HashingEmbedder(), chunk_size=30, chunk_overlap=5,
+                          index="ivf", nlist=8).run([corpus])
+
+        kb = KnowledgeBase.open(tmp_path / "kb", nprobe=8)
+        hits = kb.search("wifi issues", k=2)
+        kb.delete([hits[0].row])
+        after = kb.search("wifi issues", k=2)
+        kb.close()
+
+        assert isinstance(kb.index, IVFIndex)
+        assert all("wifi" in hit.text for hit in hits)
+        assert hits[0].row not in [hit.row for hit in after]
+
+    def test_hybrid_search_finds_codes(self, tmp_path):
+        """Test that an exact error code is retrieved through the keyword index."""
+        corpus = write_corpus(tmp_path / "docs")
+        (corpus / "codes.txt").write_text("Badge reader shows E-7781 when the card is expired.")
+        IngestionPipeline(tmp_path / "kb", HashingEmbedder(), chunk_size=30,
+                          chunk_overlap=5).run([corpus])
+
+        hits = {}
+        for mode in KnowledgeBase.RETRIEVAL_MODES:
+            kb = KnowledgeBase.open(tmp_path / "kb", retrieval=mode)
+            hits[mode] = kb.search("what does e-7781 mean", k=3, min_score=0.5)
+            assert kb.keywords.docs == len(kb)
+            kb.close()
+
+        assert hits["keyword"][0].doc_id.endswith("codes.txt")
+        assert hits["hybrid"][0].doc_id.endswith("codes.txt")
+
+    def test_interrupted_run_resumes(self, tmp_path):
+        """Test that a failed run resumes from its checkpoint without duplicates."""
+        corpus = write_corpus(tmp_path / "docs")
+        settings = dict(chunk_size=30, chunk_overlap=5, batch_size=4, checkpoint_interval=2)
+
+        full = IngestionPipeline(tmp_path / "full", HashingEmbedder(), **settings).run([corpus])
+        with pytest.raises(RuntimeError):
+            IngestionPipeline(tmp_path / "kb", FlakyEmbedder(fail_after=9), workers=1,
+                              **settings).run([corpus])
+        resumed = IngestionPipeline(tmp_path / "kb", HashingEmbedder(), **settings).run([corpus])
+
+        kb = KnowledgeBase.open(tmp_path / "kb")
+        chunk_ids = [kb.chunks.get(row).chunk_id for row in range(len(kb))]
+        keyword_rows = sorted(row for s in kb.keywords.segments for row in s.rows.tolist())
+        kb.close()
+
+        assert resumed.skipped > 0
+        assert resumed.documents < full.documents
+        assert len(chunk_ids) == len(set(chunk_ids)) == full.chunks
+        assert keyword_rows == list(range(full.chunks))
+
+    def test_resume_with_other_settings_fails(self, tmp_path):
+        """Test that resuming with different chunking is refused."""
+        corpus = write_corpus(tmp_path / "docs", documents=2)
+        IngestionPipeline(tmp_path / "kb", HashingEmbedder(), chunk_size=30,
+                          chunk_overlap=5).run([corpus])
+
+        with pytest.raises(ValueError):
+            IngestionPipeline(tmp_path / "kb", HashingEmbedder(), chunk_size=50,
+                              chunk_overlap=5).run([corpus])
+
+    def test_query_embedder_must_match(self, tmp_path):
+        """Test that a knowledge base cannot be queried with another model."""
+        corpus = write_corpus(tmp_path / "docs", documents=2)
+        IngestionPipeline(tmp_path / "kb", HashingEmbedder()).run([corpus])
+
+        with pytest.raises(ValueError):
+            KnowledgeBase.open(tmp_path / "kb", HashingEmbedder(dimension=64))
+
+
+def live_chunks(kb):
+    """Chunks of a knowledge base that have not been deleted."""
+    deleted = kb.vectors.deleted()
+    return [kb.chunks.get(row) for row in range(len(kb)) if not deleted[row]]
+
+
+class TestSync:
+    """Test suite for incremental sync."""
+
+    SETTINGS = dict(chunk_size=30, chunk_overlap=5, batch_size=4)
+
+    def test_sync_reindexes_only_changes(self, tmp_path):
+        """Test that a sync matches a rebuild while touching only changed documents."""
+        corpus = write_corpus(tmp_path / "docs")
+        first = IngestionPipeline(tmp_path / "kb", HashingEmbedder(), **self.SETTINGS).sync(
+            [corpus])
+        (corpus / "doc003.txt").write_text("The laptop docking station needs firmware 4.2.")
+        os.utime(corpus / "doc004.txt", ns=(0, 10 ** 9))
+        os.remove(corpus / "doc005.txt")
+        (corpus / "doc100.txt").write_text("Parking permits are renewed every March.")
+
+        stats = IngestionPipeline(tmp_path / "kb", HashingEmbedder(), **self.SETTINGS).sync(
+            [corpus])
+        IngestionPipeline(tmp_path / "full", HashingEmbedder(), **self.SETTINGS).run([corpus])
+        synced = KnowledgeBase.open(tmp_path / "kb", retrieval="keyword")
+        rebuilt = KnowledgeBase.open(tmp_path / "full")
+        hits = synced.search("docking station firmware", k=1)
+        chunks, expected = live_chunks(synced), live_chunks(rebuilt)
+        synced.close()
+        rebuilt.close()
+
+        assert first.added == 24
+        assert (stats.added, stats.changed, stats.deleted, stats.unchanged) == (1, 1, 1, 22)
+        assert stats.chunks == 2
+        assert sorted(chunks) == sorted(expected)
+        assert hits[0].doc_id == "docs/doc003.txt"
+
+    def test_reader_switches_on_refresh(self, tmp_path):
+        """Test that an open reader keeps its state until it refreshes."""
+        corpus = write_corpus(tmp_path / "docs", documents=4)
+        pipeline = IngestionPipeline(tmp_path / "kb", HashingEmbedder(), **self.SETTINGS)
+        pipeline.run([corpus])
+        reader = KnowledgeBase.open(tmp_path / "kb", retrieval="keyword", refresh_interval=0)
+        (corpus / "doc001.txt").write_text("Quarterly badge audit checklist.")
+
+        pipeline.sync([corpus])
+        before = reader.search("quarterly audit checklist", k=1)
+        refreshed = reader.refresh()
+        after = reader.search("quarterly audit checklist", k=1)
+        old = reader.search("payroll guide number 1", k=5)
+        reader.close()
+
+        assert before == []
+        assert refreshed
+        assert after[0].text == "Quarterly badge audit checklist."
+        assert all(hit.doc_id != "docs/doc001.txt" for hit in old)
+
+    def test_interrupted_sync_is_redone(self, tmp_path):
+        """Test that a failed sync leaves no trace and the next one completes it."""
+        corpus = write_corpus(tmp_path / "docs")
+        IngestionPipeline(tmp_path / "kb", HashingEmbedder(), **self.SETTINGS).run([corpus])
+        for i in (2, 9):
+            (corpus / f"doc{i:03d}.txt").write_text(" ".join(f"word{j}" for j in range(90)))
+
+        with pytest.raises(RuntimeError):
+            IngestionPipeline(tmp_path / "kb", FlakyEmbedder(fail_after=1), workers=1,
+                              **self.SETTINGS).sync([corpus])
+        stats = IngestionPipeline(tmp_path / "kb", HashingEmbedder(), **self.SETTINGS).sync(
+            [corpus])
+        kb = KnowledgeBase.open(tmp_path / "kb")
+        chunk_ids = [chunk.chunk_id for chunk in live_chunks(kb)]
+        kb.close()
+
+        assert stats.changed == 2
+        assert len(chunk_ids) == len(set(chunk_ids))
+        assert "docs/doc002.txt#3" in chunk_ids
+
+
+class TestChatBotKnowledge:
+    """Test suite for knowledge-grounded ChatBot answers."""
+
+    @pytest.fixture
+    def kb_path(self, tmp_path):
+        corpus = write_corpus(tmp_path / "docs")
+        IngestionPipeline(tmp_path / "kb", HashingEmbedder(), chunk_size=30,
+                          chunk_overlap=5).run([corpus])
+        return tmp_path / "kb"
+
+    def test_answers_from_knowledge_base(self, kb_path):
+        """Test that the chatbot answers with retrieved passages and cites them."""
+        bot = ChatBot(Config(cache_enabled=False, knowledge_base_path=str(kb_path)))
+        response = bot.chat("How do I fix printer issues?")
+        bot.close()
+
+        assert "printer" in response.message
+        assert response.metadata["sources"]
+
+    async def test_provider_receives_passages(self, kb_path, fake_provider_factory):
+        """Test that retrieved passages reach the provider as a system message."""
+        provider = fake_provider_factory()
+        bot = ChatBot(Config(cache_enabled=False, knowledge_base_path=str(kb_path)),
+                      provider=provider)
+        await bot.chat_async("How do I fix badge issues?")
+        bot.close()
+
+        system = provider.calls[0][0]
+        assert system["role"] == "system"
+        assert "badge" in system["content"]
+
+    async def test_async_search_runs_off_the_loop(self, kb_path):
+        """Test that async turns search the knowledge base in a worker thread."""
+        bot = ChatBot(Config(cache_enabled=False, knowledge_base_path=str(kb_path)))
+        search = bot.knowledge_base.search
+        threads = []
+
+        def tracking_search(*args, **kwargs):
+            threads.append(threading.get_ident())
+            return search(*args, **kwargs)
+
+        bot.knowledge_base.search = tracking_search
+        response = await bot.chat_async("How do I fix wifi issues?")
+        bot.close()
+
+        assert response.metadata["sources"]
+        assert threads and threads[0] != threading.get_ident()
+
+    def test_cache_keeps_sources_and_follows_syncs(self, kb_path, tmp_path):
+        """Test that cache hits cite their sources and a published sync misses the cache."""
+        bot = ChatBot(Config(knowledge_base_path=str(kb_path), knowledge_refresh_interval=0))
+        first = bot.chat("How do I fix printer issues?", session_id="a")
+        repeat = bot.chat("How do I fix printer issues?", session_id="b")
+        (tmp_path / "docs" / "doc002.txt").write_text("Printer issues: replace the toner.")
+        IngestionPipeline(kb_path, HashingEmbedder(), chunk_size=30, chunk_overlap=5).sync(
+            [tmp_path / "docs"])
+        bot.knowledge_base.refresh()
+        synced = bot.chat("How do I fix printer issues?", session_id="c")
+        bot.close()
+
+        assert repeat.metadata["cached"] is True
+        assert repeat.metadata["sources"] == first.metadata["sources"]
+        assert synced.metadata["cached"] is False
@@ -0,0 +1,195 @@
+"""
+Unit tests for the NLPEngine class.
+"""
+
+import asyncio
+import os
+import random
+import threading
+
+import pytest
+
+from intramind import Config
+from intramind.core.nlp_engine import NLPEngine
+from intramind.core.nlp_pool import decode_result, encode_result
+
+
+@pytest.fixture
+def engine():
+    """Create an NLPEngine with default rules."""
+    return NLPEngine(Config())
+
+
+class TestNLPEngineBatch:
+    """Test suite for NLPEngine.process_batch."""
+
+    def test_process_batch_matches_process(self, engine):
+        """Test that batch results equal single-message results."""
+        texts = [
+            "Hello!",
+            "bye, see you",
+            "can you help me?",
+            "what time is it?",
+            "This is great but also bad and terrible",
+            "",
+            "hi\nthere",
+            "I love this, hello",
+        ]
+
+        assert engine.process_batch(texts) == [engine.process(text) for text in texts]
+
+    def test_process_batch_random_corpus(self, engine):
+        """Test batch/single equivalence on randomly assembled messages."""
+        rng = random.Random(7)
+        vocabulary = ["hello", "hi", "this", "help", "good", "bad", "sad", "see", "you",
+                      "love", "hate", "?", "ok", "support", "shipping", "great!"]
+        texts = [" ".join(rng.choice(vocabulary) for _ in range(rng.randint(0, 12)))
+                 for _ in range(300)]
+
+        assert engine.process_batch(texts) == [engine.process(text) for text in texts]
+
+    def test_process_batch_empty(self, engine):
+        """Test that an empty batch returns an empty list."""
+        assert engine.process_batch([]) == []
+
+    def test_process_batch_independent_entities(self, engine):
+        """Test that entity dicts are not shared between results."""
+        results = engine.process_batch(["a", "b"])
+        results[0]["entities"]["persons"].append("Ada")
+
+        assert results[1]["entities"]["persons"] == []
+
+
+class TestNLPEngineStages:
+    """Test suite for custom NLP pipeline stages."""
+
+    def test_sync_stage(self, engine):
+        """Test that a sync stage result is stored under its name."""
+        engine.add_stage("length", lambda text, result: len(text))
+
+        assert engine.process("hello")["length"] == 5
+        assert engine.process_batch(["hi", "abc"])[1]["length"] == 3
+
+    def test_stage_sees_prior_results(self, engine):
+        """Test that stages receive the results computed before them."""
+        engine.add_stage("shout", lambda text, result: result["intent"].upper())
+
+        assert engine.process("hello")["shout"] == "GREETING"
+
+    def test_failing_stage(self, engine):
+        """Test that a failing stage yields None without losing other results."""
+        engine.add_stage("broken", lambda text, result: 1 / 0)
+        result = engine.process("hello")
+
+        assert result["broken"] is None
+        assert result["intent"] == "greeting"
+
+    async def test_async_stage(self, engine):
+        """Test that coroutine stages are awaited on the event loop."""
+        async def lookup(text, result):
+            await asyncio.sleep(0)
+            return threading.current_thread() is threading.main_thread()
+
+        engine.add_stage("on_loop", lookup)
+
+        assert (await engine.process_async("hello"))["on_loop"] is True
+
+    async def test_cpu_bound_stage_uses_executor(self, engine):
+        """Test that only CPU-bound stages leave the event loop thread."""
+        def where(text, result):
+            return threading.current_thread() is threading.main_thread()
+
+        engine.add_stage("inline", where)
+        engine.add_stage("offloaded", where, cpu_bound=True)
+        result = await engine.process_async("hello")
+
+        assert result["inline"] is True
+        assert result["offloaded"] is False
+
+    def test_async_stage_in_sync_path(self, engine):
+        """Test that process() can still run coroutine stages."""
+        async def echo(text, result):
+            return text
+
+        engine.add_stage("echo", echo)
+
+        assert engine.process("hello")["echo"] == "hello"
+
+    async def test_async_stage_in_sync_path_under_running_loop(self, engine):
+        """Test that process() runs coroutine stages when called on a running loop."""
+        async def echo(text, result):
+            await asyncio.sleep(0)
+            return text
+
+        engine.add_stage("echo", echo)
+
+        assert engine.process("hello")["echo"] == "hello"
+
+
+def worker_pid_stage(text, result):
+    """CPU-bound stage that reports which process ran it."""
+    return os.getpid()
+
+
+@pytest.fixture(scope="module")
+def pooled_engine():
+    """Create an NLPEngine that runs in a two-process pool."""
+    engine = NLPEngine(Config(nlp_execution="process", workers=2))
+    engine.pool.start()
+    yield engine
+    engine.close()
+
+
+class TestNLPProcessPool:
+    """Test suite for the process-pool execution mode."""
+
+    CORPUS = [
+        "Hello, I need help with my account",
+        "this is terrible and sad",
+        "great support, goodbye!",
+        "where is the VPN guide?",
+        "",
+    ]
+
+    def test_encoding_round_trip(self, engine):
+        """Test that the compact wire form preserves results."""
+        for text in self.CORPUS:
+            result = engine.process(text)
+            assert decode_result(encode_result(result)) == result
+
+    def test_process_matches_inline(self, engine, pooled_engine):
+        """Test that pooled single-text processing matches inline results."""
+        for text in self.CORPUS:
+            assert pooled_engine.process(text) == engine.process(text)
+
+    def test_batch_matches_inline(self, engine, pooled_engine):
+        """Test that pooled batches are split across workers in order."""
+        texts = self.CORPUS * 9
+        assert pooled_engine.process_batch(texts) == engine.process_batch(texts)
+
+    async def test_async_matches_inline(self, engine, pooled_engine):
+        """Test that the async path awaits the pool without blocking."""
+        results = await asyncio.gather(*(pooled_engine.process_async(t) for t in self.CORPUS))
+        assert results == [engine.process(t) for t in self.CORPUS]
+
+    async def test_cpu_bound_stage_runs_in_worker(self, pooled_engine):
+        """Test that CPU-bound stages run in worker processes."""
+        pooled_engine.add_stage("pid", worker_pid_stage, cpu_bound=True)
+        try:
+            result = await pooled_engine.process_async("hello")
+        finally:
+            pooled_engine.stages.clear()
+
+        assert result["pid"] != os.getpid()
+
+    def test_sync_paths_run_cpu_bound_stage_in_worker(self, pooled_engine):
+        """Test that process() and process_batch() also send CPU-bound stages to the pool."""
+        pooled_engine.add_stage("pid", worker_pid_stage, cpu_bound=True)
+        try:
+            single = pooled_engine.process("hello")
+            batch = pooled_engine.process_batch(self.CORPUS)
+        finally:
+            pooled_engine.stages.clear()
+
+        assert single["pid"] != os.getpid()
+        assert all(result["pid"] != os.getpid() for result in batch)
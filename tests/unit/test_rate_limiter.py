@@ -0,0 +1,204 @@
+"""
+Unit tests for the rate limiters.
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from intramind import ChatBot, Config
+from intramind.services.rate_limiter import (
+    RedisRateLimiter, TokenBucketLimiter, create_rate_limiter
+)
+
+
+class FakeClock:
+    """Manually advanced clock."""
+
+    def __init__(self, now: float = 0.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestTokenBucketLimiter:
+    """Test suite for the in-process token buckets."""
+
+    def test_burst_then_refill(self):
+        """Test that a full bucket allows a burst and refills at the limit's rate."""
+        clock = FakeClock()
+        limiter = TokenBucketLimiter([(3, 60)], clock=clock)
+        decisions = [limiter.check("a") for _ in range(4)]
+
+        assert [d.allowed for d in decisions] == [True, True, True, False]
+        assert decisions[-1].retry_after == pytest.approx(20.0)
+        clock.now = 20.0
+        assert limiter.check("a").allowed
+        assert not limiter.check("a").allowed
+        assert limiter.check("b").allowed
+        assert limiter.stats() == {"allowed": 5, "rejected": 2, "keys": 2}
+
+    def test_all_limits_must_allow(self):
+        """Test that a rejection by one limit consumes nothing from the others."""
+        clock = FakeClock()
+        limiter = TokenBucketLimiter([(2, 60), (3, 3600)], clock=clock)
+        assert [limiter.check("a").allowed for _ in range(3)] == [True, True, False]
+
+        clock.now = 60.0
+        decisions = [limiter.check("a") for _ in range(2)]
+
+        assert [d.allowed for d in decisions] == [True, False]
+        # The hourly bucket is now short of a token, not the minute one
+        assert decisions[1].retry_after > 60
+
+    def test_least_recently_seen_keys_are_dropped(self):
+        """Test that tracked keys are bounded by max_keys."""
+        limiter = TokenBucketLimiter([(1, 60)], max_keys=2)
+        for key in ("a", "b", "a", "c"):
+            limiter.check(key)
+
+        assert limiter.stats()["keys"] == 2
+        assert not limiter.check("a").allowed
+        assert limiter.check("b").allowed
+
+
+class TestRedisRateLimiter:
+    """Test suite for the Redis sliding-window limiter."""
+
+    def test_sliding_window_weights_previous_window(self, fake_redis):
+        """Test that the previous window counts in proportion to its overlap."""
+        fake_redis.clock = FakeClock(1_000_020.0)  # 0s into a minute window
+        limiter = RedisRateLimiter(fake_redis, [(4, 60)])
+        assert [limiter.check("a").allowed for _ in range(5)] == [True] * 4 + [False]
+
+        # 15s into the next window, 3/4 of the previous one still overlaps
+        fake_redis.clock.now += 75
+        decisions = [limiter.check("a") for _ in range(2)]
+
+        assert [d.allowed for d in decisions] == [True, False]
+        assert decisions[1].retry_after == pytest.approx(15.0)
+
+    def test_windows_are_shared_between_limiters(self, fake_redis):
+        """Test that limiters in different workers share one count per key."""
+        workers = [RedisRateLimiter(fake_redis, [(3, 60), (100, 3600)]) for _ in range(3)]
+        fake_redis.round_trips = 0
+
+        allowed = [worker.check("tenant").allowed for worker in workers * 2]
+
+        assert allowed == [True] * 3 + [False] * 3
+        assert fake_redis.round_trips == 6
+
+    def test_redis_errors_fail_open(self, fake_redis):
+        """Test that checks are allowed and counted when Redis fails."""
+        limiter = RedisRateLimiter(fake_redis, [(1, 60)])
+
+        def unavailable(*args, **kwargs):
+            raise ConnectionError("redis down")
+
+        limiter._script = unavailable
+
+        assert limiter.check("a").allowed
+        assert limiter.check("a").allowed
+        assert limiter.stats()["errors"] == 2
+
+    async def test_check_async_does_not_block_loop(self):
+        """Test that a slow synchronous client runs off the event loop."""
+        class SlowRedis:
+            def register_script(self, source):
+                def run(keys=(), args=()):
+                    time.sleep(0.2)
+                    return [1, 0]
+                return run
+
+        limiter = RedisRateLimiter(SlowRedis(), [(10, 60)])
+        ticks = []
+
+        async def ticker():
+            for _ in range(8):
+                ticks.append(time.perf_counter())
+                await asyncio.sleep(0.02)
+
+        decision, _ = await asyncio.gather(limiter.check_async("a"), ticker())
+
+        assert decision.allowed
+        assert max(b - a for a, b in zip(ticks, ticks[1:])) < 0.1
+
+    def test_create_from_config(self, fake_redis):
+        """Test backend selection and that disabled limits are skipped."""
+        disabled = create_rate_limiter(Config())
+        memory = create_rate_limiter(Config(rate_limit_enabled=True, rate_limit_per_hour=0))
+        redis = create_rate_limiter(
+            Config(rate_limit_enabled=True, rate_limit_backend="redis", rate_limit_per_day=10),
+            redis_client=fake_redis,
+        )
+
+        assert disabled is None
+        assert isinstance(memory, TokenBucketLimiter) and memory.limits == [(60, 60.0)]
+        assert isinstance(redis, RedisRateLimiter)
+        assert [window for _, window in redis.limits] == [60.0, 3600.0, 86400.0]
+
+
+class TestChatBotRateLimit:
+    """Test suite for rate limiting in ChatBot."""
+
+    def test_rejected_turns_skip_nlp(self):
+        """Test that a rejected turn returns before NLP and is not recorded."""
+        bot = ChatBot(Config(cache_enabled=False),
+                      rate_limiter=TokenBucketLimiter([(1, 60)]))
+        calls = []
+        process = bot.nlp_engine.process
+        bot.nlp_engine.process = lambda message: calls.append(message) or process(message)
+
+        first = bot.chat("Hello!", session_id="limited")
+        second = bot.chat("Hello again!", session_id="limited")
+
+        assert first.metadata.get("error") is None
+        assert second.metadata["error"] == "rate_limited"
+        assert second.metadata["retry_after"] > 0
+        assert second.session_id == "limited"
+        assert calls == ["Hello!"]
+        assert len(bot.get_session_history("limited")) == 2
+
+    def test_rate_limit_key_overrides_session(self):
+        """Test that turns are keyed by rate_limit_key across sessions."""
+        bot = ChatBot(Config(cache_enabled=False),
+                      rate_limiter=TokenBucketLimiter([(2, 60)]))
+        responses = [bot.chat("Hi", session_id=f"s{i}", rate_limit_key="api-key")
+                     for i in range(3)]
+
+        assert [r.metadata.get("error") for r in responses] == [None, None, "rate_limited"]
+
+    async def test_async_and_stream_paths_are_limited(self):
+        """Test that chat_async and chat_stream check the limiter first."""
+        bot = ChatBot(Config(cache_enabled=False),
+                      rate_limiter=TokenBucketLimiter([(1, 60)]))
+        allowed = await bot.chat_async("Hello!", session_id="async-limited")
+        chunks = [chunk async for chunk in bot.chat_stream("Hello!", session_id="async-limited")]
+
+        assert allowed.metadata.get("error") is None
+        assert len(chunks) == 1 and chunks[0].done
+        assert chunks[0].response.metadata["error"] == "rate_limited"
+
+    def test_batch_leaves_rejected_messages_out(self):
+        """Test that chat_batch answers rejected messages without analysing them."""
+        bot = ChatBot(Config(cache_enabled=False),
+                      rate_limiter=TokenBucketLimiter([(1, 60)]))
+        responses = bot.chat_batch(["Hi", "Hi again", "Hello"], ["b1", "b1", "b2"])
+
+        assert [r.metadata.get("error") for r in responses] == [None, "rate_limited", None]
+        assert responses[2].intent == "greeting"
+
+    def test_batch_honours_rate_limit_key(self):
+        """Test that chat_batch limits under the caller key, as chat() does."""
+        bot = ChatBot(Config(cache_enabled=False),
+                      rate_limiter=TokenBucketLimiter([(2, 60)]))
+        shared = bot.chat_batch(["Hi", "Hi", "Hi"], ["k1", "k2", "k3"], rate_limit_key="api-key")
+        per_message = bot.chat_batch(["Hi", "Hi"], ["k4", "k5"],
+                                     rate_limit_key=["api-key", "other-key"])
+
+        assert [r.metadata.get("error") for r in shared] == [None, None, "rate_limited"]
+        assert [r.metadata.get("error") for r in per_message] == ["rate_limited", None]
+        with pytest.raises(ValueError):
+            bot.chat_batch(["Hi", "Hi"], rate_limit_key=["only-one"])
@@ -0,0 +1,132 @@
+"""
+Unit tests for embedders and the semantic answer cache.
+"""
+
+import numpy as np
+
+from intramind import ChatBot, Config
+from intramind.services.embeddings import HashingEmbedder, create_embedder
+from intramind.services.semantic_cache import SemanticCache
+
+
+class TestHashingEmbedder:
+    """Test suite for the deterministic hashing embedder."""
+
+    def test_deterministic_unit_vectors(self):
+        """Test that embeddings are repeatable and normalized."""
+        embedder = HashingEmbedder(dimension=64)
+        first = embedder.embed(["reset my password"])
+        second = embedder.embed(["reset my password"])
+
+        assert first.shape == (1, 64)
+        assert first.dtype == np.float32
+        assert np.array_equal(first, second)
+        assert np.isclose(np.linalg.norm(first[0]), 1.0)
+
+    def test_paraphrases_are_similar(self):
+        """Test that shared vocabulary yields high similarity."""
+        embedder = HashingEmbedder()
+        a, b, c = embedder.embed([
+            "how do I reset my password",
+            "password reset steps",
+            "where is the cafeteria",
+        ])
+
+        assert a @ b > 0.8
+        assert a @ c < 0.2
+
+    def test_stopword_only_text(self):
+        """Test that text without content words embeds to zeros."""
+        assert not HashingEmbedder().embed_one("how do I").any()
+
+    def test_create_embedder(self):
+        """Test embedder selection from the model setting."""
+        assert create_embedder("hashing").dimension == 512
+        assert create_embedder("hashing-128").dimension == 128
+
+
+class TestSemanticCache:
+    """Test suite for SemanticCache."""
+
+    def test_paraphrase_hit(self):
+        """Test that a paraphrase returns the cached answer."""
+        cache = SemanticCache(HashingEmbedder(), capacity=10)
+        cache.add("how do I reset my password", "question", "Use the portal.")
+        hit = cache.lookup("password reset steps", "question")
+
+        assert hit is not None
+        assert hit.answer == "Use the portal."
+        assert hit.query == "how do I reset my password"
+        assert cache.stats()["hits"] == 1
+
+    def test_unrelated_query_misses(self):
+        """Test that dissimilar queries miss."""
+        cache = SemanticCache(HashingEmbedder(), capacity=10)
+        cache.add("how do I reset my password", "question", "Use the portal.")
+
+        assert cache.lookup("book a meeting room", "question") is None
+        assert cache.stats()["misses"] == 1
+
+    def test_intent_and_scope_partition(self):
+        """Test that entries only match the same intent and scope."""
+        cache = SemanticCache(HashingEmbedder(), capacity=10)
+        cache.add("reset password", "question", "answer", scope="tenant-a")
+
+        assert cache.lookup("reset password", "statement", scope="tenant-a") is None
+        assert cache.lookup("reset password", "question", scope="tenant-b") is None
+        assert cache.lookup("reset password", "question", scope="tenant-a") is not None
+
+    def test_per_intent_thresholds(self):
+        """Test that an intent can require a stricter match."""
+        cache = SemanticCache(HashingEmbedder(), capacity=10,
+                              intent_thresholds={"billing": 0.99})
+        cache.add("how do I reset my password", "question", "a")
+        cache.add("how do I reset my password", "billing", "b")
+
+        assert cache.lookup("password reset steps", "question") is not None
+        assert cache.lookup("password reset steps", "billing") is None
+        assert cache.threshold_for("billing") == 0.99
+
+    def test_capacity_eviction(self):
+        """Test that the least recently used entry is replaced when full."""
+        cache = SemanticCache(HashingEmbedder(), capacity=2)
+        cache.add("printer jam", "question", "printer")
+        cache.add("vpn disconnects", "question", "vpn")
+        cache.lookup("printer jam", "question")
+        cache.add("payroll date", "question", "payroll")
+
+        assert len(cache) == 2
+        assert cache.stats()["evictions"] == 1
+        assert cache.lookup("vpn disconnects", "question") is None
+        assert cache.lookup("printer jam", "question").answer == "printer"
+
+    def test_pluggable_embedder(self):
+        """Test that any Embedder implementation can be used."""
+        class ConstantEmbedder(HashingEmbedder):
+            def embed(self, texts):
+                return np.ones((len(texts), 4), dtype=np.float32) / 2
+
+        cache = SemanticCache(ConstantEmbedder(), capacity=4)
+        cache.add("anything", None, "same")
+
+        assert cache.lookup("something else").answer == "same"
+
+
+class TestChatBotSemanticCache:
+    """Test suite for semantic caching in ChatBot."""
+
+    async def test_paraphrase_skips_provider(self, fake_provider_factory):
+        """Test that a paraphrased question is answered without the provider."""
+        provider = fake_provider_factory(tokens=["Use ", "the portal."])
+        bot = ChatBot(Config(semantic_cache_enabled=True), provider=provider)
+
+        first = await bot.chat_async("How do I reset my password?")
+        second = await bot.chat_async("Password reset steps?")
+
+        assert len(provider.calls) == 1
+        assert second.message == first.message
+        assert second.metadata["cache_tier"] == "semantic"
+
+    def test_disabled_by_default(self):
+        """Test that the semantic cache is opt-in."""
+        assert ChatBot().semantic_cache is None
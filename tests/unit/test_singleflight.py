@@ -0,0 +1,193 @@
+"""
+Unit tests for single-flight request coalescing.
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from intramind import ChatBot, Config
+from intramind.core.singleflight import SingleFlight
+
+
+class TestSingleFlight:
+    """Test suite for SingleFlight."""
+
+    async def test_concurrent_calls_share_one_run(self):
+        """Test that identical concurrent calls run once and free the key afterwards."""
+        flights = SingleFlight()
+        runs = []
+
+        async def work(key):
+            runs.append(key)
+            await asyncio.sleep(0.01)
+            return f"result {key}"
+
+        results = await asyncio.gather(*(flights.do(key, lambda key=key: work(key))
+                                         for key in ["a"] * 5 + ["b"] * 3))
+        again = await flights.do("a", lambda: work("a"))
+
+        assert results == ["result a"] * 5 + ["result b"] * 3
+        assert again == "result a"
+        assert runs == ["a", "b", "a"]
+        assert flights.stats() == {"leaders": 3, "followers": 6, "in_flight": 0}
+
+    async def test_errors_reach_every_caller(self):
+        """Test that an exception from the shared call is raised to all callers."""
+        flights = SingleFlight()
+
+        async def fail():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("provider down")
+
+        results = await asyncio.gather(*(flights.do("k", fail) for _ in range(3)),
+                                       return_exceptions=True)
+
+        assert all(isinstance(r, RuntimeError) for r in results)
+
+    async def test_cancelled_caller_leaves_call_running(self):
+        """Test that the call is cancelled only when every caller has gone."""
+        flights = SingleFlight()
+        finished = []
+
+        async def work():
+            await asyncio.sleep(0.05)
+            finished.append(True)
+            return "done"
+
+        leader = asyncio.ensure_future(flights.do("k", work))
+        follower = asyncio.ensure_future(flights.do("k", work))
+        await asyncio.sleep(0)
+        leader.cancel()
+
+        assert await follower == "done"
+        assert finished == [True]
+
+        lone = asyncio.ensure_future(flights.do("k", work))
+        await asyncio.sleep(0)
+        lone.cancel()
+        await asyncio.sleep(0.1)
+
+        assert finished == [True]
+        assert flights.stats()["in_flight"] == 0
+
+    async def test_late_subscribers_replay_stream(self):
+        """Test that a follower joining mid-stream receives every chunk."""
+        flights = SingleFlight()
+        opened = []
+
+        async def tokens():
+            opened.append(True)
+            for token in ["one", " two", " three"]:
+                await asyncio.sleep(0.01)
+                yield token
+
+        async def read(delay):
+            await asyncio.sleep(delay)
+            return [chunk async for chunk in flights.stream("k", tokens)]
+
+        results = await asyncio.gather(read(0), read(0.015), read(0.025))
+
+        assert results == [["one", " two", " three"]] * 3
+        assert opened == [True]
+
+    async def test_stream_is_paced_by_fastest_subscriber(self):
+        """Test that the shared stream is not read ahead of its subscribers."""
+        flights = SingleFlight()
+        produced = []
+
+        async def tokens():
+            for index in range(100):
+                produced.append(index)
+                yield index
+
+        stream = flights.stream("k", tokens)
+        assert await stream.__anext__() == 0
+        await asyncio.sleep(0.01)
+        await stream.aclose()
+
+        assert len(produced) <= 2
+
+
+class TestChatBotCoalescing:
+    """Test suite for single-flight generation in ChatBot."""
+
+    async def test_identical_prompts_share_generation(self, fake_provider_factory):
+        """Test that concurrent identical prompts send one provider request."""
+        provider = fake_provider_factory(first_token_delay=0.02)
+        bot = ChatBot(Config(cache_enabled=False), provider=provider)
+        prompts = ["Is the VPN down?", "is the vpn down", "Is the VPN down?!"]
+
+        responses = await asyncio.gather(*(bot.chat_async(prompt, session_id=f"user-{i}")
+                                           for i, prompt in enumerate(prompts * 4)))
+
+        assert len(provider.calls) == 1
+        assert {r.message for r in responses} == {"Hello, world!"}
+        for i, prompt in enumerate(prompts * 4):
+            history = bot.get_session_history(f"user-{i}")
+            assert [m["content"] for m in history] == [prompt, "Hello, world!"]
+        assert bot.singleflight.stats()["followers"] == 11
+
+    async def test_identical_streams_share_generation(self, fake_provider_factory):
+        """Test that concurrent chat_stream calls share one provider stream."""
+        provider = fake_provider_factory(token_delay=0.01)
+        bot = ChatBot(Config(cache_enabled=False), provider=provider)
+
+        async def collect(session_id):
+            return [chunk async for chunk in bot.chat_stream("Status?", session_id=session_id)]
+
+        streams = await asyncio.gather(*(collect(f"s{i}") for i in range(5)))
+
+        assert len(provider.calls) == 1
+        for i, chunks in enumerate(streams):
+            assert [c.delta for c in chunks[:-1]] == ["Hello", ", ", "world", "!"]
+            assert chunks[-1].response.session_id == f"s{i}"
+            assert len(bot.get_session_history(f"s{i}")) == 2
+
+    async def test_different_history_is_not_coalesced(self, fake_provider_factory):
+        """Test that the same prompt after different history generates separately."""
+        provider = fake_provider_factory(first_token_delay=0.02)
+        bot = ChatBot(Config(cache_enabled=False), provider=provider)
+        await bot.chat_async("I use Windows", session_id="windows")
+        await bot.chat_async("I use macOS", session_id="mac")
+        provider.calls.clear()
+
+        await asyncio.gather(bot.chat_async("How do I install the VPN?", session_id="windows"),
+                             bot.chat_async("How do I install the VPN?", session_id="mac"))
+
+        assert len(provider.calls) == 2
+
+    def test_sync_chat_threads_share_generation(self, fake_provider_factory):
+        """Test that chat() calls from threads coalesce on the background loop."""
+        provider = fake_provider_factory(first_token_delay=0.1)
+        bot = ChatBot(Config(cache_enabled=False), provider=provider)
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            replies = list(pool.map(lambda i: bot.chat("Printer offline",
+                                                       session_id=f"t{i}").message, range(4)))
+
+        assert replies == ["Hello, world!"] * 4
+        assert len(provider.calls) == 1
+
+    @pytest.mark.parametrize("enabled, expected_calls", [(True, 1), (False, 3)])
+    async def test_singleflight_can_be_disabled(self, fake_provider_factory, enabled,
+                                                expected_calls):
+        """Test that SINGLEFLIGHT_ENABLED=false sends every request."""
+        provider = fake_provider_factory(first_token_delay=0.02)
+        bot = ChatBot(Config(cache_enabled=False, singleflight_enabled=enabled),
+                      provider=provider)
+
+        await asyncio.gather(*(bot.chat_async("Hi there", session_id=f"d{i}") for i in range(3)))
+
+        assert len(provider.calls) == expected_calls
+
+    def test_flight_key_follows_provider_model(self, fake_provider_factory):
+        """Test that prompts for different provider models are not coalesced."""
+        bot = ChatBot(Config(cache_enabled=False), provider=fake_provider_factory())
+        messages = [{"role": "user", "content": "Is the VPN down?"}]
+        before = bot._flight_key(messages)
+
+        bot.provider.model = "other-model"
+
+        assert bot._flight_key(messages) != before
@@ -0,0 +1,97 @@
+"""
+Unit tests for streaming responses via ChatBot.chat_stream.
+"""
+
+import asyncio
+
+from intramind import ChatBot
+from intramind.core.chatbot import StreamChunk
+
+
+class TestChatStream:
+    """Test suite for ChatBot.chat_stream."""
+
+    async def test_stream_yields_provider_chunks(self, fake_provider_factory):
+        """Test that chunks arrive as the provider emits them."""
+        bot = ChatBot(provider=fake_provider_factory(tokens=["a", "b", "c"]))
+        chunks = [chunk async for chunk in bot.chat_stream("Hello", session_id="st-1")]
+
+        assert all(isinstance(chunk, StreamChunk) for chunk in chunks)
+        assert [c.delta for c in chunks[:-1]] == ["a", "b", "c"]
+        assert chunks[-1].done is True
+        assert chunks[-1].response.message == "abc"
+        assert chunks[-1].response.session_id == "st-1"
+
+    async def test_first_chunk_before_stream_completes(self, fake_provider_factory):
+        """Test that the first chunk is delivered before the last token exists."""
+        provider = fake_provider_factory(tokens=["x"] * 5, token_delay=0.05)
+        bot = ChatBot(provider=provider)
+        loop = asyncio.get_running_loop()
+
+        stream = bot.chat_stream("Hello")
+        start = loop.time()
+        await stream.__anext__()
+        first_chunk_after = loop.time() - start
+        remaining = [chunk async for chunk in stream]
+
+        assert first_chunk_after < 0.1
+        assert remaining[-1].response.metadata["total_time"] >= 0.2
+
+    async def test_time_to_first_token_metadata(self, fake_provider_factory):
+        """Test that the final metadata reports time-to-first-token."""
+        provider = fake_provider_factory(first_token_delay=0.1, token_delay=0.02)
+        bot = ChatBot(provider=provider)
+        final = [chunk async for chunk in bot.chat_stream("Hello")][-1]
+        metadata = final.response.metadata
+
+        assert 0.1 <= metadata["time_to_first_token"] < metadata["total_time"]
+        assert metadata["model"] == bot.config.model_name
+
+    async def test_history_appended_only_on_completion(self, fake_provider_factory):
+        """Test that the assistant message is added after the stream ends."""
+        bot = ChatBot(provider=fake_provider_factory(tokens=["one ", "two"]))
+        stream = bot.chat_stream("Hi", session_id="st-2")
+
+        await stream.__anext__()
+        assert [m["role"] for m in bot.get_session_history("st-2")] == ["user"]
+
+        async for _ in stream:
+            pass
+        history = bot.get_session_history("st-2")
+        assert [m["role"] for m in history] == ["user", "assistant"]
+        assert history[-1]["content"] == "one two"
+
+    async def test_abandoned_stream_not_recorded(self, fake_provider_factory):
+        """Test that a stream closed early leaves no assistant message."""
+        bot = ChatBot(provider=fake_provider_factory(tokens=["a", "b"]))
+        stream = bot.chat_stream("Hi", session_id="st-3")
+        await stream.__anext__()
+        await stream.aclose()
+
+        assert [m["role"] for m in bot.get_session_history("st-3")] == ["user"]
+
+    async def test_provider_failure(self, fake_provider_factory):
+        """Test that a provider error ends the stream with an error response."""
+        bot = ChatBot(provider=fake_provider_factory(fail_after=1))
+        chunks = [chunk async for chunk in bot.chat_stream("Hi", session_id="st-4")]
+
+        assert chunks[-1].done is True
+        assert chunks[-1].response.confidence == 0.0
+        assert "error" in chunks[-1].response.metadata
+
+    async def test_stream_without_provider(self):
+        """Test that the placeholder response streams as one chunk."""
+        bot = ChatBot()
+        chunks = [chunk async for chunk in bot.chat_stream("Hello")]
+
+        assert chunks[0].delta == bot.chat("Hello").message
+        assert chunks[-1].done is True
+
+    async def test_chat_async_uses_provider(self, fake_provider_factory):
+        """Test that chat_async returns the assembled provider response."""
+        provider = fake_provider_factory(tokens=["ok"])
+        bot = ChatBot(provider=provider)
+        response = await bot.chat_async("Hi", session_id="st-5")
+
+        assert response.message == "ok"
+        assert provider.calls[0] == [{"role": "user", "content": "Hi"}]
@@ -0,0 +1,119 @@
+"""
+Unit tests for the knowledge base vector indexes.
+"""
+
+import multiprocessing
+
+import numpy as np
+import pytest
+
+from intramind.knowledge.vector_index import FlatIndex, IVFIndex, recall_at_k
+
+
+def clustered_vectors(rows, dimension=32, clusters=20, seed=0):
+    """Unit vectors scattered around random cluster centers."""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dimension))
+    vectors = centers[rng.integers(clusters, size=rows)] + 0.3 * rng.normal(size=(rows, dimension))
+    return (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype(np.float32)
+
+
+@pytest.fixture
+def flat(tmp_path):
+    index = FlatIndex(tmp_path / "vectors.f32", dimension=32)
+    index.append(clustered_vectors(4000))
+    yield index
+    index.close()
+
+
+def search_in_child(directory, queries, connection):
+    """Open an index in another process and send back its results."""
+    flat = FlatIndex(directory / "vectors.f32", dimension=32)
+    index = IVFIndex(flat, directory, nprobe=4)
+    connection.send(index.search(queries, k=5)[0])
+    index.close()
+
+
+class TestFlatIndex:
+    """Test suite for FlatIndex."""
+
+    def test_exact_search(self, flat):
+        """Test that the flat index returns the true nearest rows."""
+        vectors = np.asarray(flat.vectors())
+        ids, scores = flat.search(vectors[:5], k=3)
+
+        assert ids[:, 0].tolist() == [0, 1, 2, 3, 4]
+        expected = np.sort(vectors[:5] @ vectors.T, axis=1)[:, ::-1][:, :3]
+        assert np.allclose(scores, expected, atol=1e-5)
+
+    def test_delete(self, flat):
+        """Test that deleted rows are skipped and counted."""
+        query = np.asarray(flat.vectors()[7])
+
+        assert flat.delete([7, 7, 8]) == 2
+        assert 7 not in flat.search(query, k=10)[0][0]
+        assert flat.live == 3998
+
+    def test_persistence(self, flat, tmp_path):
+        """Test that rows and deletions survive reopening."""
+        flat.delete([3])
+        flat.sync()
+        reopened = FlatIndex(tmp_path / "vectors.f32", dimension=32)
+
+        assert len(reopened) == 4000
+        assert reopened.live == 3999
+        reopened.close()
+
+
+class TestIVFIndex:
+    """Test suite for IVFIndex."""
+
+    def test_recall_increases_with_nprobe(self, flat, tmp_path):
+        """Test that probing more lists trades latency for recall."""
+        queries = clustered_vectors(50, seed=1)
+        exact, _ = flat.search(queries, k=10)
+        index = IVFIndex.build(flat, tmp_path, nlist=64)
+
+        recalls = [recall_at_k(index.search(queries, k=10, nprobe=n)[0], exact)
+                   for n in (1, 8, 64)]
+
+        assert recalls[0] <= recalls[1] <= recalls[2]
+        assert recalls[1] > 0.8
+        assert recalls[2] == 1.0
+
+    def test_appends_and_deletes_are_visible(self, flat, tmp_path):
+        """Test that rows added or deleted after a build are searched correctly."""
+        index = IVFIndex.build(flat, tmp_path, nlist=32, nprobe=32)
+        added = clustered_vectors(10, seed=2)
+        index.append(added)
+        deleted_query = np.asarray(flat.vectors()[5])
+        index.delete([5])
+
+        assert index.tail == 10
+        assert index.search(added, k=1)[0][:, 0].tolist() == list(range(4000, 4010))
+        assert 5 not in index.search(deleted_query, k=10)[0][0]
+
+    def test_rebuild_publishes_new_generation(self, flat, tmp_path):
+        """Test that readers switch generations only when they refresh."""
+        first = IVFIndex.build(flat, tmp_path, nlist=16)
+        reader = IVFIndex(flat, tmp_path)
+        second = IVFIndex.build(flat, tmp_path, nlist=32)
+
+        assert reader.nlist == 16
+        assert reader.search(np.asarray(flat.vectors()[:2]), k=1)[0][:, 0].tolist() == [0, 1]
+        assert reader.refresh()
+        assert reader.nlist == second.nlist == 32
+        assert first.generation != second.generation
+
+    def test_shared_between_processes(self, flat, tmp_path):
+        """Test that another process can open and search the same files."""
+        index = IVFIndex.build(flat, tmp_path, nlist=32, nprobe=4)
+        queries = clustered_vectors(5, seed=3)
+        context = multiprocessing.get_context("spawn")
+        parent, child = context.Pipe()
+        process = context.Process(target=search_in_child, args=(tmp_path, queries, child))
+        process.start()
+        result = parent.recv()
+        process.join()
+
+        assert np.array_equal(result, index.search(queries, k=5)[0])